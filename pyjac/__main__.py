@@ -5,6 +5,12 @@
 
 
 def main(args=None):
+    if args is None and sys.argv[1:2] == ['analyze']:
+        from .analysis import cost_model
+        return cost_model.main(argv=sys.argv[2:])
+    if args is None and sys.argv[1:2] == ['tune']:
+        from .core import autotune
+        return autotune.main(argv=sys.argv[2:])
     if args is None:
         args = utils.get_parser()
         create_jacobian(
@@ -12,6 +18,8 @@ def main(args=None):
                     mech_name=args.input,
                     therm_name=args.thermo,
                     optimize_cache=args.cache_optimizer,
+                    cache_refine=args.cache_refine,
+                    cache_patience=args.cache_patience,
                     initial_state=args.initial_conditions,
                     num_blocks=args.num_blocks,
                     num_threads=args.num_threads,
@@ -22,7 +30,16 @@ def main(args=None):
                     build_path=args.build_path,
                     skip_jac=args.skip_jac,
                     last_spec=args.last_species,
-                    auto_diff=args.auto_diff
+                    auto_diff=args.auto_diff,
+                    batch_chunk=args.batch_chunk,
+                    layout=args.layout,
+                    vector_width=args.vector_width,
+                    jac_format=args.jac_format,
+                    kc_mode=args.kc_mode,
+                    hoist_trange=args.hoist_trange,
+                    gen_jobs=args.gen_jobs,
+                    mech_cache=args.mech_cache,
+                    tuned_params=args.tuned_params
                     )
 
 if __name__ == '__main__':
@@ -0,0 +1,2 @@
+from .cache_sim import LRUCache, read_kernels, get_trace, simulate, simulate_build
+from .cost_model import count_routines, roofline, analyze
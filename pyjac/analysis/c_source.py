@@ -0,0 +1,192 @@
+"""Parsing of the generated C source for the static analyses.
+
+The routines of a build directory are located after removing the comments
+and resolving the conditional compilation directives (e.g., ``CONP`` /
+``CONV``), and their bodies are split into statements by the analyses.
+"""
+
+# Python 2 compatibility
+from __future__ import division
+from __future__ import print_function
+
+# Standard libraries
+import os
+import re
+from collections import OrderedDict
+
+__all__ = ['DECLARATION', 'strip_source', 'preprocess', 'matching_bracket',
+           'split_args', 'read_routines']
+
+DECLARATION = re.compile(
+    r'^\s*(?:(?:const|static|register|volatile|inline)\s+)*' +
+    r'(?:double|float|int|long|unsigned|char|short|size_t|bool|void)\b' +
+    r'[\s\*]*(?:__restrict__\s*)?')
+"""regex: the type (and qualifiers) at the start of a declaration"""
+
+_FUNC = re.compile(r'^[ \t]*(?:(?:static|inline|extern)\s+)*(?:const\s+)?' +
+                   r'\w+[\s\*]+(\w+)\s*\(([^()]*)\)\s*\{', re.MULTILINE)
+_KEYWORDS = {'if', 'for', 'while', 'switch', 'return', 'sizeof', 'else'}
+
+
+def strip_source(text):
+    """Removes the comments and string literals from C source."""
+    text = re.sub(r'"(?:\\.|[^"\\])*"', '""', text)
+    text = re.sub(r'/\*.*?\*/', ' ', text, flags=re.DOTALL)
+    return re.sub(r'//[^\n]*', '', text)
+
+
+def _condition(expr, defines):
+    """Evaluates a preprocessor condition, unknown macros are zero."""
+    expr = re.sub(r'defined\s*\(\s*(\w+)\s*\)|defined\s+(\w+)',
+                  lambda m: '1' if (m.group(1) or m.group(2)) in defines
+                  else '0', expr)
+    expr = re.sub(r'[A-Za-z_]\w*',
+                  lambda m: str(defines.get(m.group(0), 0)), expr)
+    expr = expr.replace('&&', ' and ').replace('||', ' or ')
+    expr = re.sub(r'!(?!=)', ' not ', expr)
+    try:
+        return bool(eval(expr, {'__builtins__': {}}))
+    except Exception:
+        return False
+
+
+def preprocess(text, defines):
+    """Resolves the conditional compilation directives of C source.
+
+    Parameters
+    ----------
+    text : str
+        The source, without comments
+    defines : dict
+        The value of each defined macro, updated by ``#define``
+
+    Returns
+    -------
+    text : str
+        The active source lines, without any directives
+
+    """
+    lines = []
+    # each entry: (this branch is active, a branch was taken)
+    stack = []
+    for line in text.split('\n'):
+        stripped = line.strip()
+        active = all(x[0] for x in stack)
+        if not stripped.startswith('#'):
+            if active:
+                lines.append(line)
+            continue
+        directive = stripped[1:].strip()
+        word = directive.split(None, 1)[0] if directive else ''
+        rest = directive[len(word):].strip()
+        if word in ('if', 'ifdef', 'ifndef'):
+            if word == 'ifdef':
+                cond = rest in defines
+            elif word == 'ifndef':
+                cond = rest not in defines
+            else:
+                cond = _condition(rest, defines)
+            cond = cond and active
+            stack.append((cond, cond))
+        elif word == 'elif' and stack:
+            taken = stack[-1][1]
+            parent = all(x[0] for x in stack[:-1])
+            cond = not taken and parent and _condition(rest, defines)
+            stack[-1] = (cond, taken or cond)
+        elif word == 'else' and stack:
+            taken = stack[-1][1]
+            parent = all(x[0] for x in stack[:-1])
+            stack[-1] = (not taken and parent, True)
+        elif word == 'endif' and stack:
+            stack.pop()
+        elif word == 'define' and active:
+            parts = rest.split(None, 1)
+            if parts and '(' not in parts[0]:
+                defines[parts[0]] = parts[1] if len(parts) > 1 else 1
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def matching_bracket(text, start, opening, closing):
+    """Returns the index of the bracket closing the one at ``start``."""
+    end = text.find(closing, start + 1)
+    if end >= 0 and text.find(opening, start + 1, end) < 0:
+        return end
+    depth = 0
+    for i in range(start, len(text)):
+        if text[i] == opening:
+            depth += 1
+        elif text[i] == closing:
+            depth -= 1
+            if not depth:
+                return i
+    return len(text)
+
+
+def split_args(text):
+    """Splits a comma-separated list at the top level."""
+    args = []
+    depth = 0
+    last = 0
+    for i, char in enumerate(text):
+        if char in '([{':
+            depth += 1
+        elif char in ')]}':
+            depth -= 1
+        elif char == ',' and not depth:
+            args.append(text[last:i].strip())
+            last = i + 1
+    if text[last:].strip():
+        args.append(text[last:].strip())
+    return args
+
+
+def read_routines(build_path, defines=None):
+    """Finds the routines defined in the C files of a build directory.
+
+    Parameters
+    ----------
+    build_path : str
+        The directory of the generated C files, including sub-directories
+        (e.g., the unrolled ``jacobs``), except hidden ones
+    defines : dict, optional
+        The macros defined for the preprocessor; by default ``CONP``
+
+    Returns
+    -------
+    routines : dict
+        For each routine name, its pointer parameters (``None`` for the
+        others), its body and the file (relative to ``build_path``) it is
+        defined in
+
+    """
+    if defines is None:
+        defines = {'CONP': 1}
+    routines = OrderedDict()
+    for root, dirs, files in os.walk(build_path):
+        dirs[:] = sorted(x for x in dirs if not x.startswith('.'))
+        for filename in sorted(files):
+            if not filename.endswith('.c'):
+                continue
+            filename = os.path.join(root, filename)
+            with open(filename, 'r') as file:
+                text = preprocess(strip_source(file.read()), dict(defines))
+            filename = os.path.relpath(filename, build_path)
+
+            pos = 0
+            while True:
+                match = _FUNC.search(text, pos)
+                if match is None:
+                    break
+                end = matching_bracket(text, match.end() - 1, '{', '}')
+                if match.group(1) not in _KEYWORDS:
+                    params = []
+                    for param in split_args(match.group(2)):
+                        name = re.findall(r'\w+', param.replace('[]', ''))
+                        pointer = '*' in param or '[' in param
+                        params.append(name[-1] if pointer and name else None)
+                    routines[match.group(1)] = (params,
+                                                text[match.end():end],
+                                                filename)
+                pos = end + 1
+    return routines
@@ -0,0 +1,585 @@
+"""Access-trace cache simulator for the generated C code.
+
+The array accesses of each generated routine (kernel), e.g., ``C[]``,
+``fwd_rxn_rates[]``, ``sp_rates[]`` or ``jac[]``, are extracted from the
+source in program order, and replayed through a set-associative LRU cache
+model.  This gives a fast and deterministic comparison of species /
+reaction orderings and code layouts, without hardware counters.
+
+The model makes the following simplifications:
+
+* one state per call; for the 'soa' layout, the loops over the states
+  of a block are traced for the first state (``lane`` 0), with the
+  ``VECWIDTH`` of ``header.h`` unless defined otherwise
+* only accesses with constant indices are traced and the others are
+  counted as unresolved, e.g., in loops over the states
+* scalar locals are assumed to be held in registers, and only arrays are
+  traced, each starting on a new cache line
+* both branches of a conditional are traced
+* the cache is write-allocate, and reads and writes are treated alike
+* calls of other generated routines are inlined, with the array arguments
+  bound to the arrays (and offsets) of the caller
+"""
+
+# Python 2 compatibility
+from __future__ import division
+from __future__ import print_function
+
+# Standard libraries
+import os
+import re
+import sys
+import json
+from collections import OrderedDict
+from argparse import ArgumentParser
+
+# Local imports
+from .c_source import (DECLARATION, read_routines, matching_bracket,
+                       split_args)
+
+__all__ = ['LRUCache', 'read_kernels', 'get_trace', 'simulate',
+           'simulate_build', 'reuse_bins']
+
+_CALL = re.compile(r'^\s*(\w+)\s*\((.*)\)\s*$', re.DOTALL)
+_ARRAY = re.compile(r'\b([A-Za-z_]\w*)\s*\[')
+_INDEX = re.compile(r'^[\d\s\+\-\*/%\(\)]+$')
+_SOA_INDEX = re.compile(r'\bINDEX\s*\(')
+
+
+def _evaluate(index, defines):
+    """Returns the value of a constant index expression, or ``None``."""
+    if index.strip().isdigit():
+        return int(index)
+    index = re.sub(r'[A-Za-z_]\w*',
+                   lambda m: str(defines.get(m.group(0), m.group(0))), index)
+    if not _INDEX.match(index):
+        return None
+    try:
+        return int(eval(index.replace('/', '//'), {'__builtins__': {}}))
+    except Exception:
+        return None
+
+
+def _expand_index(body):
+    """Expands the structure-of-arrays ``INDEX(i)`` macro of ``header.h``.
+    """
+    pos = 0
+    while True:
+        match = _SOA_INDEX.search(body, pos)
+        if match is None:
+            return body
+        end = matching_bracket(body, match.end() - 1, '(', ')')
+        expansion = '(lane + ({}) * VECWIDTH)'.format(
+            body[match.end():end])
+        body = body[:match.start()] + expansion + body[end + 1:]
+        pos = match.start() + len('(lane + (')
+
+
+def _soa_defines(build_path, defines):
+    """Returns the macros for the indices of a structure-of-arrays build,
+    i.e., ``VECWIDTH`` and the first ``lane``, or ``defines`` otherwise.
+    """
+    try:
+        with open(os.path.join(build_path, 'header.h'), 'r') as file:
+            header = file.read()
+    except (IOError, OSError):
+        return defines
+    if '#define INDEX(' not in header:
+        return defines
+    defines = dict(defines)
+    width = re.search(r'#define\s+VECWIDTH\s+(\d+)', header)
+    if width is not None:
+        defines.setdefault('VECWIDTH', int(width.group(1)))
+    defines['lane'] = 0
+    return defines
+
+
+def _accesses(expr, defines, events):
+    """Appends the reads of the arrays in an expression, in program order.
+
+    Returns
+    -------
+    last : tuple or None
+        The final (array, index) access if it spans the whole expression,
+        i.e., the expression is an array element
+
+    """
+    pos = 0
+    last = None
+    while True:
+        match = _ARRAY.search(expr, pos)
+        if match is None:
+            break
+        start = match.end() - 1
+        end = matching_bracket(expr, start, '[', ']')
+        index = expr[start + 1:end]
+        # the index is evaluated before the element is accessed
+        _accesses(index, defines, events)
+        access = (match.group(1), _evaluate(index, defines))
+        events.append(('r',) + access)
+        last = access if (not expr[:match.start()].strip() and
+                          not expr[end + 1:].strip()) else None
+        pos = end + 1
+    return last
+
+
+def _assignment(stmt):
+    """Returns the position and length of the top-level assignment operator.
+    """
+    depth = 0
+    for i, char in enumerate(stmt):
+        if char in '([{':
+            depth += 1
+        elif char in ')]}':
+            depth -= 1
+        elif char == '=' and not depth:
+            before = stmt[i - 1] if i else ''
+            after = stmt[i + 1] if i + 1 < len(stmt) else ''
+            if after == '=' or before in '=!<>' and before:
+                if before in '<>' and i > 1 and stmt[i - 2] == before:
+                    return i - 2, 3
+                continue
+            if before and before in '+-*/%&|^':
+                return i - 1, 2
+            return i, 1
+    return None
+
+
+def _statement(stmt, kernels, defines):
+    """Returns the array accesses and calls of a statement."""
+    events = []
+    stmt = stmt.strip()
+    if not stmt:
+        return events
+
+    call = _CALL.match(stmt)
+    if call and call.group(1) in kernels:
+        bindings = []
+        for arg in split_args(call.group(2)):
+            ref = re.match(r'^&\s*(\w+)\s*(?:\[(.*)\])?$', arg, re.DOTALL)
+            if ref:
+                offset = 0
+                if ref.group(2) is not None:
+                    _accesses(ref.group(2), defines, events)
+                    offset = _evaluate(ref.group(2), defines)
+                bindings.append((ref.group(1), offset))
+            elif re.match(r'^\w+$', arg):
+                bindings.append((arg, 0))
+            else:
+                _accesses(arg, defines, events)
+                bindings.append(None)
+        events.append(('call', call.group(1), bindings))
+        return events
+
+    decl = DECLARATION.match(stmt)
+    if decl:
+        stmt = stmt[decl.end():]
+        if re.match(r'^\w+\s*\[', stmt):
+            # array declaration, initializer lists are not traced
+            return events
+        if re.match(r'^\w+\s*\(', stmt):
+            # function prototype
+            return events
+
+    op = _assignment(stmt)
+    if op is None:
+        _accesses(stmt, defines, events)
+        return events
+    start, length = op
+    lhs, rhs = stmt[:start], stmt[start + length:]
+    _accesses(rhs, defines, events)
+    target = []
+    element = _accesses(lhs, defines, target)
+    if element is not None:
+        # the reads of the target's index, then the target itself
+        events.extend(target[:-1])
+        if length > 1:
+            events.append(('r',) + element)
+        events.append(('w',) + element)
+    else:
+        events.extend(target)
+    return events
+
+
+def read_kernels(build_path, defines=None, routines=None):
+    """Extracts the array accesses of the generated C routines.
+
+    Parameters
+    ----------
+    build_path : str
+        The directory of the generated C files, including sub-directories
+    defines : dict, optional
+        The macros defined for the preprocessor; by default ``CONP``.  For
+        the 'soa' layout, ``VECWIDTH`` overrides the width of ``header.h``.
+    routines : dict, optional
+        The routines already found by `c_source.read_routines`
+
+    Returns
+    -------
+    kernels : dict
+        For each routine name, the pointer parameters (``None`` for the
+        others) and the ordered access events: ``('r' or 'w', array,
+        index)``, with ``None`` for non-constant indices, and ``('call',
+        routine, bindings)``, binding each argument to a caller (array,
+        offset) or ``None``
+
+    """
+    if defines is None:
+        defines = {'CONP': 1}
+    # all routines are found first, such that calls can be recognized
+    bodies = routines
+    if bodies is None:
+        bodies = read_routines(build_path, defines)
+
+    # the structure-of-arrays indices, for the first state of a block
+    index_defines = _soa_defines(build_path, defines)
+
+    kernels = OrderedDict()
+    for name, (params, body, filename) in bodies.items():
+        events = []
+        for stmt in re.split(r'[;{}]', _expand_index(body)):
+            events.extend(_statement(stmt, bodies, index_defines))
+        kernels[name] = {'params': params, 'events': events}
+    return kernels
+
+
+def get_trace(kernels, name, inline_calls=True, _binding=None, _depth=0):
+    """Flattens the accesses of a routine into a trace.
+
+    Parameters
+    ----------
+    kernels : dict
+        The routines, see `read_kernels`
+    name : str
+        The routine to trace
+    inline_calls : bool, optional
+        If ``True``, the accesses of the called routines are included
+
+    Returns
+    -------
+    trace : list of tuple
+        The ``(array, index, is_write)`` accesses, the arrays of called
+        routines are replaced by the caller's, or else prefixed by the
+        routine name.  The index is ``None`` if it is not constant.
+
+    """
+    binding = _binding if _binding is not None else {}
+    prefix = '{}.'.format(name) if _depth else ''
+
+    def __resolve(array, index):
+        if array in binding:
+            root, offset = binding[array]
+            if index is None or offset is None:
+                return root, None
+            return root, index + offset
+        return prefix + array, index
+
+    trace = []
+    for event in kernels[name]['events']:
+        if event[0] != 'call':
+            array, index = __resolve(event[1], event[2])
+            trace.append((array, index, event[0] == 'w'))
+            continue
+        if not inline_calls or _depth >= 16:
+            continue
+        callee = kernels[event[1]]
+        inner = {}
+        for param, arg in zip(callee['params'], event[2]):
+            if param is not None and arg is not None:
+                inner[param] = __resolve(*arg)
+        trace.extend(get_trace(kernels, event[1], inline_calls,
+                               inner, _depth + 1))
+    return trace
+
+
+class LRUCache(object):
+    """A set-associative cache with least-recently-used replacement.
+
+    Parameters
+    ----------
+    line_size : int, optional
+        The size of a cache line [bytes]
+    associativity : int, optional
+        The number of lines per set
+    capacity : int, optional
+        The total size of the cache [bytes], a multiple of
+        ``line_size * associativity``
+
+    """
+    def __init__(self, line_size=64, associativity=8, capacity=32 * 1024):
+        if (line_size <= 0 or associativity <= 0 or
+                capacity % (line_size * associativity) or
+                capacity < line_size * associativity):
+            raise ValueError('Cache capacity must be a positive multiple of '
+                             'the line size times the associativity')
+        self.line_size = line_size
+        self.associativity = associativity
+        self.num_sets = capacity // (line_size * associativity)
+        self.sets = [OrderedDict() for i in range(self.num_sets)]
+
+    def access(self, address):
+        """Accesses an address, and returns ``True`` for a cache hit."""
+        line = address // self.line_size
+        lines = self.sets[line % self.num_sets]
+        if line in lines:
+            lines[line] = lines.pop(line)
+            return True
+        if len(lines) >= self.associativity:
+            lines.popitem(last=False)
+        lines[line] = True
+        return False
+
+
+def reuse_bins(max_distance):
+    """Returns the labels of the reuse-distance histogram bins.
+
+    The distances are binned by powers of two, ``'0'``, ``'1'``, ``'2-3'``,
+    ``'4-7'``, ... and ``'cold'`` for the first access of each line.
+    """
+    labels = ['0']
+    low = 1
+    while low <= max_distance:
+        labels.append(str(low) if low == 1 else
+                      '{}-{}'.format(low, 2 * low - 1))
+        low *= 2
+    return labels + ['cold']
+
+
+def _bin(distance):
+    """Returns the label of the histogram bin of a reuse distance."""
+    if distance < 2:
+        return str(distance)
+    low = 1 << (distance.bit_length() - 1)
+    return '{}-{}'.format(low, 2 * low - 1)
+
+
+def simulate(trace, line_size=64, associativity=8, capacity=32 * 1024,
+             element_size=8):
+    """Replays an access trace through an LRU cache.
+
+    Each array is placed at the start of a new cache line, sized by the
+    largest index accessed.
+
+    Parameters
+    ----------
+    trace : list of tuple
+        The ``(array, index, is_write)`` accesses, see `get_trace`
+    line_size : int, optional
+        The size of a cache line [bytes]
+    associativity : int, optional
+        The number of lines per set
+    capacity : int, optional
+        The total size of the cache [bytes]
+    element_size : int, optional
+        The size of an array element [bytes]
+
+    Returns
+    -------
+    stats : dict
+        The number of ``accesses``, ``reads``, ``writes``, ``unresolved``
+        (non-constant index) accesses, cache ``hits`` and ``misses``, the
+        ``hit_rate``, the ``footprint`` in cache lines, and the ``reuse``
+        histogram of the number of distinct lines accessed between
+        accesses of the same line, see `reuse_bins`
+
+    """
+    cache = LRUCache(line_size, associativity, capacity)
+    resolved = [x for x in trace if x[1] is not None and x[1] >= 0]
+
+    extents = OrderedDict()
+    for array, index, write in resolved:
+        extents[array] = max(extents.get(array, 0), index + 1)
+    base = {}
+    address = 0
+    for array, extent in extents.items():
+        base[array] = address
+        lines = -(-extent * element_size // line_size)
+        address += lines * line_size
+
+    # Fenwick tree over the access times, marking the latest access of each
+    # line, to count the distinct lines accessed since the previous access
+    tree = [0] * (len(resolved) + 1)
+
+    def __update(pos, value):
+        while pos <= len(resolved):
+            tree[pos] += value
+            pos += pos & -pos
+
+    def __query(pos):
+        total = 0
+        while pos > 0:
+            total += tree[pos]
+            pos -= pos & -pos
+        return total
+
+    last_time = {}
+    reuse = {}
+    hits = 0
+    writes = 0
+    for time, (array, index, write) in enumerate(resolved, 1):
+        address = base[array] + index * element_size
+        hits += cache.access(address)
+        writes += write
+        line = address // line_size
+        if line in last_time:
+            label = _bin(__query(time - 1) - __query(last_time[line]))
+            __update(last_time[line], -1)
+        else:
+            label = 'cold'
+        reuse[label] = reuse.get(label, 0) + 1
+        __update(time, 1)
+        last_time[line] = time
+
+    max_distance = max([0] + [int(x.split('-')[-1]) for x in reuse
+                              if x != 'cold'])
+    accesses = len(resolved)
+    return OrderedDict([
+        ('accesses', accesses),
+        ('reads', accesses - writes),
+        ('writes', writes),
+        ('unresolved', len(trace) - accesses),
+        ('hits', hits),
+        ('misses', accesses - hits),
+        ('hit_rate', hits / accesses if accesses else 1.0),
+        ('footprint', len(last_time)),
+        ('reuse', OrderedDict((x, reuse.get(x, 0))
+                              for x in reuse_bins(max_distance))),
+        ])
+
+
+def simulate_build(build_path, kernels=None, inline_calls=True,
+                   defines=None, **cache_args):
+    """Simulates the routines of a generated C build directory.
+
+    Parameters
+    ----------
+    build_path : str
+        The directory of the generated C files
+    kernels : list of str, optional
+        The routines to simulate; by default all routines with traced
+        accesses
+    inline_calls : bool, optional
+        If ``True``, the accesses of the called routines are included
+    defines : dict, optional
+        The macros defined for the preprocessor; by default ``CONP``
+    cache_args : dict
+        The cache parameters, see `simulate`
+
+    Returns
+    -------
+    results : dict
+        The statistics of each routine, see `simulate`
+
+    """
+    parsed = read_kernels(build_path, defines)
+    results = OrderedDict()
+    for name in (kernels if kernels is not None else parsed):
+        if name not in parsed:
+            raise KeyError('Routine {} not found in {}'.format(name,
+                                                               build_path))
+        stats = simulate(get_trace(parsed, name, inline_calls), **cache_args)
+        if kernels is None and not stats['accesses']:
+            continue
+        results[name] = stats
+    return results
+
+
+def main(args=None):
+    if args is None:
+        parser = ArgumentParser(description='cache_sim: replays the array '
+                                            'accesses of generated C code '
+                                            'through an LRU cache model'
+                                )
+        parser.add_argument('-b', '--build_path',
+                            type=str,
+                            nargs='+',
+                            required=True,
+                            help='The directories of the generated C files, '
+                                 'several to compare them.'
+                            )
+        parser.add_argument('-k', '--kernels',
+                            type=str,
+                            nargs='+',
+                            default=None,
+                            help='The routines to simulate, by default all.'
+                            )
+        parser.add_argument('-ls', '--line_size',
+                            type=int,
+                            default=64,
+                            help='The cache line size [bytes].'
+                            )
+        parser.add_argument('-a', '--associativity',
+                            type=int,
+                            default=8,
+                            help='The number of lines per cache set.'
+                            )
+        parser.add_argument('-c', '--capacity',
+                            type=int,
+                            default=32 * 1024,
+                            help='The cache capacity [bytes].'
+                            )
+        parser.add_argument('-ni', '--no_inline',
+                            action='store_true',
+                            default=False,
+                            help='Do not include the accesses of called '
+                                 'routines.'
+                            )
+        parser.add_argument('-cv', '--conv',
+                            action='store_true',
+                            default=False,
+                            help='Trace the constant-volume code, rather '
+                                 'than constant-pressure.'
+                            )
+        parser.add_argument('-j', '--json',
+                            type=str,
+                            default=None,
+                            help='Write the results to this JSON file.'
+                            )
+        args = parser.parse_args()
+
+    cache_args = dict(line_size=args.line_size,
+                      associativity=args.associativity,
+                      capacity=args.capacity)
+    try:
+        LRUCache(**cache_args)
+    except ValueError as e:
+        print('Error: {}'.format(e))
+        return 2
+
+    defines = {'CONV' if args.conv else 'CONP': 1}
+    results = OrderedDict()
+    for build_path in args.build_path:
+        try:
+            results[build_path] = simulate_build(
+                build_path, args.kernels, not args.no_inline, defines,
+                **cache_args)
+        except KeyError as e:
+            print('Error: {}'.format(e.args[0]))
+            return 2
+
+    print('{:<28}{:<24}{:>10}{:>10}{:>10}{:>9}'.format(
+        'routine', 'build', 'accesses', 'lines', 'misses', 'hit rate'))
+    names = []
+    for build in results.values():
+        names.extend(x for x in build if x not in names)
+    for name in names:
+        for build_path, build in results.items():
+            if name not in build:
+                continue
+            stats = build[name]
+            print('{:<28}{:<24}{:>10}{:>10}{:>10}{:>8.2f}%'.format(
+                name[:27], os.path.basename(os.path.normpath(build_path))[:23],
+                stats['accesses'], stats['footprint'], stats['misses'],
+                100. * stats['hit_rate']))
+            print('    reuse: ' + ' '.join('{}:{}'.format(k, v) for k, v in
+                                          stats['reuse'].items() if v))
+
+    if args.json is not None:
+        with open(args.json, 'w') as file:
+            json.dump({'cache': cache_args, 'results': results}, file,
+                      indent=1)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
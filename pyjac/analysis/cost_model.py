@@ -0,0 +1,392 @@
+"""Static cost model and roofline report of the generated C code.
+
+For each generated routine (e.g., ``eval_rxn_rates``, ``get_rxn_pres_mod``,
+``eval_spec_rates``, ``eval_conc``, ``dydt``, ``eval_jacob`` and the
+unrolled ``jacob_N``), the floating-point operations, ``exp`` / ``log`` /
+``pow`` / ``sqrt`` calls, divisions, branches, and array loads and stores
+are counted from the source.  The counts include those of the called
+generated routines.  The arithmetic intensity and a roofline estimate of the
+cost per state follow from a simple machine model, see `MACHINE`.
+
+The counts are static: both branches of a conditional are counted, loops
+are counted once, and integer index arithmetic is not counted.
+"""
+
+# Python 2 compatibility
+from __future__ import division
+from __future__ import print_function
+
+# Standard libraries
+import os
+import re
+import sys
+import json
+import logging
+from collections import OrderedDict
+from argparse import ArgumentParser
+
+# Local imports
+from .._version import __version__
+from .c_source import DECLARATION, read_routines
+from . import cache_sim
+
+__all__ = ['MACHINE', 'count_ops', 'count_routines', 'roofline', 'analyze']
+
+MACHINE = OrderedDict([('peak_gflops', 4.0),
+                       ('bandwidth_gbs', 10.0),
+                       ('div', 8.0),
+                       ('exp', 20.0),
+                       ('log', 20.0),
+                       ('pow', 40.0),
+                       ('sqrt', 8.0),
+                       ('branch', 1.0),
+                       ])
+"""dict: the default machine model, i.e., the peak double-precision rate
+[GFLOP/s] and memory bandwidth [GB/s] of a core, and the cost of a division,
+math function call and branch in additions / multiplications"""
+
+COUNTS = ['flops', 'add', 'mul', 'div', 'exp', 'log', 'pow', 'sqrt',
+          'branches', 'loads', 'stores']
+"""list(`str`): the counted quantities of each routine"""
+
+_FUNCTIONS = {'exp': 'exp', 'exp10': 'exp', 'expm1': 'exp', 'log': 'log',
+              'log10': 'log', 'log1p': 'log', 'pow': 'pow', 'sqrt': 'sqrt'}
+_TOKEN = re.compile(r'(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?[fFlLuU]*|'
+                    r'[A-Za-z_]\w*|\+\+|--|->|[-+*/%&|^<>=!]=|&&|\|\||'
+                    r'<<|>>|\S')
+_OPERAND_END = re.compile(r'[\w.)\]]$')
+
+
+def count_ops(stmt):
+    """Counts the floating-point operations and branches of a C statement.
+
+    Parameters
+    ----------
+    stmt : str
+        The statement, without the trailing semicolon
+
+    Returns
+    -------
+    counts : dict
+        The number of additions / subtractions (``add``), multiplications
+        (``mul``), divisions (``div``), math function calls and branches
+
+    """
+    counts = dict((x, 0) for x in COUNTS)
+    stmt = stmt.strip()
+    head = re.match(r'^(?:else\s+)?(if|for|while|switch)\b', stmt)
+    if head:
+        counts['branches'] += 1
+        if head.group(1) != 'if':
+            # integer loop control
+            return counts
+    decl = DECLARATION.match(stmt)
+    if decl:
+        stmt = stmt[decl.end():]
+
+    # index expressions are integer arithmetic
+    previous = None
+    while previous != stmt:
+        previous = stmt
+        stmt = re.sub(r'\[[^\[\]]*\]', '[]', stmt)
+
+    tokens = _TOKEN.findall(stmt)
+    for i, token in enumerate(tokens):
+        binary = (i > 0 and tokens[i - 1] not in ('return', 'else') and
+                  _OPERAND_END.search(tokens[i - 1]) is not None)
+        if token in _FUNCTIONS and i + 1 < len(tokens) and \
+                tokens[i + 1] == '(':
+            counts[_FUNCTIONS[token]] += 1
+        elif token == '?':
+            counts['branches'] += 1
+        elif token in ('+', '-') and binary or token in ('+=', '-='):
+            counts['add'] += 1
+        elif token == '*' and binary or token == '*=':
+            counts['mul'] += 1
+        elif token == '/' and binary or token == '/=':
+            counts['div'] += 1
+    counts['flops'] = counts['add'] + counts['mul'] + counts['div']
+    return counts
+
+
+def count_routines(build_path, defines=None):
+    """Counts the operations and memory accesses of the generated routines.
+
+    Parameters
+    ----------
+    build_path : str
+        The directory of the generated C files
+    defines : dict, optional
+        The macros defined for the preprocessor; by default ``CONP``
+
+    Returns
+    -------
+    routines : dict
+        For each routine, the ``file`` it is defined in, the generated
+        routines it ``calls``, and its own (``self``) and inclusive of the
+        called routines (``total``) counts, see `COUNTS`
+
+    """
+    found = read_routines(build_path, defines)
+    kernels = cache_sim.read_kernels(build_path, defines, found)
+
+    routines = OrderedDict()
+    for name, (params, body, filename) in found.items():
+        counts = dict((x, 0) for x in COUNTS)
+        for stmt in re.split(r'[;{}]', body):
+            for key, value in count_ops(stmt).items():
+                counts[key] += value
+        calls = []
+        for event in kernels[name]['events']:
+            if event[0] == 'call':
+                calls.append(event[1])
+            else:
+                counts['loads' if event[0] == 'r' else 'stores'] += 1
+        routines[name] = {'file': filename, 'calls': calls,
+                          'self': OrderedDict((x, counts[x])
+                                              for x in COUNTS)}
+
+    def __total(name, depth):
+        total = OrderedDict(routines[name]['self'])
+        if depth < 16:
+            for callee in routines[name]['calls']:
+                for key, value in __total(callee, depth + 1).items():
+                    total[key] += value
+        return total
+
+    for name in routines:
+        routines[name]['total'] = __total(name, 0)
+    return routines
+
+
+def roofline(counts, machine=None, traffic=None):
+    """Estimates the cost of a routine from its counts.
+
+    Parameters
+    ----------
+    counts : dict
+        The counts of the routine, see `COUNTS`
+    machine : dict, optional
+        The machine model, by default `MACHINE`
+    traffic : int, optional
+        The memory traffic [bytes], e.g., from `cache_sim`; by default every
+        load and store of a double
+
+    Returns
+    -------
+    estimate : dict
+        The memory ``bytes``, the arithmetic ``intensity`` [FLOP/byte], the
+        ``compute_ns`` and ``memory_ns`` times, the ``predicted_ns`` per
+        state (the larger of the two) and what the routine is ``bound`` by
+
+    """
+    machine = MACHINE if machine is None else machine
+    work = (counts['add'] + counts['mul'] +
+            sum(counts[x] * machine[x]
+                for x in ['div', 'exp', 'log', 'pow', 'sqrt']) +
+            counts['branches'] * machine['branch'])
+    if traffic is None:
+        traffic = 8 * (counts['loads'] + counts['stores'])
+    compute = work / machine['peak_gflops']
+    memory = traffic / machine['bandwidth_gbs']
+    return OrderedDict([
+        ('bytes', traffic),
+        ('intensity', counts['flops'] / traffic if traffic else None),
+        ('compute_ns', compute),
+        ('memory_ns', memory),
+        ('predicted_ns', max(compute, memory)),
+        ('bound', 'compute' if compute >= memory else 'memory'),
+        ])
+
+
+def analyze(build_path, routines=None, machine=None, defines=None,
+            cache=None):
+    """Reports the static cost of the routines of a generated C build.
+
+    Parameters
+    ----------
+    build_path : str
+        The directory of the generated C files
+    routines : list of str, optional
+        The routines to report; by default all routines with any counts
+    machine : dict, optional
+        The machine model, by default `MACHINE`
+    defines : dict, optional
+        The macros defined for the preprocessor; by default ``CONP``
+    cache : dict, optional
+        If given, the cache parameters of `cache_sim.simulate`, and the
+        memory traffic is taken as the simulated misses, rather than every
+        load and store.  Accesses the simulator could not resolve (e.g.,
+        with non-constant indices) are each counted as an element of
+        traffic, and their number is reported as ``unresolved``.
+
+    Returns
+    -------
+    report : dict
+        The pyJac ``version``, ``machine`` model, ``cache`` parameters, and
+        for each routine its counts (see `count_routines`), its `roofline`
+        estimate, and the cache statistics if simulated
+
+    """
+    machine = MACHINE if machine is None else machine
+    counted = count_routines(build_path, defines)
+    if routines is None:
+        routines = [x for x in counted if any(counted[x]['total'].values())]
+    kernels = None
+    if cache is not None:
+        kernels = cache_sim.read_kernels(build_path, defines)
+
+    results = OrderedDict()
+    for name in routines:
+        if name not in counted:
+            raise KeyError('Routine {} not found in {}'.format(name,
+                                                               build_path))
+        result = counted[name]
+        traffic = None
+        if cache is not None:
+            stats = cache_sim.simulate(cache_sim.get_trace(kernels, name),
+                                       **cache)
+            result['cache'] = stats
+            # accesses the simulator could not place are assumed to miss
+            # a single element each
+            traffic = (stats['misses'] * cache.get('line_size', 64) +
+                       stats['unresolved'] * cache.get('element_size', 8))
+            if stats['unresolved']:
+                logging.warning(
+                    '{}: {} of {} accesses could not be simulated, and are '
+                    'counted as uncached'.format(
+                        name, stats['unresolved'],
+                        stats['accesses'] + stats['unresolved']))
+        result['roofline'] = roofline(result['total'], machine, traffic)
+        if cache is not None:
+            result['roofline']['unresolved'] = result['cache']['unresolved']
+        results[name] = result
+
+    return OrderedDict([('version', __version__),
+                        ('build_path', os.path.abspath(build_path)),
+                        ('machine', machine),
+                        ('cache', cache),
+                        ('routines', results),
+                        ])
+
+
+def main(args=None, argv=None):
+    if args is None:
+        parser = ArgumentParser(prog='pyjac analyze',
+                                description='Reports the static cost and '
+                                            'roofline estimate of the '
+                                            'generated C routines'
+                                )
+        parser.add_argument('-b', '--build_path',
+                            type=str,
+                            default='./out/',
+                            help='The directory of the generated C files.'
+                            )
+        parser.add_argument('-k', '--kernels',
+                            type=str,
+                            nargs='+',
+                            default=None,
+                            help='The routines to report, by default all.'
+                            )
+        parser.add_argument('-pf', '--peak_gflops',
+                            type=float,
+                            default=MACHINE['peak_gflops'],
+                            help='The peak double-precision rate of a core '
+                                 '[GFLOP/s].'
+                            )
+        parser.add_argument('-bw', '--bandwidth',
+                            type=float,
+                            default=MACHINE['bandwidth_gbs'],
+                            help='The memory bandwidth of a core [GB/s].'
+                            )
+        parser.add_argument('-cs', '--cache_sim',
+                            action='store_true',
+                            default=False,
+                            help='Take the memory traffic from the cache '
+                                 'simulator, rather than every load and '
+                                 'store.'
+                            )
+        parser.add_argument('-ls', '--line_size',
+                            type=int,
+                            default=64,
+                            help='The cache line size [bytes].'
+                            )
+        parser.add_argument('-a', '--associativity',
+                            type=int,
+                            default=8,
+                            help='The number of lines per cache set.'
+                            )
+        parser.add_argument('-c', '--capacity',
+                            type=int,
+                            default=32 * 1024,
+                            help='The cache capacity [bytes].'
+                            )
+        parser.add_argument('-cv', '--conv',
+                            action='store_true',
+                            default=False,
+                            help='Analyze the constant-volume code, rather '
+                                 'than constant-pressure.'
+                            )
+        parser.add_argument('-j', '--json',
+                            type=str,
+                            default=None,
+                            help='Write the report to this JSON file, or to '
+                                 'the standard output if "-".'
+                            )
+        args = parser.parse_args(argv)
+
+    machine = OrderedDict(MACHINE)
+    machine['peak_gflops'] = args.peak_gflops
+    machine['bandwidth_gbs'] = args.bandwidth
+    if machine['peak_gflops'] <= 0 or machine['bandwidth_gbs'] <= 0:
+        print('Error: peak rate and bandwidth must be positive')
+        return 2
+    cache = None
+    if args.cache_sim:
+        cache = dict(line_size=args.line_size,
+                     associativity=args.associativity,
+                     capacity=args.capacity)
+        try:
+            cache_sim.LRUCache(**cache)
+        except ValueError as e:
+            print('Error: {}'.format(e))
+            return 2
+    if not os.path.isdir(args.build_path):
+        print('Error: build directory {} not found'.format(args.build_path))
+        return 2
+
+    try:
+        report = analyze(args.build_path, args.kernels, machine,
+                         {'CONV' if args.conv else 'CONP': 1}, cache)
+    except KeyError as e:
+        print('Error: {}'.format(e.args[0]))
+        return 2
+
+    if args.json == '-':
+        json.dump(report, sys.stdout, indent=1)
+        print()
+        return 0
+    if args.json is not None:
+        with open(args.json, 'w') as file:
+            json.dump(report, file, indent=1)
+
+    print('{:<24}{:>9}{:>6}{:>6}{:>6}{:>6}{:>8}{:>8}{:>8}{:>8}{:>11}  {}'
+          .format('routine', 'flops', 'div', 'exp', 'log', 'pow', 'branch',
+                  'loads', 'stores', 'FLOP/B', 'ns/state', 'bound'))
+    for name, result in report['routines'].items():
+        total = result['total']
+        estimate = result['roofline']
+        intensity = estimate['intensity']
+        print('{:<24}{:>9}{:>6}{:>6}{:>6}{:>6}{:>8}{:>8}{:>8}{:>8}{:>11.1f}'
+              '  {}'.format(name[:23], total['flops'], total['div'],
+                            total['exp'], total['log'], total['pow'],
+                            total['branches'], total['loads'],
+                            total['stores'],
+                            '-' if intensity is None else
+                            '{:.3f}'.format(intensity),
+                            estimate['predicted_ns'], estimate['bound']))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -14,9 +14,13 @@
 	Limit for number of lines of each Jacobian reaction update subfile
 Max_Spec_Lines : int
 	Limit for number of lines of each Jacobian species update subfile
+Newton_Unroll_Max : int
+	Limit for number of updates in the unrolled LU factorization of the
+	Newton matrix, above which the factorization is table driven
 """
 
 Jacob_Unroll = 40
 Jacob_Spec_Unroll = 40
 Max_Lines = 50000
 Max_Spec_Lines = 50000
+Newton_Unroll_Max = 20000
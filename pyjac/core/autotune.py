@@ -0,0 +1,512 @@
+"""Autotuning of the code-splitting parameters of the generated code.
+
+The Jacobian is split into subfiles according to `CParams.Jacob_Unroll`,
+`CParams.Jacob_Spec_Unroll` and `CParams.Max_Lines` (and their
+`CUDAParams` equivalents), trading compile time and instruction-cache fit
+against the overhead of the calls between the subfiles.  The best values
+depend on the mechanism and the machine, hence `tune` generates, compiles
+and times variants of the parameters on stored state data, and saves the
+fastest per mechanism fingerprint, such that later `create_jacobian` runs
+reuse them.
+"""
+
+# Python 2 compatibility
+from __future__ import division
+from __future__ import print_function
+
+# Standard libraries
+import os
+import sys
+import json
+import shutil
+import hashlib
+import tempfile
+import platform
+import subprocess
+from argparse import ArgumentParser
+from timeit import default_timer as timer
+
+# Local imports
+from .. import utils
+from . import CParams
+from . import CUDAParams
+from . import chem_utilities as chem
+from . import mech_interpret as mech
+
+PARAMETERS = ['Jacob_Unroll', 'Jacob_Spec_Unroll', 'Max_Lines']
+"""list of str: the tuned parameters, of `CParams` / `CUDAParams`"""
+
+MODULES = dict(c=CParams, cuda=CUDAParams)
+"""dict: the parameter module of each language"""
+
+DEFAULTS = dict((lang, dict((name, getattr(module, name))
+                            for name in PARAMETERS))
+                for lang, module in MODULES.items())
+"""dict: the default parameters of each language"""
+
+BENCHMARK = """#define _POSIX_C_SOURCE 199309L
+#include <stdio.h>
+#include <time.h>
+#include "header.h"
+#include "mass_mole.h"
+#include "jacob.h"
+
+int main (int argc, char *argv[])
+{
+    FILE *fp = fopen (argv[1], "rb");
+    if (fp == NULL)
+    {
+        fprintf(stderr, "Could not open file: %s\\n", argv[1]);
+        return 1;
+    }
+    int repeats = atoi(argv[2]);
+    fseek(fp, 0, SEEK_END);
+    int num = ftell(fp) / ((NSP + 3) * sizeof(double));
+    rewind(fp);
+    double* y = (double*)malloc(num * NN * sizeof(double));
+    double* var = (double*)malloc(num * sizeof(double));
+    double buffer[NSP + 3];
+    // each state is (time, temperature, pressure, mass fractions)
+    for (int i = 0; i < num; ++i)
+    {
+        if (fread(buffer, sizeof(double), NSP + 3, fp) != NSP + 3)
+        {
+            return 1;
+        }
+        apply_mask(&buffer[3]);
+        y[i * NN] = buffer[1];
+        for (int j = 0; j < NSP; ++j)
+        {
+            y[i * NN + j + 1] = buffer[j + 3];
+        }
+#ifdef CONP
+        var[i] = buffer[2];
+#elif CONV
+        double Xi[NSP];
+        mass2mole (&y[i * NN + 1], Xi);
+        var[i] = getDensity (y[i * NN], buffer[2], Xi);
+#endif
+    }
+    fclose (fp);
+
+    double jac[NN * NN];
+    double best = -1;
+    for (int r = 0; r < repeats; ++r)
+    {
+        struct timespec start, end;
+        clock_gettime(CLOCK_MONOTONIC, &start);
+        for (int i = 0; i < num; ++i)
+        {
+            eval_jacob (0, var[i], &y[i * NN], jac);
+        }
+        clock_gettime(CLOCK_MONOTONIC, &end);
+        double elapsed = (end.tv_sec - start.tv_sec) +
+                         1e-9 * (end.tv_nsec - start.tv_nsec);
+        if (best < 0 || elapsed < best)
+        {
+            best = elapsed;
+        }
+    }
+    // the fastest time per state
+    printf("%.15le\\n", best / num);
+    free(y);
+    free(var);
+    return 0;
+}
+"""
+"""str: the benchmark harness, times the Jacobian over the states of the
+binary file given"""
+
+
+def default_tune_file():
+    """Returns the default file of the tuned parameters.
+
+    This is ``$PYJAC_TUNE_FILE`` if set, or else ``pyjac/tuned_params.json``
+    in the user's cache directory (``$XDG_CACHE_HOME`` or ``~/.cache``).
+    """
+    if os.environ.get('PYJAC_TUNE_FILE'):
+        return os.environ['PYJAC_TUNE_FILE']
+    base = os.environ.get('XDG_CACHE_HOME',
+                          os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(base, 'pyjac', 'tuned_params.json')
+
+
+def get_params(lang):
+    """Returns the current parameters of a language."""
+    return dict((name, getattr(MODULES[lang], name)) for name in PARAMETERS)
+
+
+def set_params(lang, params):
+    """Sets the parameters of a language.
+
+    Parameters
+    ----------
+    lang : {'c', 'cuda'}
+        Programming language
+    params : dict
+        The values, by parameter name
+
+    Returns
+    -------
+    previous : dict
+        The previous values of the parameters set
+
+    """
+    previous = get_params(lang)
+    for name, value in params.items():
+        if name in PARAMETERS:
+            setattr(MODULES[lang], name, value)
+    return previous
+
+
+def set_all_params(params):
+    """Sets the parameters of each language, e.g., in a worker process.
+
+    Parameters
+    ----------
+    params : dict
+        The values by parameter name, by language, see `get_params`
+
+    """
+    for lang, values in params.items():
+        set_params(lang, values)
+
+
+def read_tuned(fingerprint, lang, filename=None):
+    """Reads the tuned parameters of a mechanism.
+
+    Parameters
+    ----------
+    fingerprint : str
+        The mechanism fingerprint, see `chem_utilities.get_mech_fingerprint`
+    lang : str
+        Programming language
+    filename : str, optional
+        The file of the tuned parameters, by default `default_tune_file`
+
+    Returns
+    -------
+    params : dict or None
+        The tuned values, by parameter name, or ``None`` if the mechanism
+        was not tuned for the language
+
+    """
+    if filename is None:
+        filename = default_tune_file()
+    try:
+        with open(filename, 'r') as file:
+            tuned = json.load(file)
+        return tuned[fingerprint][lang]['params']
+    except (IOError, OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def write_tuned(fingerprint, lang, params, filename=None, **info):
+    """Saves the tuned parameters of a mechanism.
+
+    Parameters
+    ----------
+    fingerprint : str
+        The mechanism fingerprint, see `chem_utilities.get_mech_fingerprint`
+    lang : str
+        Programming language
+    params : dict
+        The tuned values, by parameter name
+    filename : str, optional
+        The file of the tuned parameters, by default `default_tune_file`
+    info
+        Other information stored alongside, e.g., the mechanism and timings
+
+    """
+    if filename is None:
+        filename = default_tune_file()
+    try:
+        with open(filename, 'r') as file:
+            tuned = json.load(file)
+    except (IOError, OSError, ValueError):
+        tuned = {}
+    entry = dict(info, params=params, machine=platform.node())
+    tuned.setdefault(fingerprint, {})[lang] = entry
+
+    utils.create_dir(os.path.dirname(os.path.abspath(filename)))
+    with open(filename + '.tmp', 'w') as file:
+        json.dump(tuned, file, indent=1, sort_keys=True)
+    os.rename(filename + '.tmp', filename)
+
+
+def candidates(name, num_specs, num_reacs):
+    """Returns the candidate values of a parameter.
+
+    Values beyond the number of reactions (species) are equivalent to not
+    splitting the Jacobian, hence are replaced by it.
+
+    Parameters
+    ----------
+    name : str
+        The parameter, one of `PARAMETERS`
+    num_specs : int
+        The number of species of the mechanism
+    num_reacs : int
+        The number of reactions of the mechanism
+
+    Returns
+    -------
+    values : list of int
+        The candidate values, in increasing order
+
+    """
+    if name == 'Jacob_Unroll':
+        values = [min(x, num_reacs) for x in [10, 20, 40, 80, 160]]
+    elif name == 'Jacob_Spec_Unroll':
+        values = [min(x, num_specs) for x in [10, 20, 40, 80]]
+    else:
+        values = [2000, 10000, 50000]
+    return sorted(set(values))
+
+
+def _source_digest(build_path):
+    """Returns a hash of the generated source files of a build."""
+    sha = hashlib.sha1()
+    for root, dirs, files in sorted(os.walk(build_path)):
+        for name in sorted(files):
+            if os.path.splitext(name)[1] in ['.c', '.h', '.cu', '.cuh']:
+                sha.update(os.path.relpath(os.path.join(root, name),
+                                           build_path).encode('utf-8'))
+                with open(os.path.join(root, name), 'rb') as file:
+                    sha.update(file.read())
+    return sha.hexdigest()
+
+
+def benchmark(lang, mech_name, therm_name, params, work_dir, states,
+              repeats=5, measured=None):
+    """Generates, compiles and times the Jacobian with given parameters.
+
+    Parameters
+    ----------
+    lang : {'c'}
+        Programming language
+    mech_name : str
+        Reaction mechanism filename
+    therm_name : str
+        Thermodynamic database filename, or ``None``
+    params : dict
+        The values of the parameters, by name
+    work_dir : str
+        The directory of the build
+    states : str
+        The binary state file, see `profile_guided.training_states`
+    repeats : int, optional
+        The number of timings, the fastest is used
+    measured : dict, optional
+        The results by `_source_digest` of the code generated so far,
+        updated; code identical to earlier parameters is not timed again
+
+    Returns
+    -------
+    runtime : float
+        The time per Jacobian evaluation [s]
+    compile_time : float
+        The time to compile the library [s]
+
+    """
+    from .create_jacobian import create_jacobian
+    from ..libgen import generate_library
+
+    build_path = os.path.join(work_dir, 'build')
+    previous = set_params(lang, params)
+    try:
+        create_jacobian(lang, mech_name, therm_name, build_path=build_path,
+                        tuned_params=False)
+    finally:
+        set_params(lang, previous)
+
+    digest = _source_digest(build_path)
+    if measured is not None and digest in measured:
+        return measured[digest]
+
+    start = timer()
+    lib = generate_library(lang, build_path, os.path.join(work_dir, 'obj'),
+                           work_dir, shared=False)
+    compile_time = timer() - start
+
+    driver = os.path.join(work_dir, 'benchmark' + utils.file_ext[lang])
+    with open(driver, 'w') as file:
+        file.write(BENCHMARK)
+    program = os.path.join(work_dir, 'benchmark')
+    args = ['gcc', '-std=c99', '-O3', '-I{}'.format(build_path), driver,
+            lib, '-o', program, '-lm', '-fopenmp']
+    try:
+        subprocess.check_call(args)
+        output = subprocess.check_output([program, states, str(repeats)])
+    except OSError:
+        print('Error: Compiler gcc not found, autotuning failed.')
+        sys.exit(-1)
+    except subprocess.CalledProcessError:
+        print('Error: benchmark of the generated code failed.')
+        sys.exit(-1)
+    result = float(output.decode('utf-8').strip()), compile_time
+    if measured is not None:
+        measured[digest] = result
+    return result
+
+
+def tune(lang, mech_name, therm_name=None, data=None, repeats=5,
+         tune_file=None, work_dir=None, tolerance=0.02):
+    """Finds and saves the fastest code-splitting parameters of a mechanism.
+
+    Starting from the defaults, each parameter in turn is set to each of its
+    `candidates`, keeping the fastest value, which needs only a few builds.
+    Values generating the same code as a variant timed before are not timed
+    again.
+
+    Parameters
+    ----------
+    lang : {'c'}
+        Programming language, only C code can be timed here
+    mech_name : str
+        Reaction mechanism filename
+    therm_name : str, optional
+        Thermodynamic database filename, if not in the mechanism file
+    data : list of str, optional
+        The state files (NumPy ``.npy``), see
+        `profile_guided.training_states`
+    repeats : int, optional
+        The number of timings of each variant, the fastest is used
+    tune_file : str, optional
+        The file of the tuned parameters, by default `default_tune_file`
+    work_dir : str, optional
+        The directory of the builds, by default a temporary directory
+    tolerance : float, optional
+        The relative speedup needed to prefer a variant, as a margin
+        against timing noise
+
+    Returns
+    -------
+    params : dict
+        The fastest values, by parameter name
+    results : list of tuple
+        The ``(params, runtime, compile_time)`` of each variant
+
+    """
+    from ..libgen import profile_guided
+
+    if lang != 'c':
+        print('Error: autotuning only supported for C')
+        sys.exit(2)
+
+    elems, specs, reacs = mech.read_mech_cached(mech_name, therm_name, None)
+    fingerprint = chem.get_mech_fingerprint(specs, reacs)
+
+    temp_dir = None
+    if work_dir is None:
+        work_dir = temp_dir = tempfile.mkdtemp()
+    utils.create_dir(work_dir)
+    try:
+        states = os.path.join(work_dir, 'states.bin')
+        profile_guided.training_states(len(specs), data).tofile(states)
+
+        results = []
+        measured = {}
+
+        def __measure(params):
+            runtime, compile_time = benchmark(lang, mech_name, therm_name,
+                                              params, work_dir, states,
+                                              repeats, measured)
+            results.append((params, runtime, compile_time))
+            print('{}: {:.3e} s per state, compiled in {:.1f} s'.format(
+                  ', '.join('{}={}'.format(name, params[name])
+                            for name in PARAMETERS),
+                  runtime, compile_time))
+            return runtime
+
+        best = dict(DEFAULTS[lang])
+        best_time = __measure(best)
+        for name in PARAMETERS:
+            for value in candidates(name, len(specs), len(reacs)):
+                if value == best[name]:
+                    continue
+                params = dict(best)
+                params[name] = value
+                runtime = __measure(params)
+                if runtime < best_time * (1. - tolerance):
+                    best, best_time = params, runtime
+    finally:
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir)
+
+    write_tuned(fingerprint, lang, best, tune_file,
+                mechanism=os.path.basename(mech_name), runtime=best_time,
+                default_runtime=results[0][1])
+    print('Fastest: {} ({:.2f}x the defaults)'.format(
+          ', '.join('{}={}'.format(name, best[name]) for name in PARAMETERS),
+          results[0][1] / best_time))
+    return best, results
+
+
+def main(args=None, argv=None):
+    if args is None:
+        parser = ArgumentParser(description='pyjac tune: finds the fastest '
+                                            'code-splitting parameters of a '
+                                            'mechanism, reused by later '
+                                            'pyjac runs'
+                                )
+        parser.add_argument('-l', '--lang',
+                            type=str,
+                            choices=['c'],
+                            default='c',
+                            help='Programming language for output '
+                                 'source files.'
+                            )
+        parser.add_argument('-i', '--input',
+                            type=str,
+                            required=True,
+                            help='Input mechanism filename (e.g., mech.dat).'
+                            )
+        parser.add_argument('-t', '--thermo',
+                            type=str,
+                            default=None,
+                            help='Thermodynamic database filename (e.g., '
+                                 'therm.dat), or nothing if in mechanism.'
+                            )
+        parser.add_argument('-d', '--data',
+                            type=str,
+                            nargs='+',
+                            default=None,
+                            help='The state files (.npy, as written by the '
+                                 'partially stirred reactor), by default '
+                                 'data/h2_pasr_output.npy, or random states.'
+                            )
+        parser.add_argument('-r', '--repeats',
+                            type=int,
+                            default=5,
+                            help='Number of timings of each variant.'
+                            )
+        parser.add_argument('-tp', '--tuned-params',
+                            type=str,
+                            dest='tuned_params',
+                            default=None,
+                            help='File of the tuned parameters, by default '
+                                 '$PYJAC_TUNE_FILE or '
+                                 '~/.cache/pyjac/tuned_params.json.'
+                            )
+        parser.add_argument('-w', '--work-dir',
+                            type=str,
+                            default=None,
+                            help='Directory of the builds, by default a '
+                                 'temporary directory.'
+                            )
+        parser.add_argument('-tol', '--tolerance',
+                            type=float,
+                            default=0.02,
+                            help='Relative speedup needed to prefer a '
+                                 'variant.'
+                            )
+        args = parser.parse_args(argv)
+
+    tune(args.lang, args.input, args.thermo, args.data, args.repeats,
+         args.tuned_params, args.work_dir, args.tolerance)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
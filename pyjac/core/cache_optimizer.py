@@ -9,22 +9,29 @@
 import multiprocessing
 import pickle
 import os
+import hashlib
 import itertools
 
 import numpy as np
 import time
 import datetime
+try:
+    from math import gcd as _gcd
+except ImportError:
+    # Python 2
+    from fractions import gcd as _gcd
 
 # Local imports
 from .. import utils
+from . import chem_utilities as chem
 
-#dependencies
+#dependencies, only needed by the reference `optimizer_loop_bitarray`
 have_bitarray = False
 try:
     from bitarray import bitarray
     have_bitarray = True
-except:
-    print('bitarray not found, turning off cache-optimization')
+except ImportError:
+    print('bitarray not found, optimizer_loop_bitarray will be unavailable')
 
 
 def plot(specs, reacs, consider_thd, fwd_spec_mapping, fwd_rxn_mapping):
@@ -33,7 +40,10 @@ def plot(specs, reacs, consider_thd, fwd_spec_mapping, fwd_rxn_mapping):
     nr = len(reacs)
     nsp = len(specs)
     #plot for visibility
-    import matplotlib
+    try:
+        import matplotlib
+    except ImportError:
+        return
     matplotlib.use('agg')
     import matplotlib.pyplot as plt
     fig = plt.figure()
@@ -80,10 +90,12 @@ def plot(specs, reacs, consider_thd, fwd_spec_mapping, fwd_rxn_mapping):
     plt.savefig('new.pdf')
 
 
-def optimizer_loop(starting_order, mapping, lookback,
-                   improve_cutoff, random_tries
-                   ):
-    """
+def optimizer_loop_bitarray(starting_order, mapping, lookback,
+                            improve_cutoff, random_tries
+                            ):
+    """Reference implementation of `optimizer_loop`, scoring each
+    position with `bitarray` operations.  Kept for testing and
+    benchmarking.
 
     Parameters
     ----------
@@ -213,6 +225,622 @@ def __global_score():
     return global_max, global_max_order
 
 
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)],
+                     dtype=np.int64)
+"""numpy.ndarray: number of bits set in each byte value"""
+
+
+def get_mappings(specs, reacs):
+    """Returns the participation of the species in the reactions.
+
+    Parameters
+    ----------
+    specs : list of `SpecInfo`
+        List of species in the mechanism.
+    reacs : list of `ReacInfo`
+        List of reactions in the mechanism.
+
+    Returns
+    -------
+    spec_mapping : numpy.ndarray of bool
+        The reactions (columns) each species (row) is a reactant or
+        product of
+    reac_mapping : numpy.ndarray of bool
+        The transpose of ``spec_mapping``
+
+    """
+    spec_mapping = np.zeros((len(specs), len(reacs)), dtype=bool)
+    name_map = {sp.name: i for i, sp in enumerate(specs)}
+    for rind, rxn in enumerate(reacs):
+        for sp in rxn.reac + rxn.prod:
+            spec_mapping[name_map[sp], rind] = True
+    return spec_mapping, spec_mapping.T.copy()
+
+
+def _pack_mapping(mapping):
+    """Returns the mapping as a matrix of packed bits, one row per value.
+
+    Parameters
+    ----------
+    mapping : numpy.ndarray of bool or list of bitarray
+        The mapping of each value
+
+    Returns
+    -------
+    packed : numpy.ndarray of numpy.uint8
+        The packed bits
+
+    """
+    if isinstance(mapping, np.ndarray):
+        return np.packbits(mapping.astype(bool), axis=1)
+    rows = [np.frombuffer(ba.tobytes(), dtype=np.uint8) for ba in mapping]
+    nbytes = len(rows[0]) if rows else 0
+    return np.array(rows, dtype=np.uint8).reshape(len(rows), nbytes)
+
+
+def _overlap(packed, values, others):
+    """Returns the number of bits set in both mappings of pairs of values.
+
+    Parameters
+    ----------
+    packed : numpy.ndarray of numpy.uint8
+        The packed mapping of each value
+    values : int or numpy.ndarray of int
+        The first value of each pair
+    others : numpy.ndarray of int
+        The second value of each pair
+
+    Returns
+    -------
+    overlap : numpy.ndarray of numpy.int64
+        The popcount of the bitwise and of each pair
+
+    """
+    return _POPCOUNT[packed[values] & packed[others]].sum(axis=-1)
+
+
+def optimizer_loop(starting_order, mapping, lookback,
+                   improve_cutoff, random_tries
+                   ):
+    """Greedily reorders values such that neighbors share their mappings.
+
+    The score of a value at a position is the sum over the neighbors
+    within ``lookback`` positions of the number of entries the two share,
+    minus the number of entries only the neighbor has, divided by their
+    distance.  The worst scored value is repeatedly moved to the position
+    it scores best at.
+
+    The mappings are stored as packed bits, scored with a vectorized
+    popcount, and after a move only the scores of the positions next to
+    the removal and insertion points are recomputed.  The scores are kept
+    as integers (scaled by the least common multiple of the distances),
+    such that the moves are identical to `optimizer_loop_bitarray` for a
+    ``lookback`` up to two.
+
+    Parameters
+    ----------
+    starting_order : list of int
+        Initial order of elements
+    mapping : numpy.ndarray of bool or list of bitarray
+        Mapping of each element, e.g., the reactions a species is in
+    lookback : int
+        Width of lookahead/lookforward
+    improve_cutoff : int
+        Number of iterations without improvement before return
+    random_tries : int
+        Number of random initializations to try
+
+    Returns
+    -------
+    global_max : float
+        The best total score found
+    global_max_order : list of int
+        The order with the best total score
+
+    """
+    packed = _pack_mapping(mapping)
+    counts = _POPCOUNT[packed].sum(axis=1)
+    lookback = int(lookback)
+
+    # integer weights for the inverse distances
+    scale = 1
+    for d in range(2, lookback + 1):
+        scale = scale * d // _gcd(scale, d)
+    weights = [0] + [scale // d for d in range(1, lookback + 1)]
+
+    #first move any empty entries to the end
+    order = [x for x in starting_order if counts[x]]
+    nvar = len(order)
+    order = np.array(order + [x for x in starting_order if not counts[x]],
+                     dtype=np.intp)
+
+    def __scores(positions):
+        # the score of the value at each position
+        values = order[positions]
+        scores = np.zeros(len(positions), dtype=np.int64)
+        for d in range(1, lookback + 1):
+            for neighbors in [positions - d, positions + d]:
+                valid = (neighbors >= 0) & (neighbors < nvar)
+                others = order[neighbors[valid]]
+                scores[valid] += weights[d] * (
+                    2 * _overlap(packed, values[valid], others) -
+                    counts[others])
+        return scores
+
+    def __placement_scores(value):
+        # the score of a value at each position of the current order
+        others = order[:nvar]
+        shared = 2 * _overlap(packed, value, others) - counts[others]
+        scores = np.zeros(nvar, dtype=np.int64)
+        for d in range(1, min(lookback, nvar - 1) + 1):
+            scores[d:] += weights[d] * shared[:-d]
+            scores[:-d] += weights[d] * shared[d:]
+        return scores
+
+    def __move(array, source, dest):
+        # equivalent to array.insert(dest, array.pop(source))
+        value = array[source]
+        if source < dest:
+            array[source:dest] = array[source + 1:dest + 1].copy()
+        else:
+            array[dest + 1:source + 1] = array[dest:source].copy()
+        array[dest] = value
+
+    positions = np.arange(nvar)
+    scores = __scores(positions)
+    starting_score = scores.sum()
+    if nvar < 2:
+        return starting_score / float(scale), order.tolist()
+
+    global_max = starting_score
+    global_max_order = order.copy()
+    for bottom_outs in range(random_tries):
+        last_improvement = 0
+        while last_improvement < improve_cutoff:
+            #first find the 'worst' placed values, and the best place to
+            #put each of them
+            minind = None
+            for min_ind in np.flatnonzero(scores == scores.min()):
+                placement = __placement_scores(order[min_ind])
+                placement[min_ind] = np.iinfo(np.int64).min
+                max_ind = int(np.argmax(placement))
+                if minind is None or placement[max_ind] > maxcount:
+                    minind, maxcount, maxind = min_ind, placement[max_ind], \
+                        max_ind
+
+            #now move to the better spot, and update the scores near the
+            #removal and insertion points
+            __move(order, minind, maxind)
+            __move(scores, minind, maxind)
+            lo, hi = min(minind, maxind), max(minind, maxind)
+            changed = np.union1d(
+                positions[max(lo - lookback, 0):lo + lookback + 1],
+                positions[max(hi - lookback, 0):hi + lookback + 1])
+            scores[changed] = __scores(changed)
+
+            score = scores.sum()
+            if score <= starting_score:
+                last_improvement += 1
+            else:
+                last_improvement = 0
+                starting_score = score
+            if score > global_max:
+                global_max = score
+                global_max_order = order.copy()
+
+        #we hit a minimum, let's make a random move see if that helps
+        ind1 = np.random.randint(len(order))
+        ind2 = ind1
+        while ind2 == ind1:
+            ind1 = np.random.randint(len(order))
+        __move(order, ind2, ind1)
+        scores = __scores(positions)
+
+    return global_max / float(scale), global_max_order.tolist()
+
+
+def _bipartite_adjacency(mapping):
+    """Returns the adjacency lists of the bipartite graph of a mapping.
+
+    Parameters
+    ----------
+    mapping : numpy.ndarray of bool
+        The mapping of each row value to the column values, e.g., the
+        reactions each species is in
+
+    Returns
+    -------
+    adjacency : list of list of int
+        The neighbors of each node, the rows are numbered first, followed
+        by the columns
+
+    """
+    nrow = mapping.shape[0]
+    adjacency = [[] for i in range(nrow + mapping.shape[1])]
+    for row, col in zip(*np.nonzero(mapping)):
+        adjacency[row].append(nrow + col)
+        adjacency[nrow + col].append(row)
+    return adjacency
+
+
+def _components(adjacency):
+    """Returns the connected components of a graph.
+
+    Parameters
+    ----------
+    adjacency : list of list of int
+        The neighbors of each node
+
+    Returns
+    -------
+    components : list of list of int
+        The nodes of each component, ordered by the lowest node in each
+
+    """
+    seen = [False] * len(adjacency)
+    components = []
+    for start in range(len(adjacency)):
+        if seen[start]:
+            continue
+        seen[start] = True
+        component = [start]
+        for node in component:
+            for other in adjacency[node]:
+                if not seen[other]:
+                    seen[other] = True
+                    component.append(other)
+        components.append(sorted(component))
+    return components
+
+
+def _bfs_levels(adjacency, start):
+    """Returns the breadth-first level structure of a graph from a node."""
+    seen = {start}
+    levels = [[start]]
+    while True:
+        level = []
+        for node in levels[-1]:
+            for other in adjacency[node]:
+                if other not in seen:
+                    seen.add(other)
+                    level.append(other)
+        if not level:
+            return levels
+        levels.append(level)
+
+
+def _reverse_cuthill_mckee(adjacency, component):
+    """Orders a connected component by reverse Cuthill-McKee.
+
+    The search starts from a pseudo-peripheral node (George & Liu), and
+    visits the neighbors of each node in order of increasing degree.
+
+    Parameters
+    ----------
+    adjacency : list of list of int
+        The neighbors of each node
+    component : list of int
+        The nodes of the component
+
+    Returns
+    -------
+    order : list of int
+        The nodes of the component in the new order
+
+    """
+    def __key(node):
+        return len(adjacency[node]), node
+
+    start = min(component, key=__key)
+    levels = _bfs_levels(adjacency, start)
+    while True:
+        candidate = min(levels[-1], key=__key)
+        candidate_levels = _bfs_levels(adjacency, candidate)
+        if len(candidate_levels) <= len(levels):
+            break
+        start, levels = candidate, candidate_levels
+
+    seen = {start}
+    order = [start]
+    for node in order:
+        others = sorted((x for x in adjacency[node] if x not in seen),
+                        key=__key)
+        seen.update(others)
+        order.extend(others)
+    return order[::-1]
+
+
+def _spectral(mapping, rows, cols):
+    """Orders a connected component of a bipartite graph by its Fiedler vector.
+
+    The rows and columns are sorted by their coordinates in the second
+    singular vectors of the degree-normalized mapping, i.e., the Fiedler
+    vector of the normalized Laplacian of the bipartite graph.
+
+    Parameters
+    ----------
+    mapping : numpy.ndarray of bool
+        The mapping of each row value to the column values
+    rows : list of int
+        The rows in the component
+    cols : list of int
+        The columns in the component
+
+    Returns
+    -------
+    rows : list of int
+        The rows of the component in the new order
+    cols : list of int
+        The columns of the component in the new order
+
+    """
+    if len(rows) < 2 or len(cols) < 2:
+        return rows, cols
+    sub = mapping[np.ix_(rows, cols)].astype(np.float64)
+    row_scale = 1. / np.sqrt(sub.sum(axis=1))
+    col_scale = 1. / np.sqrt(sub.sum(axis=0))
+    normed = row_scale[:, np.newaxis] * sub * col_scale[np.newaxis, :]
+
+    # eigenvectors of the smaller Gram matrix are the singular vectors
+    transpose = len(cols) < len(rows)
+    if transpose:
+        normed = normed.T
+    values, vectors = np.linalg.eigh(normed.dot(normed.T))
+    sigma = np.sqrt(max(values[-2], 0.))
+    if sigma < 1e-12:
+        return rows, cols
+    first = vectors[:, -2]
+    second = normed.T.dot(first) / sigma
+    if transpose:
+        first, second = second, first
+    row_coords = row_scale * first
+    col_coords = col_scale * second
+
+    # fix the sign, such that the order is deterministic
+    if row_coords[0] > 0:
+        row_coords, col_coords = -row_coords, -col_coords
+    return ([rows[i] for i in np.lexsort((rows, row_coords))],
+            [cols[i] for i in np.lexsort((cols, col_coords))])
+
+
+def graph_order(spec_mapping, last_spec, method='rcm'):
+    """Orders species and reactions using the species-reaction graph.
+
+    The species and reactions are the nodes of a bipartite graph, with an
+    edge for each reactant / product of a reaction.  Each connected
+    component is ordered by reverse Cuthill-McKee (``'rcm'``), or by the
+    Fiedler vector of its normalized Laplacian (``'spectral'``), such that
+    species sharing reactions, and reactions sharing species, are placed
+    close to each other.  This takes seconds, rather than the hours of the
+    greedy search in `optimize_cache`.
+
+    Parameters
+    ----------
+    spec_mapping : numpy.ndarray of bool
+        The reactions (columns) each species (row) is a reactant or product
+        of, see `get_mappings`
+    last_spec : int
+        The index of the species that should be placed last
+    method : {'rcm', 'spectral'}, optional
+        The ordering method
+
+    Returns
+    -------
+    fwd_spec_mapping : list of int
+        A mapping of the original mechanism to the new species order
+    fwd_rxn_mapping : list of int
+        A mapping of the original mechanism to the new reaction order
+
+    """
+    nsp = spec_mapping.shape[0]
+    adjacency = _bipartite_adjacency(spec_mapping)
+
+    fwd_spec_mapping = []
+    fwd_rxn_mapping = []
+    for component in _components(adjacency):
+        if method == 'rcm':
+            nodes = _reverse_cuthill_mckee(adjacency, component)
+            rows = [x for x in nodes if x < nsp]
+            cols = [x - nsp for x in nodes if x >= nsp]
+        elif method == 'spectral':
+            rows, cols = _spectral(spec_mapping,
+                                   [x for x in component if x < nsp],
+                                   [x - nsp for x in component if x >= nsp])
+        else:
+            raise ValueError('Unknown ordering method: {}'.format(method))
+        fwd_spec_mapping.extend(rows)
+        fwd_rxn_mapping.extend(cols)
+
+    fwd_spec_mapping = [x for x in fwd_spec_mapping if x != last_spec]
+    fwd_spec_mapping.append(last_spec)
+    return fwd_spec_mapping, fwd_rxn_mapping
+
+
+CHECKPOINT = 'optimized_checkpoint.pickle'
+"""str: name of the checkpoint file of the greedy search in the build
+directory"""
+
+
+def _read_checkpoint(filename, key):
+    """Reads the progress of an unfinished greedy search.
+
+    Parameters
+    ----------
+    filename : str
+        The checkpoint file
+    key : tuple
+        Identifies the mechanism and optimization settings, the checkpoint
+        is only used if it was written with the same key
+
+    Returns
+    -------
+    states : dict
+        The state of each phase of the search, keyed by label, see
+        `_greedy_search`.  Empty if there is no (matching) checkpoint.
+
+    """
+    try:
+        with open(filename, 'rb') as file:
+            checkpoint = pickle.load(file)
+        if checkpoint['key'] == key:
+            return checkpoint['states']
+    except Exception:
+        pass
+    return {}
+
+
+def _write_checkpoint(filename, key, states):
+    """Writes the progress of the greedy search.
+
+    The checkpoint is written to a temporary file first, and atomically
+    replaces the previous one, such that a killed run always leaves a
+    complete checkpoint behind.
+
+    Parameters
+    ----------
+    filename : str
+        The checkpoint file
+    key : tuple
+        Identifies the mechanism and optimization settings
+    states : dict
+        The state of each phase of the search, keyed by label
+
+    """
+    temp = filename + '.tmp'
+    with open(temp, 'wb') as file:
+        pickle.dump({'key': key, 'states': states}, file)
+    os.replace(temp, filename)
+
+
+def _greedy_search(label, mapping, starting_orders, multi_thread,
+                   improve_cutoff, lookback_max, rand_restarts_max, max_time,
+                   patience=0, state=None, save=None):
+    """Runs `optimizer_loop` from each starting order on a process pool.
+
+    The results are collected as the runs finish, the best order so far is
+    kept in ``state`` and passed to ``save``.  The search stops once all
+    runs are finished, ``max_time`` is exceeded, or ``patience`` runs in a
+    row did not improve on the best order.
+
+    Parameters
+    ----------
+    label : str
+        The name of the values for the progress messages
+    mapping : numpy.ndarray of bool
+        The mapping of each value
+    starting_orders : iterable of list of int
+        The starting order of each run
+    multi_thread : int
+        The number of processes to use
+    improve_cutoff : int
+        The (mean) number of iterations without improvement before return
+    lookback_max : int
+        The width of lookahead/lookforward (at maximum)
+    rand_restarts_max : int
+        The number of restarts to try within the iteration (at maximum)
+    max_time : int
+        The maximum time duration [s] of the search
+    patience : int, optional
+        The number of finished runs in a row without improvement after
+        which the search is stopped.  If zero, all runs are finished
+    state : dict, optional
+        The state of a previous, unfinished search to continue, with the
+        ``'best'`` (score, order) found, the number of runs ``'completed'``
+        and the number of runs ``'since_improvement'``.  Updated in place.
+    save : callable, optional
+        Called with ``state`` whenever runs have finished, e.g., to write a
+        checkpoint
+
+    Returns
+    -------
+    order : list of int
+        The best order found
+
+    """
+    if state is None:
+        state = {}
+    state.setdefault('best', None)
+    state.setdefault('completed', 0)
+    state.setdefault('since_improvement', 0)
+    state['done'] = False
+
+    pool = multiprocessing.Pool(multi_thread if multi_thread else 1)
+    pending = []
+    first_order = None
+    for order in starting_orders:
+        if first_order is None:
+            first_order = order
+        pending.append(
+            pool.apply_async(optimizer_loop,
+                             (order, mapping,
+                              np.random.randint(1, high=lookback_max + 1),
+                              np.random.randint(improve_cutoff * 0.5,
+                                                high=improve_cutoff * 1.5),
+                              np.random.randint(1,
+                                                high=rand_restarts_max + 1)
+                              )
+                             )
+            )
+    total = state['completed'] + len(pending)
+
+    time_start = datetime.datetime.now()
+    last_report = time_start
+    converged = False
+    while pending and not converged:
+        now = datetime.datetime.now()
+        if now - time_start >= datetime.timedelta(seconds=max_time):
+            break
+        # a single scan, such that a result finishing meanwhile is not lost
+        finished = [x for x in pending if x.ready()]
+        if finished:
+            pending = [x for x in pending if x not in finished]
+            for result in finished:
+                score, order = result.get()
+                state['completed'] += 1
+                if state['best'] is None or score > state['best'][0]:
+                    state['best'] = (score, order)
+                    state['since_improvement'] = 0
+                else:
+                    state['since_improvement'] += 1
+            converged = bool(patience and
+                             state['since_improvement'] >= patience)
+            if save is not None:
+                save(state)
+        else:
+            time.sleep(0.1)
+        if now - last_report >= datetime.timedelta(seconds=30):
+            last_report = now
+            print('{} Optimization {}% complete...'.format(
+                  label, 100. * state['completed'] / float(total))
+                  )
+
+    if converged:
+        print('{} Optimization converged, no improvement in the last {} '
+              'runs...'.format(label, patience))
+    else:
+        print('{} Optimization {}% complete...'.format(
+              label, 100. * state['completed'] / float(max(total, 1)))
+              )
+    if pending:
+        try:
+            pool.close()
+            pool.terminate()
+            pool.join()
+        except:
+            pass
+    else:
+        pool.close()
+        pool.join()
+
+    state['done'] = not pending or converged
+    if save is not None:
+        save(state)
+    if state['best'] is None:
+        # no run finished in time
+        return list(first_order)
+    return state['best'][1][:]
+
+
 def optimize_cache(specs, reacs, multi_thread,
                    force_optimize, build_path,
                    last_spec, consider_thd=False,
@@ -220,7 +848,11 @@ def optimize_cache(specs, reacs, multi_thread,
                    rand_init_tries=10000,
                    lookback_max=2,
                    rand_restarts_max=5,
-                   max_time=100*60 #100 min
+                   max_time=100*60, #100 min
+                   method='greedy',
+                   refine=False,
+                   refine_tries=10,
+                   patience=1000
                    ):
     """Optimize species and reaction orders to improve cache hit rates.
 
@@ -250,6 +882,20 @@ def optimize_cache(specs, reacs, multi_thread,
         The number of restarts to try within the iteration
     max_time : int
         The maximum time duration of each optimziation step
+    method : {'greedy', 'rcm', 'spectral'}
+        The ordering method.  'greedy' searches from random initial orders,
+        'rcm' and 'spectral' order the species-reaction graph, see
+        `graph_order`
+    refine : bool
+        If true, the graph ordering is refined by the greedy search, started
+        from the graph ordering rather than random orders
+    refine_tries : int
+        The number of greedy searches used to refine the graph ordering
+    patience : int
+        The greedy search is stopped early once this many runs in a row did
+        not improve on the best order.  If zero, all runs are finished.
+        The progress is checkpointed in the build directory, and continued
+        by the next call for the same mechanism unless ``force_optimize``
 
     Returns
     _______
@@ -268,6 +914,7 @@ def optimize_cache(specs, reacs, multi_thread,
 
     """
 
+    refine = refine and method != 'greedy'
     print('Beginning Cache-optimization process...')
     # first try to load past data
     if not force_optimize:
@@ -281,12 +928,15 @@ def optimize_cache(specs, reacs, multi_thread,
                 fwd_rxn_mapping = pickle.load(file)
                 reverse_spec_mapping = pickle.load(file)
                 reverse_rxn_mapping = pickle.load(file)
-            same_mech = (
-                all(any(s == sp for sp in specs) for s in old_specs) and
-                len(specs) == len(old_specs) and
-                all(any(r == rxn for rxn in reacs) for r in old_reacs) and
-                len(reacs) == len(old_reacs)
-                )
+                try:
+                    old_method = pickle.load(file)
+                except EOFError:
+                    # written before the graph orderings were available
+                    old_method = ('greedy', False)
+            # the stored species and reactions are in the optimized order
+            same_mech = (chem.get_mech_fingerprint(specs, reacs) ==
+                         chem.get_mech_fingerprint(old_specs, old_reacs)
+                         )
             if reverse_spec_mapping[last_spec] != len(specs) - 1:
                 print('Different last species detected, '
                       'old species was {} and new species is {}'.format(
@@ -294,6 +944,11 @@ def optimize_cache(specs, reacs, multi_thread,
                       )
                 print('Forcing reoptimization...')
                 same_mech = False
+            if same_mech and tuple(old_method) != (method, refine):
+                print('Different optimization method detected, '
+                      'forcing reoptimization...'
+                      )
+                same_mech = False
 
         except Exception as e:
             print('Old optimization file not found, or does not match '
@@ -312,133 +967,72 @@ def optimize_cache(specs, reacs, multi_thread,
     nsp = len(specs)
     nr = len(reacs)
 
-    last_name = specs[last_spec].name
-
     #now generate our mappings
-    spec_mapping = [bitarray([False for i in range(nr)]) for i in range(nsp)]
-
-    reac_mapping = [bitarray([False for i in range(nsp)]) for i in range(nr)]
+    spec_mapping, reac_mapping = get_mappings(specs, reacs)
 
     eff_map = [np.zeros(nsp) for i in range(nr)]
     name_map = {sp.name: i for i, sp in enumerate(specs)}
     for rind, rxn in enumerate(reacs):
-        for sp in rxn.reac:
-            spind = name_map[sp]
-            spec_mapping[spind][rind] = True
-            reac_mapping[rind][spind] = True
-        for sp in rxn.prod:
-            spind = name_map[sp]
-            spec_mapping[spind][rind] = True
-            reac_mapping[rind][spind] = True
         if consider_thd:
             for sp, eff in rxn.thd_body_eff:
                 spind = name_map[sp]
                 eff_map[rind][spind] = eff
 
-    def copy_mapping(mapping):
-        return [bitarray(ba) for ba in mapping]
-
-    mapping_list = []
-    pool = multiprocessing.Pool(multi_thread if multi_thread else 1)
-
-    lookback_list = np.random.randint(1, high=lookback_max + 1,
-                                      size=rand_init_tries + 1
-                                      )
-    rand_restarts_list = np.random.randint(1, high=rand_restarts_max + 1,
-                                           size=rand_init_tries + 1
-                                           )
-    improve_cutoff_list = np.random.randint(improve_cutoff * 0.5,
-                                            high=improve_cutoff * 1.5,
-                                            size=rand_init_tries + 1
-                                            )
-
-    fwd_rxn_mapping = [x for x in range(nr)]
-    result_list = []
-    if rand_init_tries:
-        for i in range(rand_init_tries):
-            if i % 100 == 0:
-                mapping_list = fwd_rxn_mapping[:]
+    # progress of an unfinished search of the same mechanism (in the same
+    # order) and settings is continued
+    checkpoint = os.path.join(build_path, CHECKPOINT)
+    key = (hashlib.sha1(''.join(x.fingerprint() for x in specs + reacs)
+                        .encode('utf-8')).hexdigest(),
+           last_spec, method, refine)
+    states = {} if force_optimize else _read_checkpoint(checkpoint, key)
+    if states:
+        print('Resuming cache optimization from checkpoint...')
+
+    def __save(state):
+        _write_checkpoint(checkpoint, key, states)
+
+    def __starting_orders(label, initial, exclude=None):
+        start = states.get(label, {}).get('completed', 0)
+        tries = rand_init_tries if method == 'greedy' else refine_tries
+        for i in range(start, tries):
+            # every 100th try starts from the initial order
+            if method != 'greedy' or i % 100 == 0:
+                order = initial
             else:
-                mapping_list = np.random.permutation(nr).tolist()
-            result_list.append(
-                pool.apply_async(optimizer_loop,
-                                 (mapping_list, copy_mapping(reac_mapping),
-                                  lookback_list[i], improve_cutoff_list[i],
-                                  rand_restarts_list[i]
-                                  )
-                                 )
-                )
-
-    time_start = datetime.datetime.now()
-    complete = False
-    while (datetime.datetime.now() - time_start <
-           datetime.timedelta(seconds=max_time)
-           and not complete
-           ):
-        time.sleep(30)
-        complete = sum(x.ready() for x in result_list)
-        print('Reaction Optimization {}% complete...'.format(
-              100. * complete / float(len(result_list)))
-              )
-        complete = complete == len(result_list)
-
-    if not complete:
-        try:
-            pool.close()
-            pool.terminate()
-            pool.join()
-        except:
-            pass
-
-    result_list = [r.get() for r in result_list if r.ready()]
-    fwd_rxn_mapping = result_list[np.argmax([x[0] for x in result_list])][1][:]
-
-    pool = multiprocessing.Pool(multi_thread if multi_thread else 1)
-
-    result_list = []
-    fwd_spec_mapping = [i for i in range(nsp) if i != last_spec]
-    if rand_init_tries:
-        for i in range(rand_init_tries):
-            if i % 100 == 0:
-                mapping_list = fwd_spec_mapping[:]
-            else:
-                mapping_list = np.random.permutation(nsp).tolist()
-                mapping_list = [x for x in mapping_list if x != last_spec]
-            result_list.append(
-                pool.apply_async(optimizer_loop,
-                                 (mapping_list, copy_mapping(spec_mapping),
-                                  lookback_list[i], improve_cutoff_list[i],
-                                  rand_restarts_list[i]
-                                  )
-                                 )
-                )
-
-    time_start = datetime.datetime.now()
-    complete = False
-    while (datetime.datetime.now() - time_start <
-           datetime.timedelta(seconds=max_time)
-           and not complete
-           ):
-        time.sleep(30)
-        complete = sum(x.ready() for x in result_list)
-        print('Species Optimization {}% complete...'.format(
-              100. * complete / float(len(result_list)))
-              )
-        complete = complete == len(result_list)
-
-    if not complete:
-        try:
-            pool.close()
-            pool.terminate()
-            pool.join()
-        except:
-            pass
-
-    result_list = [r.get() for r in result_list if r.ready()]
-    fwd_spec_mapping = (result_list[
-                        np.argmax([x[0] for x in result_list])
-                        ][1][:] + [last_spec]
-                        )
+                order = np.random.permutation(len(initial)).tolist()
+            yield [x for x in order if x != exclude]
+
+    if method == 'greedy':
+        fwd_spec_mapping = list(range(nsp))
+        fwd_rxn_mapping = list(range(nr))
+    else:
+        print('Ordering species and reactions by {}...'.format(method))
+        fwd_spec_mapping, fwd_rxn_mapping = graph_order(spec_mapping,
+                                                        last_spec, method)
+
+    if method == 'greedy' or refine:
+        state = states.setdefault('Reaction', {})
+        if state.get('done'):
+            fwd_rxn_mapping = state['best'][1][:]
+        else:
+            fwd_rxn_mapping = _greedy_search(
+                'Reaction', reac_mapping,
+                __starting_orders('Reaction', fwd_rxn_mapping),
+                multi_thread, improve_cutoff, lookback_max,
+                rand_restarts_max, max_time, patience=patience,
+                state=state, save=__save)
+
+        state = states.setdefault('Species', {})
+        if state.get('done'):
+            fwd_spec_mapping = state['best'][1][:]
+        else:
+            fwd_spec_mapping = _greedy_search(
+                'Species', spec_mapping,
+                __starting_orders('Species', fwd_spec_mapping, last_spec),
+                multi_thread, improve_cutoff, lookback_max,
+                rand_restarts_max, max_time, patience=patience,
+                state=state, save=__save)
+        fwd_spec_mapping = fwd_spec_mapping + [last_spec]
 
     reverse_spec_mapping = [fwd_spec_mapping.index(i)
                             for i in range(len(fwd_spec_mapping))
@@ -460,6 +1054,9 @@ def copy_mapping(mapping):
         pickle.dump(fwd_rxn_mapping, file)
         pickle.dump(reverse_spec_mapping, file)
         pickle.dump(reverse_rxn_mapping, file)
+        pickle.dump((method, refine), file)
+    if os.path.isfile(checkpoint):
+        os.remove(checkpoint)
 
     # complete, so now return
     return (specs, reacs, fwd_spec_mapping, fwd_rxn_mapping,
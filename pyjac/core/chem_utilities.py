@@ -7,10 +7,11 @@
 
 # Standard libraries
 import math
+import hashlib
 import numpy as np
 
 __all__ = ['RU', 'RUC', 'RU_JOUL', 'PA', 'get_elem_wt',
-           'ReacInfo', 'SpecInfo', 'calc_spec_smh']
+           'ReacInfo', 'SpecInfo', 'get_mech_fingerprint', 'calc_spec_smh']
 
 # universal gas constants, SI units
 RU = 8314.4621  # J/(kmole * K)
@@ -24,29 +25,105 @@
 PA = 101325.0
 
 
+def _same(value, other):
+    """Returns ``True`` if two attribute values are identical.
+
+    Arrays are compared elementwise, and lists and tuples item by item.
+    """
+    if isinstance(value, np.ndarray) or isinstance(other, np.ndarray):
+        return np.array_equal(value, other)
+    if isinstance(value, (list, tuple)) and isinstance(other, (list, tuple)):
+        return len(value) == len(other) and all(
+            _same(x, y) for x, y in zip(value, other))
+    return value == other
+
+
+def _canonical(value):
+    """Returns a plain Python representation of an attribute value, with
+    a stable ``repr`` (e.g., independent of the NumPy version).
+    """
+    if isinstance(value, np.ndarray):
+        return ['ndarray', list(value.shape), value.ravel().tolist()]
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return [_canonical(x) for x in value]
+    return value
+
+
 class CommonEqualityMixin(object):
     """Base class for `ReacInfo` and `SpecInfo` classes for equality comparison
+
+    The attributes of the subclasses are declared in ``__slots__``, and
+    compared in order.  The content `fingerprint` gives a hash that is
+    stable between runs, e.g., to look up a mechanism in a cache.
+
+    Notes
+    -----
+    The attributes are mutable, so objects are unhashable and cannot be
+    stored in a set or used as a dictionary key.  Use the `fingerprint`
+    to key objects by their contents.
     """
+    __slots__ = ()
+
     def __eq__(self, other):
-        try:
-            for key, value in self.__dict__.items():
-                if not key in other.__dict__:
-                    return False
-                if isinstance(value, np.ndarray):
-                    if not np.array_equal(value, other.__dict__[key]):
-                        return False
-                elif isinstance(value, list):
-                    if not all([any(x == y for y in other.__dict__[key]) for x in value]):
-                        return False
-                elif value != other.__dict__[key]:
-                    return False
-            return True
-        except Exception as e:
+        if type(self) != type(other):
             return False
+        return all(_same(getattr(self, key), getattr(other, key))
+                   for key in self.__slots__)
 
     def __ne__(self, other):
         return not self.__eq__(other)
 
+    __hash__ = None
+
+    def __getstate__(self):
+        return dict((key, getattr(self, key)) for key in self.__slots__)
+
+    def __setstate__(self, state):
+        # also accepts the ``__dict__`` of objects pickled before the
+        # attributes were slotted
+        for key, value in state.items():
+            setattr(self, key, value)
+
+    def fingerprint(self):
+        """Returns a hash of the contents, stable between runs.
+
+        Returns
+        -------
+        fingerprint : str
+            The hexadecimal SHA-1 digest of the attributes
+
+        """
+        content = [type(self).__name__] + [
+            [key, _canonical(getattr(self, key))] for key in self.__slots__]
+        return hashlib.sha1(repr(content).encode('utf-8')).hexdigest()
+
+
+def get_mech_fingerprint(specs, reacs):
+    """Returns a hash of the contents of a mechanism, independent of the
+    order of the species and reactions.
+
+    Parameters
+    ----------
+    specs : list of `SpecInfo`
+        List of species in the mechanism.
+    reacs : list of `ReacInfo`
+        List of reactions in the mechanism.
+
+    Returns
+    -------
+    fingerprint : str
+        The hexadecimal SHA-1 digest
+
+    """
+    sha = hashlib.sha1()
+    for items in [specs, reacs]:
+        sha.update('{}\n'.format(len(items)).encode('utf-8'))
+        for fingerprint in sorted(x.fingerprint() for x in items):
+            sha.update(fingerprint.encode('utf-8'))
+    return sha.hexdigest()
+
 
 def get_elem_wt():
     """Returns dict with built-in element names and atomic weights [kg/kmol].
@@ -156,6 +233,11 @@ class ReacInfo(CommonEqualityMixin):
     If `troe` and `sri` are both False, then the Lindemann is assumed.
 
     """
+    __slots__ = ('reac', 'reac_nu', 'prod', 'prod_nu', 'A', 'b', 'E',
+                 'rev', 'rev_par', 'dup', 'thd_body', 'thd_body_eff',
+                 'pdep', 'pdep_sp', 'low', 'high', 'troe', 'troe_par',
+                 'sri', 'sri_par', 'cheb', 'cheb_n_temp', 'cheb_n_pres',
+                 'cheb_plim', 'cheb_tlim', 'cheb_par', 'plog', 'plog_par')
 
     def __init__(self, rev, reactants, reac_nu, products, prod_nu, A, b, E):
         self.reac = reactants
@@ -238,6 +320,7 @@ class SpecInfo(CommonEqualityMixin):
         (low, middle, high), default ([300, 1000, 5000]).
 
     """
+    __slots__ = ('name', 'elem', 'mw', 'hi', 'lo', 'Trange')
 
     def __init__(self, name):
         self.name = name
@@ -0,0 +1,469 @@
+"""Expression intermediate representation for the generated code.
+
+The subroutine writers build up a list of statements from the expression
+classes below, and an `Emitter` serializes the list for the target language
+in a single write.  This gives a single place to handle the syntax and
+array indexing of each language.
+"""
+
+# Python 2 compatibility
+from __future__ import division
+from __future__ import print_function
+
+# Local imports
+from .. import utils
+
+__all__ = ['Literal', 'Var', 'ArrayRef', 'Neg', 'Sum', 'Product', 'Div',
+           'Pow', 'Call', 'Paren', 'Assign', 'Declare', 'Comment', 'Blank',
+           'If', 'horner', 'Emitter']
+
+
+class Expr(object):
+    """Base class of the expression nodes."""
+
+    #: precedence of the node, operands of lower precedence are parenthesized
+    precedence = 4
+
+    def emit(self, emitter):
+        """Returns the code for this expression.
+
+        Parameters
+        ----------
+        emitter : `Emitter`
+            The emitter for the target language
+
+        Returns
+        -------
+        code : str
+            The code for this expression
+
+        """
+        raise NotImplementedError
+
+
+class Literal(Expr):
+    """A floating point constant.
+
+    Parameters
+    ----------
+    value : float
+        The value of the constant
+    fmt : str, optional
+        The format of the value, full double precision by default
+
+    """
+    def __init__(self, value, fmt='{:.16e}'):
+        self.value = value
+        self.fmt = fmt
+
+    def emit(self, emitter):
+        return self.fmt.format(self.value)
+
+
+class Var(Expr):
+    """A scalar variable.
+
+    Parameters
+    ----------
+    name : str
+        The name of the variable
+
+    """
+    def __init__(self, name):
+        self.name = name
+
+    def emit(self, emitter):
+        return self.name
+
+
+class ArrayRef(Expr):
+    """An element of an array.
+
+    Parameters
+    ----------
+    name : str
+        The name of the array
+    index : int
+        The (zero-based) index of the element
+
+    """
+    def __init__(self, name, index):
+        self.name = name
+        self.index = index
+
+    def emit(self, emitter):
+        return emitter.get_array(emitter.lang, self.name, self.index)
+
+
+class Neg(Expr):
+    """A subtracted term of a `Sum`.
+
+    Parameters
+    ----------
+    term : `Expr`
+        The subtracted term
+
+    """
+    precedence = 1
+
+    def __init__(self, term):
+        self.term = term
+
+    def emit(self, emitter):
+        return '-' + emitter.operand(self.term, 2)
+
+
+class Sum(Expr):
+    """A sum of terms, `Neg` terms are subtracted.
+
+    Parameters
+    ----------
+    terms : list of `Expr`
+        The terms of the sum
+
+    """
+    precedence = 1
+
+    def __init__(self, terms):
+        self.terms = list(terms)
+
+    def emit(self, emitter):
+        code = ''
+        for i, term in enumerate(self.terms):
+            if isinstance(term, Neg):
+                code += (' - ' if i else '-') + emitter.operand(term.term, 2)
+            else:
+                code += (' + ' if i else '') + emitter.operand(term, 1)
+        return code
+
+
+class Product(Expr):
+    """A product of factors.
+
+    Parameters
+    ----------
+    factors : list of `Expr`
+        The factors of the product
+
+    """
+    precedence = 2
+
+    def __init__(self, factors):
+        self.factors = list(factors)
+
+    def emit(self, emitter):
+        return ' * '.join(emitter.operand(factor, 2)
+                          for factor in self.factors)
+
+
+class Div(Expr):
+    """A quotient.
+
+    Parameters
+    ----------
+    num : `Expr`
+        The numerator
+    den : `Expr`
+        The denominator
+
+    """
+    precedence = 2
+
+    def __init__(self, num, den):
+        self.num = num
+        self.den = den
+
+    def emit(self, emitter):
+        return (emitter.operand(self.num, 2) + ' / ' +
+                emitter.operand(self.den, 3))
+
+
+class Pow(Expr):
+    """A power, ``pow`` in C / CUDA, and an operator in Fortran / Matlab.
+
+    Parameters
+    ----------
+    base : `Expr`
+        The base
+    exponent : `Expr`
+        The exponent
+
+    """
+    precedence = 3
+
+    def __init__(self, base, exponent):
+        self.base = base
+        self.exponent = exponent
+
+    def emit(self, emitter):
+        if emitter.lang in ['c', 'cuda']:
+            return 'pow({}, {})'.format(self.base.emit(emitter),
+                                        self.exponent.emit(emitter))
+        # the operators bind tighter than all others, but are not
+        # associative, and may not be followed by a sign
+        exponent = emitter.operand(self.exponent, 4)
+        if exponent.startswith('-'):
+            exponent = '(' + exponent + ')'
+        return '{} {} {}'.format(emitter.operand(self.base, 4),
+                                 '**' if emitter.lang == 'fortran' else '^',
+                                 exponent)
+
+
+class Call(Expr):
+    """A call of a math function, e.g., ``exp``, ``log`` or ``pow``.
+
+    Parameters
+    ----------
+    func : str
+        The name of the function
+    args : list of `Expr`
+        The arguments of the function
+
+    """
+    def __init__(self, func, args):
+        self.func = func
+        self.args = list(args)
+
+    def emit(self, emitter):
+        return '{}({})'.format(self.func, ', '.join(
+            arg.emit(emitter) for arg in self.args))
+
+
+class Paren(Expr):
+    """An explicitly parenthesized expression.
+
+    Parameters
+    ----------
+    expr : `Expr`
+        The enclosed expression
+
+    """
+    def __init__(self, expr):
+        self.expr = expr
+
+    def emit(self, emitter):
+        return '(' + self.expr.emit(emitter) + ')'
+
+
+def horner(var, coeffs):
+    """Returns the polynomial ``c0 + var * (c1 + ... + cn * var)``
+
+    Parameters
+    ----------
+    var : `Expr`
+        The variable of the polynomial
+    coeffs : list of float or `Expr`
+        The coefficients, in increasing order, at least two
+
+    Returns
+    -------
+    expr : `Sum`
+        The polynomial
+
+    """
+    coeffs = [c if isinstance(c, Expr) else Literal(c) for c in coeffs]
+    expr = Sum([coeffs[-2], Product([coeffs[-1], var])])
+    for coeff in reversed(coeffs[:-2]):
+        expr = Sum([coeff, Product([var, expr])])
+    return expr
+
+
+class Assign(object):
+    """An assignment statement.
+
+    Parameters
+    ----------
+    target : `Expr`
+        The assigned variable or array element
+    expr : `Expr`
+        The assigned value
+    op : {'=', '+=', '-=', '*='}, optional
+        The assignment operator
+
+    """
+    def __init__(self, target, expr, op='='):
+        self.target = target
+        self.expr = expr
+        self.op = op
+
+
+class Declare(object):
+    """A declaration of a (C) local variable or array.
+
+    Parameters
+    ----------
+    name : str
+        The name of the variable
+    size : int, optional
+        The size of the array, or ``None`` for a scalar
+    expr : `Expr`, optional
+        The initial value of a scalar
+
+    """
+    def __init__(self, name, size=None, expr=None):
+        self.name = name
+        self.size = size
+        self.expr = expr
+
+
+class Comment(object):
+    """A single line comment.
+
+    Parameters
+    ----------
+    text : str
+        The text of the comment
+
+    """
+    def __init__(self, text):
+        self.text = text
+
+
+class Blank(object):
+    """An empty line."""
+
+
+class If(object):
+    """A conditional with an optional else branch.
+
+    Parameters
+    ----------
+    cond : str
+        The condition
+    body : list
+        The statements of the true branch
+    orelse : list, optional
+        The statements of the else branch
+
+    """
+    def __init__(self, cond, body, orelse=None):
+        self.cond = cond
+        self.body = list(body)
+        self.orelse = list(orelse) if orelse is not None else None
+
+
+class Emitter(object):
+    """Serializes statements for a target language.
+
+    Parameters
+    ----------
+    lang : {'c', 'cuda', 'fortran', 'matlab'}
+        Programming language.
+    get_array : function, optional
+        The get_array function for the memory layout in use
+    double_type : str, optional
+        The type of declared variables
+
+    """
+    def __init__(self, lang, get_array=utils.get_array, double_type='double'):
+        self.lang = lang
+        self.get_array = get_array
+        self.double_type = double_type
+
+    def operand(self, expr, precedence):
+        """Returns the code of an operand, parenthesized if needed.
+
+        Parameters
+        ----------
+        expr : `Expr`
+            The operand
+        precedence : int
+            The precedence of the enclosing operator
+
+        Returns
+        -------
+        code : str
+            The code for the operand
+
+        """
+        code = expr.emit(self)
+        if expr.precedence < precedence:
+            return '(' + code + ')'
+        return code
+
+    def emit(self, statements, depth=1):
+        """Returns the code for a list of statements.
+
+        Parameters
+        ----------
+        statements : list
+            The statements to serialize
+        depth : int, optional
+            The indentation level of the statements
+
+        Returns
+        -------
+        code : str
+            The code for the statements
+
+        """
+        lang = self.lang
+        indent = utils.line_start * depth
+        lines = []
+        for stmt in statements:
+            if isinstance(stmt, Assign):
+                line = indent + stmt.target.emit(self) + ' '
+                if stmt.op == '=' or lang in ['c', 'cuda']:
+                    line += stmt.op + ' '
+                else:
+                    # no compound assignment operators
+                    line += '= {} {} '.format(stmt.target.emit(self),
+                                              stmt.op[0])
+                lines.append(line + stmt.expr.emit(self) +
+                             utils.line_end[lang])
+            elif isinstance(stmt, Declare):
+                line = indent + self.double_type + ' ' + stmt.name
+                if stmt.size is not None:
+                    line += '[{}]'.format(stmt.size)
+                elif stmt.expr is not None:
+                    line += ' = ' + stmt.expr.emit(self)
+                lines.append(line + utils.line_end[lang])
+            elif isinstance(stmt, Comment):
+                lines.append(indent + utils.comment[lang] + ' ' +
+                             stmt.text + '\n')
+            elif isinstance(stmt, Blank):
+                lines.append('\n')
+            elif isinstance(stmt, If):
+                line = indent + 'if ({})'.format(stmt.cond)
+                if lang in ['c', 'cuda']:
+                    line += ' {\n'
+                elif lang == 'fortran':
+                    line += ' then\n'
+                elif lang == 'matlab':
+                    line += '\n'
+                lines.append(line)
+                lines.append(self.emit(stmt.body, depth + 1))
+                if stmt.orelse is not None:
+                    if lang in ['c', 'cuda']:
+                        lines.append(indent + '} else {\n')
+                    elif lang in ['fortran', 'matlab']:
+                        lines.append(indent + 'else\n')
+                    lines.append(self.emit(stmt.orelse, depth + 1))
+                if lang in ['c', 'cuda']:
+                    lines.append(indent + '}\n')
+                elif lang == 'fortran':
+                    lines.append(indent + 'end if\n')
+                elif lang == 'matlab':
+                    lines.append(indent + 'end\n')
+            else:
+                raise TypeError('Unknown statement: {}'.format(stmt))
+        return ''.join(lines)
+
+    def write(self, file, statements, depth=1):
+        """Writes a list of statements to a file.
+
+        Parameters
+        ----------
+        file : `File`
+            The open file object to write to
+        statements : list
+            The statements to serialize
+        depth : int, optional
+            The indentation level of the statements
+
+        Returns
+        -------
+        None
+
+        """
+        file.write(self.emit(statements, depth))
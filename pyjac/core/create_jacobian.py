@@ -10,6 +10,8 @@
 import sys
 import math
 import os
+import re
+import multiprocessing
 
 # Local imports
 from .. import utils
@@ -21,6 +23,16 @@
 from . import CParams
 from . import cache_optimizer as cache
 from . import shared_memory as shared
+from . import sparse_lu
+from . import codegen as cg
+from . import manifest
+from . import autotune
+
+SPARSE_ENTRY = '@jac[{}]@'
+"""str: marker of a (dense) Jacobian entry in the compressed formats"""
+
+SPARSE_ENTRY_RE = re.compile(r'@jac\[(\d+)\]@')
+"""compiled regex: matches `SPARSE_ENTRY`, with the dense index"""
 
 
 def calculate_shared_memory(rxn_ind, rxn, specs, reacs, rev_reacs, pdep_reacs):
@@ -759,7 +771,8 @@ def get_rxn_params_dt(rxn, rev=False):
 
 
 def write_db_dt_def(file, lang, specs, reacs, rev_reacs,
-                    dBdT_flag, do_unroll
+                    dBdT_flag, do_unroll, get_array=utils.get_array,
+                    define=True
                     ):
     """Write definition of dB/dT terms for each species
 
@@ -780,13 +793,17 @@ def write_db_dt_def(file, lang, specs, reacs, rev_reacs,
         the index of all species with non-zero dB/dT entries
     do_unroll : bool
         If ``True``, turn on Jacobian unrolling
+    get_array : function, optional
+        The get_array function for the memory layout in use
+    define : bool, optional
+        If ``False``, the dBdT array has already been declared
 
     Returns
     -------
     None
 
     """
-    if len(rev_reacs):
+    if len(rev_reacs) and define:
         if lang == 'c':
             file.write('  double dBdT[{}]'.format(len(specs)) +
                        utils.line_end[lang]
@@ -816,56 +833,32 @@ def write_db_dt_def(file, lang, specs, reacs, rev_reacs,
                 t_mid[specs[sp_ind].Trange[1]] = []
             t_mid[specs[sp_ind].Trange[1]].append(sp_ind)
 
-    for mid_temp in t_mid:
-        # dB/dT evaluation (with temperature conditional)
-        line = utils.line_start + 'if (T <= {:})'.format(mid_temp)
-        if lang in ['c', 'cuda']:
-            line += ' {\n'
-        elif lang == 'fortran':
-            line += ' then\n'
-        elif lang == 'matlab':
-            line += '\n'
-        file.write(line)
-        for sp_ind in sorted(t_mid[mid_temp]):
-            dBdT = utils.get_array(lang, 'dBdT', sp_ind)
-            line = (utils.line_start * 2 + dBdT +
-                    ' = ({:.16e}'.format(specs[sp_ind].lo[0] - 1.0) +
-                    ' + {:.16e} / T) / T'.format(specs[sp_ind].lo[5]) +
-                    ' + {:.16e} + T'.format(specs[sp_ind].lo[1] / 2.0) +
-                    ' * ({:.16e}'.format(specs[sp_ind].lo[2] / 3.0) +
-                    ' + T * ({:.16e}'.format(specs[sp_ind].lo[3] / 4.0) +
-                    ' + {:.16e} * T))'.format(specs[sp_ind].lo[4] / 5.0) +
-                    utils.line_end[lang]
-                    )
-            file.write(line)
-
-        if lang in ['c', 'cuda']:
-            file.write('  } else {\n')
-        elif lang in ['fortran', 'matlab']:
-            file.write('  else\n')
-
-        for sp_ind in sorted(t_mid[mid_temp]):
-            dBdT = utils.get_array(lang, 'dBdT', sp_ind)
-            line = (utils.line_start * 2 +  dBdT +
-                    ' = ({:.16e}'.format(specs[sp_ind].hi[0] - 1.0) +
-                    ' + {:.16e} / T) / T'.format(specs[sp_ind].hi[5]) +
-                    ' + {:.16e} + T'.format(specs[sp_ind].hi[1] / 2.0) +
-                    ' * ({:.16e}'.format(specs[sp_ind].hi[2] / 3.0) +
-                    ' + T * ({:.16e}'.format(specs[sp_ind].hi[3] / 4.0) +
-                    ' + {:.16e} * T))'.format(specs[sp_ind].hi[4] / 5.0) +
-                    utils.line_end[lang]
-                    )
-            file.write(line)
-
-        if lang in ['c', 'cuda']:
-            file.write('  }\n\n')
-        elif lang == 'fortran':
-            file.write('  end if\n\n')
-        elif lang == 'matlab':
-            file.write('  end\n\n')
+    T = cg.Var('T')
 
+    def __db_dt(c):
+        return cg.Sum([
+            cg.Div(cg.Sum([cg.Literal(c[0] - 1.0),
+                           cg.Div(cg.Literal(c[5]), T)]), T),
+            cg.Literal(c[1] / 2.0),
+            cg.Product([T, cg.horner(T, [c[2] / 3.0, c[3] / 4.0,
+                                         c[4] / 5.0])])
+            ])
 
-def get_db_dt(lang, specs, rxn, do_unroll):
+    statements = []
+    for mid_temp in t_mid:
+        # dB/dT evaluation (with temperature conditional)
+        statements.append(cg.If(
+            'T <= {:}'.format(mid_temp),
+            [cg.Assign(cg.ArrayRef('dBdT', sp_ind), __db_dt(specs[sp_ind].lo))
+             for sp_ind in sorted(t_mid[mid_temp])],
+            [cg.Assign(cg.ArrayRef('dBdT', sp_ind), __db_dt(specs[sp_ind].hi))
+             for sp_ind in sorted(t_mid[mid_temp])]
+            ))
+        statements.append(cg.Blank())
+    cg.Emitter(lang, get_array).write(file, statements)
+
+
+def get_db_dt(lang, specs, rxn, do_unroll, get_array=utils.get_array):
     """Write evaluation of dB/dT term
 
     Parameters
@@ -878,6 +871,8 @@ def get_db_dt(lang, specs, rxn, do_unroll):
         The reaction to consider
     do_unroll : bool
         If ``True``, Jacobian unrolling is turned on
+    get_array : function, optional
+        The get_array function for the memory layout in use
 
     Returns
     -------
@@ -900,7 +895,7 @@ def get_db_dt(lang, specs, rxn, do_unroll):
         if (nu == 0):
             continue
 
-        dBdT = utils.get_array(lang, 'dBdT', sp_ind)
+        dBdT = get_array(lang, 'dBdT', sp_ind)
 
         if not notfirst:
             # first entry
@@ -932,7 +927,7 @@ def get_db_dt(lang, specs, rxn, do_unroll):
 
         nu = -rxn.reac_nu[rxn.reac.index(sp_ind)]
 
-        dBdT = utils.get_array(lang, 'dBdT', sp_ind)
+        dBdT = get_array(lang, 'dBdT', sp_ind)
 
         # not first entry
         if nu == 1:
@@ -1294,7 +1289,7 @@ def write_troe_dt(lang, rxn, beta_0minf, E_0minf, k0kinf):
     return jline
 
 
-def write_dcp_dt(file, lang, specs):
+def write_dcp_dt(file, lang, specs, get_array=utils.get_array):
     """Write derivative of cp w.r.t. temperature for each species
 
     Parameters
@@ -1305,6 +1300,8 @@ def write_dcp_dt(file, lang, specs):
         The Programming language
     specs : list of `SpecInfo`
         The species in the mechanism
+    get_array : function, optional
+        The get_array function for the memory layout in use
 
     Returns
     -------
@@ -1340,7 +1337,7 @@ def write_dcp_dt(file, lang, specs):
             if i:
                 line += '\n    + '
 
-            y_str = (utils.get_array(lang, 'y', isp + 1)
+            y_str = (get_array(lang, 'y', isp + 1)
                      if isp + 1 != len(specs) else 'y_N'
                      )
             line += '(' + y_str
@@ -1371,7 +1368,7 @@ def write_dcp_dt(file, lang, specs):
             if i:
                 line += '\n    + '
 
-            y_str = (utils.get_array(lang, 'y', isp + 1)
+            y_str = (get_array(lang, 'y', isp + 1)
                      if isp + 1 != len(specs) else 'y_N'
                      )
             line += '(' + y_str
@@ -1485,7 +1482,7 @@ def get_elementary_rxn_dt(lang, specs, rxn, rxn_ind, rev_idx,
             jline += get_array(lang, 'fwd_rates', rxn_ind)
             jline += ' * {}'.format(1. - float(nu))
 
-        dbdt = get_db_dt(lang, specs, rxn, do_unroll)
+        dbdt = get_db_dt(lang, specs, rxn, do_unroll, get_array)
         nu = sum(rxn.prod_nu)
         if dbdt or nu != 1.0:
             if jline:
@@ -1676,7 +1673,7 @@ def write_cheb_rxn_dt(file, lang, jline, rxn, rxn_ind, rev_idx,
         nu = sum(rxn.prod_nu)
         if nu != 1.0:
             jline += '{} + '.format(1. - float(nu))
-        jline += '-T * (' + get_db_dt(lang, specs, rxn, do_unroll)
+        jline += '-T * (' + get_db_dt(lang, specs, rxn, do_unroll, get_array)
         jline += '))'
 
     jline += ')) * rho_inv'
@@ -1785,7 +1782,7 @@ def write_plog_rxn_dt(file, lang, jline, specs, rxn, rxn_ind,
 
         if rxn.rev:
             nu = sum(rxn.prod_nu)
-            dbdt = get_db_dt(lang, specs, rxn, do_unroll)
+            dbdt = get_db_dt(lang, specs, rxn, do_unroll, get_array)
             if nu != 1.0 or dbdt:
                 jline_p += ('{}'.format(' - ' if jline_p else '-') +
                             get_array(lang, 'rev_rates', rev_idx) +
@@ -1793,10 +1790,10 @@ def write_plog_rxn_dt(file, lang, jline, specs, rxn, rxn_ind,
                             )
                 if nu != 1.0:
                     jline_p += '{} + '.format(1. - nu)
-                dbdt = get_db_dt(lang, specs, rxn, do_unroll)
+                dbdt = get_db_dt(lang, specs, rxn, do_unroll, get_array)
                 if dbdt:
                     jline_p += ('-T * (' +
-                                get_db_dt(lang, specs, rxn, do_unroll) +
+                                get_db_dt(lang, specs, rxn, do_unroll, get_array) +
                                 ')'
                                 )
                 jline_p += ')'
@@ -1908,7 +1905,8 @@ def write_dt_completion(file, lang, specs, J_nplusone_touched, get_array):
 def write_sub_intro(path, lang, number, rate_list, this_rev, this_pdep,
                     have_pres_mod_temp,
                     batch_has_m, this_thd, this_troe, this_sri,
-                    this_cheb, cheb_dim, this_plog, no_shared, has_nsp
+                    this_cheb, cheb_dim, this_plog, no_shared, has_nsp,
+                    layout='aos', jac_vec=False
                     ):
     """
     Writes the header and definitions for the Jacobian reaction update subfiles
@@ -1947,6 +1945,11 @@ def write_sub_intro(path, lang, number, rate_list, this_rev, this_pdep,
         If ``True``, do not use CUDA shared memory
     has_nsp : bool
         If ``True``, >=1 reaction has nonzero contribution from the last species
+    layout : {'aos', 'soa'}, optional
+        Memory layout of the generated C code, see `utils.layouts`
+    jac_vec : bool, optional
+        If ``True``, write a subfile of the Jacobian-vector product, which
+        accumulates into the product rather than the Jacobian
 
     Returns
     -------
@@ -1954,33 +1957,40 @@ def write_sub_intro(path, lang, number, rate_list, this_rev, this_pdep,
         Opened Jacobian file
 
     """
-    with open(os.path.join(path, 'jacob_' + str(number) +
+    soa = layout == 'soa'
+    vec = '_vec' if soa else ''
+    name = 'jacob_vec_' if jac_vec else 'jacob_'
+    with open(os.path.join(path, name + str(number) +
               utils.header_ext[lang]), 'w'
               ) as file:
-        file.write('#ifndef JACOB_HEAD_{}\n'.format(number) +
-                   '#define JACOB_HEAD_{}\n'.format(number) +
+        file.write('#ifndef {}HEAD_{}\n'.format(name.upper(), number) +
+                   '#define {}HEAD_{}\n'.format(name.upper(), number) +
                    '\n'
                    '#include "header{}"\n'.format(utils.header_ext[lang]) +
                    '\n' + ('__device__ ' if lang == 'cuda' else '') +
                    ''
-                   'void eval_jacob_{} ('.format(number)
+                   'void eval_{}{} ('.format(name, number)
                    )
-        line = 'const double, const double * {0}'
+        # per-state scalars are passed as arrays in the
+        # structure-of-arrays layout
+        scalar = 'const double *' if soa else 'const double'
+        line = scalar + ', const double * {0}'
         for rate in rate_list:
             line += ', const double * {0}'
         if batch_has_m:
-            line += ', const double'
-        line += (', const double, const double' +
+            line += ', ' + scalar
+        line += (', {1}, {1}' +
                  ('' if not this_rev else ', const double * {0}') +
-                 ', const double, double * {0}' +
+                 (', {1}, const double * {0}, double * {0}, double * {0}'
+                  if jac_vec else ', {1}, double * {0}') +
                  (', double * {0}, double* {0}' if has_nsp else '') +
                  (', double * {0}' if this_cheb and lang == 'cuda' else '') +
                  ');\n'
                  '\n'
                  '#endif\n'
                  )
-        file.write(line.format(utils.restrict[lang]))
-    file = open(os.path.join(path, 'jacob_' + str(number) +
+        file.write(line.format(utils.restrict[lang], scalar))
+    file = open(os.path.join(path, name + str(number) +
                 utils.file_ext[lang]), 'w'
                 )
     file.write('#include <math.h>\n'
@@ -1990,23 +2000,31 @@ def write_sub_intro(path, lang, number, rate_list, this_rev, this_pdep,
 
     line =  '__device__ ' if lang == 'cuda' else ''
 
-    line += ('void eval_jacob_{} (const double pres, '.format(number) +
+    line += ('void eval_{}{} ({{1}} pres{{2}}, '.format(name, number) +
              'const double * {0} conc')
     for rate in rate_list:
         line += ', const double * {0} ' + rate
     if batch_has_m:
-        line += ', const double m'
-    line += ', const double mw_avg, const double rho'
+        line += ', {1} m{2}'
+    line += ', {1} mw_avg{2}, {1} rho{2}'
     if this_rev:
         line += ', const double * {0} dBdT'
-    line += ', const double T, double * {0} jac'
+    if jac_vec:
+        line += (', {1} T{2}, const double * {0} v, double * {0} jac_T'
+                 ', double * {0} jv_sp')
+    else:
+        line += ', {1} T{2}, double * {0} jac'
 
     if has_nsp:
-        line += ', double * {0} J_nplusone, double * {0} J_nplusjplus'
+        line += ', double * {0} J_nplusone{2}, double * {0} J_nplusjplus'
     if this_cheb and lang == 'cuda':
         line += ', double * {0} dot_prod'
     line += ') {{'
-    file.write(line.format(utils.restrict[lang]) + '\n')
+    file.write(line.format(utils.restrict[lang], scalar, vec) + '\n')
+    if soa:
+        file.write(utils.soa_loop_start(
+            ['pres'] + (['m'] if batch_has_m else []) +
+            ['mw_avg', 'rho', 'T'], ['J_nplusone'] if has_nsp else []))
 
     if not no_shared and lang == 'cuda':
         file.write(utils.line_start +
@@ -2112,10 +2130,13 @@ def write_sub_intro(path, lang, number, rate_list, this_rev, this_pdep,
                utils.line_end[lang]
                )
 
+    if jac_vec:
+        file.write(utils.line_start + 'double jv_temp' + utils.line_end[lang])
+
     return file
 
 
-def write_dy_intros(path, lang, number, have_jnplus_jplus):
+def write_dy_intros(path, lang, number, have_jnplus_jplus, layout='aos'):
     """
     Writes the header and definitions for the various Jacobian species update subfiles
 
@@ -2129,6 +2150,8 @@ def write_dy_intros(path, lang, number, have_jnplus_jplus):
         The jacobian subfile index
     have_jnplus_jplus : bool
         If ``True``, the last species has non-zero contributions to the Jacobian
+    layout : {'aos', 'soa'}, optional
+        Memory layout of the generated C code, see `utils.layouts`
 
     Returns
     -------
@@ -2136,6 +2159,7 @@ def write_dy_intros(path, lang, number, have_jnplus_jplus):
         Jacobian file object
 
     """
+    soa = layout == 'soa'
     with open(os.path.join(path, 'jacob_' + str(number) +
               utils.header_ext[lang]), 'w'
               ) as file:
@@ -2147,8 +2171,10 @@ def write_dy_intros(path, lang, number, have_jnplus_jplus):
                    ('__device__ ' if lang == 'cuda' else '') +
                    'void eval_jacob_{} ('.format(number)
                    )
-        file.write('const double, const double, const double, const double*, '
-                   'const double*, const double*, double*'
+        file.write(('const double*, const double*, const double*, '
+                    if soa else
+                    'const double, const double, const double, ') +
+                   'const double*, const double*, const double*, double*'
                    + (', double*' if have_jnplus_jplus else '') +
                    ');\n'
                    '\n'
@@ -2164,12 +2190,17 @@ def write_dy_intros(path, lang, number, have_jnplus_jplus):
     line = '__device__ ' if lang == 'cuda' else ''
 
     line += ('void eval_jacob_{} '.format(number) +
-             '(const double mw_avg, const double rho, '
-             'const double cp_avg, const double* spec_rates, '
+             ('(const double* mw_avg_vec, const double* rho_vec, '
+              'const double* cp_avg_vec, ' if soa else
+              '(const double mw_avg, const double rho, '
+              'const double cp_avg, ') +
+             'const double* spec_rates, '
              'const double* h, const double* cp, double* jac' +
              (', double* J_nplusjplus' if have_jnplus_jplus else '') + ') '
              )
     line += '{\n'
+    if soa:
+        line += utils.soa_loop_start(['mw_avg', 'rho', 'cp_avg'])
     line += utils.line_start
     if lang == 'cuda':
         line += 'register '
@@ -2186,9 +2217,61 @@ def write_dy_intros(path, lang, number, have_jnplus_jplus):
     return file
 
 
-def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
+def get_sparse_storage(touched, nvars, jac_format):
+    """Determine the compressed storage of the non-zero Jacobian entries
+
+    Parameters
+    ----------
+    touched : list of bool
+        ``True`` for the (column-major) index of each non-zero entry,
+        as returned by `write_jacobian`
+    nvars : int
+        Number of variables in the Jacobian matrix
+    jac_format : {'csr', 'csc'}
+        The compressed storage format
+
+    Returns
+    -------
+    index_map : dict
+        The position of each non-zero entry in the compressed value array,
+        keyed by its (column-major) index in the dense Jacobian
+    ptr : list of int
+        The row (CSR) or column (CSC) pointers
+    ind : list of int
+        The column (CSR) or row (CSC) index of each stored value
+
+    """
+
+    # dense index is row + nvars * column
+    if jac_format == 'csr':
+        key = lambda index: (index % nvars, int(index / nvars))
+    else:
+        key = lambda index: (int(index / nvars), index % nvars)
+
+    nonzero = sorted([x for x in range(nvars * nvars) if touched[x]], key=key)
+
+    index_map = {}
+    ptr = [0 for i in range(nvars + 1)]
+    ind = []
+    for pos, index in enumerate(nonzero):
+        major, minor = key(index)
+        index_map[index] = pos
+        ptr[major + 1] += 1
+        ind.append(minor)
+    for i in range(nvars):
+        ptr[i + 1] += ptr[i]
+
+    return index_map, ptr, ind
+
+
+def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None, layout='aos',
+                   jac_format='dense'):
     """Write Jacobian subroutine in desired language.
 
+    For C (array-of-structures layout), the Jacobian is evaluated by
+    ``eval_dydt_and_jacob``, which also returns the right hand side, and
+    ``eval_jacob`` is a thin wrapper around it.
+
     Parameters
     ----------
     path : str
@@ -2203,13 +2286,23 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
         List of `bool`; ``False`` if species has (identically) zero rate
     smm : shared_memory_manager, optional
         If not ``None``, use this to manage shared memory optimization
+    layout : {'aos', 'soa'}, optional
+        Memory layout of the generated C code, see `utils.layouts`
+    jac_format : {'dense', 'csr', 'csc'}, optional
+        Storage of the Jacobian, see `utils.jac_formats`.  For the
+        compressed formats, only the non-zero entries are stored.
 
     Returns
     -------
-    None
+    touched : list of bool
+        ``True`` for the (column-major) index of each non-zero entry
 
     """
 
+    soa = layout == 'soa'
+    # the right hand side is evaluated alongside the Jacobian, sharing the
+    # concentrations, rates and thermodynamic properties
+    fused = lang == 'c' and not soa
     if lang == 'cuda':
         do_unroll = len(reacs) > CUDAParams.Jacob_Unroll
         unroll_len = CUDAParams.Jacob_Unroll
@@ -2222,31 +2315,6 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
         # make paths for separate jacobian files
         utils.create_dir(os.path.join(path, 'jacobs'))
 
-    # first write header file
-    file = open(os.path.join(path, 'jacob' + utils.header_ext[lang]), 'w')
-    file.write('#ifndef JACOB_HEAD\n'
-               '#define JACOB_HEAD\n'
-               '\n'
-               '#include "header{0}"\n'.format(utils.header_ext[lang]) +
-               ('#include '
-                '"jacobs/jac_include{0}"\n'.format(utils.header_ext[lang])
-                if do_unroll else '') +
-               '#include "chem_utils{0}"\n'
-               '#include "rates{0}"\n'.format(utils.header_ext[lang]))
-    if lang == 'cuda':
-        file.write(
-               '#include "gpu_memory.cuh"\n'
-               '\n'
-               '__device__ ')
-    file.write('void eval_jacob (const double, const double, '
-               'const double * {0}, double * {0}{1});\n'
-               '\n'
-               '#endif\n'.format(utils.restrict[lang],
-                ', const mechanism_memory * {}'.format(utils.restrict[lang])
-                if lang == 'cuda' else '')
-               )
-    file.close()
-
     # numbers of species and reactions
     num_s = len(specs)
     num_r = len(reacs)
@@ -2271,7 +2339,16 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
     if lang == 'cuda':
         line = '__device__ '
 
-    if lang in ['c', 'cuda']:
+    if soa:
+        line += ('void eval_jacob (const double t, const double * {0} pres_vec, '
+                 'const double * {0} y, double * {0} jac) {{\n\n'.format(
+                 utils.restrict[lang])
+                 )
+    elif fused:
+        line += ('void eval_dydt_and_jacob (const double t, const double pres, '
+                 'const double * {0} y, double * {0} dy, '
+                 'double * {0} jac) {{\n\n'.format(utils.restrict[lang]))
+    elif lang in ['c', 'cuda']:
         line += ('void eval_jacob (const double t, const double pres, '
                  'const double * {0} y, double * {0} jac{1}) {{\n\n'.format(
                  utils.restrict[lang], ', const mechanism_memory * '
@@ -2305,14 +2382,32 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
         smm.reset()
         get_array = smm.get_array
         smm.write_init(file, indent=2)
-
-    # get temperature
-    if lang in ['c', 'cuda']:
-        line = utils.line_start + 'double T = ' + get_array(lang, 'y', 0)
-    elif lang in ['fortran', 'matlab']:
-        line = utils.line_start + 'T = ' + get_array(lang, 'y', 0)
-    line += utils.line_end[lang]
-    file.write(line)
+    elif soa:
+        # the rate subroutines are evaluated for the whole block of states,
+        # the Jacobian entries in vectorized loop(s) over the states
+        get_array = utils.get_soa_array
+    # array dimension in the structure-of-arrays layout
+    block = ' * VECWIDTH' if soa else ''
+
+    if jac_format != 'dense':
+        # the position of each entry in the compressed array is only known
+        # once the non-zero pattern is, i.e., after the whole Jacobian is
+        # written, so the entries are marked and filled in afterwards
+        dense_get_array = get_array
+
+        def get_array(lang, name, index, twod=None):
+            if name != 'jac':
+                return dense_get_array(lang, name, index, twod)
+            return SPARSE_ENTRY.format(index)
+
+    # get temperature (in the loop over the states for structure-of-arrays)
+    if not soa:
+        if lang in ['c', 'cuda']:
+            line = utils.line_start + 'double T = ' + get_array(lang, 'y', 0)
+        elif lang in ['fortran', 'matlab']:
+            line = utils.line_start + 'T = ' + get_array(lang, 'y', 0)
+        line += utils.line_end[lang]
+        file.write(line)
 
     file.write('\n')
 
@@ -2320,13 +2415,17 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
                ' average molecular weight\n'
                )
     # calculation of average molecular weight
-    if lang in ['c', 'cuda']:
+    if soa:
+        file.write(utils.line_start + 'double mw_avg_vec[VECWIDTH];\n')
+    elif lang in ['c', 'cuda']:
         file.write(utils.line_start + 'double mw_avg;\n')
 
     file.write(utils.line_start + utils.comment[lang] +
                ' mass-averaged density\n'
                )
-    if lang in ['c', 'cuda']:
+    if soa:
+        file.write(utils.line_start + 'double rho_vec[VECWIDTH];\n')
+    elif lang in ['c', 'cuda']:
         file.write(utils.line_start + 'double rho;\n')
 
     # evaluate species molar concentrations
@@ -2334,7 +2433,7 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
                ' species molar concentrations\n'
                )
     if lang == 'c':
-        file.write(utils.line_start + 'double conc[{}];\n'.format(num_s))
+        file.write(utils.line_start + 'double conc[{}{}];\n'.format(num_s, block))
     elif lang == 'cuda':
         file.write(utils.line_start +
                    'double * {}'.format(utils.restrict[lang]) +
@@ -2344,16 +2443,23 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
     elif lang == 'matlab':
         file.write(utils.line_start + 'conc = zeros({},1);\n'.format(num_s)
                    )
-    file.write(utils.line_start + 'double y_N' + utils.line_end[lang])
-    file.write(utils.line_start + 'eval_conc(' +
-               utils.get_array(lang, 'y', 0) +
-               ', pres, &' +
-               (utils.get_array(lang, 'y', 1) if lang != 'cuda' else
-                'y[GRID_DIM]') +
-               ', &y_N, &mw_avg, &rho, conc)' +
-                utils.line_end[lang] +
-               '\n'
-               )
+    if soa:
+        file.write(utils.line_start + 'double y_N_vec[VECWIDTH]' +
+                   utils.line_end[lang])
+        file.write(utils.line_start + 'eval_conc(y, pres_vec, &y[VECWIDTH], '
+                   'y_N_vec, mw_avg_vec, rho_vec, conc)' +
+                   utils.line_end[lang] + '\n')
+    else:
+        file.write(utils.line_start + 'double y_N' + utils.line_end[lang])
+        file.write(utils.line_start + 'eval_conc(' +
+                   utils.get_array(lang, 'y', 0) +
+                   ', pres, &' +
+                   (utils.get_array(lang, 'y', 1) if lang != 'cuda' else
+                    'y[GRID_DIM]') +
+                   ', &y_N, &mw_avg, &rho, conc)' +
+                    utils.line_end[lang] +
+                   '\n'
+                   )
 
     rate_list = ['fwd_rates']
     if len(rev_reacs):
@@ -2375,7 +2481,7 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
                 utils.line_end[lang])
         else:
             file.write(utils.line_start +
-                       'double fwd_rates[{}];\n'.format(num_r)
+                       'double fwd_rates[{}{}];\n'.format(num_r, block)
                        )
         if num_rev == 0:
             file.write(utils.line_start + 'double* rev_rates = 0;\n')
@@ -2386,7 +2492,7 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
                 utils.line_end[lang])
         else:
             file.write(utils.line_start +
-                       'double rev_rates[{}];\n'.format(num_rev)
+                       'double rev_rates[{}{}];\n'.format(num_rev, block)
                        )
         if cuda_cheb:
             file.write('  double * {} dot_prod'.format(utils.restrict[lang]) +
@@ -2395,8 +2501,9 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
                        )
 
         file.write(utils.line_start +
-                   'eval_rxn_rates (T, pres, conc, fwd_rates, '
-                   'rev_rates{});\n'.format(', dot_prod' if cuda_cheb else '')
+                   'eval_rxn_rates ({}, conc, fwd_rates, '
+                   'rev_rates{});\n'.format('y, pres_vec' if soa else 'T, pres',
+                                             ', dot_prod' if cuda_cheb else '')
                    )
     elif lang == 'fortran':
             file.write(utils.line_start +
@@ -2414,7 +2521,7 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
         file.write(utils.line_start + 'double* pres_mod = 0;\n')
     elif lang == 'c':
         file.write(utils.line_start +
-                   'double pres_mod[{}];\n'.format(num_pdep)
+                   'double pres_mod[{}{}];\n'.format(num_pdep, block)
                    )
     else:
         file.write(utils.line_start +
@@ -2431,7 +2538,8 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
         # evaluate third-body and pressure-dependence reaction modifications
         if lang in ['c', 'cuda']:
             file.write(utils.line_start +
-                       'get_rxn_pres_mod (T, pres, conc, pres_mod);\n'
+                       'get_rxn_pres_mod ({}, conc, pres_mod);\n'.format(
+                       'y, pres_vec' if soa else 'T, pres')
                        )
         elif lang == 'fortran':
             file.write(utils.line_start +
@@ -2450,11 +2558,12 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
                )
     if lang == 'c':
         file.write(utils.line_start +
-                   'double spec_rates[{}] = {{0}};\n'.format(num_s))
+                   'double spec_rates[{}{}] = {{0}};\n'.format(num_s, block))
         file.write(
             utils.line_start +
             'eval_spec_rates (fwd_rates, rev_rates, '
-            'pres_mod, spec_rates, &spec_rates[{}]);\n'.format(num_s - 1)
+            'pres_mod, spec_rates, &spec_rates[{}{}]);\n'.format(num_s - 1,
+                                                                  block)
             )
     elif lang == 'cuda':
         file.write(utils.line_start +
@@ -2480,8 +2589,45 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
                    )
     file.write('\n')
 
+    has_nsp = any(len(specs) - 1 in set(reac.reac + reac.prod) and
+                  utils.get_nu(len(specs) - 1, reac) for reac in reacs)
+    has_m = any((rxn.pdep and rxn.pdep_sp is None) or rxn.thd_body
+                for rxn in reacs)
+    if soa:
+        # block arrays shared between the vectorized loops / subroutines
+        file.write('  // species enthalpies\n'
+                   '  double h[{} * VECWIDTH];\n'.format(num_s) +
+                   '  eval_h(y, h);\n'
+                   '  // species specific heats\n'
+                   '  double cp[{} * VECWIDTH];\n'.format(num_s) +
+                   '  eval_cp(y, cp);\n'
+                   '\n'
+                   )
+        if has_nsp:
+            file.write(utils.line_start +
+                       'double J_nplusjplus[{} * VECWIDTH]'.format(num_s) +
+                       utils.line_end[lang])
+        if rev_reacs:
+            file.write(utils.line_start +
+                       'double dBdT[{} * VECWIDTH]'.format(num_s) +
+                       utils.line_end[lang])
+        if do_unroll:
+            if has_m:
+                file.write(utils.line_start + 'double m_vec[VECWIDTH]' +
+                           utils.line_end[lang])
+            if has_nsp:
+                file.write(utils.line_start +
+                           'double J_nplusone_vec[VECWIDTH] = {0}' +
+                           utils.line_end[lang])
+            file.write(utils.line_start + 'double cp_avg_vec[VECWIDTH]' +
+                       utils.line_end[lang])
+        file.write('\n')
+        file.write(utils.soa_loop_start(['pres', 'mw_avg', 'rho', 'y_N']))
+        file.write(utils.line_start + 'double T = ' +
+                   get_array(lang, 'y', 0) + utils.line_end[lang])
+
     # third-body variable needed for reactions
-    if any((rxn.pdep and rxn.pdep_sp is None) or rxn.thd_body for rxn in reacs):
+    if has_m:
         line = utils.line_start
         if lang == 'c':
             line += 'double '
@@ -2491,6 +2637,9 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
                  utils.line_end[lang]
                  )
         file.write(line)
+        if soa and do_unroll:
+            file.write(utils.line_start + 'm_vec[lane] = m' +
+                       utils.line_end[lang])
 
         if not do_unroll:
             line = utils.line_start
@@ -2600,8 +2749,13 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
         line += 'rho_inv = 1.0 / rho' + utils.line_end[lang]
         file.write(line)
 
-    if any(len(specs) - 1 in set(reac.reac + reac.prod) and \
-        utils.get_nu(len(specs) - 1, reac) for reac in reacs):
+    if has_nsp and soa:
+        if not do_unroll:
+            file.write(utils.line_start +
+                       'double J_nplusone = 0' +
+                       utils.line_end[lang]
+                       )
+    elif has_nsp:
         file.write(utils.line_start +
                    'double J_nplusone = 0' +
                    utils.line_end[lang]
@@ -2622,7 +2776,11 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
     dBdT_flag = [False for sp in specs]
 
     # define dB/dT's
-    write_db_dt_def(file, lang, specs, reacs, rev_reacs, dBdT_flag, do_unroll)
+    write_db_dt_def(file, lang, specs, reacs, rev_reacs, dBdT_flag, do_unroll,
+                    get_array, not soa)
+    if soa and do_unroll:
+        # the reaction subroutines loop over the block themselves
+        file.write(utils.soa_loop_end)
 
     line = ''
 
@@ -2709,7 +2867,7 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
                                        have_pres_mod_temp,
                                        batch_has_m, thd, troe, sri, cheb,
                                        dim, plog, smm is None,
-                                       has_jnplus_one
+                                       has_jnplus_one, layout
                                        )
 
             if lang == 'cuda' and smm is not None:
@@ -2943,6 +3101,8 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
 
             if do_unroll and (rxn_ind == next_fn_index - 1 or rxn_ind == len(reacs) - 1):
                 # switch back
+                if soa:
+                    file.write(utils.soa_loop_end)
                 file.write('}\n\n')
                 file.close()
                 file = file_store
@@ -2959,17 +3119,19 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
 
                 file.write('  eval_jacob_{}('.format(jac_count))
                 jac_count += 1
-                line = ('pres, conc')
+                vec = '_vec' if soa else ''
+                line = ('pres{}, conc'.format(vec))
                 for rate in rate_list:
                     line += ', ' + rate
                 if batch_has_m:
-                    line += ', m'
-                line += ', mw_avg, rho'
+                    line += ', m' + vec
+                line += ', mw_avg{0}, rho{0}'.format(vec)
                 if rev:
                     line += ', dBdT'
-                line += ', T, jac'
+                line += ', {}, jac'.format('y' if soa else 'T')
                 if has_jnplus_one:
-                    line += ', &J_nplusone, J_nplusjplus'
+                    line += (', J_nplusone_vec' if soa else ', &J_nplusone')
+                    line += ', J_nplusjplus'
                 if cheb and lang == 'cuda':
                     line += ', dot_prod'
                 line += ')'
@@ -2980,8 +3142,9 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
     # Partial derivatives of temperature (energy equation)
     ###################################
 
-    # evaluate enthalpy
-    if lang == 'c':
+    # evaluate enthalpy (already evaluated for the block of states
+    # in the structure-of-arrays layout)
+    if lang == 'c' and not soa:
         file.write('  // species enthalpies\n'
                    '  double h[{}];\n'.format(num_s) +
                    '  eval_h(T, h);\n')
@@ -3001,7 +3164,7 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
     file.write('\n')
 
     # evaluate specific heat
-    if lang == 'c':
+    if lang == 'c' and not soa:
         file.write('  // species specific heats\n'
                    '  double cp[{}];\n'.format(num_s) +
                    '  eval_cp(T, cp);\n')
@@ -3021,6 +3184,8 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
     file.write('\n')
 
     # average specific heat
+    if soa and do_unroll:
+        file.write(utils.soa_loop_start(['y_N']))
     if lang == 'c':
         file.write('  // average specific heat\n'
                    '  double cp_avg;\n'
@@ -3060,6 +3225,27 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
     line += utils.line_end[lang]
     file.write(line)
 
+    if fused:
+        # constant pressure right hand side, as in dydt
+        file.write('\n'
+                   '  // rate of change of temperature\n')
+        line = '  ' + get_array(lang, 'dy', 0) + ' = (-1.0 / (rho * cp_avg)) * ('
+        for k_sp, sp_k in enumerate(specs[:-1]):
+            if k_sp:
+                line += '\n        + '
+            line += ('(' + get_array(lang, 'spec_rates', k_sp) + ' * ' +
+                     get_array(lang, 'h', k_sp) +
+                     ' * {:.16e})'.format(sp_k.mw))
+        file.write(line + ')' + utils.line_end[lang])
+        file.write('\n'
+                   '  // rate of change of species mass fractions\n')
+        for k_sp, sp_k in enumerate(specs[:-1]):
+            file.write('  ' + get_array(lang, 'dy', k_sp + 1) + ' = ' +
+                       get_array(lang, 'spec_rates', k_sp) +
+                       ' * ({:.16e} / rho)'.format(sp_k.mw) +
+                       utils.line_end[lang])
+        file.write('\n')
+
     # set jac[0] = 0
     # set to zero
     line = utils.line_start
@@ -3073,6 +3259,11 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
     line += utils.line_end[lang]
     file.write(line)
 
+    if soa and do_unroll:
+        file.write(utils.line_start + 'cp_avg_vec[lane] = cp_avg' +
+                   utils.line_end[lang])
+        file.write(utils.soa_loop_end)
+
     if not do_unroll:
         line = utils.line_start
         if lang == 'c':
@@ -3086,7 +3277,7 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
                    'j_temp = 1.0 / (rho * cp_avg * cp_avg)' +
                    utils.line_end[lang]
                    )
-    else:
+    elif not soa:
         file.write(utils.line_start +
                    'double working_temp = 0' +
                    utils.line_end[lang]
@@ -3116,7 +3307,8 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
                                      )
 
                 file = write_dy_intros(os.path.join(path, 'jacobs'),
-                                       lang, jac_count, have_jnplus_jplus
+                                       lang, jac_count, have_jnplus_jplus,
+                                       layout
                                        )
 
             for j_sp, sp_j in enumerate(specs):
@@ -3235,6 +3427,8 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
 
             if do_unroll and k_sp == next_fn_index - 1:
                 # switch back
+                if soa:
+                    file.write(utils.soa_loop_end)
                 file.write('}\n\n')
                 file = file_store
                 #check that file length is under limit
@@ -3246,17 +3440,26 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
                     break
                 file.write('  eval_jacob_{}('.format(jac_count))
                 jac_count += 1
-                line = 'mw_avg, rho, cp_avg, spec_rates, h, cp, jac'
+                line = 'mw_avg{0}, rho{0}, cp_avg{0}, spec_rates, h, cp, jac'.format(
+                    '_vec' if soa else '')
                 if have_jnplus_jplus:
                     line += ', J_nplusjplus'
                 line += ')'
                 file.write(line + utils.line_end[lang])
         success = k_sp == len(specs) - 1
 
+    if soa and do_unroll:
+        file.write(utils.soa_loop_start(
+            ['rho', 'y_N', 'cp_avg'] + (['J_nplusone'] if has_nsp else [])))
+        file.write(utils.line_start + 'double T = ' +
+                   get_array(lang, 'y', 0) + utils.line_end[lang])
+        file.write(utils.line_start + 'double working_temp = 0' +
+                   utils.line_end[lang])
+
     ######################################
     # Derivatives with respect to temperature
     ######################################
-    write_dcp_dt(file, lang, specs)
+    write_dcp_dt(file, lang, specs, get_array)
 
     ######################################
     # Derivative with respect to species
@@ -3267,7 +3470,17 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
     # finish the dT entry
     write_dt_completion(file, lang, specs, J_nplusone_touched, get_array)
 
-    if lang in ['c', 'cuda']:
+    if soa:
+        file.write(utils.soa_loop_end)
+    if fused:
+        file.write('} // end eval_dydt_and_jacob\n\n')
+        file.write('void eval_jacob (const double t, const double pres, '
+                   'const double * {0} y, double * {0} jac) {{\n'.format(
+                    utils.restrict[lang]) +
+                   '  double dy[NSP];\n'
+                   '  eval_dydt_and_jacob(t, pres, y, dy, jac);\n'
+                   '} // end eval_jacob\n\n')
+    elif lang in ['c', 'cuda']:
         file.write('} // end eval_jacob\n\n')
     elif lang == 'fortran':
         file.write('end subroutine eval_jacob\n\n')
@@ -3295,12 +3508,85 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
             tempfile.write(' '.join(['jacob_{}{}'.format(i,
                            utils.file_ext[lang]) for i in range(jac_count)])
                            )
+
+    if jac_format != 'dense':
+        index_map, ptr, ind = get_sparse_storage(touched, num_s, jac_format)
+
+        def __entry(match):
+            index = int(match.group(1))
+            if index not in index_map:
+                # structural zero
+                return '0.0'
+            return dense_get_array(lang, 'jac', index_map[index])
+
+        filenames = [os.path.join(path, 'jacob' + utils.file_ext[lang])]
+        if do_unroll:
+            filenames += [os.path.join(path, 'jacobs', 'jacob_{}{}'.format(
+                          i, utils.file_ext[lang])) for i in range(jac_count)]
+        for filename in filenames:
+            with open(filename, 'r') as tempfile:
+                code = tempfile.read()
+            with open(filename, 'w') as tempfile:
+                tempfile.write(SPARSE_ENTRY_RE.sub(__entry, code))
+
+    # write the header file, with the compressed storage of the non-zero
+    # pattern
+    file = open(os.path.join(path, 'jacob' + utils.header_ext[lang]), 'w')
+    file.write('#ifndef JACOB_HEAD\n'
+               '#define JACOB_HEAD\n'
+               '\n'
+               '#include "header{0}"\n'.format(utils.header_ext[lang]) +
+               ('#include '
+                '"jacobs/jac_include{0}"\n'.format(utils.header_ext[lang])
+                if do_unroll else '') +
+               '#include "chem_utils{0}"\n'
+               '#include "rates{0}"\n'.format(utils.header_ext[lang]))
+    if jac_format != 'dense':
+        if jac_format == 'csr':
+            file.write('\n/** Compressed sparse row storage of the Jacobian */\n')
+            ptr_name, ind_name = 'row_ptr', 'col_ind'
+        else:
+            file.write('\n/** Compressed sparse column storage of the Jacobian */\n')
+            ptr_name, ind_name = 'col_ptr', 'row_ind'
+        file.write('#define NNZ {}\n'.format(len(ind)))
+        for name, size, vals in [(ptr_name, 'NSP + 1', ptr),
+                                 (ind_name, 'NNZ', ind)]:
+            line = 'static const int {}[{}] = {{'.format(name, size)
+            for i, val in enumerate(vals):
+                if len(line) > 70:
+                    file.write(line.rstrip() + '\n')
+                    line = '    '
+                line += str(val) + (', ' if i + 1 < len(vals) else '')
+            file.write(line + '};\n')
+        file.write('\n')
+    if lang == 'cuda':
+        file.write(
+               '#include "gpu_memory.cuh"\n'
+               '\n'
+               '__device__ ')
+    if fused:
+        file.write('void eval_dydt_and_jacob (const double, const double, '
+                   'const double * {0}, double * {0}, double * {0});\n'.format(
+                    utils.restrict[lang]))
+    file.write('void eval_jacob (const double, const double{2}, '
+               'const double * {0}, double * {0}{1});\n'
+               '\n'
+               '#endif\n'.format(utils.restrict[lang],
+                ', const mechanism_memory * {}'.format(utils.restrict[lang])
+                if lang == 'cuda' else '', ' *' if soa else '')
+               )
+    file.close()
+
     return touched
 
 
-def write_sparse_multiplier(path, lang, touched, nvars):
-    """Write a subroutine that multiplies the non-zero entries of the
-    Jacobian with a column 'j' of another matrix.
+def write_jacobian_vec(path, lang, specs, reacs, seen_sp):
+    """Write the matrix-free Jacobian-vector product subroutine.
+
+    ``eval_jacob_vec`` evaluates ``Jv = J * v`` from the same derivative
+    expressions as :func:`eval_jacob`, but each reaction accumulates its
+    contribution directly into the product, such that the Jacobian itself
+    is never stored.
 
     Parameters
     ----------
@@ -3308,10 +3594,12 @@ def write_sparse_multiplier(path, lang, touched, nvars):
         Path to build directory for file.
     lang : {'c', 'cuda', 'fortran', 'matlab'}
         Programming language.
-    inidicies : list
-        A list of indicies where the Jacobian is non-zero
-    nvars : int
-        Number of variables in the Jacobian matrix
+    specs : list of `SpecInfo`
+        List of species in the mechanism.
+    reacs : list of `ReacInfo`
+        List of reactions in the mechanism.
+    seen_sp : list of bool
+        List of species that have been seen in reactions
 
     Returns
     -------
@@ -3319,77 +3607,584 @@ def write_sparse_multiplier(path, lang, touched, nvars):
 
     """
 
-    sparse_indicies = [x for x in range(nvars * nvars) if touched[nvars]]
+    if lang != 'c':
+        return
+
+    do_unroll = len(reacs) > CParams.Jacob_Unroll
+    unroll_len = CParams.Jacob_Unroll
+    limit = CParams.Max_Lines
+    if do_unroll:
+        # make paths for separate jacobian files
+        utils.create_dir(os.path.join(path, 'jacobs'))
 
     # first write header file
-    file = open(os.path.join(path,
-                'sparse_multiplier{}'.format(utils.header_ext[lang])), 'w'
-                )
-    file.write('#ifndef SPARSE_HEAD\n'
-               '#define SPARSE_HEAD\n')
-    file.write('\n#define N_A {}'.format(len(sparse_indicies)))
-    file.write(
-        '\n'
-        '#include "header{}"\n'.format(utils.header_ext[lang]) +
-        '\n' +
-        ('__device__\n' if lang == 'cuda' else '') +
-        'void sparse_multiplier (const double *, const double *, double*);\n'
-        '\n'
-        '#ifdef COMPILE_TESTING_METHODS\n'
-        '  int test_sparse_multiplier();\n'
-        '#endif\n'
-        '\n'
-        '#endif\n'
-        )
+    file = open(os.path.join(path, 'jacob_vec' + utils.header_ext[lang]), 'w')
+    file.write('#ifndef JACOB_VEC_HEAD\n'
+               '#define JACOB_VEC_HEAD\n'
+               '\n'
+               '#include "header{0}"\n'.format(utils.header_ext[lang]) +
+               ('#include '
+                '"jacobs/jac_vec_include{0}"\n'.format(utils.header_ext[lang])
+                if do_unroll else '') +
+               '#include "chem_utils{0}"\n'
+               '#include "rates{0}"\n'
+               '\n'
+               'void eval_jacob_vec (const double, const double, '
+               'const double * {1}, const double * {1}, double * {1});\n'
+               '\n'
+               '#endif\n'.format(utils.header_ext[lang], utils.restrict[lang])
+               )
     file.close()
 
-    # create file depending on language
-    filename = 'sparse_multiplier' + utils.file_ext[lang]
-    file = open(os.path.join(path, filename), 'w')
+    # numbers of species and reactions
+    num_s = len(specs)
+    num_r = len(reacs)
+    rev_reacs = [i for i, rxn in enumerate(reacs) if rxn.rev]
+    num_rev = len(rev_reacs)
 
-    file.write('#include "sparse_multiplier'
-               '{}"\n\n'.format(utils.header_ext[lang])
-               )
+    pdep_reacs = []
+    for i, reac in enumerate(reacs):
+        if reac.thd_body or reac.pdep:
+            # add reaction index to list
+            pdep_reacs.append(i)
+    num_pdep = len(pdep_reacs)
 
-    if lang == 'cuda':
-        file.write('__device__\n')
+    # rows of the Jacobian with reaction contributions
+    participates = [any(utils.get_nu(k_sp, rxn) for rxn in reacs
+                        if k_sp in rxn.reac + rxn.prod)
+                    for k_sp in range(num_s)]
 
-    file.write('void sparse_multiplier(const double * A, '
-               'const double * Vm, double* w) {\n'
+    get_array = utils.get_array
+
+    file = open(os.path.join(path, 'jacob_vec' + utils.file_ext[lang]), 'w')
+    file.write('#include "jacob_vec{}"\n\n'.format(utils.header_ext[lang]))
+    file.write('void eval_jacob_vec (const double t, const double pres, '
+               'const double * {0} y, const double * {0} v, '
+               'double * {0} Jv) {{\n\n'.format(utils.restrict[lang])
                )
 
-    if lang == 'cuda':
-        """optimize for cache reusing"""
-        touched = [False for i in range(nvars)]
-        for i in range(nvars):
-            # get all indicies that belong to row i
-            i_list = [x for x in sparse_indicies if int(x / nvars) == i]
-            for index in i_list:
-                file.write(' ' +
-                           utils.get_array(lang, 'w', index % nvars) +
-                           ' {}= '.format('+' if touched[index % nvars]
-                           else '')
-                           )
-                file.write(' ' + utils.get_array(lang, 'A', index) +
-                           ' * ' + utils.get_array(lang, 'Vm', i) +
-                           utils.line_end[lang]
-                           )
-                touched[index % nvars] = True
-        zero_out = [i for i, t in enumerate(touched) if not t]
-        for i in zero_out:
-            file.write(' ' +
-                       utils.get_array(lang, 'w', i) + ' = 0' +
-                       utils.line_end[lang]
-                       )
-        file.write("}\n")
+    file.write(utils.line_start + 'double T = ' + get_array(lang, 'y', 0) +
+               utils.line_end[lang] + '\n')
+    file.write('  // average molecular weight\n'
+               '  double mw_avg;\n'
+               '  // mass-averaged density\n'
+               '  double rho;\n'
+               '  // species molar concentrations\n'
+               '  double conc[{}];\n'.format(num_s) +
+               '  double y_N;\n'
+               '  eval_conc(' + get_array(lang, 'y', 0) + ', pres, &' +
+               get_array(lang, 'y', 1) + ', &y_N, &mw_avg, &rho, conc);\n'
+               '\n'
+               )
+
+    rate_list = ['fwd_rates']
+    if len(rev_reacs):
+        rate_list.append('rev_rates')
+    if len(pdep_reacs):
+        rate_list.append('pres_mod')
+    rate_list.append('spec_rates')
+
+    file.write('  // evaluate reaction rates\n'
+               '  double fwd_rates[{}];\n'.format(num_r))
+    if num_rev == 0:
+        file.write('  double* rev_rates = 0;\n')
     else:
-        for i in range(nvars):
-            # get all indicies that belong to row i
-            i_list = [x for x in sparse_indicies if x % nvars == i]
-            if not len(i_list):
-                file.write('  ' +
-                           utils.get_array(lang, 'w', i) + ' = 0' +
-                           utils.line_end[lang]
+        file.write('  double rev_rates[{}];\n'.format(num_rev))
+    file.write('  eval_rxn_rates (T, pres, conc, fwd_rates, rev_rates);\n\n')
+
+    if num_pdep == 0:
+        file.write('  double* pres_mod = 0;\n')
+    else:
+        file.write('  double pres_mod[{}];\n'.format(num_pdep) +
+                   '  // get pressure modifications to reaction rates\n'
+                   '  get_rxn_pres_mod (T, pres, conc, pres_mod);\n')
+    file.write('\n')
+
+    file.write('  // evaluate rate of change of species molar concentration\n'
+               '  double spec_rates[{}] = {{0}};\n'.format(num_s) +
+               '  eval_spec_rates (fwd_rates, rev_rates, pres_mod, '
+               'spec_rates, &spec_rates[{}]);\n'.format(num_s - 1) +
+               '\n'
+               )
+
+    # reaction contributions to the temperature column, and the product
+    # with the species columns, for each species (including the last)
+    file.write('  // temperature derivatives of the species rates\n'
+               '  double jac_T[{}] = {{0}};\n'.format(num_s) +
+               '  // product of the species derivatives with v\n'
+               '  double jv_sp[{}] = {{0}};\n'.format(num_s) +
+               '\n'
+               )
+
+    has_m = any((rxn.pdep and rxn.pdep_sp is None) or rxn.thd_body
+                for rxn in reacs)
+    if has_m:
+        file.write(utils.line_start +
+                   'double m = pres / ({:.8e} * T)'.format(chem.RU) +
+                   utils.line_end[lang])
+        if not do_unroll:
+            file.write(utils.line_start + 'double conc_temp' +
+                       utils.line_end[lang])
+
+    file.write(utils.line_start + 'double logT = log(T)' +
+               utils.line_end[lang])
+    file.write(utils.line_start + 'double rho_inv = 1.0 / rho' +
+               utils.line_end[lang])
+
+    if not do_unroll:
+        for var in ['j_temp', 'jv_temp', 'kf']:
+            file.write(utils.line_start + 'double {} = 0.0'.format(var) +
+                       utils.line_end[lang])
+        if any((rxn.pdep or rxn.thd_body) and
+               (rxn.thd_body_eff or rxn.pdep_sp) for rxn in reacs):
+            file.write(utils.line_start + 'double pres_mod_temp = 0.0' +
+                       utils.line_end[lang])
+        if rev_reacs:
+            file.write(utils.line_start + 'double Kc = 0.0' +
+                       utils.line_end[lang])
+            file.write(utils.line_start + 'double kr = 0' +
+                       utils.line_end[lang])
+        if any(rxn.pdep for rxn in reacs):
+            file.write(utils.line_start + 'double Pr = 0.0' +
+                       utils.line_end[lang])
+        if any(rxn.troe for rxn in reacs):
+            file.write(''.join(['  double {} = 0.0{}'.format(
+                                x, utils.line_end[lang])
+                                for x in ['Fcent', 'A', 'B', 'lnF_AB']]))
+        if any(rxn.sri for rxn in reacs):
+            file.write(utils.line_start + 'double X = 0.0' +
+                       utils.line_end[lang])
+        if any(rxn.cheb for rxn in reacs):
+            dim = max(rxn.cheb_n_temp for rxn in reacs if rxn.cheb)
+            file.write(utils.line_start + 'double Tred, Pred' +
+                       utils.line_end[lang])
+            file.write(utils.line_start + 'double cheb_temp_0, cheb_temp_1' +
+                       utils.line_end[lang])
+            file.write(utils.line_start + 'double dot_prod[{}]'.format(dim) +
+                       utils.line_end[lang])
+        if any(rxn.plog for rxn in reacs):
+            file.write(utils.line_start + 'double kf2' + utils.line_end[lang])
+
+    # define dB/dT's
+    dBdT_flag = [False for sp in specs]
+    write_db_dt_def(file, lang, specs, reacs, rev_reacs, dBdT_flag, do_unroll,
+                    get_array)
+    file.write('\n')
+
+    ###################################
+    # partial derivatives of reactions
+    ###################################
+    success = False
+    retry = False
+    while not success:
+        last_conc_temp = None
+        jac_count = 0
+        next_fn_index = 0
+        for rxn_ind, rxn in enumerate(reacs):
+            if do_unroll and (rxn_ind == next_fn_index):
+                # clear conc temp
+                last_conc_temp = None
+                if not retry:
+                    file_store = file
+                retry = False
+                next_fn_index = min(rxn_ind + unroll_len, len(reacs))
+                batch = reacs[rxn_ind:next_fn_index]
+                dim = None
+                if any(reac.cheb for reac in batch):
+                    dim = max(reac.cheb_n_temp for reac in reacs if reac.cheb)
+                batch_has_m = any(reac.pdep and reac.pdep_sp is None
+                                  for reac in batch)
+                rev = any(reac.rev for reac in batch)
+                file = write_sub_intro(
+                    os.path.join(path, 'jacobs'), lang, jac_count, rate_list,
+                    rev, any(reac.pdep for reac in batch),
+                    any((reac.pdep or reac.thd_body) and
+                        (reac.thd_body_eff or reac.pdep_sp)
+                        for reac in batch),
+                    batch_has_m, any(reac.thd_body for reac in batch),
+                    any(reac.troe for reac in batch),
+                    any(reac.sri for reac in batch),
+                    any(reac.cheb for reac in batch), dim,
+                    any(reac.plog for reac in batch), True, False,
+                    jac_vec=True
+                    )
+
+            ######################################
+            # with respect to temperature
+            ######################################
+            write_dt_comment(file, lang, rxn_ind)
+
+            jline = ''
+            pres_rxn_ind = None
+            if rxn.pdep:
+                pres_rxn_ind = pdep_reacs.index(rxn_ind)
+                last_conc_temp = write_pr(file, lang, specs, reacs, pdep_reacs,
+                                          rxn, get_array, last_conc_temp
+                                          )
+
+                # dF/dT
+                if rxn.troe:
+                    write_troe(file, lang, rxn)
+                elif rxn.sri:
+                    write_sri(file, lang)
+
+                jline = get_pdep_dt(lang, rxn, rev_reacs, rxn_ind,
+                                    pres_rxn_ind, get_array)
+
+            elif rxn.thd_body:
+                # third body reaction
+                pres_rxn_ind = pdep_reacs.index(rxn_ind)
+
+                jline = (utils.line_start + 'j_temp = ((-' +
+                         get_array(lang, 'pres_mod', pres_rxn_ind) + ' * '
+                         )
+                if rxn.rev:
+                    # forward and reverse reaction rates
+                    jline += ('(' + get_array(lang, 'fwd_rates', rxn_ind) +
+                              ' - ' + get_array(lang, 'rev_rates',
+                                                rev_reacs.index(rxn_ind)) +
+                              ')')
+                else:
+                    # forward reaction rate only
+                    jline += get_array(lang, 'fwd_rates', rxn_ind)
+
+                jline += ' / T) + (' + get_array(lang, 'pres_mod', pres_rxn_ind)
+
+            else:
+                jline += '  j_temp = ((1.0'
+
+            jline += ' / T) * ('
+
+            doT = True
+            if rxn.plog:
+                write_plog_rxn_dt(file, lang, jline, specs, rxn, rxn_ind,
+                                  rev_reacs.index(rxn_ind) if rxn.rev else None,
+                                  get_array, do_unroll
+                                  )
+            elif rxn.cheb:
+                write_cheb_rxn_dt(file, lang, jline, rxn, rxn_ind,
+                                  rev_reacs.index(rxn_ind) if rxn.rev else None,
+                                  specs, get_array, do_unroll
+                                  )
+            else:
+                dkdt = get_elementary_rxn_dt(
+                    lang, specs, rxn, rxn_ind,
+                    rev_reacs.index(rxn_ind) if rxn.rev else None,
+                    get_array, do_unroll
+                    )
+                if dkdt:
+                    file.write(jline + dkdt)
+                else:
+                    doT = False
+
+            if doT:
+                for k_sp in sorted(set(rxn.reac + rxn.prod)):
+                    nu = utils.get_nu(k_sp, rxn)
+                    if nu == 0:
+                        continue
+                    file.write(utils.line_start +
+                               get_array(lang, 'jac_T', k_sp) +
+                               ' += j_temp * {:.16e}'.format(
+                                    nu * specs[k_sp].mw) +
+                               utils.line_end[lang])
+                file.write('\n')
+
+            ######################################
+            # with respect to species
+            ######################################
+            write_dy_comment(file, lang, rxn_ind)
+
+            if rxn.rev and not rxn.rev_par:
+                # need to find Kc
+                write_kc(file, lang, specs, rxn)
+
+            # need to write the dr/dy parts (independent of any species)
+            write_dr_dy(file, lang, rev_reacs, rxn, rxn_ind,
+                        pres_rxn_ind, get_array
+                        )
+
+            # write the forward / backwards rates:
+            write_rates(file, lang, rxn)
+
+            # directional derivative of the reaction rate along v
+            for j_sp, sp_j in enumerate(specs[:-1]):
+                dr_dyj = write_dr_dy_species(lang, specs, rxn, pres_rxn_ind,
+                                             j_sp, sp_j, rxn_ind,
+                                             rev_reacs, get_array
+                                             )
+                file.write(utils.line_start + 'jv_temp {}= '.format(
+                                '+' if j_sp else '') +
+                           '{:.16e} * ('.format(1.0 / sp_j.mw) + dr_dyj +
+                           ') * ' + get_array(lang, 'v', j_sp + 1) +
+                           utils.line_end[lang])
+
+            for k_sp in sorted(set(rxn.reac + rxn.prod)):
+                nu = utils.get_nu(k_sp, rxn)
+                if nu == 0:
+                    continue
+                file.write(utils.line_start +
+                           get_array(lang, 'jv_sp', k_sp) +
+                           ' += {:.16e} * jv_temp'.format(
+                                nu * specs[k_sp].mw) +
+                           utils.line_end[lang])
+            file.write('\n')
+
+            if do_unroll and (rxn_ind == next_fn_index - 1 or
+                              rxn_ind == len(reacs) - 1):
+                # switch back
+                file.write('}\n\n')
+                file.close()
+                file = file_store
+                if jac_count == 0:
+                    with open(os.path.join(path, 'jacobs', 'jacob_vec_{}{}'.format(
+                              jac_count, utils.file_ext[lang]))) as readfile:
+                        num_lines = sum(1 for line in readfile)
+                    if num_lines > limit:
+                        unroll_len = int(unroll_len / 2)
+                        retry = True
+                        break
+
+                line = '  eval_jacob_vec_{}(pres, conc'.format(jac_count)
+                jac_count += 1
+                for rate in rate_list:
+                    line += ', ' + rate
+                if batch_has_m:
+                    line += ', m'
+                line += ', mw_avg, rho'
+                if rev:
+                    line += ', dBdT'
+                line += ', T, v, jac_T, jv_sp)'
+                file.write(line + utils.line_end[lang])
+        success = rxn_ind == len(reacs) - 1
+
+    ###################################
+    # Partial derivatives of temperature (energy equation)
+    ###################################
+    file.write('\n'
+               '  // species enthalpies\n'
+               '  double h[{}];\n'.format(num_s) +
+               '  eval_h(T, h);\n'
+               '\n'
+               '  // species specific heats\n'
+               '  double cp[{}];\n'.format(num_s) +
+               '  eval_cp(T, cp);\n'
+               '\n'
+               '  // average specific heat\n'
+               '  double cp_avg;\n'
+               )
+    line = utils.line_start + 'cp_avg = '
+    for isp, sp in enumerate(specs[:-1]):
+        if len(line) > 70:
+            file.write(line + '\n')
+            line = utils.line_start + '   '
+        line += ('(' + get_array(lang, 'y', isp + 1) + ' * ' +
+                 get_array(lang, 'cp', isp) + ') + ')
+    line += '(y_N * ' + get_array(lang, 'cp', num_s - 1) + ')'
+    file.write(line + utils.line_end[lang])
+
+    file.write(utils.line_start + 'double working_temp = (1.0 / cp_avg)' +
+               utils.line_end[lang])
+    file.write(utils.line_start + ('double ' if do_unroll else '') +
+               'j_temp = 1.0 / (rho * cp_avg * cp_avg)' +
+               utils.line_end[lang])
+
+    # the product with the (mass fraction) contribution of the
+    # last species, common to each species row
+    file.write('\n'
+               '  // finish the products with the species columns\n')
+    line = utils.line_start + 'double vy_sum = '
+    for j_sp, sp_j in enumerate(specs[:-1]):
+        if len(line) > 70:
+            file.write(line + '\n')
+            line = utils.line_start + '   '
+        line += ('{:.16e} * '.format(1.0 / sp_j.mw - 1.0 / specs[-1].mw) +
+                 get_array(lang, 'v', j_sp + 1) +
+                 (' + ' if j_sp + 2 < num_s else ''))
+    file.write(line + utils.line_end[lang])
+    line = utils.line_start + 'double vcp_sum = '
+    for j_sp, sp_j in enumerate(specs[:-1]):
+        if len(line) > 70:
+            file.write(line + '\n')
+            line = utils.line_start + '   '
+        line += ('(' + get_array(lang, 'cp', j_sp) + ' - ' +
+                 get_array(lang, 'cp', num_s - 1) + ') * ' +
+                 get_array(lang, 'v', j_sp + 1) +
+                 (' + ' if j_sp + 2 < num_s else ''))
+    file.write(line + utils.line_end[lang])
+    for k_sp, sp_k in enumerate(specs):
+        if participates[k_sp]:
+            file.write(utils.line_start + get_array(lang, 'jv_sp', k_sp) +
+                       ' += ' + get_array(lang, 'spec_rates', k_sp) +
+                       ' * mw_avg * {:.16e} * rho_inv * vy_sum'.format(
+                            sp_k.mw) +
+                       utils.line_end[lang])
+
+    # product with the temperature row
+    file.write('\n'
+               '  // product with the temperature row\n')
+    file.write(utils.line_start + get_array(lang, 'Jv', 0) + ' = 0.0' +
+               utils.line_end[lang])
+    for k_sp, sp_k in enumerate(specs):
+        if not (participates[k_sp] or seen_sp[k_sp]):
+            continue
+        line = (utils.line_start + get_array(lang, 'Jv', 0) + ' -= ' +
+                get_array(lang, 'h', k_sp) + ' * (')
+        if participates[k_sp]:
+            line += ('working_temp * ' + get_array(lang, 'jv_sp', k_sp) +
+                     ' - ')
+        else:
+            line += '-'
+        line += ('(j_temp * vcp_sum * ' +
+                 get_array(lang, 'spec_rates', k_sp) +
+                 ' * {:.8e}))'.format(sp_k.mw))
+        file.write(line + utils.line_end[lang])
+
+    ######################################
+    # Derivatives with respect to temperature
+    ######################################
+    write_dcp_dt(file, lang, specs, get_array)
+
+    # the temperature column
+    file.write(utils.line_start + utils.comment[lang] +
+               'Complete dT wrt T calculations\n')
+    line = utils.line_start + 'double dT_dT = -('
+    for k_sp, sp_k in enumerate(specs):
+        if k_sp:
+            line += utils.line_start + '  + '
+        line += (get_array(lang, 'spec_rates', k_sp) +
+                 ' * {:.8e}'.format(sp_k.mw) + ' * ' +
+                 '(-working_temp * ' + get_array(lang, 'h', k_sp) +
+                 ' / cp_avg + ' + get_array(lang, 'cp', k_sp) + ')' +
+                 ' + ' + get_array(lang, 'jac_T', k_sp) + ' * ' +
+                 get_array(lang, 'h', k_sp) + ' * rho')
+        if k_sp != num_s - 1:
+            line += '\n'
+    line += ') / (rho * cp_avg)'
+    file.write(line + utils.line_end[lang])
+    file.write(utils.line_start + get_array(lang, 'Jv', 0) + ' += dT_dT * ' +
+               get_array(lang, 'v', 0) + utils.line_end[lang])
+
+    for k_sp in range(num_s - 1):
+        file.write(utils.line_start + get_array(lang, 'Jv', k_sp + 1) +
+                   ' = ' + get_array(lang, 'jac_T', k_sp) + ' * ' +
+                   get_array(lang, 'v', 0) + ' + ' +
+                   get_array(lang, 'jv_sp', k_sp) + utils.line_end[lang])
+
+    file.write('} // end eval_jacob_vec\n\n')
+    file.close()
+
+    # create include file
+    if do_unroll:
+        with open(os.path.join(path, 'jacobs', 'jac_vec_include' +
+                  utils.header_ext[lang]), 'w'
+                  ) as tempfile:
+            tempfile.write('#ifndef JAC_VEC_INCLUDE_H\n'
+                           '#define JAC_VEC_INCLUDE_H\n')
+            for i in range(jac_count):
+                tempfile.write('#include "jacob_vec_{}{}"\n'.format(
+                               i, utils.header_ext[lang]))
+            tempfile.write('#endif\n\n')
+
+        with open(os.path.join(path, 'jacobs',
+                  'jac_vec_list_{}'.format(lang)), 'w'
+                  ) as tempfile:
+            tempfile.write(' '.join(['jacob_vec_{}{}'.format(
+                           i, utils.file_ext[lang]) for i in range(jac_count)])
+                           )
+
+
+def write_sparse_multiplier(path, lang, touched, nvars):
+    """Write a subroutine that multiplies the non-zero entries of the
+    Jacobian with a column 'j' of another matrix.
+
+    Parameters
+    ----------
+    path : str
+        Path to build directory for file.
+    lang : {'c', 'cuda', 'fortran', 'matlab'}
+        Programming language.
+    inidicies : list
+        A list of indicies where the Jacobian is non-zero
+    nvars : int
+        Number of variables in the Jacobian matrix
+
+    Returns
+    -------
+    None
+
+    """
+
+    sparse_indicies = [x for x in range(nvars * nvars) if touched[nvars]]
+
+    # first write header file
+    file = open(os.path.join(path,
+                'sparse_multiplier{}'.format(utils.header_ext[lang])), 'w'
+                )
+    file.write('#ifndef SPARSE_HEAD\n'
+               '#define SPARSE_HEAD\n')
+    file.write('\n#define N_A {}'.format(len(sparse_indicies)))
+    file.write(
+        '\n'
+        '#include "header{}"\n'.format(utils.header_ext[lang]) +
+        '\n' +
+        ('__device__\n' if lang == 'cuda' else '') +
+        'void sparse_multiplier (const double *, const double *, double*);\n'
+        '\n'
+        '#ifdef COMPILE_TESTING_METHODS\n'
+        '  int test_sparse_multiplier();\n'
+        '#endif\n'
+        '\n'
+        '#endif\n'
+        )
+    file.close()
+
+    # create file depending on language
+    filename = 'sparse_multiplier' + utils.file_ext[lang]
+    file = open(os.path.join(path, filename), 'w')
+
+    file.write('#include "sparse_multiplier'
+               '{}"\n\n'.format(utils.header_ext[lang])
+               )
+
+    if lang == 'cuda':
+        file.write('__device__\n')
+
+    file.write('void sparse_multiplier(const double * A, '
+               'const double * Vm, double* w) {\n'
+               )
+
+    if lang == 'cuda':
+        """optimize for cache reusing"""
+        touched = [False for i in range(nvars)]
+        for i in range(nvars):
+            # get all indicies that belong to row i
+            i_list = [x for x in sparse_indicies if int(x / nvars) == i]
+            for index in i_list:
+                file.write(' ' +
+                           utils.get_array(lang, 'w', index % nvars) +
+                           ' {}= '.format('+' if touched[index % nvars]
+                           else '')
+                           )
+                file.write(' ' + utils.get_array(lang, 'A', index) +
+                           ' * ' + utils.get_array(lang, 'Vm', i) +
+                           utils.line_end[lang]
+                           )
+                touched[index % nvars] = True
+        zero_out = [i for i, t in enumerate(touched) if not t]
+        for i in zero_out:
+            file.write(' ' +
+                       utils.get_array(lang, 'w', i) + ' = 0' +
+                       utils.line_end[lang]
+                       )
+        file.write("}\n")
+    else:
+        for i in range(nvars):
+            # get all indicies that belong to row i
+            i_list = [x for x in sparse_indicies if x % nvars == i]
+            if not len(i_list):
+                file.write('  ' +
+                           utils.get_array(lang, 'w', i) + ' = 0' +
+                           utils.line_end[lang]
                            )
                 continue
             file.write('  ' + utils.get_array(lang, 'w', i) + ' = ')
@@ -3404,11 +4199,223 @@ def write_sparse_multiplier(path, lang, touched, nvars):
     file.close()
 
 
+def write_batch_drivers(path, lang, skip_jac=False, batch_chunk=0,
+                        layout='aos', jac_format='dense'):
+    """Write multi-state drivers that evaluate :func:`dydt` and
+    :func:`eval_jacob` over a batch of states using OpenMP.
+
+    State ``i`` of the batch is stored contiguously, i.e., ``y[i * NSP]``,
+    ``dy[i * NSP]`` and ``jac[i * NSP * NSP]``, with pressure ``pres[i]``.
+    For the structure-of-arrays layout, the batch is instead split into
+    blocks of ``VECWIDTH`` states, each stored as expected by :func:`dydt` /
+    :func:`eval_jacob`.  The remaining ``n % VECWIDTH`` states form a last,
+    partial block, stored in the same manner with a stride of its number of
+    states rather than ``VECWIDTH``, and are evaluated in a block padded
+    with copies of its last state.
+
+    Parameters
+    ----------
+    path : str
+        Path to build directory for file.
+    lang : {'c', 'cuda', 'fortran', 'matlab'}
+        Programming language.
+    skip_jac : bool, optional
+        If ``True``, only the batched :func:`dydt` driver is written
+    batch_chunk : int, optional
+        The default number of states assigned to an OpenMP thread at once.
+        If zero, the states are split evenly amongst the threads.
+        Can be overridden at compile time by defining ``BATCH_CHUNK``
+    layout : {'aos', 'soa'}, optional
+        Memory layout of the generated C code, see `utils.layouts`
+    jac_format : {'dense', 'csr', 'csc'}, optional
+        Storage of the Jacobian, see `utils.jac_formats`.  For the compressed
+        formats each Jacobian in the batch holds ``NNZ`` values
+
+    Returns
+    -------
+    None
+
+    """
+
+    if lang != 'c':
+        return
+
+    jac_size = 'NSP * NSP' if jac_format == 'dense' else 'NNZ'
+
+    soa = layout == 'soa'
+    # states per call of dydt / eval_jacob
+    width = ' * VECWIDTH' if soa else ''
+
+    if batch_chunk < 0:
+        print('Error: batch chunk size must be non-negative')
+        sys.exit(2)
+
+    # first write header file
+    file = open(os.path.join(path, 'batch' + utils.header_ext[lang]), 'w')
+    file.write('#ifndef BATCH_HEAD\n'
+               '#define BATCH_HEAD\n'
+               '\n'
+               '#include "header{}"\n'.format(utils.header_ext[lang]) +
+               '\n'
+               '//number of states handed to an OpenMP thread at once, '
+               'zero for an even split\n'
+               '#ifndef BATCH_CHUNK\n'
+               '#define BATCH_CHUNK {}\n'.format(batch_chunk) +
+               '#endif\n'
+               '\n'
+               'void dydt_batch (const int, const double, const double * {0}, '
+               'const double * {0}, double * {0}, const int);\n'.format(
+                    utils.restrict[lang])
+               )
+    if not skip_jac:
+        file.write('void eval_jacob_batch (const int, const double, '
+                   'const double * {0}, const double * {0}, double * {0}, '
+                   'const int);\n'.format(utils.restrict[lang])
+                   )
+    file.write('\n'
+               '#endif\n'
+               )
+    file.close()
+
+    def __write_loop(file, body, tail=''):
+        count = 'n / VECWIDTH' if soa else 'n'
+        file.write('  int nt = num_threads > 0 ? num_threads : '
+                   'omp_get_max_threads();\n'
+                   '  int i;\n'
+                   '#if BATCH_CHUNK > 0\n'
+                   '  #pragma omp parallel for schedule(static, BATCH_CHUNK) '
+                   'num_threads(nt)\n'
+                   '#else\n'
+                   '  #pragma omp parallel for schedule(static) '
+                   'num_threads(nt)\n'
+                   '#endif\n'
+                   '  for (i = 0; i < {}; ++i) {{\n'.format(count) +
+                   body +
+                   '  }\n' +
+                   tail +
+                   '}\n'
+                   )
+
+    def __write_tail(func, out, size):
+        # the partial block is copied to (and from) a full block padded with
+        # copies of its last state
+        return ('  // the remaining states, in a padded block\n'
+                '  const int m = n % VECWIDTH;\n'
+                '  if (m > 0) {{\n'
+                '    const int start = n - m;\n'
+                '    double pres_m[VECWIDTH];\n'
+                '    double y_m[NSP * VECWIDTH];\n'
+                '    double * {0}_m = (double*)malloc({1} * VECWIDTH * '
+                'sizeof(double));\n'
+                '    for (int lane = 0; lane < VECWIDTH; ++lane) {{\n'
+                '      const int src = lane < m ? lane : m - 1;\n'
+                '      pres_m[lane] = pres[start + src];\n'
+                '      for (int k = 0; k < NSP; ++k) {{\n'
+                '        y_m[lane + k * VECWIDTH] = y[start * NSP + src + '
+                'k * m];\n'
+                '      }}\n'
+                '    }}\n'
+                '{2}'
+                '    {3}(t, pres_m, y_m, {0}_m);\n'
+                '    for (int k = 0; k < {1}; ++k) {{\n'
+                '      for (int lane = 0; lane < m; ++lane) {{\n'
+                '        {0}[start * {1} + lane + k * m] = '
+                '{0}_m[lane + k * VECWIDTH];\n'
+                '      }}\n'
+                '    }}\n'
+                '    free({0}_m);\n'
+                '  }}\n'
+                ).format(out, size,
+                         '    memset({0}_m, 0, {1} * VECWIDTH * '
+                         'sizeof(double));\n'.format(out, size)
+                         if func == 'eval_jacob' else '',
+                         func)
+
+    file = open(os.path.join(path, 'batch' + utils.file_ext[lang]), 'w')
+    file.write('#include "batch{}"\n'.format(utils.header_ext[lang]) +
+               '#include "dydt{}"\n'.format(utils.header_ext[lang])
+               )
+    if not skip_jac:
+        file.write('#include "jacob{}"\n'.format(utils.header_ext[lang]))
+    file.write('\n')
+
+    file.write('void dydt_batch (const int n, const double t, '
+               'const double * {0} pres, const double * {0} y, '
+               'double * {0} dy, const int num_threads) {{\n'.format(
+                    utils.restrict[lang])
+               )
+    __write_loop(file, ('    dydt(t, {0}, &y[i{1} * NSP], &dy[i{1} * NSP]);\n'
+                        ).format('&pres[i * VECWIDTH]' if soa else 'pres[i]',
+                                 width),
+                 __write_tail('dydt', 'dy', 'NSP') if soa else '')
+
+    if not skip_jac:
+        file.write('\n'
+                   'void eval_jacob_batch (const int n, const double t, '
+                   'const double * {0} pres, const double * {0} y, '
+                   'double * {0} jac, const int num_threads) {{\n'.format(
+                        utils.restrict[lang])
+                   )
+        # eval_jacob only writes the non-zero entries of the Jacobian
+        __write_loop(file,
+                     ('    double * jac_i = &jac[i{1} * {2}];\n'
+                      '    memset(jac_i, 0, {2}{1} * sizeof(double));\n'
+                      '    eval_jacob(t, {0}, &y[i{1} * NSP], jac_i);\n'
+                      ).format('&pres[i * VECWIDTH]' if soa else 'pres[i]',
+                               width, jac_size),
+                     __write_tail('eval_jacob', 'jac', jac_size)
+                     if soa else '')
+    file.close()
+
+
+def _call_writer(task):
+    """Calls a subroutine writer, in a process pool
+
+    Parameters
+    ----------
+    task : tuple
+        The writer function, and a tuple of its arguments
+
+    Returns
+    -------
+    result
+        The return value of the writer
+
+    """
+    func, args = task
+    return func(*args)
+
+
+def _run_writers(pool, tasks):
+    """Calls the subroutine writers, in order or in a process pool
+
+    Parameters
+    ----------
+    pool : `multiprocessing.Pool`
+        The process pool, or ``None`` to write in this process
+    tasks : list of tuple
+        The writer functions, and tuples of their arguments
+
+    Returns
+    -------
+    results : list
+        The return values of the writers, in order
+
+    """
+    if pool is None:
+        return [_call_writer(task) for task in tasks]
+    return pool.map(_call_writer, tasks)
+
+
 def create_jacobian(lang, mech_name=None, therm_name=None, gas=None, optimize_cache=False,
                     initial_state="", num_blocks=8, num_threads=64,
                     no_shared=False, L1_preferred=True, multi_thread=None,
                     force_optimize=False, build_path='./out/', last_spec=None,
-                    skip_jac=False, auto_diff=False
+                    skip_jac=False, auto_diff=False, batch_chunk=0,
+                    layout='aos', vector_width=8, jac_format='dense',
+                    kc_mode='reaction', hoist_trange=False, gen_jobs=1,
+                    mech_cache=None, cache_refine=False, cache_patience=1000,
+                    tuned_params=None
                     ):
     """Create Jacobian subroutine from mechanism.
 
@@ -3424,8 +4431,10 @@ def create_jacobian(lang, mech_name=None, therm_name=None, gas=None, optimize_ca
         or nothing if info in mechanism file.
     gas : cantera.Solution, optional
         The mechanism to generate the Jacobian for.  This or ``mech_name`` must be specified
-    optimize_cache : bool, optional
-        If ``True``, use the greedy optimizer to attempt to improve cache hit rates
+    optimize_cache : bool or {'greedy', 'rcm', 'spectral'}, optional
+        The method used to reorder the species and reactions to attempt to
+        improve cache hit rates, see `cache_optimizer.optimize_cache`.
+        ``True`` selects the greedy optimizer
     initial_state : str, optional
         A comma separated list of the initial conditions to use in form
         T,P,X (e.g. '800,1,H2=1.0,O2=0.5'). Temperature in K, P in atm
@@ -3443,7 +4452,8 @@ def create_jacobian(lang, mech_name=None, therm_name=None, gas=None, optimize_ca
     force_optimize : bool, optional
         If ``True``, redo the cache optimization even if the same mechanism
     build_path : str, optional
-        The output directory for the jacobian files
+        The output directory for the jacobian files.  Only files with
+        changed contents are written, see `manifest.update_build_dir`
     last_spec : str, optional
         If specified, the species to assign to the last index.
         Typically should be N2, Ar, He or another inert bath gas
@@ -3451,6 +4461,46 @@ def create_jacobian(lang, mech_name=None, therm_name=None, gas=None, optimize_ca
         If ``True``, only the reaction rate subroutines will be generated
     auto_diff : bool, optional
         If ``True``, generate files for use with the Adept autodifferention library.
+    batch_chunk : int, optional
+        The default number of states per OpenMP thread chunk in the
+        batched (multi-state) C drivers; zero splits states evenly.
+    layout : {'aos', 'soa'}, optional
+        Memory layout of the generated C code.  If 'soa', the subroutines
+        evaluate a block of ``vector_width`` states per call, stored as a
+        structure-of-arrays, and vectorize over the states
+    vector_width : int, optional
+        The number of states per block for the 'soa' layout
+    jac_format : {'dense', 'csr', 'csc'}, optional
+        Storage of the Jacobian.  The compressed formats write only the
+        structural non-zeros, in compressed sparse row / column order
+    kc_mode : {'reaction', 'gibbs'}, optional
+        Evaluation of the equilibrium constants in the reaction rates.  If
+        'gibbs', the species (S - H) / RT are evaluated once per call, and
+        each equilibrium constant from the reaction stoichiometry
+    hoist_trange : bool, optional
+        If ``True``, the species thermodynamic properties and the equilibrium
+        constants are grouped by temperature breakpoint, and evaluated under
+        a single conditional per breakpoint
+    gen_jobs : int, optional
+        The number of processes used to write the independent subroutine
+        files (reaction and species rates, thermodynamic properties,
+        derivatives, Jacobian-vector product, etc.) alongside the Jacobian
+    mech_cache : str, optional
+        Directory of the parsed-mechanism cache, see
+        `mech_interpret.read_mech_cached`.  If ``None``, the mechanism is
+        always parsed.
+    cache_refine : bool, optional
+        If ``True``, the 'rcm' / 'spectral' cache optimization is refined by
+        the greedy optimizer
+    cache_patience : int, optional
+        The greedy optimizer stops once this many runs in a row did not
+        improve the order; zero runs all of them.  Its progress is
+        checkpointed in the build directory and resumed by the next call
+    tuned_params : str or bool, optional
+        File of the code-splitting parameters tuned per mechanism, see
+        `autotune.tune`; the parameters tuned for this mechanism, if any,
+        are used.  If ``None``, `autotune.default_tune_file` is used; if
+        ``False``, the current `CParams` / `CUDAParams` are used
 
     Returns
     -------
@@ -3471,172 +4521,305 @@ def create_jacobian(lang, mech_name=None, therm_name=None, gas=None, optimize_ca
             print(l)
         sys.exit(2)
 
-    # create output directory if none exists
-    utils.create_dir(build_path)
+    if layout not in utils.layouts:
+        print('Error: layout needs to be one of: ')
+        for l in utils.layouts:
+            print(l)
+        sys.exit(2)
 
-    if auto_diff:
-        with open(os.path.join(build_path, 'ad_jacob.h'), 'w') as file:
-            file.write('#ifndef AD_JAC_H\n'
-                       '#define AD_JAC_H\n'
-                       'void eval_jacob (const double t, const double pres, '
-                       'const double* y, double* jac);\n'
-                       '#endif\n'
-                       )
+    if layout == 'soa' and (lang != 'c' or auto_diff):
+        print('Error: structure-of-arrays layout only supported for C '
+              '(without autodifferentiation)')
+        sys.exit(2)
 
-    assert mech_name is not None or gas is not None, 'No mechanism specified!'
+    if layout == 'soa' and vector_width < 1:
+        print('Error: vector width must be positive')
+        sys.exit(2)
 
-    # Interpret reaction mechanism file, depending on Cantera or
-    # Chemkin format.
-    if gas is not None or mech_name.endswith(tuple(['.cti', '.xml'])):
-        elems, specs, reacs = mech.read_mech_ct(mech_name, gas)
-    else:
-        elems, specs, reacs = mech.read_mech(mech_name, therm_name)
-
-    if not specs:
-        print('No species found in file: {}'.format(mech_name))
-        sys.exit(3)
-
-    if not reacs:
-        print('No reactions found in file: {}'.format(mech_name))
-        sys.exit(3)
-
-    #check to see if the last_spec is specified
-    if last_spec is not None:
-        #find the index if possible
-        isp = next((i for i, sp in enumerate(specs)
-                   if sp.name.lower() == last_spec.lower().strip()),
-                   None
-                   )
-        if isp is None:
-            print('Warning: User specified last species {} '
-                  'not found in mechanism.'
-                  '  Attempting to find a default species.'.format(last_spec)
-                  )
-            last_spec = None
-        else:
-            last_spec = isp
-    else:
-        print('User specified last species not found or not specified.  '
-              'Attempting to find a default species')
-    if last_spec is None:
-        wt = chem.get_elem_wt()
-        #check for N2, Ar, He, etc.
-        candidates = [('N2', wt['n'] * 2.), ('Ar', wt['ar']),
-                        ('He', wt['he'])]
-        for sp in candidates:
-            match = next((isp for isp, spec in enumerate(specs)
-                          if sp[0].lower() == spec.name.lower() and
-                          sp[1] == spec.mw),
-                            None)
-            if match is not None:
-                last_spec = match
-                break
-        if last_spec is not None:
-            print('Default last species '
-                  '{} found.'.format(specs[last_spec].name)
-                  )
-    if last_spec is None:
-        print('Warning: Neither a user specified or default last species '
-              'could be found. Proceeding using the last species in the '
-              'base mechanism: {}'.format(specs[-1].name))
-        last_spec = len(specs) - 1
-
-    optimize_cache = optimize_cache and cache.have_bitarray
-    if optimize_cache:
-        specs, reacs, \
-        fwd_spec_mapping, fwd_rxn_mapping, \
-        reverse_spec_mapping, reverse_rxn_mapping = \
-                cache.optimize_cache(specs, reacs, multi_thread,
-                                     force_optimize, build_path, last_spec
-                                     )
-    else:
-        fwd_rxn_mapping = list(range(len(reacs)))
-        reverse_rxn_mapping = list(range(len(reacs)))
+    if optimize_cache is True:
+        optimize_cache = 'greedy'
+    if optimize_cache and optimize_cache not in utils.cache_optimizers:
+        print('Error: cache optimizer needs to be one of: ')
+        for l in utils.cache_optimizers:
+            print(l)
+        sys.exit(2)
 
-        fwd_spec_mapping, \
-        reverse_spec_mapping = \
-            utils.get_species_mappings(len(specs), last_spec)
+    if jac_format not in utils.jac_formats:
+        print('Error: Jacobian format needs to be one of: ')
+        for l in utils.jac_formats:
+            print(l)
+        sys.exit(2)
 
-        #pick up the last_spec and drop it at the end
-        temp = specs[:]
-        for i in range(len(specs)):
-            specs[i] = temp[fwd_spec_mapping[i]]
+    if jac_format != 'dense' and lang != 'c':
+        print('Error: sparse Jacobian formats only supported for C')
+        sys.exit(2)
 
+    if kc_mode not in utils.kc_modes:
+        print('Error: equilibrium constant mode needs to be one of: ')
+        for l in utils.kc_modes:
+            print(l)
+        sys.exit(2)
 
-    #remove old file which potentially could corrupt library generation
-    if not auto_diff:
-        try:
-            os.remove(os.path.join(build_path, 'jacobs', 'jac_list_{}'.format(lang)))
-        except:
-            pass
+    if kc_mode == 'gibbs' and lang != 'c':
+        print('Error: Gibbs-based equilibrium constants only supported for C')
+        sys.exit(2)
 
-        try:
-            os.remove(os.path.join(build_path, 'rates', 'rate_list_{}'.format(lang)))
-        except:
-            pass
+    if hoist_trange and lang != 'c':
+        print('Error: hoisted temperature conditionals only supported for C')
+        sys.exit(2)
 
+    if gen_jobs < 1:
+        print('Error: number of generation jobs must be positive')
+        sys.exit(2)
 
-    the_len = len(reacs)
+    # create output directory if none exists
+    utils.create_dir(build_path)
 
-    if lang == 'cuda':
-        CUDAParams.write_launch_bounds(build_path, num_blocks, num_threads,
-                                       L1_preferred, no_shared
-                                       )
-    smm = None
-    if lang == 'cuda' and not no_shared:
-        smm = shared.shared_memory_manager(num_blocks, num_threads,
-                                           L1_preferred
-                                           )
+    # the files are written to a staging directory, and only the changed
+    # files are moved to the output directory at the end
+    out_path = build_path
+    build_path = manifest.get_staging_dir(out_path)
+    previous_params = None
+    try:
+        if auto_diff:
+            with open(os.path.join(build_path, 'ad_jacob.h'), 'w') as file:
+                file.write('#ifndef AD_JAC_H\n'
+                           '#define AD_JAC_H\n'
+                           'void eval_jacob (const double t, const double pres, '
+                           'const double* y, double* jac);\n'
+                           '#endif\n'
+                           )
+
+        assert mech_name is not None or gas is not None, 'No mechanism specified!'
+
+        # Interpret reaction mechanism file, depending on Cantera or
+        # Chemkin format.
+        if gas is not None:
+            elems, specs, reacs = mech.read_mech_ct(mech_name, gas)
+        else:
+            elems, specs, reacs = mech.read_mech_cached(mech_name, therm_name,
+                                                        mech_cache)
+
+        if not specs:
+            print('No species found in file: {}'.format(mech_name))
+            sys.exit(3)
+
+        if not reacs:
+            print('No reactions found in file: {}'.format(mech_name))
+            sys.exit(3)
+
+        # use the code-splitting parameters tuned for this mechanism, if any
+        if tuned_params is not False and lang in autotune.MODULES:
+            params = autotune.read_tuned(chem.get_mech_fingerprint(specs, reacs),
+                                         lang, tuned_params)
+            if params is not None:
+                print('Using tuned parameters: {}'.format(', '.join(
+                      '{}={}'.format(name, params[name])
+                      for name in autotune.PARAMETERS if name in params)))
+                previous_params = autotune.set_params(lang, params)
+
+        #check to see if the last_spec is specified
+        if last_spec is not None:
+            #find the index if possible
+            isp = next((i for i, sp in enumerate(specs)
+                       if sp.name.lower() == last_spec.lower().strip()),
+                       None
+                       )
+            if isp is None:
+                print('Warning: User specified last species {} '
+                      'not found in mechanism.'
+                      '  Attempting to find a default species.'.format(last_spec)
+                      )
+                last_spec = None
+            else:
+                last_spec = isp
+        else:
+            print('User specified last species not found or not specified.  '
+                  'Attempting to find a default species')
+        if last_spec is None:
+            wt = chem.get_elem_wt()
+            #check for N2, Ar, He, etc.
+            candidates = [('N2', wt['n'] * 2.), ('Ar', wt['ar']),
+                            ('He', wt['he'])]
+            for sp in candidates:
+                match = next((isp for isp, spec in enumerate(specs)
+                              if sp[0].lower() == spec.name.lower() and
+                              sp[1] == spec.mw),
+                                None)
+                if match is not None:
+                    last_spec = match
+                    break
+            if last_spec is not None:
+                print('Default last species '
+                      '{} found.'.format(specs[last_spec].name)
+                      )
+        if last_spec is None:
+            print('Warning: Neither a user specified or default last species '
+                  'could be found. Proceeding using the last species in the '
+                  'base mechanism: {}'.format(specs[-1].name))
+            last_spec = len(specs) - 1
+
+        if optimize_cache:
+            specs, reacs, \
+            fwd_spec_mapping, fwd_rxn_mapping, \
+            reverse_spec_mapping, reverse_rxn_mapping = \
+                    cache.optimize_cache(specs, reacs, multi_thread,
+                                         force_optimize, out_path, last_spec,
+                                         method=optimize_cache,
+                                         refine=cache_refine,
+                                         patience=cache_patience
+                                         )
+        else:
+            fwd_rxn_mapping = list(range(len(reacs)))
+            reverse_rxn_mapping = list(range(len(reacs)))
 
-    #reassign the reaction's product / reactant / third body list
-    # to integer indexes for speed
-    utils.reassign_species_lists(reacs, specs)
+            fwd_spec_mapping, \
+            reverse_spec_mapping = \
+                utils.get_species_mappings(len(specs), last_spec)
 
-    ## now begin writing subroutines
+            #pick up the last_spec and drop it at the end
+            temp = specs[:]
+            for i in range(len(specs)):
+                specs[i] = temp[fwd_spec_mapping[i]]
 
-    # print reaction rate subroutine
-    rate.write_rxn_rates(build_path, lang, specs, reacs,
-                         fwd_rxn_mapping, smm, auto_diff
-                         )
 
-    # if third-body/pressure-dependent reactions,
-    # print modification subroutine
-    if next((r for r in reacs if (r.thd_body or r.pdep)), None):
-        rate.write_rxn_pressure_mod(build_path, lang, specs, reacs,
-                                    fwd_rxn_mapping, smm, auto_diff
-                                    )
+        #remove old file which potentially could corrupt library generation,
+        # files no longer generated are otherwise removed using the manifest
+        if not auto_diff and not manifest.has_manifest(out_path):
+            try:
+                os.remove(os.path.join(out_path, 'jacobs', 'jac_list_{}'.format(lang)))
+            except:
+                pass
 
-    # write species rates subroutine
-    seen_sp = rate.write_spec_rates(build_path, lang, specs, reacs,
-                                    fwd_spec_mapping, fwd_rxn_mapping,
-                                    smm, auto_diff
-                                    )
+            try:
+                os.remove(os.path.join(out_path, 'rates', 'rate_list_{}'.format(lang)))
+            except:
+                pass
 
-    # write chem_utils subroutines
-    rate.write_chem_utils(build_path, lang, specs, auto_diff)
 
-    # write derivative subroutines
-    rate.write_derivs(build_path, lang, specs, reacs, seen_sp, auto_diff)
+        the_len = len(reacs)
 
-    # write mass-mole fraction conversion subroutine
-    rate.write_mass_mole(build_path, lang, specs)
+        if lang == 'cuda':
+            CUDAParams.write_launch_bounds(build_path, num_blocks, num_threads,
+                                           L1_preferred, no_shared
+                                           )
+        smm = None
+        if lang == 'cuda' and not no_shared:
+            smm = shared.shared_memory_manager(num_blocks, num_threads,
+                                               L1_preferred
+                                               )
 
-    # write header file
-    aux.write_header(build_path, lang)
+        #reassign the reaction's product / reactant / third body list
+        # to integer indexes for speed
+        utils.reassign_species_lists(reacs, specs)
 
-    # write mechanism initializers and testing methods
-    aux.write_mechanism_initializers(build_path, lang, specs, reacs,
-                                     fwd_spec_mapping, reverse_spec_mapping,
-                                     initial_state, optimize_cache,
-                                     last_spec, auto_diff
-                                     )
+        ## now begin writing subroutines
 
-    if skip_jac == False:
-        # write Jacobian subroutine
-        touched = write_jacobian(build_path, lang, specs,
-                                         reacs, seen_sp, smm)
+        # the writers are independent (each writes its own files), and are
+        # run in a process pool if requested
+        pool = None
+        if gen_jobs > 1:
+            # the workers are passed the code-splitting parameters, as they
+            # do not inherit the tuned parameters of this process unless
+            # forked
+            pool = multiprocessing.Pool(
+                gen_jobs, autotune.set_all_params,
+                (dict((l, autotune.get_params(l)) for l in autotune.MODULES),))
 
-        write_sparse_multiplier(build_path, lang, touched, len(specs))
+        try:
+            tasks = []
+            # print reaction rate subroutine
+            tasks.append((rate.write_rxn_rates,
+                          (build_path, lang, specs, reacs, fwd_rxn_mapping, smm,
+                           auto_diff, layout, kc_mode, hoist_trange)))
+
+            # if third-body/pressure-dependent reactions,
+            # print modification subroutine
+            if next((r for r in reacs if (r.thd_body or r.pdep)), None):
+                tasks.append((rate.write_rxn_pressure_mod,
+                              (build_path, lang, specs, reacs, fwd_rxn_mapping, smm,
+                               auto_diff, layout)))
+
+            # write chem_utils subroutines
+            tasks.append((rate.write_chem_utils,
+                          (build_path, lang, specs, auto_diff, layout,
+                           hoist_trange)))
+
+            # write mass-mole fraction conversion subroutine
+            tasks.append((rate.write_mass_mole, (build_path, lang, specs)))
+
+            # write header file
+            tasks.append((aux.write_header, (build_path, lang, layout, vector_width)))
+
+            # write mechanism initializers and testing methods
+            tasks.append((aux.write_mechanism_initializers,
+                          (build_path, lang, specs, reacs, fwd_spec_mapping,
+                           reverse_spec_mapping, initial_state, optimize_cache,
+                           last_spec, auto_diff)))
+
+            # write species rates subroutine, needed by the later subroutines
+            tasks.append((rate.write_spec_rates,
+                          (build_path, lang, specs, reacs, fwd_spec_mapping,
+                           fwd_rxn_mapping, smm, auto_diff, layout)))
+            seen_sp = _run_writers(pool, tasks)[-1]
+
+            tasks = []
+            # write derivative subroutines
+            tasks.append((rate.write_derivs,
+                          (build_path, lang, specs, reacs, seen_sp, auto_diff,
+                           layout)))
+
+            # matrix-free Jacobian-vector product, for a single state
+            if skip_jac == False and layout != 'soa':
+                tasks.append((write_jacobian_vec,
+                              (build_path, lang, specs, reacs, seen_sp)))
+
+            # the Jacobian is written in this process, alongside the others
+            if pool is not None:
+                results = pool.map_async(_call_writer, tasks)
+            else:
+                _run_writers(pool, tasks)
+
+            if skip_jac == False:
+                # write Jacobian subroutine
+                touched = write_jacobian(build_path, lang, specs, reacs,
+                                         seen_sp, smm, layout, jac_format)
+
+                # the sparse multiplier operates on a single, dense Jacobian
+                if layout != 'soa' and jac_format == 'dense':
+                    write_sparse_multiplier(build_path, lang, touched, len(specs))
+
+                # factorization of the Newton matrix, for a single state
+                if layout != 'soa':
+                    index_map = None
+                    if jac_format != 'dense':
+                        index_map = get_sparse_storage(touched, len(specs),
+                                                       jac_format)[0]
+                    sparse_lu.write_newton_solver(build_path, lang, touched,
+                                                  len(specs), index_map)
+
+            if pool is not None:
+                results.get()
+                pool.close()
+                pool.join()
+        finally:
+            # a failed writer must not leave the workers running
+            if pool is not None:
+                pool.terminate()
+
+        if not auto_diff:
+            # write multi-state drivers
+            write_batch_drivers(build_path, lang, skip_jac, batch_chunk, layout,
+                                jac_format)
+
+        # only files with changed contents are rewritten
+        manifest.update_build_dir(build_path, out_path)
+    finally:
+        # the tuned parameters only apply to this mechanism
+        if previous_params is not None:
+            autotune.set_params(lang, previous_params)
+        # a failed generation must not leave the staging directory behind
+        manifest.remove_staging_dir(build_path)
 
     return 0
 
@@ -3648,6 +4831,8 @@ def create_jacobian(lang, mech_name=None, therm_name=None, gas=None, optimize_ca
                     mech_name=args.input,
                     therm_name=args.thermo,
                     optimize_cache=args.cache_optimizer,
+                    cache_refine=args.cache_refine,
+                    cache_patience=args.cache_patience,
                     initial_state=args.initial_conditions,
                     num_blocks=args.num_blocks,
                     num_threads=args.num_threads,
@@ -3657,5 +4842,14 @@ def create_jacobian(lang, mech_name=None, therm_name=None, gas=None, optimize_ca
                     force_optimize=args.force_optimize,
                     build_path=args.build_path,
                     last_spec=args.last_species,
-                    auto_diff=args.auto_diff
+                    auto_diff=args.auto_diff,
+                    batch_chunk=args.batch_chunk,
+                    layout=args.layout,
+                    vector_width=args.vector_width,
+                    jac_format=args.jac_format,
+                    kc_mode=args.kc_mode,
+                    hoist_trange=args.hoist_trange,
+                    gen_jobs=args.gen_jobs,
+                    mech_cache=args.mech_cache,
+                    tuned_params=args.tuned_params
                     )
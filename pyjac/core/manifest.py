@@ -0,0 +1,176 @@
+"""Incremental update of the build directory.
+
+The generated files are written to a staging directory, and only the files
+whose contents changed are moved into the build directory, such that the
+timestamps of unchanged files are left alone.  A manifest of the content
+hashes of the generated files is kept in the build directory, to remove
+files that are no longer generated.
+"""
+
+# Python 2 compatibility
+from __future__ import division
+from __future__ import print_function
+
+# Standard libraries
+import os
+import json
+import shutil
+import hashlib
+
+# Local imports
+from .. import utils
+
+MANIFEST = '.pyjac_manifest.json'
+"""str: name of the manifest file in the build directory"""
+
+STAGING = '.pyjac_staging'
+"""str: name of the staging directory in the build directory"""
+
+
+def file_hash(filename):
+    """Returns the SHA-256 hash of the contents of a file.
+
+    Parameters
+    ----------
+    filename : str
+        The file to hash
+
+    Returns
+    -------
+    digest : str
+        The hexadecimal digest of the contents
+
+    """
+    sha = hashlib.sha256()
+    with open(filename, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 16), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def has_manifest(build_path):
+    """Returns ``True`` if the build directory has a manifest.
+
+    Parameters
+    ----------
+    build_path : str
+        The build directory
+
+    """
+    return os.path.isfile(os.path.join(build_path, MANIFEST))
+
+
+def read_manifest(build_path):
+    """Reads the manifest of the build directory.
+
+    Parameters
+    ----------
+    build_path : str
+        The build directory
+
+    Returns
+    -------
+    hashes : dict
+        The content hash of each generated file, keyed by the path
+        relative to the build directory.  Empty if there is no (valid)
+        manifest.
+
+    """
+    try:
+        with open(os.path.join(build_path, MANIFEST), 'r') as file:
+            return json.load(file)['files']
+    except (IOError, OSError, ValueError, KeyError):
+        return {}
+
+
+def get_staging_dir(build_path):
+    """Creates an empty staging directory in the build directory.
+
+    Any staging directory left behind by an unfinished generation is
+    removed.
+
+    Parameters
+    ----------
+    build_path : str
+        The build directory
+
+    Returns
+    -------
+    staging : str
+        The staging directory
+
+    """
+    staging = os.path.join(build_path, STAGING)
+    remove_staging_dir(staging)
+    utils.create_dir(staging)
+    return staging
+
+
+def remove_staging_dir(staging):
+    """Removes the staging directory, if present.
+
+    Parameters
+    ----------
+    staging : str
+        The staging directory
+
+    """
+    if os.path.isdir(staging):
+        shutil.rmtree(staging)
+
+
+def update_build_dir(staging, build_path):
+    """Moves the changed files from the staging to the build directory.
+
+    A generated file is moved unless the file in the build directory has
+    the same contents.  Files in the manifest that were not generated again
+    are removed from the build directory, and the staging directory is
+    removed.
+
+    Parameters
+    ----------
+    staging : str
+        The staging directory with the generated files
+    build_path : str
+        The build directory
+
+    Returns
+    -------
+    changed : list of str
+        The paths (relative to the build directory) of the new or changed
+        files
+
+    """
+    old_hashes = read_manifest(build_path)
+    hashes = {}
+    changed = []
+    for root, dirs, files in os.walk(staging):
+        for name in files:
+            source = os.path.join(root, name)
+            rel = os.path.relpath(source, staging).replace(os.sep, '/')
+            digest = file_hash(source)
+            hashes[rel] = digest
+
+            dest = os.path.join(build_path, *rel.split('/'))
+            # the file on disk is compared, rather than the manifest, such
+            # that edited or truncated files are restored
+            if os.path.isfile(dest) and file_hash(dest) == digest:
+                continue
+            utils.create_dir(os.path.dirname(dest))
+            if os.path.isfile(dest):
+                os.remove(dest)
+            shutil.move(source, dest)
+            changed.append(rel)
+
+    # remove files that are no longer generated, e.g., unrolled sub-files
+    for rel in old_hashes:
+        if rel not in hashes:
+            dest = os.path.join(build_path, *rel.split('/'))
+            if os.path.isfile(dest):
+                os.remove(dest)
+
+    with open(os.path.join(build_path, MANIFEST), 'w') as file:
+        json.dump({'files': hashes}, file, indent=1, sort_keys=True)
+    remove_staging_dir(staging)
+
+    return sorted(changed)
@@ -437,7 +437,7 @@ def write_mechanism_initializers(path, lang, specs, reacs,
             file.write('#endif\n')
 
 
-def write_header(path, lang):
+def write_header(path, lang, layout='aos', vector_width=8):
     """Writes minimal header file used by all other source files.
 
     Parameters
@@ -446,6 +446,10 @@ def write_header(path, lang):
         Path where files are being written.
     lang : {'c', 'cuda', 'fortran', 'matlab'}
         Language type.
+    layout : {'aos', 'soa'}, optional
+        Memory layout of the generated C code, see `utils.layouts`
+    vector_width : int, optional
+        The number of states per structure-of-arrays block (``VECWIDTH``)
 
     Returns
     -------
@@ -474,5 +478,14 @@ def write_header(path, lang):
                    ' #define omp_get_max_threads() 1\n'
                    ' #define omp_get_num_threads() 1\n'
                    '#endif\n'
-                   '#endif\n'
                   )
+        if layout == 'soa':
+            file.write('\n'
+                       '/** Structure-of-arrays layout: states per block */\n'
+                       '#ifndef VECWIDTH\n'
+                       ' #define VECWIDTH {}\n'.format(vector_width) +
+                       '#endif\n'
+                       '/** Index of entry i of the current state in a block */\n'
+                       '#define INDEX(i) (lane + (i) * VECWIDTH)\n'
+                       )
+        file.write('#endif\n')
@@ -6,9 +6,13 @@
 from __future__ import division
 
 # Standard libraries
+import os
 import sys
 import math
 import re
+import itertools
+import pickle
+import hashlib
 from copy import deepcopy
 import logging
 
@@ -16,6 +20,7 @@
 
 # Local imports
 from .. import utils
+from .._version import __version__
 from . import chem_utilities as chem
 
 # Related module
@@ -84,6 +89,9 @@ def read_mech(mech_filename, therm_filename):
     reacs = []
     specs = []
     key = ''
+    # default units from Chemkin
+    units_A = 'moles'
+    units_E = 'cal/mole'
 
     with open(mech_filename, 'r') as file:
         # start line reading loop
@@ -131,32 +139,7 @@ def read_mech(mech_filename, therm_filename):
 
             elif line[0:4].lower() == 'reac':
                 key = 'reac'
-
-                # default units from Chemkin
-                units_E = 'cal/mole'
-                units_A = 'moles'
-
-                # get Arrhenius coefficient units (if specified)
-                for unit in line.split()[1:]:
-                    if unit.lower() in pre_units:
-                        units_A = unit.lower()
-                    elif unit.lower() in act_energy_units:
-                        units_E = unit.lower()
-                    else:
-                        print('Error: unsupported units on REACTION line.')
-                        print('For pre-exponential factor, choose from: ' +
-                              pre_units
-                              )
-                        print('For activation energy, choose from: ' +
-                              act_energy_units
-                              )
-                        print('Otherwise leave blank for moles and cal/mole.')
-                        sys.exit(1)
-
-                if units_A == 'molecules':
-                    raise NotImplementedError('Molecules units not '
-                                              'supported, sorry.'
-                                              )
+                units_A, units_E = _parse_units(line)
                 continue
             elif line[0:4].lower() == 'ther':
                 # thermo data is in mechanism file
@@ -192,474 +175,590 @@ def read_mech(mech_filename, therm_filename):
 
             elif key == 'reac':
                 # determine if reaction or auxiliary info line
-
                 if '=' in line:
                     # new reaction
-
-                    cheb_flag = False
-
-                    # get Arrhenius coefficients
-                    line_split = line.split()
-                    n = len(line_split)
-                    reac_A = float(line_split[n - 3])
-                    reac_b = float(line_split[n - 2])
-                    reac_E = float(line_split[n - 1])
-
-                    ind = line.index(line_split[n - 3])
-                    line = line[0:ind].strip()
-
-                    if '<=>' in line:
-                        ind = line.index('<=>')
-                        reac_rev = True
-                        reac_str = line[0:ind].strip()
-                        prod_str = line[ind + 3:].strip()
-                    elif '=>' in line:
-                        ind = line.index('=>')
-                        reac_rev = False
-                        reac_str = line[0:ind].strip()
-                        prod_str = line[ind + 2:].strip()
-                    else:
-                        ind = line.index('=')
-                        reac_rev = True
-                        reac_str = line[0:ind].strip()
-                        prod_str = line[ind + 1:].strip()
-
-                    thd = False
-                    pdep = False
-                    pdep_sp = ''
-
-                    reac_spec = []
-                    reac_nu = []
-                    prod_spec = []
-                    prod_nu = []
-
-                    # reactants
-
-                    # look for third-body species
-                    sub_str = reac_str
-                    while '(' in sub_str:
-                        ind1 = sub_str.find('(')
-                        ind2 = sub_str.find(')')
-
-                        # Need to check if '+' is first character inside
-                        # parentheses and not embedded within parentheses
-                        # (e.g., '(+)').
-                        # If not, part of species name.
-                        inParen = sub_str[ind1 + 1: ind2].strip()
-                        if inParen is '+':
-                            # '+' embedded within parentheses
-                            sub_str = sub_str[ind2 + 1:]
-                        elif inParen[0] is '+':
-                            pdep = True
-
-                            # either 'm' or a specific species
-                            pdep_sp = sub_str[ind1 + 1: ind2].replace('+', ' ')
-                            pdep_sp = pdep_sp.strip()
-
-                            if pdep_sp.lower() == 'm':
-                                thd = True
-                                pdep_sp = ''
-
-                            # now remove from string
-                            ind = reac_str.find(sub_str)
-                            reac_str = (reac_str[0: ind1 + ind] +
-                                        reac_str[ind2 + ind + 1:]
-                                        )
-                            break
-                        else:
-                            # Part of species name, remove from substring
-                            # and look at rest of reactant line.
-                            sub_str = sub_str[ind2 + 1:]
-
-                    reac_list = reac_str.split('+')
-
-                    # Check for empty list elements, meaning there were
-                    # multiple '+' in a row, which indicates species'
-                    # name ended in '+'.
-                    while '' in reac_list:
-                        ind = reac_list.index('')
-                        reac_list[ind - 1] = reac_list[ind - 1] + '+'
-                        del reac_list[ind]
-
-                    # check for any species with '(+)' that was split apart
-                    for sp in reac_list:
-                        ind = reac_list.index(sp)
-
-                        # ensure not last entry
-                        if (ind < len(reac_list) - 1):
-                            spNext = reac_list[ind + 1]
-                            if sp[len(sp) - 1] is '(' and spNext[0] is ')':
-                                reac_list[ind] = sp + '+' + spNext
-                                del reac_list[ind + 1]
-
-                    for sp in reac_list:
-
-                        sp = sp.strip()
-
-                        # look for coefficient
-                        if sp[0:1].isdigit():
-                            # starts with number (coefficient)
-
-                            # search for first letter
-                            for i in range(len(sp)):
-                                if sp[i: i + 1].isalpha(): break
-
-                            nu = sp[0:i]
-                            if '.' in nu:
-                                # float
-                                nu = float(nu)
-                            else:
-                                # integer
-                                nu = int(nu)
-
-                            sp = sp[i:].strip()
-                        else:
-                            # no coefficient given
-                            nu = 1
-
-                        # check for third body
-                        if sp.lower() == 'm':
-                            thd = True
-                            continue
-
-                        # check if species already in reaction
-                        if sp not in reac_spec:
-                            # new reactant
-                            reac_spec.append(sp)
-                            reac_nu.append(nu)
-                        else:
-                            # existing reactant
-                            i = reac_spec.index(sp)
-                            reac_nu[i] += nu
-
-                    # products
-
-                    # look for third-body species
-                    sub_str = prod_str
-                    while '(' in sub_str:
-                        ind1 = sub_str.find('(')
-                        ind2 = sub_str.find(')')
-
-                        # Need to check if '+' is first character inside
-                        # parentheses and not embedded within parentheses
-                        # (e.g., '(+)'). If not, part of species name.
-                        inParen = sub_str[ind1 + 1: ind2].strip()
-                        if inParen is '+':
-                            # '+' embedded within parentheses
-                            sub_str = sub_str[ind2 + 1:]
-                        elif inParen[0] is '+':
-                            pdep = True
-
-                            # either 'm' or a specific species
-                            pdep_sp = sub_str[ind1 + 1: ind2].replace('+', ' ')
-                            pdep_sp = pdep_sp.strip()
-
-                            if pdep_sp.lower() == 'm':
-                                thd = True
-                                pdep_sp = ''
-
-                            # now remove from string
-                            ind = prod_str.find(sub_str)
-                            prod_str = (prod_str[0: ind1 + ind] +
-                                        prod_str[ind2 + ind + 1:]
-                                        )
-                            break
-                        else:
-                            # Part of species name, remove from substring and
-                            # look at rest of product line.
-                            sub_str = sub_str[ind2 + 1:]
-
-                    prod_list = prod_str.split('+')
-
-                    # Check for empty list elements, meaning there were
-                    # multiple '+' in a row, which indicates species
-                    # name ended in '+'.
-                    while '' in prod_list:
-                        ind = prod_list.index('')
-                        prod_list[ind - 1] = prod_list[ind - 1] + '+'
-                        del prod_list[ind]
-
-                    # check for any species with '(+)' that was split apart
-                    for sp in prod_list:
-                        ind = prod_list.index(sp)
-
-                        # ensure not last entry
-                        if (ind < len(prod_list) - 1):
-                            spNext = prod_list[ind + 1]
-                            if sp[len(sp) - 1] is '(' and spNext[0] is ')':
-                                prod_list[ind] = sp + '+' + spNext
-                                del prod_list[ind + 1]
-
-                    for sp in prod_list:
-
-                        sp = sp.strip()
-
-                        # look for coefficient
-                        if sp[0:1].isdigit():
-                            # starts with number (coefficient)
-
-                            # search for first letter
-                            for i in range(len(sp)):
-                                if sp[i: i + 1].isalpha(): break
-
-                            nu = sp[0:i]
-                            if '.' in nu:
-                                # float
-                                nu = float(nu)
-                            else:
-                                # integer
-                                nu = int(nu)
-
-                            sp = sp[i:].strip()
-                        else:
-                            # no coefficient given
-                            nu = 1
-
-                        # check for third body
-                        if sp in ['m', 'M']:
-                            thd = True
-                            continue
-
-                        # check if species already in reaction
-                        if sp not in prod_spec:
-                            # new product
-                            prod_spec.append(sp)
-                            prod_nu.append(nu)
-                        else:
-                            # existing product
-                            i = prod_spec.index(sp)
-                            prod_nu[i] += nu
-
-                    # Don't want to confuse third-body and pressure-dependent
-                    # reactions... they are different!
-                    if pdep:
-                        thd = False
-
-                    # Convert given activation energy units to internal units
-                    reac_E *= act_energy_fact[units_E]
-
-                    # Convert given pre-exponential units to internal units
-                    if units_A == 'moles':
-                        reac_ord = sum(reac_nu)
-                        if thd:
-                            reac_A /= 1000. ** reac_ord
-                        elif pdep:
-                            # Low- (chemically activated bimolecular reaction) or
-                            # high-pressure (fall-off reaction) limit parameters
-                            reac_A /= 1000. ** (reac_ord - 1.)
-                        else:
-                            # Elementary reaction
-                            reac_A /= 1000. ** (reac_ord - 1.)
-
-                    # add reaction to list
-                    reac = chem.ReacInfo(reac_rev, reac_spec, reac_nu,
-                                         prod_spec, prod_nu, reac_A, reac_b,
-                                         reac_E
-                                         )
-                    reac.thd_body = thd
-                    reac.pdep = pdep
-                    if pdep: reac.pdep_sp = pdep_sp
-
-                    reacs.append(reac)
-
+                    reacs.append(_parse_reaction(line, units_A, units_E))
                 else:
                     # auxiliary reaction info
+                    _parse_reaction_aux(line, reacs, units_A, units_E)
 
-                    aux = line[0:3].lower()
-                    if aux == 'dup':
-                        reacs[-1].dup = True
-
-                    elif aux == 'rev':
-                        line = line.replace('/', ' ')
-                        line = line.replace(',', ' ')
-                        line_split = line.split()
-                        par1 = float(line_split[1])
-                        par2 = float(line_split[2])
-                        par3 = float(line_split[3])
-
-                        # Convert reverse activation energy units
-                        par3 *= act_energy_fact[units_E]
-
-                        # Convert reverse pre-exponential factor
-                        if units_A == 'moles':
-                            reac_ord = sum(reacs[-1].prod_nu)
-                            if thd:
-                                par1 /= 1000. ** reac_ord
-                            elif pdep:
-                                # Low- (chemically activated bimolecular reaction) or
-                                # high-pressure (fall-off reaction) limit parameters
-                                par1 /= 1000. ** (reac_ord - 1.)
-                            else:
-                                # Elementary reaction
-                                par1 /= 1000. ** (reac_ord - 1.)
-
-                        # Ensure nonzero reverse coefficients
-                        if par1 != 0.0:
-                            reacs[-1].rev_par.append(par1)
-                            reacs[-1].rev_par.append(par2)
-                            reacs[-1].rev_par.append(par3)
-                        else:
-                            reacs[-1].rev = False
-
-                    elif aux == 'low':
-                        line = line.replace('/', ' ')
-                        line = line.replace(',', ' ')
-                        line_split = line.split()
-                        par1 = float(line_split[1])
-                        par2 = float(line_split[2])
-                        par3 = float(line_split[3])
-
-                        # Convert low-pressure activation energy units
-                        par3 *= act_energy_fact[units_E]
-
-                        # Convert low-pressure pre-exponential factor
-                        if units_A == 'moles':
-                            par1 /= 1000. ** sum(reacs[-1].reac_nu)
-
-                        reacs[-1].low.append(par1)
-                        reacs[-1].low.append(par2)
-                        reacs[-1].low.append(par3)
-
-                    elif aux == 'hig':
-                        line = line.replace('/', ' ')
-                        line = line.replace(',', ' ')
-                        line_split = line.split()
-                        par1 = float(line_split[1])
-                        par2 = float(line_split[2])
-                        par3 = float(line_split[3])
-
-                        # Convert high-pressure activation energy units
-                        par3 *= act_energy_fact[units_E]
-
-                        # Convert high-pressure pre-exponential factor
-                        if units_A == 'moles':
-                            par1 /= 1000. ** (sum(reacs[-1].reac_nu) - 2.)
-
-                        reacs[-1].high.append(par1)
-                        reacs[-1].high.append(par2)
-                        reacs[-1].high.append(par3)
-
-                    elif aux == 'tro':
-                        line = line.replace('/', ' ')
-                        line = line.replace(',', ' ')
-                        line_split = line.split()
-                        reacs[-1].troe = True
-                        par1 = float(line_split[1])
-                        par2 = float(line_split[2])
-                        par3 = float(line_split[3])
-
-                        do_warn = False
-                        if par2 == 0:
-                            do_warn=True
-                            par2 = 1e-30
-                        if par3 == 0:
-                            do_warn=True
-                            par3 = 1e-30
-                        if do_warn:
-                            logging.warn('Troe parameters in reaction {} modified to avoid'
-                                ' division by zero!.'.format(len(reacs)))
-
-                        reacs[-1].troe_par.append(par1)
-                        reacs[-1].troe_par.append(par2)
-                        reacs[-1].troe_par.append(par3)
-
-                        # optional fourth parameter
-                        if len(line_split) > 4:
-                            par4 = float(line_split[4])
-                            reacs[-1].troe_par.append(par4)
-
-                    elif aux == 'sri':
-                        line = line.replace('/', ' ')
-                        line = line.replace(',', ' ')
-                        line_split = line.split()
-                        reacs[-1].sri = True
-                        par1 = float(line_split[1])
-                        par2 = float(line_split[2])
-                        par3 = float(line_split[3])
-                        reacs[-1].sri_par.append(par1)
-                        reacs[-1].sri_par.append(par2)
-                        reacs[-1].sri_par.append(par3)
-
-                        # optional fourth and fifth parameters
-                        if len(line_split) > 4:
-                            par4 = float(line_split[4])
-                            par5 = float(line_split[5])
-                            reacs[-1].sri_par.append(par4)
-                            reacs[-1].sri_par.append(par5)
-                    elif aux == 'che':
-                        reacs[-1].cheb = True
-                        line = line.replace('/', ' ')
-                        line_split = line.split()
-                        if cheb_flag:
-                            for par in line_split[1:]:
-                                reacs[-1].cheb_par.append(float(par))
-                        else:
-                            # first CHEB line
-                            cheb_flag = True
-                            # Don't want Cheb reactions lumped in with
-                            # standard falloff.
-                            reacs[-1].pdep = False
-                            reacs[-1].cheb_n_temp = int(line_split[1])
-                            reacs[-1].cheb_n_pres = int(line_split[2])
-                            reacs[-1].cheb_par = []
-                            for par in line_split[3:]:
-                                reacs[-1].cheb_par.append(float(par))
-                    elif aux == 'pch':
-                        line = line.replace('/', ' ')
-                        line_split = line.split()
-                        # Convert pressure from atm to Pa
-                        reacs[-1].cheb_plim = [float(line_split[1]) * chem.PA,
-                                               float(line_split[2]) * chem.PA
-                                               ]
-
-                        # Look for temperature limits on same line:
-                        if line_split[3].lower() == 'tcheb':
-                            reacs[-1].cheb_tlim = [float(line_split[4]),
-                                                   float(line_split[5])
-                                                   ]
-                    elif aux == 'tch':
-                        line = line.replace('/', ' ')
-                        line_split = line.split()
-                        reacs[-1].cheb_tlim = [float(line_split[1]),
-                                               float(line_split[2])
-                                               ]
-                        # Look for pressure limits on same line:
-                        if line_split[3].lower() == 'pcheb':
-                            reacs[-1].cheb_plim = [float(line_split[4]) * chem.PA,
-                                                   float(line_split[5]) * chem.PA
-                                                   ]
-                    elif aux == 'plo':
-                        line = line.replace('/', ' ')
-                        line_split = line.split()
-                        if not reacs[-1].plog:
-                            reacs[-1].plog = True
-                            # Don't want Plog reactions lumped in with
-                            # standard falloff.
-                            reacs[-1].pdep = False
-                            reacs[-1].plog_par = []
-                        pars = [float(n) for n in line_split[1:5]]
-
-                        # Convert pressure from atm to Pa
-                        pars[0] *= 101325.0
-
-                        # Convert given activation energy units to internal units
-                        pars[3] *= act_energy_fact[units_E]
-
-                        # Convert given pre-exponential units to internal units
-                        if units_A == 'moles':
-                            reac_ord = sum(reacs[-1].reac_nu)
-                            # Looks like elementary reaction
-                            pars[1] /= 1000. ** (reac_ord - 1.)
-
-                        reacs[-1].plog_par.append(pars)
-                    else:
-                        # enhanced third body efficiencies
-                        line = line.replace('/', ' ')
-                        line_split = line.split()
-                        for i in range(0, len(line_split), 2):
-                            pair = [line_split[i], float(line_split[i + 1])]
-                            reacs[-1].thd_body_eff.append(pair)
+    return _finish_mech(elems, specs, reacs, units_A, therm_filename,
+                        read_thermo)
+
+
+def _parse_units(line):
+    """Returns the units of the Arrhenius coefficients on a REACTIONS line.
+
+    Parameters
+    ----------
+    line : str
+        The REACTIONS line, e.g., 'REACTIONS MOLES KELVINS'
+
+    Returns
+    -------
+    units_A : str
+        Units of the pre-exponential factor, see `pre_units`
+    units_E : str
+        Units of the activation energy, see `act_energy_units`
+
+    """
+    # default units from Chemkin
+    units_E = 'cal/mole'
+    units_A = 'moles'
+
+    # get Arrhenius coefficient units (if specified)
+    for unit in line.split()[1:]:
+        if unit.lower() in pre_units:
+            units_A = unit.lower()
+        elif unit.lower() in act_energy_units:
+            units_E = unit.lower()
+        else:
+            print('Error: unsupported units on REACTION line.')
+            print('For pre-exponential factor, choose from: ' +
+                  pre_units
+                  )
+            print('For activation energy, choose from: ' +
+                  act_energy_units
+                  )
+            print('Otherwise leave blank for moles and cal/mole.')
+            sys.exit(1)
+
+    if units_A == 'molecules':
+        raise NotImplementedError('Molecules units not '
+                                  'supported, sorry.'
+                                  )
+
+    return units_A, units_E
+
+
+def _parse_reaction(line, units_A, units_E):
+    """Interprets the line of a new reaction.
+
+    Parameters
+    ----------
+    line : str
+        The reaction line, with comments and surrounding whitespace removed
+    units_A : str
+        Units of the pre-exponential factor
+    units_E : str
+        Units of the activation energy
+
+    Returns
+    -------
+    reac : `ReacInfo`
+        The new reaction
 
+    """
+
+    # get Arrhenius coefficients
+    line_split = line.split()
+    n = len(line_split)
+    reac_A = float(line_split[n - 3])
+    reac_b = float(line_split[n - 2])
+    reac_E = float(line_split[n - 1])
+
+    ind = line.index(line_split[n - 3])
+    line = line[0:ind].strip()
+
+    if '<=>' in line:
+        ind = line.index('<=>')
+        reac_rev = True
+        reac_str = line[0:ind].strip()
+        prod_str = line[ind + 3:].strip()
+    elif '=>' in line:
+        ind = line.index('=>')
+        reac_rev = False
+        reac_str = line[0:ind].strip()
+        prod_str = line[ind + 2:].strip()
+    else:
+        ind = line.index('=')
+        reac_rev = True
+        reac_str = line[0:ind].strip()
+        prod_str = line[ind + 1:].strip()
+
+    thd = False
+    pdep = False
+    pdep_sp = ''
+
+    reac_spec = []
+    reac_nu = []
+    prod_spec = []
+    prod_nu = []
+
+    # reactants
+
+    # look for third-body species
+    sub_str = reac_str
+    while '(' in sub_str:
+        ind1 = sub_str.find('(')
+        ind2 = sub_str.find(')')
+
+        # Need to check if '+' is first character inside
+        # parentheses and not embedded within parentheses
+        # (e.g., '(+)').
+        # If not, part of species name.
+        inParen = sub_str[ind1 + 1: ind2].strip()
+        if inParen is '+':
+            # '+' embedded within parentheses
+            sub_str = sub_str[ind2 + 1:]
+        elif inParen[0] is '+':
+            pdep = True
+
+            # either 'm' or a specific species
+            pdep_sp = sub_str[ind1 + 1: ind2].replace('+', ' ')
+            pdep_sp = pdep_sp.strip()
+
+            if pdep_sp.lower() == 'm':
+                thd = True
+                pdep_sp = ''
+
+            # now remove from string
+            ind = reac_str.find(sub_str)
+            reac_str = (reac_str[0: ind1 + ind] +
+                        reac_str[ind2 + ind + 1:]
+                        )
+            break
+        else:
+            # Part of species name, remove from substring
+            # and look at rest of reactant line.
+            sub_str = sub_str[ind2 + 1:]
+
+    reac_list = reac_str.split('+')
+
+    # Check for empty list elements, meaning there were
+    # multiple '+' in a row, which indicates species'
+    # name ended in '+'.
+    while '' in reac_list:
+        ind = reac_list.index('')
+        reac_list[ind - 1] = reac_list[ind - 1] + '+'
+        del reac_list[ind]
+
+    # check for any species with '(+)' that was split apart
+    for sp in reac_list:
+        ind = reac_list.index(sp)
+
+        # ensure not last entry
+        if (ind < len(reac_list) - 1):
+            spNext = reac_list[ind + 1]
+            if sp[len(sp) - 1] is '(' and spNext[0] is ')':
+                reac_list[ind] = sp + '+' + spNext
+                del reac_list[ind + 1]
+
+    for sp in reac_list:
+
+        sp = sp.strip()
+
+        # look for coefficient
+        if sp[0:1].isdigit():
+            # starts with number (coefficient)
+
+            # search for first letter
+            for i in range(len(sp)):
+                if sp[i: i + 1].isalpha(): break
+
+            nu = sp[0:i]
+            if '.' in nu:
+                # float
+                nu = float(nu)
+            else:
+                # integer
+                nu = int(nu)
+
+            sp = sp[i:].strip()
+        else:
+            # no coefficient given
+            nu = 1
+
+        # check for third body
+        if sp.lower() == 'm':
+            thd = True
+            continue
+
+        # check if species already in reaction
+        if sp not in reac_spec:
+            # new reactant
+            reac_spec.append(sp)
+            reac_nu.append(nu)
+        else:
+            # existing reactant
+            i = reac_spec.index(sp)
+            reac_nu[i] += nu
+
+    # products
+
+    # look for third-body species
+    sub_str = prod_str
+    while '(' in sub_str:
+        ind1 = sub_str.find('(')
+        ind2 = sub_str.find(')')
+
+        # Need to check if '+' is first character inside
+        # parentheses and not embedded within parentheses
+        # (e.g., '(+)'). If not, part of species name.
+        inParen = sub_str[ind1 + 1: ind2].strip()
+        if inParen is '+':
+            # '+' embedded within parentheses
+            sub_str = sub_str[ind2 + 1:]
+        elif inParen[0] is '+':
+            pdep = True
+
+            # either 'm' or a specific species
+            pdep_sp = sub_str[ind1 + 1: ind2].replace('+', ' ')
+            pdep_sp = pdep_sp.strip()
+
+            if pdep_sp.lower() == 'm':
+                thd = True
+                pdep_sp = ''
+
+            # now remove from string
+            ind = prod_str.find(sub_str)
+            prod_str = (prod_str[0: ind1 + ind] +
+                        prod_str[ind2 + ind + 1:]
+                        )
+            break
+        else:
+            # Part of species name, remove from substring and
+            # look at rest of product line.
+            sub_str = sub_str[ind2 + 1:]
+
+    prod_list = prod_str.split('+')
+
+    # Check for empty list elements, meaning there were
+    # multiple '+' in a row, which indicates species
+    # name ended in '+'.
+    while '' in prod_list:
+        ind = prod_list.index('')
+        prod_list[ind - 1] = prod_list[ind - 1] + '+'
+        del prod_list[ind]
+
+    # check for any species with '(+)' that was split apart
+    for sp in prod_list:
+        ind = prod_list.index(sp)
+
+        # ensure not last entry
+        if (ind < len(prod_list) - 1):
+            spNext = prod_list[ind + 1]
+            if sp[len(sp) - 1] is '(' and spNext[0] is ')':
+                prod_list[ind] = sp + '+' + spNext
+                del prod_list[ind + 1]
+
+    for sp in prod_list:
+
+        sp = sp.strip()
+
+        # look for coefficient
+        if sp[0:1].isdigit():
+            # starts with number (coefficient)
+
+            # search for first letter
+            for i in range(len(sp)):
+                if sp[i: i + 1].isalpha(): break
+
+            nu = sp[0:i]
+            if '.' in nu:
+                # float
+                nu = float(nu)
+            else:
+                # integer
+                nu = int(nu)
+
+            sp = sp[i:].strip()
+        else:
+            # no coefficient given
+            nu = 1
+
+        # check for third body
+        if sp in ['m', 'M']:
+            thd = True
+            continue
+
+        # check if species already in reaction
+        if sp not in prod_spec:
+            # new product
+            prod_spec.append(sp)
+            prod_nu.append(nu)
+        else:
+            # existing product
+            i = prod_spec.index(sp)
+            prod_nu[i] += nu
+
+    # Don't want to confuse third-body and pressure-dependent
+    # reactions... they are different!
+    if pdep:
+        thd = False
+
+    # Convert given activation energy units to internal units
+    reac_E *= act_energy_fact[units_E]
+
+    # Convert given pre-exponential units to internal units
+    if units_A == 'moles':
+        reac_ord = sum(reac_nu)
+        if thd:
+            reac_A /= 1000. ** reac_ord
+        elif pdep:
+            # Low- (chemically activated bimolecular reaction) or
+            # high-pressure (fall-off reaction) limit parameters
+            reac_A /= 1000. ** (reac_ord - 1.)
+        else:
+            # Elementary reaction
+            reac_A /= 1000. ** (reac_ord - 1.)
+
+    # add reaction to list
+    reac = chem.ReacInfo(reac_rev, reac_spec, reac_nu,
+                         prod_spec, prod_nu, reac_A, reac_b,
+                         reac_E
+                         )
+    reac.thd_body = thd
+    reac.pdep = pdep
+    if pdep: reac.pdep_sp = pdep_sp
+
+    return reac
+
+
+def _parse_reaction_aux(line, reacs, units_A, units_E):
+    """Interprets an auxiliary information line of the last reaction.
+
+    Parameters
+    ----------
+    line : str
+        The auxiliary line, with comments and surrounding whitespace removed
+    reacs : list of `ReacInfo`
+        The reactions read so far, the last of which is updated
+    units_A : str
+        Units of the pre-exponential factor
+    units_E : str
+        Units of the activation energy
+
+    Returns
+    -------
+    None
+
+    """
+
+    aux = line[0:3].lower()
+    if aux == 'dup':
+        reacs[-1].dup = True
+
+    elif aux == 'rev':
+        line = line.replace('/', ' ')
+        line = line.replace(',', ' ')
+        line_split = line.split()
+        par1 = float(line_split[1])
+        par2 = float(line_split[2])
+        par3 = float(line_split[3])
+
+        # Convert reverse activation energy units
+        par3 *= act_energy_fact[units_E]
+
+        # Convert reverse pre-exponential factor
+        if units_A == 'moles':
+            reac_ord = sum(reacs[-1].prod_nu)
+            if reacs[-1].thd_body:
+                par1 /= 1000. ** reac_ord
+            elif reacs[-1].pdep:
+                # Low- (chemically activated bimolecular reaction) or
+                # high-pressure (fall-off reaction) limit parameters
+                par1 /= 1000. ** (reac_ord - 1.)
+            else:
+                # Elementary reaction
+                par1 /= 1000. ** (reac_ord - 1.)
+
+        # Ensure nonzero reverse coefficients
+        if par1 != 0.0:
+            reacs[-1].rev_par.append(par1)
+            reacs[-1].rev_par.append(par2)
+            reacs[-1].rev_par.append(par3)
+        else:
+            reacs[-1].rev = False
+
+    elif aux == 'low':
+        line = line.replace('/', ' ')
+        line = line.replace(',', ' ')
+        line_split = line.split()
+        par1 = float(line_split[1])
+        par2 = float(line_split[2])
+        par3 = float(line_split[3])
+
+        # Convert low-pressure activation energy units
+        par3 *= act_energy_fact[units_E]
+
+        # Convert low-pressure pre-exponential factor
+        if units_A == 'moles':
+            par1 /= 1000. ** sum(reacs[-1].reac_nu)
+
+        reacs[-1].low.append(par1)
+        reacs[-1].low.append(par2)
+        reacs[-1].low.append(par3)
+
+    elif aux == 'hig':
+        line = line.replace('/', ' ')
+        line = line.replace(',', ' ')
+        line_split = line.split()
+        par1 = float(line_split[1])
+        par2 = float(line_split[2])
+        par3 = float(line_split[3])
+
+        # Convert high-pressure activation energy units
+        par3 *= act_energy_fact[units_E]
+
+        # Convert high-pressure pre-exponential factor
+        if units_A == 'moles':
+            par1 /= 1000. ** (sum(reacs[-1].reac_nu) - 2.)
+
+        reacs[-1].high.append(par1)
+        reacs[-1].high.append(par2)
+        reacs[-1].high.append(par3)
+
+    elif aux == 'tro':
+        line = line.replace('/', ' ')
+        line = line.replace(',', ' ')
+        line_split = line.split()
+        reacs[-1].troe = True
+        par1 = float(line_split[1])
+        par2 = float(line_split[2])
+        par3 = float(line_split[3])
+
+        do_warn = False
+        if par2 == 0:
+            do_warn=True
+            par2 = 1e-30
+        if par3 == 0:
+            do_warn=True
+            par3 = 1e-30
+        if do_warn:
+            logging.warn('Troe parameters in reaction {} modified to avoid'
+                ' division by zero!.'.format(len(reacs)))
+
+        reacs[-1].troe_par.append(par1)
+        reacs[-1].troe_par.append(par2)
+        reacs[-1].troe_par.append(par3)
+
+        # optional fourth parameter
+        if len(line_split) > 4:
+            par4 = float(line_split[4])
+            reacs[-1].troe_par.append(par4)
+
+    elif aux == 'sri':
+        line = line.replace('/', ' ')
+        line = line.replace(',', ' ')
+        line_split = line.split()
+        reacs[-1].sri = True
+        par1 = float(line_split[1])
+        par2 = float(line_split[2])
+        par3 = float(line_split[3])
+        reacs[-1].sri_par.append(par1)
+        reacs[-1].sri_par.append(par2)
+        reacs[-1].sri_par.append(par3)
+
+        # optional fourth and fifth parameters
+        if len(line_split) > 4:
+            par4 = float(line_split[4])
+            par5 = float(line_split[5])
+            reacs[-1].sri_par.append(par4)
+            reacs[-1].sri_par.append(par5)
+    elif aux == 'che':
+        line = line.replace('/', ' ')
+        line_split = line.split()
+        if reacs[-1].cheb:
+            for par in line_split[1:]:
+                reacs[-1].cheb_par.append(float(par))
+        else:
+            # first CHEB line
+            reacs[-1].cheb = True
+            # Don't want Cheb reactions lumped in with
+            # standard falloff.
+            reacs[-1].pdep = False
+            reacs[-1].cheb_n_temp = int(line_split[1])
+            reacs[-1].cheb_n_pres = int(line_split[2])
+            reacs[-1].cheb_par = []
+            for par in line_split[3:]:
+                reacs[-1].cheb_par.append(float(par))
+    elif aux == 'pch':
+        line = line.replace('/', ' ')
+        line_split = line.split()
+        # Convert pressure from atm to Pa
+        reacs[-1].cheb_plim = [float(line_split[1]) * chem.PA,
+                               float(line_split[2]) * chem.PA
+                               ]
+
+        # Look for temperature limits on same line:
+        if line_split[3].lower() == 'tcheb':
+            reacs[-1].cheb_tlim = [float(line_split[4]),
+                                   float(line_split[5])
+                                   ]
+    elif aux == 'tch':
+        line = line.replace('/', ' ')
+        line_split = line.split()
+        reacs[-1].cheb_tlim = [float(line_split[1]),
+                               float(line_split[2])
+                               ]
+        # Look for pressure limits on same line:
+        if line_split[3].lower() == 'pcheb':
+            reacs[-1].cheb_plim = [float(line_split[4]) * chem.PA,
+                                   float(line_split[5]) * chem.PA
+                                   ]
+    elif aux == 'plo':
+        line = line.replace('/', ' ')
+        line_split = line.split()
+        if not reacs[-1].plog:
+            reacs[-1].plog = True
+            # Don't want Plog reactions lumped in with
+            # standard falloff.
+            reacs[-1].pdep = False
+            reacs[-1].plog_par = []
+        pars = [float(n) for n in line_split[1:5]]
+
+        # Convert pressure from atm to Pa
+        pars[0] *= 101325.0
+
+        # Convert given activation energy units to internal units
+        pars[3] *= act_energy_fact[units_E]
+
+        # Convert given pre-exponential units to internal units
+        if units_A == 'moles':
+            reac_ord = sum(reacs[-1].reac_nu)
+            # Looks like elementary reaction
+            pars[1] /= 1000. ** (reac_ord - 1.)
+
+        reacs[-1].plog_par.append(pars)
+    else:
+        # enhanced third body efficiencies
+        line = line.replace('/', ' ')
+        line_split = line.split()
+        for i in range(0, len(line_split), 2):
+            pair = [line_split[i], float(line_split[i + 1])]
+            reacs[-1].thd_body_eff.append(pair)
+
+
+def _finish_mech(elems, specs, reacs, units_A, therm_filename, thermo_reader):
+    """Checks the interpreted mechanism, and reads missing thermo data.
+
+    Parameters
+    ----------
+    elems : list of str
+        List of elements in mechanism.
+    specs : list of `SpecInfo`
+        List of species in mechanism.
+    reacs : list of `ReacInfo`
+        List of reactions in mechanism, reactions with explicit reverse
+        parameters are split in place.
+    units_A : str
+        Units of the pre-exponential factor
+    therm_filename : str
+        Thermodynamic database filename, or ``None``
+    thermo_reader : function
+        Reads the thermodynamic database, with the signature of `read_thermo`
+
+    Returns
+    -------
+    elems : list of str
+        List of elements in mechanism.
+    specs : list of `SpecInfo`
+        List of species in mechanism.
+    reacs : list of `ReacInfo`
+        List of reactions in mechanism.
+
+    """
     # process some reaction auxiliary info
     for idx, reac in enumerate(reacs):
         if reac.cheb:
@@ -692,13 +791,14 @@ def read_mech(mech_filename, therm_filename):
 
     # Split reversible reactions with explicit reverse parameters into
     # two irreversible reactions to match Cantera's behavior
-    for reac in reacs[:]:
+    split_reacs = []
+    for reac in reacs:
+        split_reacs.append(reac)
         if reac.rev_par:
             new_reac = deepcopy(reac)
 
-            idx = reacs.index(reac)
-            reacs[idx].rev = False
-            reacs[idx].rev_par = []
+            reac.rev = False
+            reac.rev_par = []
 
             new_reac.A = new_reac.rev_par[0]
             new_reac.b = new_reac.rev_par[1]
@@ -710,12 +810,13 @@ def read_mech(mech_filename, therm_filename):
             new_reac.reac = reac.prod[:]
             new_reac.reac_nu = reac.prod_nu[:]
 
-            reacs.insert(idx + 1, new_reac)
+            split_reacs.append(new_reac)
+    reacs[:] = split_reacs
 
     # Read seperate thermo file if present and needed
     if any([not sp.mw for sp in specs]):
         if therm_filename:
-            read_thermo(therm_filename, elems, specs)
+            thermo_reader(therm_filename, elems, specs)
         else:
             print('Error: no thermo file specified, but species missing \n'
                   'data. Either specify file, or ensure complete data in\n'
@@ -732,6 +833,7 @@ def read_mech(mech_filename, therm_filename):
     return (elems, specs, reacs)
 
 
+
 def read_thermo(filename, elems, specs):
     """Read and interpret thermodynamic database for species data.
 
@@ -776,7 +878,7 @@ def read_thermo(filename, elems, specs):
         else:
             # no common temperature info
             file.seek(last_line)
-            # default
+            T_ranges = None
 
         # now start reading species thermo info
         while True:
@@ -823,59 +925,8 @@ def read_thermo(filename, elems, specs):
                 line = file.readline()
                 continue
 
-            # now get element composition of species, columns 24:44
-            # each piece of data is 5 characters long (2 for element, 3 for #)
-            elem_str = utils.split_str(line[24:44], 5)
-
-            for e_str in elem_str:
-                e = e_str[0:2].strip()
-                # skip if blank
-                if e == '' or e == '0': continue
-                # may need to convert to float first, in case of e.g. "1."
-                e_num = float(e_str[2:].strip())
-                e_num = int(e_num)
-
-                spec.elem.append([e, e_num])
-
-                # calculate molecular weight
-                spec.mw += e_num * elem_wt[e.lower()]
-
-            # temperatures for species
-            T_spec = utils.read_str_num(line[45:74])
-            T_low = T_spec[0]
-            T_high = T_spec[1]
-            if len(T_spec) == 3:
-                T_com = T_spec[2]
-            else:
-                T_com = T_ranges[1]
-
-            spec.Trange = [T_low, T_com, T_high]
-
-            # second species line
-            line = file.readline()
-            coeffs = utils.split_str(line[0:75], 15)
-            spec.hi[0] = float(coeffs[0])
-            spec.hi[1] = float(coeffs[1])
-            spec.hi[2] = float(coeffs[2])
-            spec.hi[3] = float(coeffs[3])
-            spec.hi[4] = float(coeffs[4])
-
-            # third species line
-            line = file.readline()
-            coeffs = utils.split_str(line[0:75], 15)
-            spec.hi[5] = float(coeffs[0])
-            spec.hi[6] = float(coeffs[1])
-            spec.lo[0] = float(coeffs[2])
-            spec.lo[1] = float(coeffs[3])
-            spec.lo[2] = float(coeffs[4])
-
-            # fourth species line
-            line = file.readline()
-            coeffs = utils.split_str(line[0:75], 15)
-            spec.lo[3] = float(coeffs[0])
-            spec.lo[4] = float(coeffs[1])
-            spec.lo[5] = float(coeffs[2])
-            spec.lo[6] = float(coeffs[3])
+            _read_thermo_entry(spec, [line, file.readline(), file.readline(),
+                                      file.readline()], T_ranges)
 
             # stop reading if all species in mechanism accounted for
             if not next((sp for sp in specs if sp.mw == 0.0), None): break
@@ -883,6 +934,367 @@ def read_thermo(filename, elems, specs):
     return None
 
 
+def _read_thermo_entry(spec, lines, T_ranges):
+    """Interprets the four-line thermodynamic database entry of a species.
+
+    Parameters
+    ----------
+    spec : `SpecInfo`
+        The species, whose composition, molecular weight, temperature
+        ranges and NASA polynomial coefficients are set
+    lines : list of str
+        The four lines of the entry
+    T_ranges : list of float
+        The common temperature ranges, used if the entry has no common
+        temperature.  May be ``None`` if not given in the database.
+
+    Returns
+    -------
+    None
+
+    """
+    line = lines[0]
+
+    # now get element composition of species, columns 24:44
+    # each piece of data is 5 characters long (2 for element, 3 for #)
+    elem_str = utils.split_str(line[24:44], 5)
+
+    for e_str in elem_str:
+        e = e_str[0:2].strip()
+        # skip if blank
+        if e == '' or e == '0': continue
+        # may need to convert to float first, in case of e.g. "1."
+        e_num = float(e_str[2:].strip())
+        e_num = int(e_num)
+
+        spec.elem.append([e, e_num])
+
+        # calculate molecular weight
+        spec.mw += e_num * elem_wt[e.lower()]
+
+    # temperatures for species
+    T_spec = utils.read_str_num(line[45:74])
+    T_low = T_spec[0]
+    T_high = T_spec[1]
+    if len(T_spec) == 3:
+        T_com = T_spec[2]
+    else:
+        T_com = T_ranges[1]
+
+    spec.Trange = [T_low, T_com, T_high]
+
+    # second species line
+    line = lines[1]
+    coeffs = utils.split_str(line[0:75], 15)
+    spec.hi[0] = float(coeffs[0])
+    spec.hi[1] = float(coeffs[1])
+    spec.hi[2] = float(coeffs[2])
+    spec.hi[3] = float(coeffs[3])
+    spec.hi[4] = float(coeffs[4])
+
+    # third species line
+    line = lines[2]
+    coeffs = utils.split_str(line[0:75], 15)
+    spec.hi[5] = float(coeffs[0])
+    spec.hi[6] = float(coeffs[1])
+    spec.lo[0] = float(coeffs[2])
+    spec.lo[1] = float(coeffs[3])
+    spec.lo[2] = float(coeffs[4])
+
+    # fourth species line
+    line = lines[3]
+    coeffs = utils.split_str(line[0:75], 15)
+    spec.lo[3] = float(coeffs[0])
+    spec.lo[4] = float(coeffs[1])
+    spec.lo[5] = float(coeffs[2])
+    spec.lo[6] = float(coeffs[3])
+
+
+def _thermo_name(line):
+    """Returns the species name of the first line of a thermo entry.
+
+    Parameters
+    ----------
+    line : str
+        The first line of the entry
+
+    Returns
+    -------
+    name : str
+        The species name, from columns 0:18
+
+    """
+    name = line[0:18].strip()
+
+    # Apparently, in some cases, notes are in the
+    # columns of shorter species names, so make
+    # sure no spaces.
+    if name.find(' ') > 0:
+        name = name[0: name.find(' ')]
+    return name
+
+
+def _tokenize_thermo(lines):
+    """Splits the lines of a thermodynamic database into tokens.
+
+    Parameters
+    ----------
+    lines : iterator of str
+        The lines of the file, positioned after the THERMO line
+
+    Yields
+    ------
+    kind : {'trange', 'entry'}
+        The common temperature ranges, or the entry of a species
+    value : list of float or list of str
+        The temperatures, or the four lines of the entry
+
+    """
+    # next line either has common temperature ranges or first species
+    line = next(lines, '')
+    line_split = line.split()
+    if line_split and line_split[0][0:1].isdigit():
+        yield 'trange', utils.read_str_num(line)
+    else:
+        # no common temperature info
+        lines = itertools.chain([line], lines)
+
+    for line in lines:
+        if line[0:3].lower() == 'end':
+            break
+
+        # skip blank/commented line
+        stripped = line.lstrip()
+        if not stripped or stripped[0] == '!':
+            continue
+
+        yield 'entry', [line, next(lines, ''), next(lines, ''),
+                        next(lines, '')]
+
+
+def _tokenize_mech(lines):
+    """Splits the lines of a Chemkin-format mechanism into tokens.
+
+    Comments and blank lines are dropped, and each line is assigned to the
+    ELEMENTS, SPECIES, REACTIONS or THERMO section it is in.
+
+    Parameters
+    ----------
+    lines : iterator of str
+        The lines of the file
+
+    Yields
+    ------
+    kind : {'elem', 'spec', 'units', 'reac', 'aux', 'thermo'}
+        A line of elements (and atomic weights) or species, the REACTIONS
+        line, a new reaction, an auxiliary reaction line, or a THERMO
+        section
+    value : str, list of str or generator
+        The line, the words of an ELEMENTS or SPECIES line, or for 'thermo'
+        the tokens of the section, see `_tokenize_thermo`
+
+    """
+    key = ''
+    for line in lines:
+        # Remove trailing and leading whitespace, tabs, newline
+        line = line.strip()
+
+        # skip blank or commented lines
+        if not line or line[0] == '!':
+            continue
+
+        # remove any comments from end of line
+        ind = line.find('!')
+        if ind > 0:
+            line = line[0:ind]
+
+        # now determine key
+        word = line[0:4].lower()
+        if word == 'elem' or word == 'spec':
+            key = word
+
+            # check for any entries on this line
+            line_split = line.split(None, 1)
+            if len(line_split) == 1:
+                continue
+            line = line_split[1]
+        elif word == 'reac':
+            key = 'reac'
+            yield 'units', line
+            continue
+        elif word == 'ther':
+            # thermo data is in mechanism file
+            thermo = _tokenize_thermo(lines)
+            yield 'thermo', thermo
+
+            # skip the rest of the section, if not consumed
+            for token in thermo:
+                pass
+            key = ''
+            continue
+        elif line[0:3].lower() == 'end':
+            key = ''
+            continue
+
+        if key == 'elem':
+            # if any atomic weight declarations, replace / with spaces
+            yield 'elem', line.replace('/', ' ').split()
+        elif key == 'spec':
+            yield 'spec', line.split()
+        elif key == 'reac':
+            # determine if reaction or auxiliary info line
+            yield ('reac' if '=' in line else 'aux'), line
+
+
+def _read_thermo_tokens(tokens, spec_index):
+    """Reads the species thermo data from the tokens of a database.
+
+    Parameters
+    ----------
+    tokens : iterator
+        The tokens of the database, see `_tokenize_thermo`
+    spec_index : dict
+        The `SpecInfo` of each species in the mechanism, by name
+
+    Returns
+    -------
+    None
+
+    """
+    missing = sum(1 for spec in spec_index.values() if not spec.mw)
+    T_ranges = None
+    for kind, value in tokens:
+        # stop reading if all species in mechanism accounted for
+        if not missing:
+            break
+
+        if kind == 'trange':
+            T_ranges = value
+            continue
+
+        # ensure not reading the same species more than once...
+        spec = spec_index.get(_thermo_name(value[0]))
+        if spec is None or spec.mw:
+            continue
+
+        _read_thermo_entry(spec, value, T_ranges)
+        if spec.mw:
+            missing -= 1
+
+
+def read_thermo_stream(filename, elems, specs):
+    """Read and interpret thermodynamic database for species data.
+
+    Equivalent to `read_thermo`, in a single pass over the file.
+
+    Parameters
+    ----------
+    filename : str
+        Name of thermo database file.
+    elems : list of str
+        List of element names in mechanism.
+    specs : list of `SpecInfo`
+        List of species in mechanism.
+
+    Returns
+    -------
+    None
+
+    """
+    spec_index = dict((spec.name, spec) for spec in reversed(specs))
+
+    with open(filename, 'r') as file:
+        lines = iter(file)
+
+        # loop through intro lines
+        for line in lines:
+            # skip blank or commented lines
+            stripped = line.lstrip()
+            if not stripped or stripped[0] == '!':
+                continue
+
+            # skip 'thermo' at beginning
+            if 'thermo' in line.lower():
+                break
+
+        _read_thermo_tokens(_tokenize_thermo(lines), spec_index)
+
+    return None
+
+
+def read_mech_stream(mech_filename, therm_filename):
+    """Read and interpret mechanism file for elements, species, and reactions.
+
+    Equivalent to `read_mech`, but the file is split into tokens in a single
+    pass, species are looked up by name, and thermo data in the mechanism
+    file is read as it is reached.  The run time is linear in the size of
+    the mechanism and thermodynamic database, rather than quadratic in the
+    number of species.
+
+    Parameters
+    ----------
+    mech_filename : str
+        Reaction mechanism filename (e.g. 'mech.dat')
+    therm_filename : str, optional
+        Thermodynamic database filename (e.g., 'therm.dat')
+
+    Returns
+    -------
+    elems : list of str
+        List of elements in mechanism.
+    specs : list of `SpecInfo`
+        List of species in mechanism.
+    reacs : list of `ReacInfo`
+        List of reactions in mechanism.
+
+    Notes
+    -----
+    Doesn't support element names with digits.
+
+    """
+
+    elems = []
+    reacs = []
+    specs = []
+    spec_index = {}
+
+    # default units from Chemkin
+    units_A = 'moles'
+    units_E = 'cal/mole'
+
+    with open(mech_filename, 'r') as file:
+        for kind, value in _tokenize_mech(iter(file)):
+            if kind == 'reac':
+                reacs.append(_parse_reaction(value, units_A, units_E))
+            elif kind == 'aux':
+                _parse_reaction_aux(value, reacs, units_A, units_E)
+            elif kind == 'spec':
+                for s in value:
+                    if s[0:3] == 'end': continue
+                    if s not in spec_index:
+                        spec_index[s] = chem.SpecInfo(s)
+                        specs.append(spec_index[s])
+            elif kind == 'elem':
+                e_last = ''
+                for e in value:
+                    if e.isalpha():
+                        if e[0:3] == 'end': continue
+                        if e not in elems:
+                            elems.append(e)
+                        e_last = e
+                    else:
+                        # either add new element or update existing
+                        # atomic weight
+                        elem_wt[e_last.lower()] = float(e)
+            elif kind == 'units':
+                units_A, units_E = _parse_units(value)
+            elif kind == 'thermo':
+                _read_thermo_tokens(value, spec_index)
+
+    return _finish_mech(elems, specs, reacs, units_A, therm_filename,
+                        read_thermo_stream)
+
+
 def read_mech_ct(filename=None, gas=None):
     """Read and interpret Cantera-format mechanism file.
 
@@ -1135,3 +1547,105 @@ def handle_effiencies(reac, ct_rxn):
         reacs.append(reac)
 
     return (elems, specs, reacs)
+
+
+def get_mech_hash(mech_filename, therm_filename=None):
+    """Returns the key of a mechanism in the parsed-mechanism cache.
+
+    The key is a hash of the contents of the mechanism and thermodynamic
+    database files, and of the pyJac (and for Cantera-format files, the
+    Cantera) version.
+
+    Parameters
+    ----------
+    mech_filename : str
+        Reaction mechanism filename (e.g. 'mech.dat' or 'mech.cti')
+    therm_filename : str, optional
+        Thermodynamic database filename (e.g., 'therm.dat')
+
+    Returns
+    -------
+    key : str
+        The hexadecimal SHA-256 digest
+
+    """
+    sha = hashlib.sha256()
+    sha.update('pyjac {}\n'.format(__version__).encode('utf-8'))
+    if mech_filename.endswith(tuple(['.cti', '.xml'])) and CANTERA_FLAG:
+        sha.update('cantera {}\n'.format(ct.__version__).encode('utf-8'))
+    for filename in [mech_filename, therm_filename]:
+        if filename is None:
+            sha.update(b'\0')
+            continue
+        with open(filename, 'rb') as file:
+            contents = file.read()
+        sha.update('{}\n'.format(len(contents)).encode('utf-8'))
+        sha.update(contents)
+    return sha.hexdigest()
+
+
+def read_mech_cached(mech_filename, therm_filename=None, cache_dir=None):
+    """Read and interpret a mechanism file, through an on-disk cache.
+
+    Chemkin-format files are read with `read_mech_stream`, and Cantera-format
+    files (.cti/.xml) with `read_mech_ct`.  The parsed mechanism is stored
+    in ``cache_dir``, keyed by `get_mech_hash`, and later reads of the same
+    files load the stored mechanism instead.
+
+    Parameters
+    ----------
+    mech_filename : str
+        Reaction mechanism filename (e.g. 'mech.dat' or 'mech.cti')
+    therm_filename : str, optional
+        Thermodynamic database filename (e.g., 'therm.dat')
+    cache_dir : str, optional
+        The cache directory.  If ``None``, the mechanism is always parsed.
+
+    Returns
+    -------
+    elems : list of str
+        List of elements in mechanism.
+    specs : list of `SpecInfo`
+        List of species in mechanism.
+    reacs : list of `ReacInfo`
+        List of reactions in mechanism.
+
+    """
+    def __parse():
+        if mech_filename.endswith(tuple(['.cti', '.xml'])):
+            return read_mech_ct(mech_filename)
+        return read_mech_stream(mech_filename, therm_filename)
+
+    if cache_dir is None:
+        return __parse()
+
+    cache_file = os.path.join(cache_dir, get_mech_hash(
+        mech_filename, therm_filename) + '.pickle')
+    try:
+        with open(cache_file, 'rb') as file:
+            elems, specs, reacs, weights = pickle.load(file)
+        # element weights defined in the mechanism
+        elem_wt.update(weights)
+        logging.info('Loaded parsed mechanism from {}'.format(cache_file))
+        return elems, specs, reacs
+    except (pickle.UnpicklingError, EOFError, IOError, OSError):
+        # not stored, or unreadable
+        pass
+
+    elems, specs, reacs = __parse()
+    weights = dict((e.lower(), elem_wt[e.lower()]) for e in elems
+                   if e.lower() in elem_wt)
+    try:
+        utils.create_dir(cache_dir)
+        # write to a temporary file first, such that concurrent reads never
+        # see a partially written cache file
+        temp_file = cache_file + '.{}.tmp'.format(os.getpid())
+        with open(temp_file, 'wb') as file:
+            pickle.dump((elems, specs, reacs, weights), file,
+                        pickle.HIGHEST_PROTOCOL)
+        os.rename(temp_file, cache_file)
+    except (IOError, OSError) as e:
+        logging.warning('Could not store parsed mechanism in {}: {}'.format(
+            cache_dir, e))
+
+    return elems, specs, reacs
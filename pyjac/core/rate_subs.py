@@ -22,6 +22,7 @@
 from . import cache_optimizer as cache
 from . import mech_auxiliary as aux
 from . import shared_memory as shared
+from . import codegen as cg
 
 
 def rxn_rate_const(A, b, E):
@@ -252,7 +253,8 @@ def get_cheb_rate(lang, rxn, write_defns=True):
 
 
 def write_rxn_rates(path, lang, specs, reacs, fwd_rxn_mapping,
-                    smm=None, auto_diff=False):
+                    smm=None, auto_diff=False, layout='aos',
+                    kc_mode='reaction', hoist_trange=False):
     """Write reaction rate subroutine.
 
     Includes conditionals for reversible reactions.
@@ -273,6 +275,13 @@ def write_rxn_rates(path, lang, specs, reacs, fwd_rxn_mapping,
         If not ``None`` (default), `shared_memory_manager` for CUDA optimizations
     auto_diff : Optional[bool]
         If ``True``, generate files for Adept autodifferention library.
+    layout : {'aos', 'soa'}, optional
+        Memory layout of the generated C code, see `utils.layouts`
+    kc_mode : {'reaction', 'gibbs'}, optional
+        Evaluation of the equilibrium constants, see `utils.kc_modes`
+    hoist_trange : bool, optional
+        If ``True``, the equilibrium constants of all reactions are evaluated
+        under a single conditional per temperature breakpoint.  C only.
 
     Returns
     -------
@@ -305,16 +314,20 @@ def write_rxn_rates(path, lang, specs, reacs, fwd_rxn_mapping,
         file.write('#include "adept.h"\n'
                    'using adept::adouble;\n')
     cuda_cheb = any(rxn.cheb for rxn in reacs) and lang == 'cuda'
-    line = ('{0}void eval_rxn_rates (const {1},'
-               ' const {1}{2}, const {1} * {3}, {1} * {3}, {1} * {3}'
+    soa = layout == 'soa'
+    # in the structure-of-arrays layout, the temperature and pressure
+    # of the block of states are passed as arrays
+    state_type = '{1} *' if soa else '{1}'
+    line = ('{0}void eval_rxn_rates (const ' + state_type + ','
+               ' const ' + state_type + '{2}, const {1} * {3}, {1} * {3}, {1} * {3}'
                + (', {1} * {3}' if cuda_cheb else '') +');\n'
                '{0}void eval_spec_rates (const {1} * {3},'
                ' const {1} * {3}, const {1} * {3}, {1} * {3}, {1} * {3});\n')
     file.write(line.format(pre, double_type, pres_ref, utils.restrict[lang]))
 
     if pdep_reacs:
-        file.write('{0}void get_rxn_pres_mod (const {1}, const '
-                   '{1}{2}, const {1} * {3}, {1} * {3});\n'.format(
+        file.write(('{0}void get_rxn_pres_mod (const ' + state_type + ', const '
+                   + state_type + '{2}, const {1} * {3}, {1} * {3});\n').format(
                    pre, double_type, pres_ref, utils.restrict[lang])
                    )
 
@@ -339,6 +352,8 @@ def write_rxn_rates(path, lang, specs, reacs, fwd_rxn_mapping,
         get_array = smm.get_array
         if not do_unroll:
             smm.write_init(file, indent=2)
+    elif soa:
+        get_array = utils.get_soa_array
 
     def write_header(lang, rate_count):
         """Writes reaction rate header file.
@@ -413,14 +428,25 @@ def write_sub_intro(file, defines, start, end, rate_count=None):
             if auto_diff:
                 file.write('#include "adept.h"\n'
                             'using adept::adouble;\n')
-            line += ('void eval_rxn_rates{0} (const {1} T, const {1}{2} pres,'
-                     ' const {1} * {3} C, {1} * {3} fwd_rxn_rates, '
-                     '{1} * {3} rev_rxn_rates{4}) {{\n'.format(
-                     '_{}'.format(rate_count) if rate_count is not None else '',
-                     double_type, pres_ref, utils.restrict[lang],
-                     ', {} * {} dot_prod'.format(double_type, utils.restrict[lang]) if cuda_cheb else ''
-                     )
-                     )
+            if soa:
+                line += ('void eval_rxn_rates (const {0} * {1} T_vec,'
+                         ' const {0} * {1} pres_vec, const {0} * {1} C,'
+                         ' {0} * {1} fwd_rxn_rates, {0} * {1} rev_rxn_rates) '
+                         '{{\n'.format(double_type, utils.restrict[lang])
+                         )
+                # the pressure is only needed by PLOG and Chebyshev rates
+                line += utils.soa_loop_start(
+                    ['T'] + (['pres'] if any(rxn.plog or rxn.cheb
+                                             for rxn in my_reacs) else []))
+            else:
+                line += ('void eval_rxn_rates{0} (const {1} T, const {1}{2} pres,'
+                         ' const {1} * {3} C, {1} * {3} fwd_rxn_rates, '
+                         '{1} * {3} rev_rxn_rates{4}) {{\n'.format(
+                         '_{}'.format(rate_count) if rate_count is not None else '',
+                         double_type, pres_ref, utils.restrict[lang],
+                         ', {} * {} dot_prod'.format(double_type, utils.restrict[lang]) if cuda_cheb else ''
+                         )
+                         )
         elif lang == 'fortran':
             line += ('subroutine eval_rxn_rates(T, pres, C, fwd_rxn_rates,'
                      ' rev_rxn_rates)\n\n'
@@ -537,9 +563,9 @@ def write_sub_intro(file, defines, start, end, rate_count=None):
     rrange = (0, len(reacs)) if not do_unroll else (0, CUDAParams.Rates_Unroll)
     write_sub_intro(file, not do_unroll, rrange[0], rrange[1])
 
-    def __get_arrays(sp, factor=1.0):
+    def __get_arrays(sp, nu):
         # put together all our coeffs
-        lo_array = [nu * factor] + [
+        lo_array = [nu] + [
             sp.lo[6], sp.lo[0], sp.lo[0] - 1.0, sp.lo[1] / 2.0,
             sp.lo[2] / 6.0, sp.lo[3] / 12.0, sp.lo[4] / 20.0,
             sp.lo[5]
@@ -549,7 +575,7 @@ def __get_arrays(sp, factor=1.0):
                     [lo_array[1] - lo_array[2]] + lo_array[3:]
                     ]
 
-        hi_array = [nu * factor] + [
+        hi_array = [nu] + [
             sp.hi[6], sp.hi[0], sp.hi[0] - 1.0, sp.hi[1] / 2.0,
             sp.hi[2] / 6.0, sp.hi[3] / 12.0, sp.hi[4] / 20.0,
             sp.hi[5]
@@ -560,11 +586,210 @@ def __get_arrays(sp, factor=1.0):
                     ]
         return lo_array, hi_array
 
+    def __get_net_nu(rxn):
+        # the net stoichiometric coefficients of a reaction
+        return tuple((isp, utils.get_nu(isp, rxn)) for isp in
+                     sorted(set(rxn.reac + rxn.prod))
+                     if utils.get_nu(isp, rxn))
+
+    # common subexpression elimination of the equilibrium constants, the
+    # number of reactions with each net stoichiometry
+    kc_count = {}
+    if lang in ['c', 'cuda']:
+        for rxn in reacs:
+            if rxn.rev and not rxn.rev_par:
+                key = __get_net_nu(rxn)
+                kc_count[key] = kc_count.get(key, 0) + 1
+    # the stored equilibrium constants available in the current subroutine
+    kc_names = {}
+
+    def __get_kc_coeffs(i_rxn):
+        # the coefficients of the equilibrium constant polynomial for each
+        # temperature breakpoint, and the sum of stoichiometric coefficients
+        rxn = reacs[i_rxn]
+
+        # sum of stoichiometric coefficients
+        sum_nu = 0
+
+        coeffs = {}
+        # go through product species
+        for isp, prod_sp in enumerate(rxn.prod):
+            # check if species also in reactants
+            if prod_sp in rxn.reac:
+                isp2 = rxn.reac.index(prod_sp)
+                nu = rxn.prod_nu[isp] - rxn.reac_nu[isp2]
+            else:
+                nu = rxn.prod_nu[isp]
+
+            # Skip species with zero overall
+            # stoichiometric coefficient.
+            if (nu == 0):
+                continue
+
+            sum_nu += nu
+
+            # get species object
+            sp = specs[prod_sp]
+            if not sp:
+                print('Error: species ' + prod_sp + ' in reaction '
+                      '{} not found.\n'.format(i_rxn)
+                      )
+                sys.exit()
+
+            lo_array, hi_array = __get_arrays(sp, nu)
+
+            if not sp.Trange[1] in coeffs:
+                coeffs[sp.Trange[1]] = lo_array, hi_array
+            else:
+                coeffs[sp.Trange[1]] = [
+                    lo_array[i] + coeffs[sp.Trange[1]][0][i]
+                    for i in range(len(lo_array))
+                    ], [
+                    hi_array[i] + coeffs[sp.Trange[1]][1][i]
+                    for i in range(len(hi_array))
+                    ]
+
+        # now loop through reactants
+        for isp, reac_sp in enumerate(rxn.reac):
+            # Check if species also in products;
+            # if so, already considered).
+            if reac_sp in rxn.prod: continue
+
+            nu = rxn.reac_nu[isp]
+            sum_nu -= nu
+
+            # get species object
+            sp = specs[reac_sp]
+            if not sp:
+                print('Error: species ' + reac_sp + ' in reaction '
+                      '{} not found.\n'.format(i_rxn)
+                      )
+                sys.exit()
+
+            lo_array, hi_array = __get_arrays(sp, -nu)
+
+            if not sp.Trange[1] in coeffs:
+                coeffs[sp.Trange[1]] = lo_array, hi_array
+            else:
+                coeffs[sp.Trange[1]] = [
+                    lo_array[i] +
+                    coeffs[sp.Trange[1]][0][i]
+                    for i in range(len(lo_array))
+                    ], [hi_array[i] +
+                    coeffs[sp.Trange[1]][1][i]
+                    for i in range(len(hi_array))
+                    ]
+
+        return coeffs, sum_nu
+
+    # the local (thermodynamic) arrays are always in the usual layout
+    emitter = cg.Emitter(lang, utils.get_array, double_type)
+    T = cg.Var('T')
+
+    def __get_kc_poly(array):
+        # the equilibrium constant polynomial with the given coefficients
+        return cg.Paren(cg.Sum([
+            cg.Literal(array[0]),
+            cg.Product([cg.Literal(array[1]), cg.Var('logT')]),
+            cg.Product([T, cg.horner(T, array[2:6])]),
+            cg.Neg(cg.Div(cg.Literal(array[6]), T))
+            ]))
+
+    def __get_kc_def(key, i_rxn):
+        # the name of, and the start of the line defining, the
+        # equilibrium constant of reaction i_rxn
+        if kc_count.get(key, 0) > 1:
+            # store for the reactions sharing the equilibrium constant
+            kc = 'Kc_{}'.format(i_rxn)
+            kc_names[key] = kc
+            return kc, '  {} {} = '.format('register double' if lang == 'cuda'
+                                           else double_type, kc)
+        return 'Kc', '  Kc = '
+
+    def __write_smh(file):
+        # the species (S - H) / RT (less log(T), the conversion to
+        # concentration units), for all species in equilibrium constants
+        t_mid = {}
+        for isp in sorted(set(isp for rxn in reacs
+                              if rxn.rev and not rxn.rev_par
+                              for isp, nu in __get_net_nu(rxn))):
+            t_mid.setdefault(specs[isp].Trange[1], []).append(isp)
+        if not t_mid:
+            return
+
+        def __smh(c):
+            return cg.Sum([cg.Literal(c[6] - c[0])] + [
+                cg.Product([cg.Literal(coeff), cg.Var(var)]) for coeff, var
+                in [(c[0] - 1.0, 'logT'), (c[1] / 2.0, 'T'),
+                    (c[2] / 6.0, 'T2'), (c[3] / 12.0, 'T3'),
+                    (c[4] / 20.0, 'T4'), (-c[5], 'T_inv')]
+                ])
+
+        statements = [
+            cg.Comment('species (S - H) / RT - log(T)'),
+            cg.Declare('smh', num_s),
+            cg.Declare('T2', expr=cg.Product([T, T])),
+            cg.Declare('T3', expr=cg.Product([cg.Var('T2'), T])),
+            cg.Declare('T4', expr=cg.Product([cg.Var('T3'), T])),
+            cg.Declare('T_inv', expr=cg.Div(cg.Literal(1.0, '{}'), T))
+            ]
+        for T_mid in sorted(t_mid):
+            statements.append(cg.If(
+                'T <= {:}'.format(T_mid),
+                [cg.Assign(cg.ArrayRef('smh', isp), __smh(specs[isp].lo))
+                 for isp in t_mid[T_mid]],
+                [cg.Assign(cg.ArrayRef('smh', isp), __smh(specs[isp].hi))
+                 for isp in t_mid[T_mid]]
+                ))
+        statements.append(cg.Blank())
+        emitter.write(file, statements)
+
+    # the index of each equilibrium constant exponent
+    kc_exp_index = {}
+
+    def __write_kc_exp(file):
+        # the equilibrium constant exponents of all reactions, grouped by
+        # the temperature breakpoints
+        t_mid = {}
+        for i_rxn, rxn in enumerate(reacs):
+            if not rxn.rev or rxn.rev_par:
+                continue
+            key = __get_net_nu(rxn)
+            if key in kc_exp_index:
+                continue
+            kc_exp_index[key] = len(kc_exp_index)
+            coeffs, sum_nu = __get_kc_coeffs(i_rxn)
+            for T_mid in coeffs:
+                t_mid.setdefault(T_mid, []).append(
+                    (kc_exp_index[key], coeffs[T_mid]))
+        if not t_mid:
+            return
+
+        statements = [cg.Comment('equilibrium constant exponents'),
+                      cg.Declare('Kc_exp', len(kc_exp_index))]
+        assigned = set()
+        for T_mid in sorted(t_mid):
+            branches = [[cg.Assign(cg.ArrayRef('Kc_exp', index),
+                                   __get_kc_poly(arrays[i]),
+                                   '+=' if index in assigned else '=')
+                         for index, arrays in t_mid[T_mid]]
+                        for i in range(2)]
+            statements.append(cg.If('T <= {:}'.format(T_mid), *branches))
+            assigned.update(index for index, arrays in t_mid[T_mid])
+        statements.append(cg.Blank())
+        emitter.write(file, statements)
+
+    if kc_mode == 'gibbs':
+        __write_smh(file)
+    elif hoist_trange:
+        __write_kc_exp(file)
+
     for i_rxn in range(len(reacs)):
         if do_unroll and i_rxn == next_file:
             file_store = file
             file = open(os.path.join(path, 'rates', 'rxn_rates_{}{}'.format(
                 rate_count, utils.file_ext[lang])), 'w')
+            kc_names = {}
             next_file = min(len(reacs), i_rxn + CUDAParams.Rates_Unroll)
             write_sub_intro(file, True, i_rxn + 1, next_file, rate_count)
             rate_count += 1
@@ -661,153 +886,99 @@ def __get_arrays(sp, factor=1.0):
 
             if not rxn.rev_par:
 
-                # line = '  Kc = 0.0' + utils.line_end[lang]
-                # file.write(line)
-
-                # sum of stoichiometric coefficients
-                sum_nu = 0
-
-                coeffs = {}
-                # go through product species
-                for isp, prod_sp in enumerate(rxn.prod):
-                    # check if species also in reactants
-                    if prod_sp in rxn.reac:
-                        isp2 = rxn.reac.index(prod_sp)
-                        nu = rxn.prod_nu[isp] - rxn.reac_nu[isp2]
-                    else:
-                        nu = rxn.prod_nu[isp]
-
-                    # Skip species with zero overall
-                    # stoichiometric coefficient.
-                    if (nu == 0):
-                        continue
-
-                    sum_nu += nu
-
-                    # get species object
-                    sp = specs[prod_sp]
-                    if not sp:
-                        print('Error: species ' + prod_sp + ' in reaction '
-                              '{} not found.\n'.format(i_rxn)
-                              )
-                        sys.exit()
-
-                    lo_array, hi_array = __get_arrays(sp)
-
-                    if not sp.Trange[1] in coeffs:
-                        coeffs[sp.Trange[1]] = lo_array, hi_array
-                    else:
-                        coeffs[sp.Trange[1]] = [
-                            lo_array[i] + coeffs[sp.Trange[1]][0][i]
-                            for i in range(len(lo_array))
-                            ], [
-                            hi_array[i] + coeffs[sp.Trange[1]][1][i]
-                            for i in range(len(hi_array))
-                            ]
-
-                # now loop through reactants
-                for isp, reac_sp in enumerate(rxn.reac):
-                    # Check if species also in products;
-                    # if so, already considered).
-                    if reac_sp in rxn.prod: continue
-
-                    nu = rxn.reac_nu[isp]
-                    sum_nu -= nu
-
-                    # get species object
-                    sp = specs[reac_sp]
-                    if not sp:
-                        print('Error: species ' + reac_sp + ' in reaction '
-                              '{} not found.\n'.format(i_rxn)
-                              )
-                        sys.exit()
-
-                    lo_array, hi_array = __get_arrays(sp, factor=-1.0)
-
-                    if not sp.Trange[1] in coeffs:
-                        coeffs[sp.Trange[1]] = lo_array, hi_array
-                    else:
-                        coeffs[sp.Trange[1]] = [
-                            lo_array[i] +
-                            coeffs[sp.Trange[1]][0][i]
-                            for i in range(len(lo_array))
-                            ], [hi_array[i] +
-                            coeffs[sp.Trange[1]][1][i]
-                            for i in range(len(hi_array))
-                            ]
-
-                isFirst = True
-                for T_mid in coeffs:
-                    # need temperature conditional for equilibrium constants
-                    line = '  if (T <= {:})'.format(T_mid)
-                    if lang in ['c', 'cuda']:
-                        line += ' {\n'
-                    elif lang == 'fortran':
-                        line += ' then\n'
-                    elif lang == 'matlab':
-                        line += '\n'
-                    file.write(line)
-
-                    lo_array, hi_array = coeffs[T_mid]
-
-                    if isFirst:
-                        line = '    Kc = '
-                    else:
-                        if lang in ['cuda', 'c']:
-                            line = '    Kc += '
+                key = __get_net_nu(rxn)
+                kc = 'Kc'
+                if key in kc_names:
+                    # identical net stoichiometry (and hence thermodynamic
+                    # ranges) as an earlier reaction, reuse its Kc
+                    kc = kc_names[key]
+                elif kc_mode == 'gibbs':
+                    # weighted sum of the species (S - H) / RT
+                    kc, line = __get_kc_def(key, i_rxn)
+                    smh_sum = ''
+                    for isp, nu in key:
+                        smh = utils.get_array(lang, 'smh', isp)
+                        if nu == 1:
+                            smh_sum += ' + ' + smh
+                        elif nu == -1:
+                            smh_sum += ' - ' + smh
                         else:
-                            line = '    Kc = Kc + '
-                    line += ('({:.16e} + '.format(lo_array[0]) +
-                             '{:.16e} * '.format(lo_array[1]) +
-                             'logT + T * ('
-                             '{:.16e} + T * ('.format(lo_array[2]) +
-                             '{:.16e} + T * ('.format(lo_array[3]) +
-                             '{:.16e} + '.format(lo_array[4]) +
-                             '{:.16e} * T))) - '.format(lo_array[5]) +
-                             '{:.16e} / T)'.format(lo_array[6]) +
-                             utils.line_end[lang]
-                             )
+                            smh_sum += ' {} {} * '.format(
+                                '+' if nu > 0 else '-', float(abs(nu))) + smh
+                    smh_sum = ('-' if smh_sum[1] == '-' else '') + smh_sum[3:]
+                    sum_nu = sum(nu for isp, nu in key)
+                    line += ('{:.16e}'.format((chem.PA / chem.RU) ** sum_nu) +
+                             ' * exp(' + smh_sum + ')' + utils.line_end[lang])
                     file.write(line)
-
-                    if lang in ['c', 'cuda']:
-                        file.write('  } else {\n')
-                    elif lang in ['fortran', 'matlab']:
-                        file.write('  else\n')
-
-                    if isFirst:
-                        line = '    Kc = '
-                    else:
-                        if lang in ['cuda', 'c']:
-                            line = '    Kc += '
+                elif hoist_trange:
+                    kc, line = __get_kc_def(key, i_rxn)
+                    sum_nu = sum(nu for isp, nu in key)
+                    kc_exp = utils.get_array(lang, 'Kc_exp', kc_exp_index[key])
+                    line += ('{:.16e}'.format((chem.PA / chem.RU) ** sum_nu) +
+                             ' * exp(' + kc_exp + ')' + utils.line_end[lang])
+                    file.write(line)
+                else:
+                    # line = '  Kc = 0.0' + utils.line_end[lang]
+                    # file.write(line)
+
+                    coeffs, sum_nu = __get_kc_coeffs(i_rxn)
+
+                    isFirst = True
+                    for T_mid in coeffs:
+                        # need temperature conditional for equilibrium constants
+                        line = '  if (T <= {:})'.format(T_mid)
+                        if lang in ['c', 'cuda']:
+                            line += ' {\n'
+                        elif lang == 'fortran':
+                            line += ' then\n'
+                        elif lang == 'matlab':
+                            line += '\n'
+                        file.write(line)
+
+                        lo_array, hi_array = coeffs[T_mid]
+
+                        if isFirst:
+                            line = '    Kc = '
                         else:
-                            line = '    Kc = Kc + '
-                    line += ('({:.16e} + '.format(hi_array[0]) +
-                             '{:.16e} * '.format(hi_array[1]) +
-                             'logT + T * ('
-                             '{:.16e} + T * ('.format(hi_array[2]) +
-                             '{:.16e} + T * ('.format(hi_array[3]) +
-                             '{:.16e} + '.format(hi_array[4]) +
-                             '{:.16e} * T))) - '.format(hi_array[5]) +
-                             '{:.16e} / T)'.format(hi_array[6]) +
+                            if lang in ['cuda', 'c']:
+                                line = '    Kc += '
+                            else:
+                                line = '    Kc = Kc + '
+                        line += (__get_kc_poly(lo_array).emit(emitter) +
+                                 utils.line_end[lang])
+                        file.write(line)
+
+                        if lang in ['c', 'cuda']:
+                            file.write('  } else {\n')
+                        elif lang in ['fortran', 'matlab']:
+                            file.write('  else\n')
+
+                        if isFirst:
+                            line = '    Kc = '
+                        else:
+                            if lang in ['cuda', 'c']:
+                                line = '    Kc += '
+                            else:
+                                line = '    Kc = Kc + '
+                        line += (__get_kc_poly(hi_array).emit(emitter) +
+                                 utils.line_end[lang])
+                        file.write(line)
+
+                        if lang in ['c', 'cuda']:
+                            file.write('  }\n\n')
+                        elif lang == 'fortran':
+                            file.write('  end if\n\n')
+                        elif lang == 'matlab':
+                            file.write('  end\n\n')
+                        isFirst = False
+
+                    kc, line = __get_kc_def(key, i_rxn)
+                    line += ('{:.16e}'.format((chem.PA / chem.RU) ** sum_nu) +
+                             ' * exp(Kc)' +
                              utils.line_end[lang]
                              )
                     file.write(line)
 
-                    if lang in ['c', 'cuda']:
-                        file.write('  }\n\n')
-                    elif lang == 'fortran':
-                        file.write('  end if\n\n')
-                    elif lang == 'matlab':
-                        file.write('  end\n\n')
-                    isFirst = False
-
-                line = ('  Kc = '
-                        '{:.16e}'.format((chem.PA / chem.RU) ** sum_nu) +
-                        ' * exp(Kc)' +
-                        utils.line_end[lang]
-                        )
-                file.write(line)
-
             line = '  ' + get_array(lang, 'rev_rxn_rates',
                                     rev_reacs.index(i_rxn)
                                     ) + ' = '
@@ -835,7 +1006,7 @@ def __get_arrays(sp, factor=1.0):
                                        )
             else:
                 # use equilibrium constant
-                line += 'kf / Kc'
+                line += 'kf / ' + kc
             line += utils.line_end[lang]
             file.write(line)
 
@@ -849,6 +1020,8 @@ def __get_arrays(sp, factor=1.0):
                 rate_count - 1, ', dot_prod' if cuda_cheb else '') + utils.line_end[lang])
 
 
+    if soa:
+        file.write(utils.soa_loop_end)
     if lang in ['c', 'cuda']:
         file.write('} // end eval_rxn_rates\n\n')
     elif lang == 'fortran':
@@ -877,8 +1050,8 @@ def __get_arrays(sp, factor=1.0):
 
 
 def write_rxn_pressure_mod(path, lang, specs, reacs,
-                           fwd_rxn_mapping, smm=None, auto_diff=False
-                           ):
+                           fwd_rxn_mapping, smm=None, auto_diff=False,
+                           layout='aos'):
     """Write subroutine to for reaction pressure dependence modifications.
 
     Parameters
@@ -897,6 +1070,8 @@ def write_rxn_pressure_mod(path, lang, specs, reacs,
         If not ```None```, `shared_memory_manager` to use for CUDA optimizations
     auto_diff : bool, optional
         If ```True```, generate files for Adept autodifferention library.
+    layout : {'aos', 'soa'}, optional
+        Memory layout of the generated C code, see `utils.layouts`
 
     Returns
     -------
@@ -906,6 +1081,7 @@ def write_rxn_pressure_mod(path, lang, specs, reacs,
     double_type = 'double'
     file_prefix = ''
     pres_ref = ''
+    soa = layout == 'soa'
     if auto_diff:
         double_type = 'adouble'
         file_prefix = 'ad_'
@@ -948,7 +1124,14 @@ def write_rxn_pressure_mod(path, lang, specs, reacs,
     line = ''
     if lang == 'cuda': line = '__device__ '
 
-    if lang in ['c', 'cuda']:
+    if soa:
+        line += ('void get_rxn_pres_mod (const {0} * {1} T_vec, '
+                 'const {0} * {1} pres_vec, const {0} * {1} C, '
+                 '{0} * {1} pres_mod) {{\n'.format(
+                 double_type, utils.restrict[lang])
+                 )
+        line += utils.soa_loop_start(['T', 'pres'])
+    elif lang in ['c', 'cuda']:
         line += ('void get_rxn_pres_mod (const {0} T, const {0}{1} pres, '
                  'const {0} * {2} C, {0} * {2} pres_mod) {{\n'.format(
                 double_type, pres_ref, utils.restrict[lang])
@@ -975,6 +1158,8 @@ def write_rxn_pressure_mod(path, lang, specs, reacs,
         smm.reset()
         get_array = smm.get_array
         smm.write_init(file, indent=2)
+    elif soa:
+        get_array = utils.get_soa_array
 
     # declarations for third-body variables
     if thd_flag or pdep_flag:
@@ -1282,6 +1467,8 @@ def write_rxn_pressure_mod(path, lang, specs, reacs,
         file.write('\n')
         pind += 1
 
+    if soa:
+        file.write(utils.soa_loop_end)
     if lang in ['c', 'cuda']:
         file.write('} // end get_rxn_pres_mod\n\n')
     elif lang == 'fortran':
@@ -1295,7 +1482,7 @@ def write_rxn_pressure_mod(path, lang, specs, reacs,
 
 
 def write_spec_rates(path, lang, specs, reacs, fwd_spec_mapping,
-                    fwd_rxn_mapping, smm=None, auto_diff=False):
+                    fwd_rxn_mapping, smm=None, auto_diff=False, layout='aos'):
     """Write subroutine to evaluate species rates of production.
 
     Parameters
@@ -1316,6 +1503,8 @@ def write_spec_rates(path, lang, specs, reacs, fwd_spec_mapping,
         If not ```None```, `shared_memory_manager` to use for CUDA optimizations
     auto_diff : bool, optional
         If ```True```, generate files for Adept autodifferention library.
+    layout : {'aos', 'soa'}, optional
+        Memory layout of the generated C code, see `utils.layouts`
 
     Returns
     -------
@@ -1358,12 +1547,15 @@ def write_spec_rates(path, lang, specs, reacs, fwd_spec_mapping,
     line = ''
     if lang == 'cuda': line = '__device__ '
 
+    soa = layout == 'soa'
     if lang in ['c', 'cuda']:
         line += ('void eval_spec_rates (const {0} * {1} fwd_rates,'
                  ' const {0} * {1} rev_rates, const {0} * {1} pres_mod,'
-                 ' {0} * {1} sp_rates, {0} * {1} dy_N) {{\n'.format(double_type,
-                 utils.restrict[lang])
+                 ' {0} * {1} sp_rates, {0} * {1} dy_N{2}) {{\n'.format(double_type,
+                 utils.restrict[lang], '_vec' if soa else '')
                  )
+        if soa:
+            line += utils.soa_loop_start(outputs=['dy_N'])
     elif lang == 'fortran':
         line += ('subroutine eval_spec_rates (fwd_rates, rev_rates,'
                  ' pres_mod, sp_rates, dy_N)\n\n'
@@ -1420,6 +1612,8 @@ def __on_eviction(sp, shared, shared_ind):
         get_array = smm.get_array
         smm.write_init(file, indent=2)
         smm.set_on_eviction(__on_eviction)
+    elif soa:
+        get_array = utils.get_soa_array
 
     #loop through reaction
     for rind in range(len(reacs)):
@@ -1530,6 +1724,8 @@ def __on_eviction(sp, shared, shared_ind):
         smm.force_eviction()
         smm.set_on_eviction(None)
 
+    if soa:
+        file.write(utils.soa_loop_end)
     if lang in ['c', 'cuda']:
         file.write('} // end eval_spec_rates\n\n')
     elif lang == 'fortran':
@@ -1542,7 +1738,8 @@ def __on_eviction(sp, shared, shared_ind):
     return seen
 
 
-def write_chem_utils(path, lang, specs, auto_diff):
+def write_chem_utils(path, lang, specs, auto_diff, layout='aos',
+                     hoist_trange=False):
     """Write subroutine to evaluate species thermodynamic properties.
 
     Notes
@@ -1560,6 +1757,11 @@ def write_chem_utils(path, lang, specs, auto_diff):
         List of species in the mechanism.
     auto_diff : bool, optional
         If ``True``, generate files for Adept autodifferention library.
+    layout : {'aos', 'soa'}, optional
+        Memory layout of the generated C code, see `utils.layouts`
+    hoist_trange : bool, optional
+        If ``True``, the properties of all species with the same temperature
+        breakpoint are evaluated under a single conditional
 
     Returns
     -------
@@ -1577,6 +1779,48 @@ def write_chem_utils(path, lang, specs, auto_diff):
 
     num_s = len(specs)
 
+    soa = layout == 'soa'
+    get_array = utils.get_soa_array if soa else utils.get_array
+    # per-state scalars are passed as arrays in the structure-of-arrays layout
+    vec = '_vec' if soa else ''
+    state_type = '{1} *' if soa else '{1}{2}'
+
+    def __state(name):
+        """Returns the declaration of per-state input ``name``"""
+        if soa:
+            return 'const {} * {} {}_vec'.format(double_type,
+                                                 utils.restrict[lang], name)
+        return 'const {}{} {}'.format(double_type, pres_ref, name)
+
+    emitter = cg.Emitter(lang, get_array, double_type)
+    T = cg.Var('T')
+    one_neg = cg.Neg(cg.Literal(1.0, '{}'))
+
+    def __write_species(file, name, get_expr):
+        """Writes the property ``name`` of each species, ``get_expr`` returns
+        the expression for a species and a set of polynomial coefficients"""
+        if hoist_trange:
+            t_mid = {}
+            for isp, sp in enumerate(specs):
+                t_mid.setdefault(sp.Trange[1], []).append(isp)
+            groups = [(T_mid, t_mid[T_mid]) for T_mid in sorted(t_mid)]
+        else:
+            groups = [(sp.Trange[1], [isp]) for isp, sp in enumerate(specs)]
+
+        statements = []
+        for T_mid, species in groups:
+            statements.append(cg.If(
+                'T <= {:}'.format(T_mid),
+                [cg.Assign(cg.ArrayRef(name, isp),
+                           get_expr(specs[isp], specs[isp].lo))
+                 for isp in species],
+                [cg.Assign(cg.ArrayRef(name, isp),
+                           get_expr(specs[isp], specs[isp].hi))
+                 for isp in species]
+                ))
+            statements.append(cg.Blank())
+        emitter.write(file, statements)
+
     pre = '__device__ ' if lang == 'cuda' else ''
     file = open(os.path.join(path, file_prefix + 'chem_utils'
                              + utils.header_ext[lang]), 'w')
@@ -1592,17 +1836,18 @@ def write_chem_utils(path, lang, specs, auto_diff):
     if lang == 'cuda':
         file.write('#include "gpu_memory.cuh"\n')
 
-    file.write(
-               '{0}void eval_conc (const {1}{2}, const {1}{2}, '
+    file.write((
+               '{0}void eval_conc (const SCALAR, const SCALAR, '
                'const {1} * {3}, {1} * {3}, {1} * {3}, {1} * {3}, {1} * {3});\n'
-               '{0}void eval_conc_rho (const {1}{2}, const {1}{2}, '
+               '{0}void eval_conc_rho (const SCALAR, const SCALAR, '
                'const {1} * {3}, {1} * {3}, {1} * {3}, {1} * {3}, {1} * {3});\n'
-               '{0}void eval_h (const {1}{2}, {1} * {3});\n'
-               '{0}void eval_u (const {1}{2}, {1} * {3});\n'
-               '{0}void eval_cv (const {1}{2}, {1} * {3});\n'
-               '{0}void eval_cp (const {1}{2}, {1} * {3});\n'
+               '{0}void eval_h (const SCALAR, {1} * {3});\n'
+               '{0}void eval_u (const SCALAR, {1} * {3});\n'
+               '{0}void eval_cv (const SCALAR, {1} * {3});\n'
+               '{0}void eval_cp (const SCALAR, {1} * {3});\n'
                '\n'
-               '#endif\n'.format(pre, double_type, pres_ref,
+               '#endif\n').replace('SCALAR', state_type).format(
+                                 pre, double_type, pres_ref,
                                  utils.restrict[lang])
                )
     file.close()
@@ -1624,11 +1869,15 @@ def write_chem_utils(path, lang, specs, auto_diff):
     ###################################
     line = pre
     if lang in ['c', 'cuda']:
-        line += ('void eval_conc (const {0}{1} T, const {0}{1} pres, '
-                 'const {0} * {2} y, {0} * {2} y_N, {0} * {2} mw_avg, '
-                 '{0} * {2} rho, {0} * {2} conc) {{\n\n'.format(
-                 double_type, pres_ref, utils.restrict[lang])
+        line += ('void eval_conc ({3}, {4}, '
+                 'const {0} * {2} y, {0} * {2} y_N{5}, {0} * {2} mw_avg{5}, '
+                 '{0} * {2} rho{5}, {0} * {2} conc) {{\n\n'.format(
+                 double_type, pres_ref, utils.restrict[lang],
+                 __state('T'), __state('pres'), vec)
                  )
+        if soa:
+            line += utils.soa_loop_start(['T', 'pres'],
+                                         ['y_N', 'mw_avg', 'rho'])
     elif lang == 'fortran':
         line += (
             # fortran needs type declarations
@@ -1659,7 +1908,7 @@ def write_chem_utils(path, lang, specs, auto_diff):
 
         if not isfirst: line += ' + '
 
-        line += utils.get_array(lang, 'y', isp)
+        line += get_array(lang, 'y', isp)
 
         isfirst = False
     line += ')'
@@ -1675,7 +1924,7 @@ def write_chem_utils(path, lang, specs, auto_diff):
             line = '     '
 
         if not isfirst: line += ' + '
-        line += '(' + utils.get_array(lang, 'y', isp) + ' * {:.16e})'.format(1.0 / sp.mw)
+        line += '(' + get_array(lang, 'y', isp) + ' * {:.16e})'.format(1.0 / sp.mw)
 
         isfirst = False
     line += ' + ((*y_N) * {:.16e})'.format(1.0 / specs[-1].mw)
@@ -1692,16 +1941,18 @@ def write_chem_utils(path, lang, specs, auto_diff):
 
     # loop through species
     for isp, sp in enumerate(specs[:-1]):
-        line = utils.line_start + utils.get_array(lang, 'conc', isp)
+        line = utils.line_start + get_array(lang, 'conc', isp)
         line += ' = '
-        line += '(*rho) * ' + utils.get_array(lang, 'y', isp)
+        line += '(*rho) * ' + get_array(lang, 'y', isp)
         line += ' * {:.16e}'.format(1.0 / sp.mw) + utils.line_end[lang]
         file.write(line)
-    line = utils.line_start + utils.get_array(lang, 'conc', len(specs) - 1)
+    line = utils.line_start + get_array(lang, 'conc', len(specs) - 1)
     line += ' = (*rho) * (*y_N) * '.format(len(specs) - 1)
     line += '{:.16e}'.format(1.0 / specs[-1].mw) + utils.line_end[lang]
     file.write(line + '\n')
 
+    if soa:
+        file.write(utils.soa_loop_end)
     if lang in ['c', 'cuda']:
         file.write('} // end eval_conc\n\n')
     elif lang == 'fortran':
@@ -1713,11 +1964,15 @@ def write_chem_utils(path, lang, specs, auto_diff):
 
     line = pre
     if lang in ['c', 'cuda']:
-        line += ('void eval_conc_rho (const {0}{1} T, const {0}{1} rho, '
-                 'const {0} * {2} y, {0} * {2} y_N, {0} * {2} mw_avg, '
-                 '{0} * {2} pres, {0} * {2} conc) {{\n\n'.format(
-                 double_type, pres_ref, utils.restrict[lang])
+        line += ('void eval_conc_rho ({3}, {4}, '
+                 'const {0} * {2} y, {0} * {2} y_N{5}, {0} * {2} mw_avg{5}, '
+                 '{0} * {2} pres{5}, {0} * {2} conc) {{\n\n'.format(
+                 double_type, pres_ref, utils.restrict[lang],
+                 __state('T'), __state('rho'), vec)
                  )
+        if soa:
+            line += utils.soa_loop_start(['T', 'rho'],
+                                         ['y_N', 'mw_avg', 'pres'])
     elif lang == 'fortran':
         line += (
             # fortran needs type declarations
@@ -1748,7 +2003,7 @@ def write_chem_utils(path, lang, specs, auto_diff):
 
         if not isfirst: line += ' + '
 
-        line += utils.get_array(lang, 'y', isp)
+        line += get_array(lang, 'y', isp)
 
         isfirst = False
     line += ')'
@@ -1764,7 +2019,7 @@ def write_chem_utils(path, lang, specs, auto_diff):
             line = '     '
 
         if not isfirst: line += ' + '
-        line += '(' + utils.get_array(lang, 'y', isp) + ' * {:.16e})'.format(1.0 / sp.mw)
+        line += '(' + get_array(lang, 'y', isp) + ' * {:.16e})'.format(1.0 / sp.mw)
 
         isfirst = False
     line += ' + ((*y_N) * {:.16e})'.format(1.0 / specs[-1].mw)
@@ -1781,18 +2036,20 @@ def write_chem_utils(path, lang, specs, auto_diff):
 
     # loop through species
     for isp, sp in enumerate(specs[:-1]):
-        line = utils.line_start + utils.get_array(lang, 'conc', isp)
+        line = utils.line_start + get_array(lang, 'conc', isp)
         line += ' = '
-        line += 'rho * ' + utils.get_array(lang, 'y', isp)
+        line += 'rho * ' + get_array(lang, 'y', isp)
         line += ' * {:.16e}'.format(1.0 / sp.mw) + utils.line_end[lang]
         file.write(line)
-    line = utils.line_start + utils.get_array(lang, 'conc', len(specs) - 1)
+    line = utils.line_start + get_array(lang, 'conc', len(specs) - 1)
     line += ' = rho * (*y_N) * '.format(len(specs) - 1)
     line += '{:.16e}'.format(1.0 / specs[-1].mw) + utils.line_end[lang]
     file.write(line)
 
     file.write('\n')
 
+    if soa:
+        file.write(utils.soa_loop_end)
     if lang in ['c', 'cuda']:
         file.write('} // end eval_conc\n\n')
     elif lang == 'fortran':
@@ -1805,8 +2062,8 @@ def write_chem_utils(path, lang, specs, auto_diff):
     ######################
     line = pre
     if lang in ['c', 'cuda']:
-        line += 'void eval_h (const {0}{1} T, {0} * {2} h) {{\n\n'.format(
-            double_type, pres_ref, utils.restrict[lang])
+        line += 'void eval_h ({3}, {0} * {2} h) {{\n\n'.format(
+            double_type, pres_ref, utils.restrict[lang], __state('T'))
     elif lang == 'fortran':
         line += ('subroutine eval_h (T, h)\n\n'
                  # fortran needs type declarations
@@ -1818,54 +2075,20 @@ def write_chem_utils(path, lang, specs, auto_diff):
     elif lang == 'matlab':
         line += 'function h = eval_h (T)\n\n'
     file.write(line)
+    if soa:
+        file.write(utils.soa_loop_start(['T']))
 
-    # loop through species
-    for isp, sp in enumerate(specs):
-        line = '  if (T <= {:})'.format(sp.Trange[1])
-        if lang in ['c', 'cuda']:
-            line += ' {\n'
-        elif lang == 'fortran':
-            line += ' then\n'
-        elif lang == 'matlab':
-            line += '\n'
-        file.write(line)
+    def __h(sp, c):
+        return cg.Product([
+            cg.Literal(chem.RU / sp.mw),
+            cg.horner(T, [c[5], c[0], c[1] / 2.0, c[2] / 3.0, c[3] / 4.0,
+                          c[4] / 5.0])
+            ])
 
-        line = '    ' + utils.get_array(lang, 'h', isp)
-        line += (' = {:.16e} * '.format(chem.RU / sp.mw) +
-                 '({:.16e} + T * ('.format(sp.lo[5]) +
-                 '{:.16e} + T * ('.format(sp.lo[0]) +
-                 '{:.16e} + T * ('.format(sp.lo[1] / 2.0) +
-                 '{:.16e} + T * ('.format(sp.lo[2] / 3.0) +
-                 '{:.16e} + '.format(sp.lo[3] / 4.0) +
-                 '{:.16e} * T)))))'.format(sp.lo[4] / 5.0) +
-                 utils.line_end[lang]
-                 )
-        file.write(line)
-
-        if lang in ['c', 'cuda']:
-            file.write('  } else {\n')
-        elif lang in ['fortran', 'matlab']:
-            file.write('  else\n')
-
-        line = '    ' + utils.get_array(lang, 'h', isp)
-        line += (' = {:.16e} * '.format(chem.RU / sp.mw) +
-                 '({:.16e} + T * ('.format(sp.hi[5]) +
-                 '{:.16e} + T * ('.format(sp.hi[0]) +
-                 '{:.16e} + T * ('.format(sp.hi[1] / 2.0) +
-                 '{:.16e} + T * ('.format(sp.hi[2] / 3.0) +
-                 '{:.16e} + '.format(sp.hi[3] / 4.0) +
-                 '{:.16e} * T)))))'.format(sp.hi[4] / 5.0) +
-                 utils.line_end[lang]
-                 )
-        file.write(line)
-
-        if lang in ['c', 'cuda']:
-            file.write('  }\n\n')
-        elif lang == 'fortran':
-            file.write('  end if\n\n')
-        elif lang == 'matlab':
-            file.write('  end\n\n')
+    __write_species(file, 'h', __h)
 
+    if soa:
+        file.write(utils.soa_loop_end)
     if lang in ['c', 'cuda']:
         file.write('} // end eval_h\n\n')
     elif lang == 'fortran':
@@ -1878,8 +2101,8 @@ def write_chem_utils(path, lang, specs, auto_diff):
     #################################
     line = pre
     if lang in ['c', 'cuda']:
-        line += 'void eval_u (const {0}{1} T, {0} * {2} u) {{\n\n'.format(
-            double_type, pres_ref, utils.restrict[lang])
+        line += 'void eval_u ({3}, {0} * {2} u) {{\n\n'.format(
+            double_type, pres_ref, utils.restrict[lang], __state('T'))
     elif lang == 'fortran':
         line += ('subroutine eval_u (T, u)\n\n'
                  # fortran needs type declarations
@@ -1890,54 +2113,20 @@ def write_chem_utils(path, lang, specs, auto_diff):
     elif lang == 'matlab':
         line += 'function u = eval_u (T)\n\n'
     file.write(line)
+    if soa:
+        file.write(utils.soa_loop_start(['T']))
 
-    # loop through species
-    for isp, sp in enumerate(specs):
-        line = '  if (T <= {:})'.format(sp.Trange[1])
-        if lang in ['c', 'cuda']:
-            line += ' {\n'
-        elif lang == 'fortran':
-            line += ' then\n'
-        elif lang == 'matlab':
-            line += '\n'
-        file.write(line)
-
-        line = '    ' + utils.get_array(lang, 'u', isp)
-        line += (' = {:.16e} * '.format(chem.RU / sp.mw) +
-                 '({:.16e} + T * ('.format(sp.lo[5]) +
-                 '{:.16e} - 1.0 + T * ('.format(sp.lo[0]) +
-                 '{:.16e} + T * ('.format(sp.lo[1] / 2.0) +
-                 '{:.16e} + T * ('.format(sp.lo[2] / 3.0) +
-                 '{:.16e} + '.format(sp.lo[3] / 4.0) +
-                 '{:.16e} * T)))))'.format(sp.lo[4] / 5.0) +
-                 utils.line_end[lang]
-                 )
-        file.write(line)
+    def __u(sp, c):
+        return cg.Product([
+            cg.Literal(chem.RU / sp.mw),
+            cg.horner(T, [c[5], cg.Sum([cg.Literal(c[0]), one_neg]),
+                          c[1] / 2.0, c[2] / 3.0, c[3] / 4.0, c[4] / 5.0])
+            ])
 
-        if lang in ['c', 'cuda']:
-            file.write('  } else {\n')
-        elif lang in ['fortran', 'matlab']:
-            file.write('  else\n')
-
-        line = '    ' + utils.get_array(lang, 'u', isp)
-        line += (' = {:.16e} * '.format(chem.RU / sp.mw) +
-                 '({:.16e} + T * ('.format(sp.hi[5]) +
-                 '{:.16e} - 1.0 + T * ('.format(sp.hi[0]) +
-                 '{:.16e} + T * ('.format(sp.hi[1] / 2.0) +
-                 '{:.16e} + T * ('.format(sp.hi[2] / 3.0) +
-                 '{:.16e} + '.format(sp.hi[3] / 4.0) +
-                 '{:.16e} * T)))))'.format(sp.hi[4] / 5.0) +
-                 utils.line_end[lang]
-                 )
-        file.write(line)
-
-        if lang in ['c', 'cuda']:
-            file.write('  }\n\n')
-        elif lang == 'fortran':
-            file.write('  end if\n\n')
-        elif lang == 'matlab':
-            file.write('  end\n\n')
+    __write_species(file, 'u', __u)
 
+    if soa:
+        file.write(utils.soa_loop_end)
     if lang in ['c', 'cuda']:
         file.write('} // end eval_u\n\n')
     elif lang == 'fortran':
@@ -1949,8 +2138,9 @@ def write_chem_utils(path, lang, specs, auto_diff):
     # cv subroutine
     ##################################
     if lang in ['c', 'cuda']:
-        line = pre + 'void eval_cv (const {0}{1} T, {0} * {2} cv) {{\n\n'.format(
-                        double_type, pres_ref, utils.restrict[lang])
+        line = pre + 'void eval_cv ({3}, {0} * {2} cv) {{\n\n'.format(
+                        double_type, pres_ref, utils.restrict[lang],
+                        __state('T'))
     elif lang == 'fortran':
         line = ('subroutine eval_cv (T, cv)\n\n'
                 # fortran needs type declarations
@@ -1962,52 +2152,20 @@ def write_chem_utils(path, lang, specs, auto_diff):
     elif lang == 'matlab':
         line = 'function cv = eval_cv (T)\n\n'
     file.write(line)
+    if soa:
+        file.write(utils.soa_loop_start(['T']))
 
-    # loop through species
-    for isp, sp in enumerate(specs):
-        line = '  if (T <= {:})'.format(sp.Trange[1])
-        if lang in ['c', 'cuda']:
-            line += ' {\n'
-        elif lang == 'fortran':
-            line += ' then\n'
-        elif lang == 'matlab':
-            line += '\n'
-        file.write(line)
+    def __cv(sp, c):
+        return cg.Product([
+            cg.Literal(chem.RU / sp.mw),
+            cg.horner(T, [cg.Sum([cg.Literal(c[0]), one_neg]), c[1], c[2],
+                          c[3], c[4]])
+            ])
 
-        line = '    ' + utils.get_array(lang, 'cv', isp)
-        line += (' = {:.16e} * '.format(chem.RU / sp.mw) +
-                 '({:.16e} - 1.0 + T * ('.format(sp.lo[0]) +
-                 '{:.16e} + T * ('.format(sp.lo[1]) +
-                 '{:.16e} + T * ('.format(sp.lo[2]) +
-                 '{:.16e} + '.format(sp.lo[3]) +
-                 '{:.16e} * T))))'.format(sp.lo[4]) +
-                 utils.line_end[lang]
-                 )
-        file.write(line)
-
-        if lang in ['c', 'cuda']:
-            file.write('  } else {\n')
-        elif lang in ['fortran', 'matlab']:
-            file.write('  else\n')
-
-        line = '    ' + utils.get_array(lang, 'cv', isp)
-        line += (' = {:.16e} * '.format(chem.RU / sp.mw) +
-                 '({:.16e} - 1.0 + T * ('.format(sp.hi[0]) +
-                 '{:.16e} + T * ('.format(sp.hi[1]) +
-                 '{:.16e} + T * ('.format(sp.hi[2]) +
-                 '{:.16e} + '.format(sp.hi[3]) +
-                 '{:.16e} * T))))'.format(sp.hi[4]) +
-                 utils.line_end[lang]
-                 )
-        file.write(line)
-
-        if lang in ['c', 'cuda']:
-            file.write('  }\n\n')
-        elif lang == 'fortran':
-            file.write('  end if\n\n')
-        elif lang == 'matlab':
-            file.write('  end\n\n')
+    __write_species(file, 'cv', __cv)
 
+    if soa:
+        file.write(utils.soa_loop_end)
     if lang in ['c', 'cuda']:
         file.write('} // end eval_cv\n\n')
     elif lang == 'fortran':
@@ -2019,8 +2177,9 @@ def write_chem_utils(path, lang, specs, auto_diff):
     # cp subroutine
     ###############################
     if lang in ['c', 'cuda']:
-        line = pre + 'void eval_cp (const {0}{1} T, {0} * {2} cp) {{\n\n'.format(
-                        double_type, pres_ref, utils.restrict[lang])
+        line = pre + 'void eval_cp ({3}, {0} * {2} cp) {{\n\n'.format(
+                        double_type, pres_ref, utils.restrict[lang],
+                        __state('T'))
     elif lang == 'fortran':
         line = ('subroutine eval_cp (T, cp)\n\n'
                 # fortran needs type declarations
@@ -2032,52 +2191,19 @@ def write_chem_utils(path, lang, specs, auto_diff):
     elif lang == 'matlab':
         line = 'function cp = eval_cp (T)\n\n'
     file.write(line)
+    if soa:
+        file.write(utils.soa_loop_start(['T']))
 
-    # loop through species
-    for isp, sp in enumerate(specs):
-        line = '  if (T <= {:})'.format(sp.Trange[1])
-        if lang in ['c', 'cuda']:
-            line += ' {\n'
-        elif lang == 'fortran':
-            line += ' then\n'
-        elif lang == 'matlab':
-            line += '\n'
-        file.write(line)
+    def __cp(sp, c):
+        return cg.Product([
+            cg.Literal(chem.RU / sp.mw),
+            cg.horner(T, [c[0], c[1], c[2], c[3], c[4]])
+            ])
 
-        line = '    ' + utils.get_array(lang, 'cp', isp)
-        line += (' = {:.16e} * '.format(chem.RU / sp.mw) +
-                 '({:.16e} + T * ('.format(sp.lo[0]) +
-                 '{:.16e} + T * ('.format(sp.lo[1]) +
-                 '{:.16e} + T * ('.format(sp.lo[2]) +
-                 '{:.16e} + '.format(sp.lo[3]) +
-                 '{:.16e} * T))))'.format(sp.lo[4]) +
-                 utils.line_end[lang]
-                 )
-        file.write(line)
-
-        if lang in ['c', 'cuda']:
-            file.write('  } else {\n')
-        elif lang in ['fortran', 'matlab']:
-            file.write('  else\n')
-
-        line = '    ' + utils.get_array(lang, 'cp', isp)
-        line += (' = {:.16e} * '.format(chem.RU / sp.mw) +
-                 '({:.16e} + T * ('.format(sp.hi[0]) +
-                 '{:.16e} + T * ('.format(sp.hi[1]) +
-                 '{:.16e} + T * ('.format(sp.hi[2]) +
-                 '{:.16e} + '.format(sp.hi[3]) +
-                 '{:.16e} * T))))'.format(sp.hi[4]) +
-                 utils.line_end[lang]
-                 )
-        file.write(line)
-
-        if lang in ['c', 'cuda']:
-            file.write('  }\n\n')
-        elif lang == 'fortran':
-            file.write('  end if\n\n')
-        elif lang == 'matlab':
-            file.write('  end\n\n')
+    __write_species(file, 'cp', __cp)
 
+    if soa:
+        file.write(utils.soa_loop_end)
     if lang in ['c', 'cuda']:
         file.write('} // end eval_cp\n\n')
     elif lang == 'fortran':
@@ -2090,7 +2216,151 @@ def write_chem_utils(path, lang, specs, auto_diff):
     return
 
 
-def write_derivs(path, lang, specs, reacs, specs_nonzero, auto_diff=False):
+def _write_soa_dydt(file, specs, reacs, specs_nonzero, conp):
+    """Writes the structure-of-arrays C derivative function.
+
+    The rate subroutines are called once for the block of ``VECWIDTH``
+    states, the remaining (inline) terms are evaluated in a single
+    vectorized loop over the states.
+
+    Parameters
+    ----------
+    file : file
+        Open file for the derivative function
+    specs : list of `SpecInfo`
+        List of species in the mechanism.
+    reacs : list of `ReacInfo`
+        List of reactions in the mechanism.
+    specs_nonzero : list of bool
+        List of `bool` indicating species with zero net production
+    conp : bool
+        If ``True``, write the constant pressure form, else constant volume
+
+    Returns
+    -------
+    None
+
+    """
+    lang = 'c'
+    get_array = utils.get_soa_array
+    restrict = utils.restrict[lang]
+    num_s = len(specs)
+    num_rev = sum(1 for rxn in reacs if rxn.rev)
+    num_dep_reacs = sum(1 for rxn in reacs if rxn.thd_body or rxn.pdep)
+
+    # the state variable passed in, and the one computed from the state
+    given, derived = ('pres', 'rho') if conp else ('rho', 'pres')
+    cp, h = ('cp', 'h') if conp else ('cv', 'u')
+
+    file.write('void dydt (const double t, const double * {0} {1}_vec, '
+               'const double * {0} y, double * {0} dy) {{\n\n'.format(
+               restrict, given))
+
+    # calculation of species molar concentrations
+    file.write('  // species molar concentrations\n'
+               '  double conc[{} * VECWIDTH];\n'.format(num_s) +
+               '  double y_N_vec[VECWIDTH];\n'
+               '  double mw_avg_vec[VECWIDTH];\n'
+               '  double {}_vec[VECWIDTH];\n'.format(derived)
+               )
+    file.write('  eval_conc{0} (y, {1}_vec, &y[VECWIDTH], y_N_vec, '
+               'mw_avg_vec, {2}_vec, conc);\n\n'.format(
+               '' if conp else '_rho', given, derived))
+
+    # evaluate reaction rates
+    file.write('  // local arrays holding reaction rates\n'
+               '  double fwd_rates[{} * VECWIDTH];\n'.format(len(reacs)))
+    if num_rev:
+        file.write('  double rev_rates[{} * VECWIDTH];\n'.format(num_rev))
+    else:
+        file.write('  double* rev_rates = 0;\n')
+    file.write('  eval_rxn_rates (y, pres_vec, conc, fwd_rates, rev_rates);\n\n')
+
+    # reaction pressure dependence
+    if num_dep_reacs > 0:
+        file.write('  // get pressure modifications to reaction rates\n'
+                   '  double pres_mod[{} * VECWIDTH];\n'.format(num_dep_reacs) +
+                   '  get_rxn_pres_mod (y, pres_vec, conc, pres_mod);\n'
+                   )
+    else:
+        file.write('  double* pres_mod = 0;\n')
+    file.write('\n')
+
+    # species rate of change of molar concentration
+    file.write('  // evaluate species molar net production rates\n'
+               '  double dy_N_vec[VECWIDTH];\n'
+               '  eval_spec_rates (fwd_rates, rev_rates, pres_mod, '
+               '&dy[VECWIDTH], dy_N_vec);\n\n')
+
+    # evaluate specific heat and enthalpy / internal energy
+    file.write('  double {}[{} * VECWIDTH];\n'.format(cp, num_s) +
+               '  eval_{} (y, {});\n'.format(cp, cp) +
+               '  double {}[{} * VECWIDTH];\n'.format(h, num_s) +
+               '  eval_{} (y, {});\n\n'.format(h, h)
+               )
+
+    # the rate of the last species is only needed if it is nonzero
+    file.write(utils.soa_loop_start(
+        ['rho', 'y_N'] + (['dy_N'] if specs_nonzero[-1] else [])))
+    file.write('  // mass-average specific heat\n')
+    line = '  double {}_avg = '.format(cp)
+    isfirst = True
+    for isp, sp in enumerate(specs[:-1]):
+        if len(line) > 70:
+            line += '\n'
+            file.write(line)
+            line = '             '
+
+        if not isfirst: line += ' + '
+
+        line += ('(' + get_array(lang, cp, isp) + ' * ' +
+                 get_array(lang, 'y', isp + 1) + ')')
+
+        isfirst = False
+
+    if not isfirst: line += ' + '
+    line += '(' + get_array(lang, cp, num_s - 1) + ' * y_N)'
+    file.write(line + utils.line_end[lang] + '\n')
+
+    # energy equation
+    file.write('  // rate of change of temperature\n')
+    line = ('  ' + get_array(lang, 'dy', 0) +
+            ' = (-1.0 / (rho * {}_avg)) * ('.format(cp)
+            )
+    isfirst = True
+    for isp, sp in enumerate(specs):
+        if not specs_nonzero[isp]:
+            continue
+        if len(line) > 70:
+            line += '\n'
+            file.write(line)
+            line = '       '
+
+        if not isfirst: line += ' + '
+
+        arr = get_array(lang, 'dy', isp + 1) if isp < num_s - 1 else 'dy_N'
+        line += ('(' + arr + ' * ' +
+                 get_array(lang, h, isp) + ' * {:.16e})'.format(sp.mw)
+                 )
+
+        isfirst = False
+    line += ')' + utils.line_end[lang] + '\n'
+    file.write(line)
+
+    # rate of change of species mass fractions
+    file.write('  // calculate rate of change of species mass fractions\n')
+    for isp, sp in enumerate(specs[:-1]):
+        file.write('  ' + get_array(lang, 'dy', isp + 1) +
+                   ' *= ({:.16e} / rho);\n'.format(sp.mw)
+                   )
+    file.write(utils.soa_loop_end)
+    file.write('\n')
+
+    file.write('} // end dydt\n\n')
+
+
+def write_derivs(path, lang, specs, reacs, specs_nonzero, auto_diff=False,
+                 layout='aos'):
     """Writes derivative function file and header.
 
     Parameters
@@ -2107,6 +2377,8 @@ def write_derivs(path, lang, specs, reacs, specs_nonzero, auto_diff=False):
         List of `bool` indicating species with zero net production
     auto_diff : bool, optional
         If ``True``, generate files for Adept autodifferention library.
+    layout : {'aos', 'soa'}, optional
+        Memory layout of the generated C code, see `utils.layouts`
 
     Returns
     -------
@@ -2139,7 +2411,8 @@ def write_derivs(path, lang, specs, reacs, specs_nonzero, auto_diff=False):
         file.write('#include "adept.h"\n'
                    'using adept::adouble;\n')
     file.write('{0}void dydt (const double, const {1}{2}, '
-               'const {1} * {3}, {1} * {3}'.format(pre, double_type, pres_ref,
+               'const {1} * {3}, {1} * {3}'.format(pre, double_type,
+                                pres_ref if layout != 'soa' else ' *',
                                 utils.restrict[lang]) +
                ('' if lang == 'c' else
                     ', const mechanism_memory * {}'.format(utils.restrict[lang])) +
@@ -2165,6 +2438,15 @@ def write_derivs(path, lang, specs, reacs, specs_nonzero, auto_diff=False):
         file.write('#include "adept.h"\n'
                    'using adept::adouble;\n')
 
+    if layout == 'soa':
+        file.write('#if defined(CONP)\n\n')
+        _write_soa_dydt(file, specs, reacs, specs_nonzero, conp=True)
+        file.write('#elif defined(CONV)\n\n')
+        _write_soa_dydt(file, specs, reacs, specs_nonzero, conp=False)
+        file.write('#endif\n')
+        file.close()
+        return
+
     ##################################################################
     # constant pressure
     ##################################################################
@@ -2824,6 +3106,8 @@ def write_mass_mole(path, lang, specs):
                 mech_name=args.input,
                 therm_name=args.thermo,
                 optimize_cache=args.cache_optimizer,
+                cache_refine=args.cache_refine,
+                cache_patience=args.cache_patience,
                 initial_state=args.initial_conditions,
                 num_blocks=args.num_blocks,
                 num_threads=args.num_threads,
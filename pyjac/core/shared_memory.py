@@ -57,6 +57,14 @@ def to_string(self):
         return utils.get_array(self.lang, self.base, self.index)
 
 
+def _used_twice(var):
+    """The default self-eviction strategy of the `shared_memory_manager`,
+    a `variable` is evicted after it has been used twice.  A module level
+    function, such that the manager can be pickled.
+    """
+    return var.last_use_count >= 2
+
+
 class shared_memory_manager(object):
     """Manager for GPU shared memory.
     """
@@ -90,7 +98,7 @@ def __init__(self, blocks_per_sm=8, num_threads=64, L1_PREFERRED=True):
         self.shared_indexes = [True for i in range(self.shared_per_thread)]
         self.eviction_marking = [False for i in range(self.shared_per_thread)]
         self.on_eviction = None
-        self.self_eviction_strategy = lambda x: x.last_use_count >= 2
+        self.self_eviction_strategy = _used_twice
 
     def force_eviction(self):
         """Forces eviction of the manager's internal dictionary.
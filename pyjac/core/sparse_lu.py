@@ -0,0 +1,301 @@
+"""Writes a sparse LU factorization and solve of the Newton matrix
+``I - h * gamma * J``, with the symbolic factorization done at
+generation time.
+"""
+
+# Python 2 compatibility
+from __future__ import division
+from __future__ import print_function
+
+# Standard libraries
+import os
+
+# Local imports
+from .. import utils
+from . import CParams
+
+
+def get_fill_reducing_order(pattern, nvars):
+    """Determine a fill-reducing elimination order with a minimum degree
+    heuristic on the symmetrized non-zero pattern.
+
+    Parameters
+    ----------
+    pattern : set of tuple
+        The ``(row, column)`` pairs of the non-zero entries
+    nvars : int
+        Number of variables in the matrix
+
+    Returns
+    -------
+    order : list of int
+        The original variable eliminated at each step
+
+    """
+
+    adjacency = [set() for i in range(nvars)]
+    for row, col in pattern:
+        if row != col:
+            adjacency[row].add(col)
+            adjacency[col].add(row)
+
+    remaining = set(range(nvars))
+    order = []
+    while remaining:
+        # ties are broken by the lowest index, to keep the natural order
+        # where possible
+        var = min(remaining, key=lambda x: (len(adjacency[x]), x))
+        remaining.remove(var)
+        order.append(var)
+        neighbors = adjacency[var]
+        for other in neighbors:
+            adjacency[other].discard(var)
+            adjacency[other].update(neighbors - set([other]))
+        adjacency[var] = set()
+
+    return order
+
+
+def get_symbolic_lu(pattern, nvars, order):
+    """Perform the symbolic LU factorization of the reordered matrix.
+
+    Parameters
+    ----------
+    pattern : set of tuple
+        The ``(row, column)`` pairs of the non-zero entries, which must
+        include the diagonal
+    nvars : int
+        Number of variables in the matrix
+    order : list of int
+        The original variable eliminated at each step
+
+    Returns
+    -------
+    lu_rows : list of list of int
+        The (reordered) columns of the non-zero entries of each
+        (reordered) row of the combined L and U factors, in increasing order
+
+    """
+
+    position = [0 for i in range(nvars)]
+    for i, var in enumerate(order):
+        position[var] = i
+
+    rows = [set() for i in range(nvars)]
+    for row, col in pattern:
+        rows[position[row]].add(position[col])
+
+    # row i is updated by every earlier row k it has an entry in
+    for i in range(nvars):
+        for k in range(i):
+            if k in rows[i]:
+                rows[i].update(col for col in rows[k] if col > k)
+
+    return [sorted(row) for row in rows]
+
+
+def write_newton_solver(path, lang, touched, nvars, index_map=None):
+    """Write subroutines that factor the Newton matrix ``I - h_gamma * J``
+    and solve with the resulting factors.
+
+    The elimination order and the fill-in are determined at generation
+    time, and no pivoting is performed at run time.  The Jacobian and the
+    right hand side are in the usual state order (without the last species),
+    the reordering is internal to the factors.
+
+    Parameters
+    ----------
+    path : str
+        Path to build directory for file.
+    lang : {'c', 'cuda', 'fortran', 'matlab'}
+        Programming language.
+    touched : list of bool
+        ``True`` for the (column-major) index of each non-zero Jacobian entry
+    nvars : int
+        Number of variables in the Jacobian matrix
+    index_map : dict, optional
+        For the compressed Jacobian formats, the position of each non-zero
+        entry in the value array, see `create_jacobian.get_sparse_storage`
+
+    Returns
+    -------
+    None
+
+    """
+
+    if lang != 'c':
+        return
+
+    # dense index is row + nvars * column
+    pattern = set((x % nvars, int(x / nvars)) for x in range(nvars * nvars)
+                  if touched[x])
+    if index_map is None:
+        index_map = dict((x, x) for x in range(nvars * nvars) if touched[x])
+    pattern.update((i, i) for i in range(nvars))
+
+    order = get_fill_reducing_order(pattern, nvars)
+    lu_rows = get_symbolic_lu(pattern, nvars, order)
+
+    # position of each entry in the (row-wise) factor storage
+    lu_index = {}
+    for i, row in enumerate(lu_rows):
+        for j in row:
+            lu_index[(i, j)] = len(lu_index)
+
+    # the elimination schedule
+    divisions = [[] for i in range(nvars)]
+    updates = [[] for i in range(nvars)]
+    for i, row in enumerate(lu_rows):
+        for k in row:
+            if k >= i:
+                break
+            divisions[k].append(lu_index[(i, k)])
+            for j in lu_rows[k]:
+                if j > k:
+                    updates[k].append((lu_index[(i, j)], lu_index[(i, k)],
+                                       lu_index[(k, j)]))
+    num_updates = sum(len(x) for x in updates)
+    unroll = num_updates <= CParams.Newton_Unroll_Max
+
+    def __lu(index):
+        return utils.get_array(lang, 'lu', index)
+
+    # first write header file
+    file = open(os.path.join(path, 'newton' + utils.header_ext[lang]), 'w')
+    file.write('#ifndef NEWTON_HEAD\n'
+               '#define NEWTON_HEAD\n'
+               '\n'
+               '#include "header{}"\n'.format(utils.header_ext[lang]) +
+               '\n'
+               '//number of entries of the LU factors\n'
+               '#define NNZ_LU {}\n'.format(len(lu_index)) +
+               '\n'
+               'int factor_newton_matrix (const double, const double * {0}, '
+               'double * {0});\n'
+               'void solve_newton (const double * {0}, double * {0});\n'
+               '\n'
+               '#endif\n'.format(utils.restrict[lang])
+               )
+    file.close()
+
+    file = open(os.path.join(path, 'newton' + utils.file_ext[lang]), 'w')
+    file.write('#include "newton{}"\n'.format(utils.header_ext[lang]) +
+               '\n'
+               '// elimination order: ' +
+               ', '.join(str(var) for var in order) + '\n'
+               '\n'
+               )
+
+    if not unroll:
+        # write the elimination schedule as tables, rather than a line of
+        # code per update
+        div_ptr = [0]
+        upd_ptr = [0]
+        for k in range(nvars):
+            div_ptr.append(div_ptr[-1] + len(divisions[k]))
+            upd_ptr.append(upd_ptr[-1] + len(updates[k]))
+        tables = [('piv', nvars, [lu_index[(k, k)] for k in range(nvars)]),
+                  ('div_ptr', nvars + 1, div_ptr),
+                  ('div_ind', div_ptr[-1], [x for k in divisions for x in k]),
+                  ('upd_ptr', nvars + 1, upd_ptr),
+                  ('upd_ind', 3 * num_updates,
+                   [x for k in updates for op in k for x in op])]
+        for name, size, vals in tables:
+            line = 'static const int {}[{}] = {{'.format(name, max(size, 1))
+            if not vals:
+                vals = [0]
+            for i, val in enumerate(vals):
+                if len(line) > 70:
+                    file.write(line.rstrip() + '\n')
+                    line = '    '
+                line += str(val) + (', ' if i + 1 < len(vals) else '')
+            file.write(line + '};\n')
+        file.write('\n')
+
+    file.write('int factor_newton_matrix (const double h_gamma, '
+               'const double * {0} jac, double * {0} lu) {{\n'.format(
+                    utils.restrict[lang])
+               )
+    file.write('  // form I - h_gamma * J in the storage of the factors\n')
+    for (i, j), index in sorted(lu_index.items(), key=lambda x: x[1]):
+        orig = order[i] + nvars * order[j]
+        line = '  ' + __lu(index) + ' = '
+        if orig in index_map:
+            line += ('1.0 - ' if i == j else '-') + 'h_gamma * '
+            line += utils.get_array(lang, 'jac', index_map[orig])
+        else:
+            line += '1.0' if i == j else '0.0'
+        file.write(line + utils.line_end[lang])
+
+    file.write('\n'
+               '  // factor in place, returning the (one-based) index of a '
+               'zero pivot\n')
+    if unroll:
+        for k in range(nvars):
+            file.write('  if (' + __lu(lu_index[(k, k)]) + ' == 0.0)\n'
+                       '    return {};\n'.format(k + 1))
+            for index in divisions[k]:
+                file.write('  ' + __lu(index) + ' /= ' +
+                           __lu(lu_index[(k, k)]) + utils.line_end[lang])
+            for ij, ik, kj in updates[k]:
+                file.write('  ' + __lu(ij) + ' -= ' + __lu(ik) + ' * ' +
+                           __lu(kj) + utils.line_end[lang])
+    else:
+        file.write('  for (int k = 0; k < NSP; ++k) {\n'
+                   '    const double pivot = lu[piv[k]];\n'
+                   '    if (pivot == 0.0)\n'
+                   '      return k + 1;\n'
+                   '    for (int m = div_ptr[k]; m < div_ptr[k + 1]; ++m)\n'
+                   '      lu[div_ind[m]] /= pivot;\n'
+                   '    for (int m = upd_ptr[k]; m < upd_ptr[k + 1]; ++m)\n'
+                   '      lu[upd_ind[3 * m]] -= lu[upd_ind[3 * m + 1]] * '
+                   'lu[upd_ind[3 * m + 2]];\n'
+                   '  }\n'
+                   )
+    file.write('  return 0;\n'
+               '}\n'
+               '\n'
+               )
+
+    file.write('void solve_newton (const double * {0} lu, '
+               'double * {0} rhs) {{\n'.format(utils.restrict[lang])
+               )
+    file.write('  double x[NSP];\n')
+    for i in range(nvars):
+        file.write('  ' + utils.get_array(lang, 'x', i) + ' = ' +
+                   utils.get_array(lang, 'rhs', order[i]) +
+                   utils.line_end[lang])
+
+    file.write('\n'
+               '  // forward substitution\n')
+    for i, row in enumerate(lu_rows):
+        terms = [k for k in row if k < i]
+        if not terms:
+            continue
+        file.write('  ' + utils.get_array(lang, 'x', i) + ' -= ')
+        file.write(' + '.join(__lu(lu_index[(i, k)]) + ' * ' +
+                              utils.get_array(lang, 'x', k) for k in terms))
+        file.write(utils.line_end[lang])
+
+    file.write('\n'
+               '  // backward substitution\n')
+    for i in reversed(range(nvars)):
+        terms = [j for j in lu_rows[i] if j > i]
+        line = '  ' + utils.get_array(lang, 'x', i) + ' = '
+        if terms:
+            line += '(' + utils.get_array(lang, 'x', i) + ' - ('
+            line += ' + '.join(__lu(lu_index[(i, j)]) + ' * ' +
+                               utils.get_array(lang, 'x', j) for j in terms)
+            line += '))'
+        else:
+            line += utils.get_array(lang, 'x', i)
+        line += ' / ' + __lu(lu_index[(i, i)])
+        file.write(line + utils.line_end[lang])
+
+    file.write('\n')
+    for i in range(nvars):
+        file.write('  ' + utils.get_array(lang, 'rhs', order[i]) + ' = ' +
+                   utils.get_array(lang, 'x', i) + utils.line_end[lang])
+    file.write('}\n')
+
+    file.close()
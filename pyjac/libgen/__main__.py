@@ -1,6 +1,7 @@
 from argparse import ArgumentParser
 
 from .libgen import generate_library
+from . import object_cache
 from .. import utils
 
 if __name__ == '__main__':
@@ -38,8 +39,75 @@
                         help='If specified, the generated library will be'
                              'a static library (required for CUDA).'
                         )
+    parser.add_argument('-cd', '--cache_dir',
+                        type=str,
+                        required=False,
+                        default=None,
+                        help='Path of the object cache directory shared '
+                             'between builds, by default $PYJAC_OBJECT_CACHE '
+                             'or ~/.cache/pyjac/objects.'
+                        )
+    parser.add_argument('-cs', '--cache_size',
+                        type=float,
+                        required=False,
+                        default=object_cache.DEFAULT_SIZE / 1024. ** 2,
+                        help='Maximum size of the object cache [MB], the '
+                             'least recently used objects are removed '
+                             'beyond this.'
+                        )
+    parser.add_argument('-nc', '--no_cache',
+                        required=False,
+                        default=False,
+                        action='store_true',
+                        help='If specified, every file is compiled '
+                             'without the object cache.'
+                        )
+    parser.add_argument('-j', '--jobs',
+                        type=int,
+                        required=False,
+                        default=None,
+                        help='Number of parallel compilations, by default '
+                             'the number of CPUs.'
+                        )
+    parser.add_argument('-mb', '--memory_budget',
+                        type=float,
+                        required=False,
+                        default=None,
+                        help='Memory available to the parallel compilations '
+                             '[MB], by default 80%% of the physical memory.'
+                        )
+    parser.add_argument('-pgo', '--pgo',
+                        required=False,
+                        default=False,
+                        action='store_true',
+                        help='If specified, the library is compiled with '
+                             'profile-guided optimization, trained on '
+                             'partially stirred reactor states (C only).'
+                        )
+    parser.add_argument('-pd', '--pgo_data',
+                        type=str,
+                        nargs='+',
+                        required=False,
+                        default=None,
+                        help='The training state files (.npy, as written '
+                             'by the partially stirred reactor), by default '
+                             'data/h2_pasr_output.npy.'
+                        )
+    parser.add_argument('-lto', '--lto',
+                        required=False,
+                        default=False,
+                        action='store_true',
+                        help='If specified, the library is compiled with '
+                             'link-time optimization (C only).'
+                        )
 
     args = parser.parse_args()
     generate_library(args.lang, args.source_dir, args.obj_dir,
-                     args.out_dir, not args.static
+                     args.out_dir, not args.static,
+                     cache_dir=False if args.no_cache else args.cache_dir,
+                     cache_size=int(args.cache_size * 1024 ** 2),
+                     processes=args.jobs,
+                     memory_budget=(None if args.memory_budget is None else
+                                    args.memory_budget * 1024 ** 2),
+                     pgo=args.pgo, pgo_data=args.pgo_data, lto=args.lto
                      )
@@ -7,10 +7,13 @@
 import os
 import subprocess
 import sys
-import multiprocessing
 import platform
+from timeit import default_timer as timer
 
 from .. import utils
+from . import object_cache
+from . import scheduler
+from . import profile_guided
 
 def lib_ext(shared):
     """Returns the appropriate library extension based on the shared flag"""
@@ -40,8 +43,10 @@ def cmd_lib(lang, shared):
                       ]
                 )
 
-flags = dict(c=['-std=c99', '-O3', '-mtune=native'],
-             icc=['-std=c99', '-O3', '-xhost', '-fp-model', 'precise', '-ipo'],
+#OpenMP is used by the batched drivers, and the vectorized (SoA) kernels
+flags = dict(c=['-std=c99', '-O3', '-mtune=native', '-fopenmp'],
+             icc=['-std=c99', '-O3', '-xhost', '-fp-model', 'precise', '-ipo',
+                  '-qopenmp'],
              cuda=['-O3', '-arch=sm_20']
              )
 
@@ -50,9 +55,10 @@ def cmd_lib(lang, shared):
                     cuda=['-Xcompiler', '"-fPIC"']
                     )
 
-libs = dict(c=['-lm', '-std=c99'],
+#programs linking a static library must link OpenMP as well
+libs = dict(c=['-lm', '-std=c99', '-fopenmp'],
             cuda=['-lcudart'],
-            icc=['-m64', '-ipo', '-lm', '-std=c99']
+            icc=['-m64', '-ipo', '-lm', '-std=c99', '-qopenmp']
             )
 
 
@@ -84,6 +90,20 @@ def compiler(fstruct):
     -----
     Designed to work with a multiprocess compilation workflow
     """
+    return _compile(fstruct)[0]
+
+
+def _compile(fstruct):
+    """Compiles a source file, see `compiler`
+
+    Returns
+    -------
+    success : int
+        0 if the compilation process was sucessful, -1 otherwise
+    compiled : bool
+        ``True`` if the file was compiled, ``False`` if the object was
+        copied from the object cache
+    """
     args = [cmd_compile[fstruct.build_lang]]
     if fstruct.auto_diff:
         args = ['g++']
@@ -97,14 +117,30 @@ def compiler(fstruct):
     include = ['-I{}'.format(d) for d in fstruct.i_dirs +
                includes[fstruct.build_lang]
                ]
+    compile_flag = '-{}c'.format('d' if fstruct.lang == 'cuda' else '')
+    source = os.path.join(fstruct.source_dir, fstruct.filename +
+                          utils.file_ext[fstruct.build_lang]
+                          )
+    obj = os.path.join(fstruct.obj_dir, os.path.basename(fstruct.filename) + '.o')
+
+    key = None
+    if fstruct.cache_dir:
+        #the object is keyed on the contents of the source and its includes,
+        #not on their paths
+        #the optimized objects of a profile-guided build depend on the profile
+        profile = [os.path.splitext(obj)[0] + '.gcda'] if any(
+            val.startswith('-fprofile-use') for val in args) else []
+        key = object_cache.cache_key(
+            args[0], [val for val in args[1:] + [compile_flag] if val.strip()],
+            source, fstruct.i_dirs + includes[fstruct.build_lang], profile)
+        if object_cache.fetch(fstruct.cache_dir, key, obj):
+            print('Using cached object for ' + fstruct.filename +
+                  utils.file_ext[fstruct.build_lang]
+                  )
+            return 0, False
+
     args.extend(include)
-    args.extend([
-        '-{}c'.format('d' if fstruct.lang == 'cuda' else ''),
-        os.path.join(fstruct.source_dir, fstruct.filename +
-                     utils.file_ext[fstruct.build_lang]
-                     ),
-        '-o', os.path.join(fstruct.obj_dir, os.path.basename(fstruct.filename) + '.o')
-        ])
+    args.extend([compile_flag, source, '-o', obj])
     args = [val for val in args if val.strip()]
     try:
         print(' '.join(args))
@@ -116,8 +152,19 @@ def compiler(fstruct):
         print('Error: compilation failed for ' + fstruct.filename +
               utils.file_ext[fstruct.build_lang]
               )
-        return -1
-    return 0
+        return -1, True
+
+    if key is not None:
+        object_cache.store(fstruct.cache_dir, key, obj)
+    return 0, True
+
+
+def _timed_compile(fstruct):
+    """Compiles a source file, and returns the result of `_compile` and
+    the elapsed time [s]"""
+    start = timer()
+    success, compiled = _compile(fstruct)
+    return success, compiled, timer() - start
 
 
 def get_cuda_path():
@@ -146,7 +193,7 @@ def get_cuda_path():
     return cuda_path
 
 
-def libgen(lang, obj_dir, out_dir, filelist, shared, auto_diff):
+def libgen(lang, obj_dir, out_dir, filelist, shared, auto_diff, lto=False):
     """Create a library from a list of compiled files
 
     Parameters
@@ -163,9 +210,16 @@ def libgen(lang, obj_dir, out_dir, filelist, shared, auto_diff):
         The list of object files to include in the library
     auto_diff : Optional[bool]
         Optional; if ``True``, include autodifferentiation
+    lto : Optional[bool]
+        Optional; if ``True``, the objects were compiled for link-time
+        optimization
 
     """
     command = cmd_lib(lang, shared)
+    if lto and lang == 'c':
+        #the archive needs the LTO plugin, and the link the optimization flags
+        command = ['gcc-ar', 'rcs'] if not shared else (
+            command + flags[lang] + ['-flto'])
 
     if lang == 'cuda':
         desc = 'cu'
@@ -219,7 +273,7 @@ class file_struct(object):
     """A simple structure designed to enable multiprocess compilation
     """
     def __init__(self, lang, build_lang, filename, i_dirs, args,
-                 source_dir, obj_dir, shared
+                 source_dir, obj_dir, shared, cache_dir=None
                  ):
         """
         Parameters
@@ -240,6 +294,9 @@ def __init__(self, lang, build_lang, filename, i_dirs, args,
             The directory to place the compiled object file in
         shared : bool
             If true, this is creating a shared library
+        cache_dir : Optional[str]
+            The object cache directory, if ``None`` the object is always
+            compiled
         """
 
         self.lang = lang
@@ -251,6 +308,7 @@ def __init__(self, lang, build_lang, filename, i_dirs, args,
         self.obj_dir = obj_dir
         self.shared = shared
         self.auto_diff=False
+        self.cache_dir = cache_dir
 
 
 def get_file_list(source_dir, pmod, lang, FD=False, AD=False):
@@ -292,12 +350,20 @@ def get_file_list(source_dir, pmod, lang, FD=False, AD=False):
     if pmod:
         files += ['rxn_rates_pres_mod']
 
+    if lang == 'c' and os.path.isfile(os.path.join(source_dir, 'batch.c')):
+        files += ['batch']
+    if lang == 'c' and os.path.isfile(os.path.join(source_dir, 'newton.c')):
+        files += ['newton']
+
     if FD:
         files += ['fd_jacob']
         flists = []
     else:
         files += ['jacob']
         flists = [('jacobs', 'jac_list_{}')]
+        if os.path.isfile(os.path.join(source_dir, 'jacob_vec.c')):
+            files += ['jacob_vec']
+            flists += [('jacobs', 'jac_vec_list_{}')]
 
     flists += [('rates', 'rate_list_{}')]
     for flist in flists:
@@ -321,7 +387,10 @@ def get_file_list(source_dir, pmod, lang, FD=False, AD=False):
 
 def generate_library(lang, source_dir, obj_dir=None,
                      out_dir=None, shared=None,
-                     finite_difference=False, auto_diff=False
+                     finite_difference=False, auto_diff=False,
+                     cache_dir=None, cache_size=object_cache.DEFAULT_SIZE,
+                     processes=None, memory_budget=None,
+                     pgo=False, pgo_data=None, lto=False
                      ):
     """Generate shared/static library for pyJac files.
 
@@ -339,6 +408,31 @@ def generate_library(lang, source_dir, obj_dir=None,
         If ``True``, include finite differences
     auto_diff : bool
         If ``True``, include autodifferentiation
+    cache_dir : Optional[str or bool]
+        Optional; the object cache directory, shared between builds.
+        If ``None``, `object_cache.default_cache_dir` is used;
+        if ``False``, every file is compiled
+    cache_size : Optional[int]
+        Optional; the maximum size of the object cache [bytes], the least
+        recently used objects are removed beyond this
+    processes : Optional[int]
+        Optional; the number of parallel compilations, by default the
+        number of CPUs
+    memory_budget : Optional[float]
+        Optional; the memory available to the parallel compilations [bytes],
+        by default 80% of the physical memory.  The compile time and memory
+        of each file are estimated from earlier builds (recorded in
+        `scheduler.HISTORY` in `obj_dir`) or its line count, and the longest
+        compilations that fit in the budget are started first
+    pgo : Optional[bool]
+        Optional; if ``True``, compile an instrumented library, run it over
+        training states and compile with the resulting profile (C only)
+    pgo_data : Optional[list of str]
+        Optional; the training state files (NumPy ``.npy``), by default
+        `profile_guided.TRAINING_DATA`, see
+        `profile_guided.training_states`
+    lto : Optional[bool]
+        Optional; if ``True``, use link-time optimization (C only)
 
     Returns
     -------
@@ -356,6 +450,11 @@ def generate_library(lang, source_dir, obj_dir=None,
         print('CUDA does not support linking of shared device libraries.')
         sys.exit(-1)
 
+    if (pgo or lto) and (lang != 'c' or auto_diff):
+        print('Profile-guided and link-time optimization are only supported '
+              'for C without autodifferentiation.')
+        sys.exit(-1)
+
     build_lang = lang if lang != 'icc' else 'c'
 
     source_dir = os.path.abspath(os.path.normpath(source_dir))
@@ -392,20 +491,60 @@ def generate_library(lang, source_dir, obj_dir=None,
                                   FD=finite_difference, AD=auto_diff
                                   )
 
-    # Compile generated source code
-    structs = [file_struct(lang, build_lang, f, i_dirs,
-               (['-DFINITE_DIFF'] if finite_difference else []),
-               source_dir, obj_dir, shared) for f in files
-               ]
-    for x in structs:
-        x.auto_diff=auto_diff
+    if cache_dir is None:
+        cache_dir = object_cache.default_cache_dir()
+    if cache_dir:
+        cache_dir = os.path.abspath(os.path.expanduser(cache_dir))
 
-    pool = multiprocessing.Pool()
-    results = pool.map(compiler, structs)
-    pool.close()
-    pool.join()
-    if any(r == -1 for r in results):
-       sys.exit(-1)
+    if memory_budget is None and scheduler.available_memory():
+        memory_budget = 0.8 * scheduler.available_memory()
 
-    libname = libgen(lang, obj_dir, out_dir, files, shared, auto_diff)
+    history_file = os.path.join(obj_dir, scheduler.HISTORY)
+    history = scheduler.read_history(history_file)
+    lines = [scheduler.count_lines(os.path.join(
+             source_dir, f + utils.file_ext[build_lang])) for f in files
+             ]
+    costs = [scheduler.estimate(f, n, history) for f, n in zip(files, lines)]
+
+    def __compile(args, cache_dir):
+        # Compile generated source code
+        structs = [file_struct(lang, build_lang, f, i_dirs,
+                   (['-DFINITE_DIFF'] if finite_difference else []) + args,
+                   source_dir, obj_dir, shared, cache_dir) for f in files
+                   ]
+        for x in structs:
+            x.auto_diff=auto_diff
+
+        results = scheduler.schedule(_timed_compile, structs, costs,
+                                     processes, memory_budget
+                                     )
+        for f, n, ((success, compiled, elapsed), memory) in zip(files, lines,
+                                                                results):
+            if success == 0 and compiled:
+                history[f] = dict(lines=n, time=elapsed, memory=memory)
+        scheduler.write_history(history_file, history)
+        if any(r[0][0] == -1 for r in results):
+            sys.exit(-1)
+
+    args = []
+    if pgo:
+        #instrumented objects write their profile next to the object file
+        #they were compiled to, hence are never cached
+        for f in files:
+            profile = os.path.join(obj_dir, os.path.basename(f) + '.gcda')
+            if os.path.exists(profile):
+                os.remove(profile)
+        __compile(profile_guided.generate_flags, None)
+        if not profile_guided.train(source_dir, obj_dir, i_dirs, files,
+                                    pgo_data):
+            sys.exit(-1)
+        args += profile_guided.use_flags
+    if lto:
+        args += ['-flto'] + (['-ffat-lto-objects'] if not shared else [])
+    __compile(args, cache_dir)
+
+    if cache_dir:
+        object_cache.evict(cache_dir, cache_size)
+
+    libname = libgen(lang, obj_dir, out_dir, files, shared, auto_diff, lto)
     return os.path.join(out_dir, libname)
@@ -0,0 +1,276 @@
+"""Content-addressed cache of compiled object files.
+
+Each object is stored under a hash of the compiler version, the compiler
+flags, and the contents of the source file and of the (local) files it
+transitively includes, in the manner of ccache.  Repeated builds of the same
+generated files, e.g., by the functional and performance testers, copy the
+cached objects rather than compiling them again.  The cache is shared
+between build directories, and bounded in size by evicting the least
+recently used objects.
+"""
+
+# Python 2 compatibility
+from __future__ import division
+from __future__ import print_function
+
+# Standard libraries
+import os
+import re
+import shutil
+import hashlib
+import tempfile
+import subprocess
+
+__all__ = ['default_cache_dir', 'DEFAULT_SIZE', 'compiler_version',
+           'include_closure', 'cache_key', 'fetch', 'store', 'evict']
+
+DEFAULT_SIZE = 1024 * 1024 * 1024
+"""int: the default maximum size of the cache [bytes]"""
+
+_INCLUDE = re.compile(r'^\s*#\s*include\s*"([^"]+)"', re.MULTILINE)
+
+_versions = {}
+
+
+def default_cache_dir():
+    """Returns the default object cache directory.
+
+    This is ``$PYJAC_OBJECT_CACHE`` if set, or else ``pyjac/objects`` in
+    the user's cache directory (``$XDG_CACHE_HOME`` or ``~/.cache``).
+    """
+    if os.environ.get('PYJAC_OBJECT_CACHE'):
+        return os.environ['PYJAC_OBJECT_CACHE']
+    base = os.environ.get('XDG_CACHE_HOME',
+                          os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(base, 'pyjac', 'objects')
+
+
+def compiler_version(command):
+    """Returns the version output of a compiler, e.g., ``gcc --version``.
+
+    Parameters
+    ----------
+    command : str
+        The compiler executable
+
+    Returns
+    -------
+    version : str
+        The output of the compiler's ``--version``, or an empty string if
+        it could not be run
+
+    """
+    if command not in _versions:
+        try:
+            output = subprocess.check_output([command, '--version'],
+                                             stderr=subprocess.STDOUT)
+            _versions[command] = output.decode('utf-8', 'replace')
+        except (OSError, subprocess.CalledProcessError):
+            _versions[command] = ''
+    return _versions[command]
+
+
+def include_closure(source, i_dirs):
+    """Returns the local files transitively included by a source file.
+
+    Only quoted includes are followed, searched for in the directory of
+    the including file and then the include directories; system headers
+    are covered by the compiler version.
+
+    Parameters
+    ----------
+    source : str
+        The source file
+    i_dirs : list of str
+        The include directories, in search order
+
+    Returns
+    -------
+    includes : list of tuple
+        The ``(name, path)`` of each include, in the order first found;
+        the path is ``None`` if the file was not found
+
+    """
+    includes = []
+    seen = set()
+    pending = [source]
+    while pending:
+        current = pending.pop(0)
+        with open(current, 'r') as file:
+            names = _INCLUDE.findall(file.read())
+        for name in names:
+            path = None
+            for directory in [os.path.dirname(current)] + list(i_dirs):
+                candidate = os.path.join(directory, name)
+                if os.path.isfile(candidate):
+                    path = os.path.abspath(candidate)
+                    break
+            if (name, path) in seen:
+                continue
+            seen.add((name, path))
+            includes.append((name, path))
+            if path is not None:
+                pending.append(path)
+    return includes
+
+
+def _file_hash(filename):
+    """Returns the SHA-256 hash of the contents of a file."""
+    sha = hashlib.sha256()
+    with open(filename, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 16), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def cache_key(command, flags, source, i_dirs, extra_files=()):
+    """Returns the cache key of the compilation of a source file.
+
+    The paths of the source, object and include directories do not enter
+    the key, only the contents of the files, such that the same generated
+    code compiled in another build directory shares the cached object.
+
+    Parameters
+    ----------
+    command : str
+        The compiler executable
+    flags : list of str
+        The compiler flags, without include directories, the source and
+        the output
+    source : str
+        The source file
+    i_dirs : list of str
+        The include directories, in search order
+    extra_files : list of str, optional
+        Other files read by the compiler, e.g., profile data
+
+    Returns
+    -------
+    key : str
+        The hexadecimal SHA-256 key
+
+    """
+    sha = hashlib.sha256()
+    for part in ([command, compiler_version(command)] + list(flags) +
+                 [_file_hash(source)]):
+        sha.update(part.encode('utf-8'))
+        sha.update(b'\0')
+    for name, path in include_closure(source, i_dirs):
+        sha.update(name.encode('utf-8'))
+        sha.update(b'\0')
+        sha.update((_file_hash(path) if path is not None else '').encode(
+            'utf-8'))
+        sha.update(b'\0')
+    for path in extra_files:
+        sha.update((_file_hash(path) if os.path.isfile(path) else '').encode(
+            'utf-8'))
+        sha.update(b'\0')
+    return sha.hexdigest()
+
+
+def _entry(cache_dir, key):
+    """Returns the path of a cached object."""
+    return os.path.join(cache_dir, key[:2], key + '.o')
+
+
+def fetch(cache_dir, key, obj):
+    """Copies a cached object, if present.
+
+    Parameters
+    ----------
+    cache_dir : str
+        The cache directory
+    key : str
+        The cache key, see `cache_key`
+    obj : str
+        The object file to write
+
+    Returns
+    -------
+    found : bool
+        ``True`` if the object was cached
+
+    """
+    entry = _entry(cache_dir, key)
+    try:
+        shutil.copyfile(entry, obj)
+        # mark as recently used
+        os.utime(entry, None)
+    except (IOError, OSError):
+        return False
+    return True
+
+
+def store(cache_dir, key, obj):
+    """Adds a compiled object to the cache.
+
+    The object is copied to a temporary file in the cache first, such that
+    concurrent builds never see a partial object.
+
+    Parameters
+    ----------
+    cache_dir : str
+        The cache directory
+    key : str
+        The cache key, see `cache_key`
+    obj : str
+        The compiled object file
+
+    """
+    entry = _entry(cache_dir, key)
+    try:
+        if not os.path.isdir(os.path.dirname(entry)):
+            os.makedirs(os.path.dirname(entry))
+        handle, temp = tempfile.mkstemp(dir=os.path.dirname(entry),
+                                        suffix='.tmp')
+        os.close(handle)
+        shutil.copyfile(obj, temp)
+        if os.path.isfile(entry):
+            os.remove(entry)
+        os.rename(temp, entry)
+    except (IOError, OSError):
+        # another build stored the same object, or the cache is unwritable
+        pass
+
+
+def evict(cache_dir, max_size=DEFAULT_SIZE):
+    """Removes the least recently used objects until the cache fits.
+
+    Parameters
+    ----------
+    cache_dir : str
+        The cache directory
+    max_size : int, optional
+        The maximum total size of the cached objects [bytes]
+
+    Returns
+    -------
+    removed : int
+        The number of objects removed
+
+    """
+    entries = []
+    total = 0
+    for root, dirs, files in os.walk(cache_dir):
+        for name in files:
+            if not name.endswith('.o'):
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path, stat.st_size))
+            total += stat.st_size
+
+    removed = 0
+    for mtime, path, size in sorted(entries):
+        if total <= max_size:
+            break
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError:
+            pass
+        total -= size
+    return removed
@@ -0,0 +1,236 @@
+"""Profile-guided optimization of the pyJac library.
+
+The library is first compiled with ``-fprofile-generate``, a training driver
+evaluating the species rates and Jacobian through the batched drivers (in
+the memory layout of the generated code) is run over representative states
+(by default the partially stirred reactor states in
+``data/h2_pasr_output.npy``), and the library is compiled again with
+``-fprofile-use``, such that the branches actually taken, e.g., the
+temperature ranges of the thermodynamic fits and the falloff/PLOG code
+paths, are laid out accordingly.
+"""
+
+# Python 2 compatibility
+from __future__ import division
+from __future__ import print_function
+
+# Standard libraries
+import os
+import re
+import sys
+import subprocess
+
+# Related modules
+import numpy as np
+
+# Local imports
+from .. import utils
+
+__all__ = ['TRAINING_DATA', 'DRIVER', 'generate_flags', 'use_flags',
+           'training_states', 'train']
+
+TRAINING_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, os.pardir, 'data',
+                             'h2_pasr_output.npy')
+"""str: the partially stirred reactor states bundled with the source"""
+
+generate_flags = ['-fprofile-generate']
+"""list of str: the flags of the instrumented compilation"""
+
+use_flags = ['-fprofile-use', '-fprofile-correction',
+             '-fprofile-partial-training', '-Wno-missing-profile']
+"""list of str: the flags of the optimized compilation; functions never
+called during training are compiled as without profile"""
+
+DRIVER = """#include <stdio.h>
+#include "header.h"
+#include "mass_mole.h"
+#include "batch.h"
+#include "jacob.h"
+
+// states evaluated per call of the batched functions
+#ifdef VECWIDTH
+ #define CHUNK (4 * VECWIDTH)
+#else
+ #define CHUNK 16
+#endif
+// entries of each Jacobian
+#ifdef NNZ
+ #define JAC_SIZE NNZ
+#else
+ #define JAC_SIZE (NSP * NSP)
+#endif
+
+// the index of entry k of state i of n in a batch, see batch.h
+static int batch_index (int n, int i, int k, int size)
+{
+#ifdef VECWIDTH
+    // blocks of VECWIDTH states, the last with a stride of its states
+    int start = i - i % VECWIDTH;
+    int width = n - start < VECWIDTH ? n - start : VECWIDTH;
+    return start * size + i % VECWIDTH + k * width;
+#else
+    return i * size + k;
+#endif
+}
+
+int main (int argc, char *argv[])
+{
+    FILE *fp = fopen (argv[1], "rb");
+    if (fp == NULL)
+    {
+        fprintf(stderr, "Could not open file: %s\\n", argv[1]);
+        return 1;
+    }
+    double buffer[CHUNK][NSP + 3];
+    double var[CHUNK];
+    double y[CHUNK * NSP];
+    double dy[CHUNK * NSP];
+    double* jac = (double*)malloc(CHUNK * JAC_SIZE * sizeof(double));
+    int num = 0;
+    // each state is (time, temperature, pressure, mass fractions)
+    int n;
+    while ((n = fread(buffer, sizeof(double) * (NSP + 3), CHUNK, fp)) > 0)
+    {
+        for (int i = 0; i < n; ++i)
+        {
+            double y_i[NSP];
+            apply_mask(&buffer[i][3]);
+            y_i[0] = buffer[i][1];
+            for (int j = 1; j < NSP; ++j)
+            {
+                y_i[j] = buffer[i][j + 2];
+            }
+#ifdef CONP
+            var[i] = buffer[i][2];
+#elif CONV
+            double Xi[NSP];
+            mass2mole (&y_i[1], Xi);
+            var[i] = getDensity (y_i[0], buffer[i][2], Xi);
+#endif
+            for (int j = 0; j < NSP; ++j)
+            {
+                y[batch_index(n, i, j, NSP)] = y_i[j];
+            }
+        }
+        dydt_batch (n, 0, var, y, dy, 0);
+        eval_jacob_batch (n, 0, var, y, jac, 0);
+        num += n;
+    }
+    fclose (fp);
+    free (jac);
+    printf("%d training states\\n", num);
+    return num == 0;
+}
+"""
+"""str: the training driver, reads the states of the binary file given and
+evaluates them in chunks with `dydt_batch` and `eval_jacob_batch`; the
+structure-of-arrays layout is detected from ``VECWIDTH`` in header.h"""
+
+
+def training_states(num_species, data=None, num_states=1000):
+    """Returns the training states of a mechanism.
+
+    Parameters
+    ----------
+    num_species : int
+        The number of species of the mechanism
+    data : list of str, optional
+        The state files (NumPy ``.npy``, as written by the partially
+        stirred reactor), if ``None`` `TRAINING_DATA` is used
+    num_states : int, optional
+        The number of states generated if no file matches the mechanism
+
+    Returns
+    -------
+    states : numpy.ndarray
+        The ``(time, temperature, pressure, mass fractions)`` of each state,
+        with the species in the order of the mechanism file
+
+    """
+    if data is None:
+        data = [TRAINING_DATA]
+    states = []
+    for filename in data:
+        state_data = np.load(filename)
+        state_data = state_data.reshape(-1, state_data.shape[-1])
+        if state_data.shape[1] != num_species + 3:
+            print('Warning: {} has {} species, but the mechanism has {}; '
+                  'skipping.'.format(filename, state_data.shape[1] - 3,
+                                     num_species)
+                  )
+            continue
+        states.append(state_data)
+    if states:
+        return np.vstack(states)
+
+    # random states over the temperature ranges of the thermodynamic fits
+    # and the pressures of the falloff/PLOG reactions
+    print('Using {} random training states.'.format(num_states))
+    rand = np.random.RandomState(0)
+    states = np.zeros((num_states, num_species + 3))
+    states[:, 1] = rand.uniform(300., 3000., num_states)
+    states[:, 2] = 101325. * 10. ** rand.uniform(-2., 2., num_states)
+    fractions = rand.uniform(0., 1., (num_states, num_species))
+    states[:, 3:] = fractions / np.sum(fractions, axis=1)[:, np.newaxis]
+    return states
+
+
+def train(source_dir, obj_dir, i_dirs, files, data=None):
+    """Runs the training driver on an instrumented library.
+
+    Parameters
+    ----------
+    source_dir : str
+        Path of folder with pyJac files
+    obj_dir : str
+        Path of folder with the instrumented object files
+    i_dirs : list of str
+        The include directories
+    files : list of str
+        The compiled files
+    data : list of str, optional
+        The state files, see `training_states`
+
+    Returns
+    -------
+    success : bool
+        ``True`` if the driver ran successfully
+
+    """
+    for header in ['batch.h', 'jacob.h']:
+        if not os.path.isfile(os.path.join(source_dir, header)):
+            print('Error: training of pyjac library requires the batched '
+                  'drivers and the Jacobian, {} not found.'.format(header))
+            return False
+
+    with open(os.path.join(source_dir, 'mechanism.h'), 'r') as file:
+        num_species = int(re.search(r'#define NSP (\d+)',
+                                    file.read()).group(1))
+    states = training_states(num_species, data)
+    states.astype(np.float64).tofile(os.path.join(obj_dir, 'pgo_data.bin'))
+
+    driver = os.path.join(obj_dir, 'pgo_train' + utils.file_ext['c'])
+    with open(driver, 'w') as file:
+        file.write(DRIVER)
+
+    program = os.path.join(obj_dir, 'pgo_train')
+    args = (['gcc', '-std=c99', '-O3', '-fopenmp'] + generate_flags +
+            ['-I{}'.format(d) for d in i_dirs] + [driver] +
+            [os.path.join(obj_dir, os.path.basename(f) + '.o')
+             for f in files] +
+            ['-o', program, '-lm']
+            )
+    try:
+        print(' '.join(args))
+        subprocess.check_call(args)
+        subprocess.check_call([program, os.path.join(obj_dir,
+                                                     'pgo_data.bin')])
+    except OSError:
+        print('Error: Compiler gcc not found, training of pyjac library '
+              'failed.')
+        sys.exit(-1)
+    except subprocess.CalledProcessError:
+        print('Error: training of pyjac library failed.')
+        return False
+    return True
@@ -0,0 +1,237 @@
+"""Cost-aware scheduling of the compilation of the generated files.
+
+The generated files vary enormously in size, e.g., ``rxn_rates.c`` may have
+tens of thousands of lines, while ``mass_mole.c`` is tiny.  The compile time
+and peak memory of each file are estimated from the times and memory
+recorded by earlier builds, scaled by the change in line count, or from its
+line count alone, and the longest jobs are started first, as long as the
+estimated memory of the running jobs fits in a memory budget.
+"""
+
+# Python 2 compatibility
+from __future__ import division
+from __future__ import print_function
+
+# Standard libraries
+import os
+import sys
+import json
+import multiprocessing
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+try:
+    import resource
+except ImportError:
+    resource = None
+
+__all__ = ['HISTORY', 'count_lines', 'available_memory', 'read_history',
+           'write_history', 'estimate', 'schedule']
+
+HISTORY = '.pyjac_build_times.json'
+"""str: filename of the recorded compile times, in the object directory"""
+
+SECONDS_PER_LINE = 2e-4
+"""float: the compile time per line [s] assumed without a build history"""
+
+BASE_MEMORY = 100 * 1024 ** 2
+"""int: the compiler memory [bytes] assumed for an empty file"""
+
+MEMORY_PER_LINE = 64 * 1024
+"""int: the compiler memory per line [bytes] assumed without a history"""
+
+
+def count_lines(filename):
+    """Returns the number of lines of a file, or 0 if it does not exist."""
+    try:
+        with open(filename, 'rb') as file:
+            return sum(block.count(b'\n') for block in
+                       iter(lambda: file.read(1 << 16), b''))
+    except (IOError, OSError):
+        return 0
+
+
+def available_memory():
+    """Returns the physical memory of the system [bytes], if known.
+
+    Returns
+    -------
+    memory : int or None
+        The physical memory, or ``None`` if it cannot be determined
+
+    """
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def read_history(filename):
+    """Reads the recorded compile times and memory of the files.
+
+    Parameters
+    ----------
+    filename : str
+        The history file, see `HISTORY`
+
+    Returns
+    -------
+    history : dict
+        The ``lines``, ``time`` [s] and ``memory`` [bytes] of each file,
+        by filename; empty if there is no readable history
+
+    """
+    try:
+        with open(filename, 'r') as file:
+            history = json.load(file)
+    except (IOError, OSError, ValueError):
+        return {}
+    return history if isinstance(history, dict) else {}
+
+
+def write_history(filename, history):
+    """Writes the recorded compile times and memory of the files.
+
+    Parameters
+    ----------
+    filename : str
+        The history file, see `HISTORY`
+    history : dict
+        The ``lines``, ``time`` [s] and ``memory`` [bytes] of each file,
+        by filename
+
+    """
+    temp = filename + '.tmp'
+    try:
+        with open(temp, 'w') as file:
+            json.dump(history, file, indent=1, sort_keys=True)
+        os.rename(temp, filename)
+    except (IOError, OSError):
+        pass
+
+
+def estimate(name, lines, history):
+    """Estimates the compile time and peak memory of a file.
+
+    A file compiled before is assumed to scale with its line count; a new
+    file is assumed to take the mean time per line of the recorded files.
+
+    Parameters
+    ----------
+    name : str
+        The file, as recorded in the history
+    lines : int
+        The current number of lines of the file
+    history : dict
+        The recorded compile times and memory, see `read_history`
+
+    Returns
+    -------
+    time : float
+        The estimated compile time [s]
+    memory : float
+        The estimated peak memory of the compiler [bytes]
+
+    """
+    record = history.get(name)
+    if record and record.get('lines'):
+        scale = lines / record['lines']
+        return (record['time'] * scale,
+                record.get('memory', 0) * max(scale, 1.))
+
+    recorded = [r for r in history.values() if r.get('lines')]
+    total_lines = sum(r['lines'] for r in recorded)
+    if total_lines:
+        rate = sum(r['time'] for r in recorded) / total_lines
+    else:
+        rate = SECONDS_PER_LINE
+    return lines * rate, BASE_MEMORY + lines * MEMORY_PER_LINE
+
+
+def _peak_memory():
+    """Returns the peak memory of the finished child processes [bytes]."""
+    if resource is None:
+        return 0
+    maxrss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # kilobytes, except on OS X
+    return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+
+def schedule(func, items, costs, processes=None, memory_budget=None):
+    """Runs a function on each item in parallel, longest jobs first.
+
+    Each job runs in a new worker process, such that the peak memory of
+    the processes it starts can be measured.  A job is only started if the
+    estimated memory of the running jobs and itself fits in the budget,
+    else the next-longest job that fits is started; a job that does not fit
+    on its own runs alone.
+
+    Parameters
+    ----------
+    func : function
+        The function to run, must be picklable
+    items : list
+        The argument of each job
+    costs : list of tuple
+        The estimated ``(time, memory)`` of each job, see `estimate`
+    processes : int, optional
+        The number of parallel jobs, by default the number of CPUs
+    memory_budget : float, optional
+        The memory available to the running jobs [bytes], unbounded if
+        ``None``
+
+    Returns
+    -------
+    results : list of tuple
+        The ``(result, peak memory)`` of each job, in the order of `items`
+
+    """
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if memory_budget is None:
+        memory_budget = float('inf')
+
+    pending = sorted(range(len(items)), key=lambda i: -costs[i][0])
+    running = {}
+    results = [None] * len(items)
+    finished = queue.Queue()
+
+    pool = multiprocessing.Pool(processes, maxtasksperchild=1)
+    try:
+        while pending or running:
+            while pending and len(running) < processes:
+                used = sum(running.values())
+                for index, i in enumerate(pending):
+                    if not running or used + costs[i][1] <= memory_budget:
+                        break
+                else:
+                    break
+                pending.pop(index)
+                running[i] = costs[i][1]
+                # errors outside of the job (e.g., pickling the arguments)
+                # are passed to the error callback
+                pool.apply_async(_run, (func, items[i]),
+                                 callback=lambda result, i=i:
+                                 finished.put((i, result)),
+                                 error_callback=lambda e, i=i:
+                                 finished.put((i, e)))
+            i, result = finished.get()
+            if isinstance(result, BaseException):
+                pool.terminate()
+                raise result
+            results[i] = result
+            del running[i]
+    finally:
+        pool.close()
+        pool.join()
+    return results
+
+
+def _run(func, item):
+    """Runs a job in a worker process, and measures its peak memory."""
+    try:
+        return func(item), _peak_memory()
+    except (Exception, SystemExit) as e:
+        # an exception in the worker would otherwise never be reported
+        return e
@@ -0,0 +1,163 @@
+"""Benchmark of the cache-optimizer scoring.
+
+Times `optimizer_loop` against the `bitarray` reference implementation
+`optimizer_loop_bitarray` on the species and reaction mappings of the
+bundled mechanism and of a synthetic mechanism, from the same starting
+orders and random seeds, and checks that both find the same order.
+"""
+
+# Python 2 compatibility
+from __future__ import division
+from __future__ import print_function
+
+# Standard libraries
+import os
+import sys
+import tempfile
+import shutil
+from argparse import ArgumentParser
+from timeit import default_timer as timer
+
+# Related modules
+import numpy as np
+from bitarray import bitarray
+
+# Local imports
+from ..core import mech_interpret as mech
+from ..core import cache_optimizer as cache
+from .parse_benchmark import write_synthetic_mechanism
+
+BUNDLED = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                       os.pardir, os.pardir, 'data', 'h2o2.inp')
+"""str: the mechanism bundled with the source distribution"""
+
+
+def benchmark(mapping, lookback=2, improve_cutoff=20, random_tries=3,
+              seeds=3):
+    """Times both optimizer loops on a mapping.
+
+    Parameters
+    ----------
+    mapping : numpy.ndarray of bool
+        The mapping of each value, see `cache_optimizer.get_mappings`
+    lookback : int, optional
+        Width of lookahead/lookforward
+    improve_cutoff : int, optional
+        Number of iterations without improvement before return
+    random_tries : int, optional
+        Number of random restarts
+    seeds : int, optional
+        Number of random starting orders, the times are summed over them
+
+    Returns
+    -------
+    times : dict
+        The total run time [s] of each loop, by function name
+    same : bool
+        ``True`` if both loops give the same score and order for each seed
+
+    """
+    bit_mapping = [bitarray(row.tolist()) for row in mapping]
+    times = {}
+    results = {}
+    for loop, arg in [(cache.optimizer_loop_bitarray, bit_mapping),
+                      (cache.optimizer_loop, mapping)]:
+        elapsed = 0.
+        results[loop.__name__] = []
+        for seed in range(seeds):
+            state = np.random.RandomState(seed)
+            order = state.permutation(len(mapping)).tolist()
+            np.random.seed(seed)
+            start = timer()
+            results[loop.__name__].append(
+                loop(order, arg, lookback, improve_cutoff, random_tries))
+            elapsed += timer() - start
+        times[loop.__name__] = elapsed
+
+    same = all(x[1] == y[1] and abs(x[0] - y[0]) <= 1e-9 * max(1., abs(x[0]))
+               for x, y in zip(results['optimizer_loop_bitarray'],
+                               results['optimizer_loop']))
+    return times, same
+
+
+def main(args=None):
+    if args is None:
+        parser = ArgumentParser(description='cache_benchmark: times the '
+                                            'cache-optimizer scoring'
+                                )
+        parser.add_argument('-i', '--input',
+                            type=str,
+                            default=None,
+                            help='Mechanism file, if not given the bundled '
+                                 'mechanism and a synthetic mechanism are '
+                                 'used.'
+                            )
+        parser.add_argument('-t', '--thermo',
+                            type=str,
+                            default=None,
+                            help='Thermodynamic database filename (must be '
+                                 'Chemkin format).'
+                            )
+        parser.add_argument('-ns', '--num-species',
+                            type=int,
+                            default=100,
+                            help='Number of species of the synthetic '
+                                 'mechanism.'
+                            )
+        parser.add_argument('-nr', '--num-reactions',
+                            type=int,
+                            default=500,
+                            help='Number of reactions of the synthetic '
+                                 'mechanism.'
+                            )
+        parser.add_argument('-l', '--lookback',
+                            type=int,
+                            default=2,
+                            help='Width of lookahead/lookforward.'
+                            )
+        parser.add_argument('-s', '--seeds',
+                            type=int,
+                            default=3,
+                            help='Number of random starting orders.'
+                            )
+        args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        if args.input is not None:
+            mechs = [(args.input, args.thermo)]
+        else:
+            mechs = [(BUNDLED, None), write_synthetic_mechanism(
+                temp_dir, args.num_species, args.num_reactions)]
+
+        ok = True
+        print('{:<20}{:<10}{:>7}{:>12}{:>12}{:>10}  same'.format(
+            'mechanism', 'mapping', 'size', 'bitarray', 'numpy', 'speedup'))
+        for mech_filename, therm_filename in mechs:
+            elems, specs, reacs = mech.read_mech_stream(mech_filename,
+                                                        therm_filename)
+            spec_mapping, reac_mapping = cache.get_mappings(specs, reacs)
+            for name, mapping in [('species', spec_mapping),
+                                  ('reactions', reac_mapping)]:
+                times, same = benchmark(mapping, lookback=args.lookback,
+                                        seeds=args.seeds)
+                ok = ok and same
+                print('{:<20}{:<10}{:>7}{:>11.3f}s{:>11.3f}s{:>9.1f}x  {}'
+                      .format(os.path.basename(mech_filename)[:19], name,
+                              len(mapping),
+                              times['optimizer_loop_bitarray'],
+                              times['optimizer_loop'],
+                              times['optimizer_loop_bitarray'] /
+                              times['optimizer_loop'],
+                              same))
+    finally:
+        shutil.rmtree(temp_dir)
+
+    if not ok:
+        print('Error: the optimizer loops give different orders.')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,277 @@
+"""Benchmark of the Chemkin-format mechanism interpreters.
+
+Times `read_mech` and `read_mech_stream` on a given mechanism, or on a
+synthetic mechanism of a realistic size, and checks that both give the same
+elements, species and reactions.
+"""
+
+# Python 2 compatibility
+from __future__ import division
+from __future__ import print_function
+
+# Standard libraries
+import os
+import sys
+import random
+import tempfile
+import shutil
+from argparse import ArgumentParser
+from timeit import default_timer as timer
+
+# Local imports
+from ..core import mech_interpret as mech
+
+
+def __write_thermo_entry(file, name, comp, rng):
+    """Writes a (random) four-line thermodynamic database entry."""
+    elem_str = ''.join('{:<2}{:>3d}'.format(e, n) for e, n in comp)
+    file.write('{:<18}{:<6}{:<20}G{:>10.3f}{:>10.3f}{:>8.2f}      1\n'.format(
+        name, 'SYN', elem_str, 300.0, 5000.0, rng.choice([1000., 1382.])))
+    coeffs = [rng.uniform(-10., 10.) * 10. ** rng.randint(-15, 4)
+              for i in range(14)]
+    for i, line in enumerate([coeffs[0:5], coeffs[5:10], coeffs[10:14]]):
+        file.write(''.join('{:15.8E}'.format(c) for c in line).ljust(79) +
+                   '{}\n'.format(i + 2))
+
+
+def write_synthetic_mechanism(path, num_species=1000, num_reactions=5000,
+                              inline_thermo=False, seed=0):
+    """Writes a synthetic Chemkin-format mechanism and thermo database.
+
+    The reactions cycle through all of the supported reaction types and
+    auxiliary keywords, and the thermodynamic database contains as many
+    unused species as species in the mechanism.
+
+    Parameters
+    ----------
+    path : str
+        The directory to write the files to
+    num_species : int, optional
+        The number of species, at least four
+    num_reactions : int, optional
+        The number of reactions
+    inline_thermo : bool, optional
+        If ``True``, the thermo data is written in a THERMO section of the
+        mechanism file, rather than a separate database
+    seed : int, optional
+        The seed of the random number generator
+
+    Returns
+    -------
+    mech_filename : str
+        The mechanism file
+    therm_filename : str
+        The thermodynamic database, or ``None`` if ``inline_thermo``
+
+    """
+    rng = random.Random(seed)
+    names = ['SP{}'.format(i) for i in range(num_species)]
+
+    def __comp():
+        return [(e, rng.randint(1, 12)) for e in ['C', 'H', 'O', 'N']
+                if rng.random() < 0.6] or [('H', 1)]
+
+    def __spec():
+        return rng.choice(names)
+
+    def __arrhenius():
+        return '{:.4E} {:.3f} {:.2f}'.format(
+            rng.uniform(1., 10.) * 10. ** rng.randint(5, 15),
+            rng.uniform(-2., 3.), rng.uniform(0., 50000.))
+
+    def __write_thermo(file):
+        file.write('THERMO ALL\n'
+                   '   300.000  1000.000  5000.000\n')
+        for i, name in enumerate(names):
+            __write_thermo_entry(file, name, __comp(), rng)
+            __write_thermo_entry(file, 'UNUSED{}'.format(i), __comp(), rng)
+        file.write('END\n')
+
+    mech_filename = os.path.join(path, 'synthetic.inp')
+    with open(mech_filename, 'w') as file:
+        file.write('! synthetic mechanism, {} species and {} reactions\n'
+                   '\n'
+                   'ELEMENTS\n'
+                   'C H O N\n'
+                   'END\n'
+                   'SPECIES\n'.format(num_species, num_reactions))
+        for i in range(0, num_species, 8):
+            file.write(' '.join(names[i:i + 8]) + '\n')
+        file.write('END\n')
+        if inline_thermo:
+            __write_thermo(file)
+        file.write('REACTIONS\n')
+
+        for i in range(num_reactions):
+            kind = i % 10
+            a, b, c, d = [__spec() for j in range(4)]
+            if kind == 0:
+                file.write('{}+{}<=>{}+{}    {}\n'.format(
+                    a, b, c, d, __arrhenius()))
+            elif kind == 1:
+                file.write('{}+M<=>{}+{}+M    {}\n'.format(
+                    a, b, c, __arrhenius()))
+                file.write('{}/2.50/ {}/12.00/ ! efficiencies\n'.format(b, c))
+            elif kind == 2:
+                file.write('{}+{}(+M)<=>{}(+M)    {}\n'.format(
+                    a, b, c, __arrhenius()))
+                file.write('   LOW  /  {} /\n'.format(__arrhenius()))
+                file.write('   TROE/ 0.5 1.0E-30 1.0E+30 1.0E+10 /\n')
+                file.write('{}/2.00/ {}/0.00/\n'.format(a, d))
+            elif kind == 3:
+                file.write('{}+{}(+{})={}+{}(+{})    {}\n'.format(
+                    a, b, d, c, a, d, __arrhenius()))
+                file.write('HIGH / {} /\n'.format(__arrhenius()))
+                file.write('SRI / 0.45 797.0 979.0 /\n')
+            elif kind == 4:
+                file.write('{}+{}={}+{}    {}\n'.format(
+                    a, b, c, d, __arrhenius()))
+                for p in [0.01, 0.1, 1.0, 10.0, 100.0]:
+                    file.write('PLOG / {:.3E} {} /\n'.format(p, __arrhenius()))
+            elif kind == 5:
+                file.write('2{}=>{}+{}    {}\n'.format(a, c, d, __arrhenius()))
+            elif kind == 6:
+                file.write('{}+{}={}    {}\n'.format(a, b, c, __arrhenius()))
+                file.write('REV / {} /\n'.format(__arrhenius()))
+            elif kind == 7:
+                for j in range(2):
+                    file.write('{}+{}={}+{}    {}\n'.format(
+                        a, b, c, d, __arrhenius()))
+                    file.write('DUPLICATE\n')
+            elif kind == 8:
+                file.write('{}+{}(+M)<=>{}+{}(+M)    1.0 0.0 0.0\n'.format(
+                    a, b, c, d))
+                file.write('TCHEB/ 300.0 2500.0 / PCHEB / 0.001 100.0 /\n')
+                file.write('CHEB/ 3 2 {:.4f} {:.4f} /\n'.format(
+                    rng.uniform(1., 10.), rng.uniform(-1., 1.)))
+                file.write('CHEB/ {:.4f} {:.4f} {:.4f} {:.4f} /\n'.format(
+                    *[rng.uniform(-1., 1.) for j in range(4)]))
+            else:
+                file.write('{}+1.5{}=>{}    {}  ! fractional\n'.format(
+                    a, b, c, __arrhenius()))
+        file.write('END\n')
+
+    if inline_thermo:
+        return mech_filename, None
+
+    therm_filename = os.path.join(path, 'synthetic_therm.dat')
+    with open(therm_filename, 'w') as file:
+        __write_thermo(file)
+    return mech_filename, therm_filename
+
+
+def same_mechanism(first, second):
+    """Returns ``True`` if two interpreted mechanisms are identical.
+
+    Parameters
+    ----------
+    first : tuple
+        The elements, species and reactions of the first mechanism
+    second : tuple
+        The elements, species and reactions of the second mechanism
+
+    Returns
+    -------
+    same : bool
+        ``True`` if the mechanisms are identical, in the same order
+
+    """
+    return all(x == y for x, y in zip(first, second))
+
+
+def benchmark(mech_filename, therm_filename=None, repeats=3):
+    """Times the mechanism interpreters, and compares their results.
+
+    Parameters
+    ----------
+    mech_filename : str
+        Reaction mechanism filename (e.g. 'mech.dat')
+    therm_filename : str, optional
+        Thermodynamic database filename (e.g., 'therm.dat')
+    repeats : int, optional
+        The number of times each interpreter is run, the fastest is reported
+
+    Returns
+    -------
+    times : dict
+        The fastest run time [s] of each interpreter, by function name
+    same : bool
+        ``True`` if both interpreters give the same mechanism
+
+    """
+    times = {}
+    results = {}
+    for reader in [mech.read_mech, mech.read_mech_stream]:
+        best = None
+        for i in range(repeats):
+            start = timer()
+            results[reader.__name__] = reader(mech_filename, therm_filename)
+            elapsed = timer() - start
+            best = elapsed if best is None else min(best, elapsed)
+        times[reader.__name__] = best
+
+    same = same_mechanism(results['read_mech'], results['read_mech_stream'])
+    return times, same
+
+
+def main(args=None):
+    if args is None:
+        parser = ArgumentParser(description='parse_benchmark: times the '
+                                            'Chemkin-format mechanism '
+                                            'interpreters'
+                                )
+        parser.add_argument('-i', '--input',
+                            type=str,
+                            default=None,
+                            help='Mechanism file, if not given a synthetic '
+                                 'mechanism is used.'
+                            )
+        parser.add_argument('-t', '--thermo',
+                            type=str,
+                            default=None,
+                            help='Thermodynamic database filename (must be '
+                                 'Chemkin format).'
+                            )
+        parser.add_argument('-ns', '--num-species',
+                            type=int,
+                            default=2000,
+                            help='Number of species of the synthetic '
+                                 'mechanism.'
+                            )
+        parser.add_argument('-nr', '--num-reactions',
+                            type=int,
+                            default=10000,
+                            help='Number of reactions of the synthetic '
+                                 'mechanism.'
+                            )
+        parser.add_argument('-r', '--repeats',
+                            type=int,
+                            default=3,
+                            help='Number of runs of each interpreter.'
+                            )
+        args = parser.parse_args()
+
+    temp_dir = None
+    mech_filename, therm_filename = args.input, args.thermo
+    if mech_filename is None:
+        temp_dir = tempfile.mkdtemp()
+        mech_filename, therm_filename = write_synthetic_mechanism(
+            temp_dir, args.num_species, args.num_reactions)
+    try:
+        times, same = benchmark(mech_filename, therm_filename, args.repeats)
+    finally:
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir)
+
+    for name in sorted(times):
+        print('{:<18}{:10.3f} s'.format(name, times[name]))
+    print('speedup           {:10.2f}x'.format(
+        times['read_mech'] / times['read_mech_stream']))
+    if not same:
+        print('Error: interpreters give different mechanisms.')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
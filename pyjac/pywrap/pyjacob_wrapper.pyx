@@ -1,11 +1,21 @@
 import numpy as np
 cimport numpy as np
+cimport cython
+cimport openmp
+from cython.parallel cimport prange
+from libc.string cimport memset
 
-cdef extern from "dydt.h":
-    void dydt(double t, double pres, double* y, double* dy)
+cdef extern from "mechanism.h":
+    enum:
+        NSP
+        NN
 
-cdef extern from "jacob.h":
+cdef extern from "dydt.h" nogil:
+    void dydt(double t, double pres, const double* y, double* dy)
+
+cdef extern from "jacob.h" nogil:
     void eval_jacob (const double t, const double pres, const double* y, double* jac)
+    void eval_dydt_and_jacob (const double t, const double pres, const double* y, double* dy, double* jac)
 
 cdef extern from "rates.h":
     void eval_rxn_rates (const double T, const double pres, const double* C, double* fwd_rxn_rates, double* rev_rxn_rates)
@@ -27,6 +37,13 @@ def py_eval_jacobian(np.double_t t,
             np.ndarray[np.double_t] jac):
     eval_jacob(t, pres, &y[0], &jac[0])
 
+def py_eval_dydt_and_jacobian(np.double_t t,
+            np.double_t pres,
+            np.ndarray[np.double_t] y,
+            np.ndarray[np.double_t] dy,
+            np.ndarray[np.double_t] jac):
+    eval_dydt_and_jacob(t, pres, &y[0], &dy[0], &jac[0])
+
 def py_eval_rxn_rates(np.double_t T,
             np.double_t pres,
             np.ndarray[np.double_t] C,
@@ -53,3 +70,114 @@ def py_eval_conc(np.double_t T,
             np.double_t rho,
             np.ndarray[np.double_t] conc):
     eval_conc(T, pres, &mass_frac[0], &mass_frac[-1], &mw_avg, &rho, &conc[0])
+
+
+def _pressures(pres, Py_ssize_t num):
+    """Returns the pressure of each of ``num`` states, from a scalar or array"""
+    return np.ascontiguousarray(np.broadcast_to(
+        np.asarray(pres, dtype=np.double), (num,)))
+
+cdef inline void _last_species_rate(double* dy) noexcept nogil:
+    """Sets the derivative of the last species mass fraction, the negated
+    sum of the others, as `dydt` only evaluates the first ``NSP`` entries"""
+    cdef int k
+    dy[NSP] = 0
+    for k in range(1, NSP):
+        dy[NSP] -= dy[k]
+
+def _check_shape(name, arr, Py_ssize_t num, widths):
+    if arr.shape[0] != num or arr.shape[1] not in widths:
+        raise ValueError('{} must have shape ({}, {})'.format(
+            name, num, ' or '.join(str(w) for w in widths)))
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def py_dydt_batch(np.double_t t, pres, y, out=None, int num_threads=0):
+    """Evaluates the derivatives of many states in parallel, without the GIL.
+
+    Parameters
+    ----------
+    t : float
+        Time, in seconds
+    pres : float or ``numpy.ndarray``
+        Pressure of all states, or of each state, in Pascals
+    y : ``numpy.ndarray``
+        C-contiguous states (temperature + species mass fractions), of
+        shape ``(n_states, NSP)``, or ``(n_states, NN)`` including the
+        last species
+    out : ``numpy.ndarray``, optional
+        C-contiguous buffer of the shape of ``y`` for the derivatives,
+        allocated if ``None``.  For states including the last species,
+        its derivative is the negated sum of the others
+    num_threads : int, optional
+        Number of OpenMP threads, by default the maximum
+
+    Returns
+    -------
+    out : ``numpy.ndarray``
+        The derivatives of each state
+
+    """
+    cdef const double[:, ::1] y_view = y
+    cdef Py_ssize_t i, num = y_view.shape[0]
+    _check_shape('y', y_view, num, (NSP, NN))
+    cdef bint last_species = y_view.shape[1] == NN
+    cdef const double[::1] pres_view = _pressures(pres, num)
+    if out is None:
+        out = np.empty((num, y_view.shape[1]))
+    cdef double[:, ::1] out_view = out
+    _check_shape('out', out_view, num, (y_view.shape[1],))
+    if num_threads <= 0:
+        num_threads = openmp.omp_get_max_threads()
+
+    for i in prange(num, nogil=True, schedule='static',
+                    num_threads=num_threads):
+        dydt(t, pres_view[i], &y_view[i, 0], &out_view[i, 0])
+        if last_species:
+            _last_species_rate(&out_view[i, 0])
+    return out
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def py_eval_jacobian_batch(np.double_t t, pres, y, out=None,
+                           int num_threads=0):
+    """Evaluates the Jacobian of many states in parallel, without the GIL.
+
+    Parameters
+    ----------
+    t : float
+        Time, in seconds
+    pres : float or ``numpy.ndarray``
+        Pressure of all states, or of each state, in Pascals
+    y : ``numpy.ndarray``
+        C-contiguous states (temperature + species mass fractions), of
+        shape ``(n_states, NSP)``, or ``(n_states, NN)`` including the
+        last species
+    out : ``numpy.ndarray``, optional
+        C-contiguous buffer of shape ``(n_states, NSP * NSP)`` for the
+        Jacobians, as for `py_eval_jacobian`, allocated if ``None``
+    num_threads : int, optional
+        Number of OpenMP threads, by default the maximum
+
+    Returns
+    -------
+    out : ``numpy.ndarray``
+        The Jacobian of each state
+
+    """
+    cdef const double[:, ::1] y_view = y
+    cdef Py_ssize_t i, num = y_view.shape[0]
+    _check_shape('y', y_view, num, (NSP, NN))
+    cdef const double[::1] pres_view = _pressures(pres, num)
+    if out is None:
+        out = np.empty((num, NSP * NSP))
+    cdef double[:, ::1] out_view = out
+    _check_shape('out', out_view, num, (NSP * NSP,))
+    if num_threads <= 0:
+        num_threads = openmp.omp_get_max_threads()
+
+    for i in prange(num, nogil=True, schedule='static',
+                    num_threads=num_threads):
+        memset(&out_view[i, 0], 0, NSP * NSP * sizeof(double))
+        eval_jacob(t, pres_view[i], &y_view[i, 0], &out_view[i, 0])
+    return out
@@ -91,6 +91,20 @@ def generate_wrapper(lang, source_dir, out_dir=None, auto_diff=False):
 
     distutils_build = os.path.join('build', distutils_dir_name('temp'))
 
+    if lang == 'c':
+        with open(os.path.join(source_dir, 'header.h')) as file:
+            if any('VECWIDTH' in line for line in file):
+                print('Error: the Python wrapper does not support the '
+                      'structure-of-arrays layout')
+                sys.exit(-1)
+        jacob = os.path.join(source_dir, 'jacob.h')
+        if os.path.isfile(jacob):
+            with open(jacob) as file:
+                if any('NNZ' in line for line in file):
+                    print('Error: the Python wrapper does not support the '
+                          'sparse Jacobian formats')
+                    sys.exit(-1)
+
     shared = False
     ext = '.so' if shared else '.a'
     lib = None
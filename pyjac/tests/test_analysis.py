@@ -0,0 +1,140 @@
+# Python 2 compatibility
+from __future__ import print_function
+from __future__ import division
+
+import os
+import sys
+import shutil
+import tempfile
+
+from ..analysis import cache_sim
+from ..analysis import cost_model
+from ..core import create_jacobian
+
+MECH = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'h2o2.inp')
+"""str: the H2/O2 mechanism used by the tests"""
+
+class TestCacheSim(object):
+    """
+    """
+    def test_imported(self):
+        """Ensure cache_sim module imported.
+        """
+        assert 'pyjac.analysis.cache_sim' in sys.modules
+
+    def test_simulate(self):
+        """Ensure the traced accesses and cache statistics are as expected.
+        """
+        source = ('#include "header.h"\n'
+                  'void scale (const double * x, double * y) {\n'
+                  '  y[0] = 2.0 * x[0];\n'
+                  '#ifdef CONP\n'
+                  '  y[1] += x[8] * y[0];\n'
+                  '#else\n'
+                  '  y[1] = 0;\n'
+                  '#endif\n'
+                  '}\n'
+                  'void kernel (const double * z, double * out) {\n'
+                  '  double tmp[2];\n'
+                  '  scale (&z[1], tmp);\n'
+                  '  out[0] = tmp[1];\n'
+                  '}\n')
+        path = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(path, 'kernel.c'), 'w') as file:
+                file.write(source)
+            kernels = cache_sim.read_kernels(path)
+        finally:
+            shutil.rmtree(path)
+
+        trace = cache_sim.get_trace(kernels, 'kernel')
+        assert trace == [('z', 1, False), ('tmp', 0, True),
+                         ('z', 9, False), ('tmp', 0, False),
+                         ('tmp', 1, False), ('tmp', 1, True),
+                         ('tmp', 1, False), ('out', 0, True)]
+
+        # z spans two lines of 64 bytes, tmp and out one each
+        stats = cache_sim.simulate(trace, line_size=64, associativity=1,
+                                   capacity=64)
+        assert stats['footprint'] == 4
+        assert stats['misses'] == 5
+        assert stats['reuse']['cold'] == 4
+        assert stats['reuse']['0'] == 3
+        assert stats['reuse']['1'] == 1
+
+    def test_simulate_soa(self):
+        """Ensure the structure-of-arrays layout is traced for a lane.
+        """
+        path = tempfile.mkdtemp()
+        try:
+            results = {}
+            for layout in ['aos', 'soa']:
+                build_path = os.path.join(path, layout)
+                create_jacobian.create_jacobian(
+                    'c', MECH, build_path=build_path, layout=layout,
+                    vector_width=4, tuned_params=False)
+                results[layout] = cache_sim.simulate_build(build_path)
+                kernels = cache_sim.read_kernels(build_path)
+        finally:
+            shutil.rmtree(path)
+
+        for name in ['eval_rxn_rates', 'eval_spec_rates', 'dydt',
+                     'eval_jacob']:
+            soa = results['soa'][name]
+            assert soa['accesses'] and not soa['unresolved']
+            # the entries of a state are VECWIDTH apart
+            assert soa['footprint'] > results['aos'][name]['footprint']
+
+        trace = cache_sim.get_trace(kernels, 'eval_spec_rates')
+        assert set(index % 4 for array, index, write in trace
+                   if array == 'sp_rates') == set([0])
+
+class TestCostModel(object):
+    """
+    """
+    def test_imported(self):
+        """Ensure cost_model module imported.
+        """
+        assert 'pyjac.analysis.cost_model' in sys.modules
+
+    def test_count_ops(self):
+        """Ensure the operations of a statement are counted as expected.
+        """
+        counts = cost_model.count_ops(
+            'y[i + 1] = 2.0 * exp(x[0] - -1.5e+03 / T) + '
+            '(T > 1000.0 ? a : b)')
+        assert (counts['add'], counts['mul'], counts['div']) == (2, 1, 1)
+        assert (counts['exp'], counts['branches']) == (1, 1)
+        assert counts['flops'] == 4
+
+        counts = dict((x, 0) for x in cost_model.COUNTS)
+        counts.update(flops=8, add=4, mul=4, loads=3, stores=1)
+        estimate = cost_model.roofline(counts)
+        assert estimate['bytes'] == 32
+        assert estimate['intensity'] == 0.25
+        assert estimate['bound'] == 'memory'
+        assert estimate['predicted_ns'] == 32 / 10.
+
+    def test_analyze_unresolved(self):
+        """Ensure accesses the cache simulator cannot resolve count as
+        memory traffic, and are reported.
+        """
+        source = ('void kernel (const double * x, double * y) {\n'
+                  '  y[0] = 2.0 * x[0];\n'
+                  '  for (int i = 1; i < 16; ++i) {\n'
+                  '    y[i] = 2.0 * x[i];\n'
+                  '  }\n'
+                  '}\n')
+        path = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(path, 'kernel.c'), 'w') as file:
+                file.write(source)
+            report = cost_model.analyze(path, cache=dict(line_size=64))
+        finally:
+            shutil.rmtree(path)
+
+        result = report['routines']['kernel']
+        stats = result['cache']
+        assert stats['accesses'] == 2 and stats['unresolved'] == 2
+        assert result['roofline']['unresolved'] == 2
+        assert result['roofline']['bytes'] == 64 * stats['misses'] + 8 * 2
@@ -2,14 +2,204 @@
 from __future__ import print_function
 from __future__ import division
 
+import os
+import re
 import sys
+import ctypes
+import pickle
+import shutil
+import tempfile
 
+import numpy as np
+import pytest
+
+from ..core import autotune
 from ..core import cache_optimizer
 from ..core import chem_utilities
+from ..core import codegen
 from ..core import create_jacobian
+from ..core import manifest
 from ..core import mech_auxiliary
+from ..core import mech_interpret
 from ..core import rate_subs
 from ..core import shared_memory
+from ..core import sparse_lu
+from ..libgen import generate_library
+from .. import utils
+
+MECH = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'h2o2.inp')
+"""str: the H2/O2 mechanism used by the tests"""
+
+
+def build_mechanism(path, **options):
+    """Generates and compiles the H2/O2 mechanism, and loads the library.
+
+    Parameters
+    ----------
+    path : str
+        The directory of the generated files, objects and library
+    options
+        Options of `create_jacobian.create_jacobian`
+
+    Returns
+    -------
+    lib : `ctypes.CDLL`
+        The compiled (shared) library
+    build_path : str
+        The directory of the generated files
+
+    """
+    build_path = os.path.join(path, 'out')
+    create_jacobian.create_jacobian('c', MECH, build_path=build_path,
+                                    tuned_params=False, **options)
+    lib = generate_library('c', build_path, os.path.join(path, 'obj'), path,
+                           shared=True, cache_dir=False)
+    return ctypes.CDLL(lib), build_path
+
+
+def read_files(path):
+    """Returns the contents of the files in a directory, by relative path."""
+    contents = {}
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            filename = os.path.join(root, name)
+            with open(filename, 'rb') as file:
+                contents[os.path.relpath(filename, path)] = file.read()
+    return contents
+
+
+def random_states(num, num_species=9, seed=0):
+    """Returns random pressures [Pa] and states (temperature, mass fractions
+    but the last) of a mechanism."""
+    rand = np.random.RandomState(seed)
+    pres = 101325. * rand.uniform(0.5, 20., num)
+    fractions = rand.uniform(0., 1., (num, num_species))
+    fractions /= np.sum(fractions, axis=1)[:, np.newaxis]
+    y = np.hstack((rand.uniform(800., 2500., (num, 1)), fractions[:, :-1]))
+    return pres, np.ascontiguousarray(y)
+
+
+def read_header(filename):
+    """Returns the integer macros and constant integer arrays of a header."""
+    with open(filename, 'r') as file:
+        text = file.read()
+    values = dict((name, int(value)) for name, value in
+                  re.findall(r'#define (\w+) (\d+)\n', text))
+    for name, vals in re.findall(r'static const int (\w+)\[[^]]*\] = '
+                                 r'\{([^}]*)\};', text):
+        values[name] = np.array([int(x) for x in vals.split(',')])
+    return values
+
+
+def dense_lu_fill(matrix):
+    """Returns the number of non-zero entries of the combined L and U
+    factors of a matrix, factored without pivoting, and the diagonal."""
+    lu = np.array(matrix, dtype=np.double)
+    size = lu.shape[0]
+    for k in range(size):
+        lu[k + 1:, k] /= lu[k, k]
+        lu[k + 1:, k + 1:] -= np.outer(lu[k + 1:, k], lu[k, k + 1:])
+    return np.count_nonzero(lu + np.diag(np.diag(lu) == 0))
+
+
+def as_pointer(array):
+    """Returns a pointer to the data of a contiguous array of doubles."""
+    return array.ctypes.data_as(ctypes.POINTER(ctypes.c_double))
+
+
+def evaluate(lib, pres, y):
+    """Evaluates `dydt` and `eval_jacob` state by state.
+
+    Returns
+    -------
+    dy : numpy.ndarray
+        The derivatives of each state
+    jac : numpy.ndarray
+        The (column-major) Jacobian of each state
+
+    """
+    num_species = y.shape[1]
+    dy = np.zeros_like(y)
+    jac = np.zeros((y.shape[0], num_species * num_species))
+    for i in range(y.shape[0]):
+        lib.dydt(ctypes.c_double(0.), ctypes.c_double(pres[i]),
+                 as_pointer(y[i]), as_pointer(dy[i]))
+        lib.eval_jacob(ctypes.c_double(0.), ctypes.c_double(pres[i]),
+                       as_pointer(y[i]), as_pointer(jac[i]))
+    return dy, jac
+
+class TestAutotune(object):
+    """
+    """
+    def test_imported(self):
+        """Ensure autotune module imported.
+        """
+        assert 'pyjac.core.autotune' in sys.modules
+
+    def test_tuned_params(self):
+        """Ensure the tuned parameters are used for their mechanism only.
+        """
+        elems, specs, reacs = mech_interpret.read_mech(MECH, None)
+        fingerprint = chem_utilities.get_mech_fingerprint(specs, reacs)
+        assert autotune.candidates('Jacob_Unroll', len(specs),
+                                   len(reacs)) == [10, 20, len(reacs)]
+
+        path = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(path, 'tuned.json')
+            params = dict(Jacob_Unroll=10, Jacob_Spec_Unroll=5,
+                          Max_Lines=2000)
+            autotune.write_tuned(fingerprint, 'c', params, filename)
+            assert autotune.read_tuned(fingerprint, 'c', filename) == params
+            assert autotune.read_tuned(fingerprint, 'cuda', filename) is None
+
+            build_path = os.path.join(path, 'out')
+            create_jacobian.create_jacobian('c', MECH, build_path=build_path,
+                                            tuned_params=filename)
+            assert autotune.get_params('c') == autotune.DEFAULTS['c']
+            with open(os.path.join(build_path, 'jacobs',
+                                   'jac_list_c')) as file:
+                assert len(file.readline().split()) >= -(-len(reacs) // 10)
+        finally:
+            shutil.rmtree(path)
+
+    def test_tuned_params_restored(self):
+        """Ensure the tuned parameters are restored after a failed generation,
+        and are used by the generation workers.
+        """
+        import multiprocessing
+
+        elems, specs, reacs = mech_interpret.read_mech(MECH, None)
+        fingerprint = chem_utilities.get_mech_fingerprint(specs, reacs)
+        path = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(path, 'tuned.json')
+            autotune.write_tuned(fingerprint, 'c', dict(Jacob_Unroll=10),
+                                 filename)
+            try:
+                create_jacobian.create_jacobian(
+                    'c', MECH, build_path=os.path.join(path, 'failed'),
+                    initial_state='800,1,XX=1', tuned_params=filename)
+            except SystemExit:
+                pass
+            else:
+                assert False, 'Unknown species not reported'
+            assert autotune.get_params('c') == autotune.DEFAULTS['c']
+
+            # spawned workers do not inherit the parameters
+            method = multiprocessing.get_start_method()
+            multiprocessing.set_start_method('spawn', force=True)
+            try:
+                for gen_jobs in [1, 2]:
+                    create_jacobian.create_jacobian(
+                        'c', MECH, gen_jobs=gen_jobs, tuned_params=filename,
+                        build_path=os.path.join(path, str(gen_jobs)))
+            finally:
+                multiprocessing.set_start_method(method, force=True)
+            assert read_files(os.path.join(path, '1')) == read_files(
+                os.path.join(path, '2'))
+        finally:
+            shutil.rmtree(path)
 
 class TestCacheOptimizer(object):
     """
@@ -19,6 +209,87 @@ def test_imported(self):
         """
         assert 'pyjac.core.cache_optimizer' in sys.modules
 
+    def test_optimizer_loop(self):
+        """Ensure the vectorized loop matches the `bitarray` loop.
+        """
+        from ..performance_tester.cache_benchmark import benchmark
+
+        elems, specs, reacs = mech_interpret.read_mech(MECH, None)
+        for mapping in cache_optimizer.get_mappings(specs, reacs):
+            times, same = benchmark(mapping, lookback=2, seeds=2)
+            assert same
+
+    def test_graph_order(self):
+        """Ensure the graph orderings are permutations keeping the last species.
+        """
+        elems, specs, reacs = mech_interpret.read_mech(MECH, None)
+        spec_mapping, reac_mapping = cache_optimizer.get_mappings(specs, reacs)
+        last_spec = [sp.name for sp in specs].index('H2O')
+        for method in ['rcm', 'spectral']:
+            fwd_spec_mapping, fwd_rxn_mapping = cache_optimizer.graph_order(
+                spec_mapping, last_spec, method)
+            assert sorted(fwd_spec_mapping) == list(range(len(specs)))
+            assert sorted(fwd_rxn_mapping) == list(range(len(reacs)))
+            assert fwd_spec_mapping[-1] == last_spec
+
+    def test_checkpoint(self):
+        """Ensure a checkpoint is only resumed with the same key.
+        """
+        path = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(path, cache_optimizer.CHECKPOINT)
+            states = {'Reaction': {'best': (1.5, [1, 0, 2]), 'completed': 3,
+                                   'since_improvement': 1, 'done': False}}
+            cache_optimizer._write_checkpoint(filename, ('a', 0), states)
+            assert cache_optimizer._read_checkpoint(filename,
+                                                    ('a', 0)) == states
+            assert cache_optimizer._read_checkpoint(filename, ('b', 0)) == {}
+            assert os.listdir(path) == [cache_optimizer.CHECKPOINT]
+        finally:
+            shutil.rmtree(path)
+
+    def test_greedy_search(self, monkeypatch):
+        """Ensure every run is collected, also one finishing while the
+        pending runs are scanned.
+        """
+        class FakeResult(object):
+            def __init__(self, score, ready_after):
+                self.score = score
+                self.calls = 0
+                self.ready_after = ready_after
+
+            def ready(self):
+                # not ready for the first calls, then ready
+                self.calls += 1
+                return self.calls > self.ready_after
+
+            def get(self):
+                assert self.calls > self.ready_after
+                return self.score, [self.score]
+
+        results = [FakeResult(1, 0), FakeResult(2, 1), FakeResult(3, 3)]
+
+        class FakePool(object):
+            def __init__(self, processes):
+                self.results = iter(results)
+
+            def apply_async(self, func, args):
+                return next(self.results)
+
+            def close(self):
+                pass
+
+            def join(self):
+                pass
+
+        monkeypatch.setattr(cache_optimizer.multiprocessing, 'Pool', FakePool)
+        state = {}
+        order = cache_optimizer._greedy_search(
+            'Test', None, [[0], [1], [2]], 1, 10, 2, 2, 60, state=state)
+        assert state['completed'] == 3
+        assert state['done']
+        assert order == [3]
+
 class TestChemUtilities(object):
     """
     """
@@ -27,14 +298,566 @@ def test_imported(self):
         """
         assert 'pyjac.core.chem_utilities' in sys.modules
 
+    def test_fingerprint(self):
+        """Ensure the fingerprints follow the contents of the mechanism.
+        """
+        elems, specs, reacs = mech_interpret.read_mech_stream(MECH, None)
+        fingerprint = chem_utilities.get_mech_fingerprint(specs, reacs)
+        assert fingerprint == chem_utilities.get_mech_fingerprint(
+            specs[::-1], reacs[::-1])
+
+        copies = pickle.loads(pickle.dumps(reacs, pickle.HIGHEST_PROTOCOL))
+        assert copies == reacs
+        copies[0].A *= 2.
+        assert copies != reacs
+        assert fingerprint != chem_utilities.get_mech_fingerprint(
+            specs, copies)
+
+        # mutable, such that the objects are keyed by fingerprint instead
+        with pytest.raises(TypeError):
+            hash(specs[0])
+
+class TestCodegen(object):
+    """
+    """
+    def test_imported(self):
+        """Ensure codegen module imported.
+        """
+        assert 'pyjac.core.codegen' in sys.modules
+
+    def test_precedence(self):
+        """Ensure operands are parenthesized only where needed.
+        """
+        a, b, c = codegen.Var('a'), codegen.Var('b'), codegen.Var('c')
+        emitter = codegen.Emitter('c')
+        cases = [
+            (codegen.Sum([a, codegen.Product([b, c])]), 'a + b * c'),
+            (codegen.Product([codegen.Sum([a, b]), c]), '(a + b) * c'),
+            (codegen.Div(codegen.Product([a, b]), c), 'a * b / c'),
+            (codegen.Div(a, codegen.Product([b, c])), 'a / (b * c)'),
+            (codegen.Div(codegen.Div(a, b), c), 'a / b / c'),
+            (codegen.Div(a, codegen.Div(b, c)), 'a / (b / c)'),
+            (codegen.Div(codegen.Sum([a, b]), c), '(a + b) / c'),
+            (codegen.Sum([a, codegen.Sum([b, c])]), 'a + b + c'),
+            (codegen.Call('exp', [codegen.Sum([a, b])]), 'exp(a + b)'),
+            (codegen.Product([codegen.Paren(a), b]), '(a) * b'),
+            (codegen.horner(a, [1., 2., 3.]),
+             '1.0000000000000000e+00 + a * (2.0000000000000000e+00 + '
+             '3.0000000000000000e+00 * a)'),
+        ]
+        for expr, code in cases:
+            assert expr.emit(emitter) == code
+
+    def test_neg(self):
+        """Ensure subtracted terms are emitted as subtraction.
+        """
+        a, b, c = codegen.Var('a'), codegen.Var('b'), codegen.Var('c')
+        emitter = codegen.Emitter('c')
+        cases = [
+            (codegen.Sum([a, codegen.Neg(b)]), 'a - b'),
+            (codegen.Sum([codegen.Neg(a), b]), '-a + b'),
+            (codegen.Sum([a, codegen.Neg(codegen.Sum([b, c]))]),
+             'a - (b + c)'),
+            (codegen.Sum([a, codegen.Neg(codegen.Product([b, c]))]),
+             'a - b * c'),
+            (codegen.Neg(codegen.Sum([a, b])), '-(a + b)'),
+            (codegen.Product([c, codegen.Neg(a)]), 'c * (-a)'),
+            (codegen.Div(a, codegen.Neg(b)), 'a / (-b)'),
+        ]
+        for expr, code in cases:
+            assert expr.emit(emitter) == code
+
+    def test_pow(self):
+        """Ensure powers are emitted for each language.
+        """
+        a, b, c = codegen.Var('a'), codegen.Var('b'), codegen.Var('c')
+        two = codegen.Literal(2., '{:.1f}')
+        cases = [
+            (codegen.Pow(a, two),
+             {'c': 'pow(a, 2.0)', 'cuda': 'pow(a, 2.0)',
+              'fortran': 'a ** 2.0', 'matlab': 'a ^ 2.0'}),
+            (codegen.Product([codegen.Pow(codegen.Sum([a, b]), c), two]),
+             {'c': 'pow(a + b, c) * 2.0', 'fortran': '(a + b) ** c * 2.0',
+              'matlab': '(a + b) ^ c * 2.0'}),
+            (codegen.Pow(codegen.Pow(a, b), c),
+             {'c': 'pow(pow(a, b), c)', 'fortran': '(a ** b) ** c',
+              'matlab': '(a ^ b) ^ c'}),
+            (codegen.Pow(a, codegen.Literal(-1., '{:.1f}')),
+             {'c': 'pow(a, -1.0)', 'fortran': 'a ** (-1.0)',
+              'matlab': 'a ^ (-1.0)'}),
+            (codegen.Div(a, codegen.Pow(b, two)),
+             {'c': 'a / pow(b, 2.0)', 'fortran': 'a / b ** 2.0'}),
+            (codegen.Sum([a, codegen.Neg(codegen.Pow(b, two))]),
+             {'c': 'a - pow(b, 2.0)', 'fortran': 'a - b ** 2.0'}),
+        ]
+        for expr, codes in cases:
+            for lang, code in codes.items():
+                assert expr.emit(codegen.Emitter(lang)) == code
+
+    def test_syntax(self):
+        """Ensure the statements are emitted in the syntax of each language.
+        """
+        a = codegen.Var('a')
+        statements = [
+            codegen.Comment('note'),
+            codegen.Assign(codegen.ArrayRef('y', 0), a),
+            codegen.Assign(codegen.ArrayRef('y', 1), a, '+='),
+            codegen.If('T <= 1000.0',
+                       [codegen.Assign(a, codegen.ArrayRef('y', 2), '*=')],
+                       [codegen.Assign(a, codegen.ArrayRef('y', 3), '-=')]),
+            codegen.Blank(),
+        ]
+        codes = {
+            'c': ('  // note\n'
+                  '  y[0] = a;\n'
+                  '  y[1] += a;\n'
+                  '  if (T <= 1000.0) {\n'
+                  '    a *= y[2];\n'
+                  '  } else {\n'
+                  '    a -= y[3];\n'
+                  '  }\n'
+                  '\n'),
+            'cuda': ('  // note\n'
+                     '  y[INDEX(0)] = a;\n'
+                     '  y[INDEX(1)] += a;\n'
+                     '  if (T <= 1000.0) {\n'
+                     '    a *= y[INDEX(2)];\n'
+                     '  } else {\n'
+                     '    a -= y[INDEX(3)];\n'
+                     '  }\n'
+                     '\n'),
+            'fortran': ('  ! note\n'
+                        '  y(1) = a\n'
+                        '  y(2) = y(2) + a\n'
+                        '  if (T <= 1000.0) then\n'
+                        '    a = a * y(3)\n'
+                        '  else\n'
+                        '    a = a - y(4)\n'
+                        '  end if\n'
+                        '\n'),
+            'matlab': ('  % note\n'
+                       '  y(1) = a;\n'
+                       '  y(2) = y(2) + a;\n'
+                       '  if (T <= 1000.0)\n'
+                       '    a = a * y(3);\n'
+                       '  else\n'
+                       '    a = a - y(4);\n'
+                       '  end\n'
+                       '\n'),
+        }
+        for lang, code in codes.items():
+            assert codegen.Emitter(lang).emit(statements) == code
+
+        # declarations, and the if without an else
+        statements = [codegen.Declare('smh', 4),
+                      codegen.Declare('T2', expr=codegen.Product([a, a])),
+                      codegen.If('T > 0', [codegen.Assign(a, a)])]
+        assert codegen.Emitter('cuda', double_type='float').emit(
+            statements, depth=2) == ('    float smh[4];\n'
+                                     '    float T2 = a * a;\n'
+                                     '    if (T > 0) {\n'
+                                     '      a = a;\n'
+                                     '    }\n')
+
+        with pytest.raises(TypeError):
+            codegen.Emitter('c').emit([a])
+
 class TestCreateJacobian(object):
     """
     """
+    @classmethod
+    def setup_class(cls):
+        cls.path = tempfile.mkdtemp()
+        cls.lib, cls.build_path = build_mechanism(
+            os.path.join(cls.path, 'default'))
+        cls.pres, cls.y = random_states(10)
+        cls.dy, cls.jac = evaluate(cls.lib, cls.pres, cls.y)
+
+    @classmethod
+    def teardown_class(cls):
+        shutil.rmtree(cls.path)
+
     def test_imported(self):
         """Ensure create_jacobian module imported.
         """
         assert 'pyjac.core.create_jacobian' in sys.modules
 
+    def test_gen_jobs(self):
+        """Ensure parallel generation writes the same files as serial.
+        """
+        build_path = os.path.join(self.path, 'gen_jobs')
+        create_jacobian.create_jacobian('c', MECH, build_path=build_path,
+                                        gen_jobs=3, tuned_params=False)
+        assert read_files(build_path) == read_files(self.build_path)
+
+    def test_batch(self):
+        """Ensure the batched drivers match the state-by-state evaluation.
+        """
+        num, num_species = self.y.shape
+        dy = np.zeros_like(self.dy)
+        jac = np.full_like(self.jac, np.nan)
+        for num_threads in [1, 2]:
+            self.lib.dydt_batch(num, ctypes.c_double(0.),
+                                as_pointer(self.pres), as_pointer(self.y),
+                                as_pointer(dy), num_threads)
+            self.lib.eval_jacob_batch(num, ctypes.c_double(0.),
+                                      as_pointer(self.pres),
+                                      as_pointer(self.y), as_pointer(jac),
+                                      num_threads)
+            assert np.array_equal(dy, self.dy)
+            assert np.array_equal(jac, self.jac)
+
+    def test_batch_soa(self):
+        """Ensure the structure-of-arrays batched drivers evaluate each state,
+        including a last, partial block.
+        """
+        width = 4
+        lib, build_path = build_mechanism(os.path.join(self.path, 'soa'),
+                                          layout='soa', vector_width=width)
+        num, num_species = self.y.shape
+        assert num % width
+
+        def to_blocks(states):
+            # each block stores the entries of its states contiguously
+            return np.concatenate([states[i:i + width].T.flatten()
+                                   for i in range(0, num, width)])
+
+        def from_blocks(values, size):
+            states = np.empty((num, size))
+            for i in range(0, num, width):
+                count = min(width, num - i)
+                states[i:i + count] = values[i * size:(i + count) * size
+                                             ].reshape(size, count).T
+            return states
+
+        y = to_blocks(self.y)
+        dy = np.zeros_like(y)
+        jac = np.full(self.jac.size, np.nan)
+        lib.dydt_batch(num, ctypes.c_double(0.), as_pointer(self.pres),
+                       as_pointer(y), as_pointer(dy), 2)
+        lib.eval_jacob_batch(num, ctypes.c_double(0.), as_pointer(self.pres),
+                             as_pointer(y), as_pointer(jac), 2)
+        assert np.allclose(from_blocks(dy, num_species), self.dy,
+                           rtol=1e-10, atol=1e-12)
+        assert np.allclose(from_blocks(jac, num_species ** 2), self.jac,
+                           rtol=1e-10, atol=1e-12)
+
+    def test_soa(self):
+        """Ensure the structure-of-arrays kernels evaluate each state of a
+        block as the default build.
+        """
+        width = 2
+        lib, build_path = build_mechanism(os.path.join(self.path, 'soa_block'),
+                                          layout='soa', vector_width=width)
+        num, num_species = self.y.shape
+        for i in range(0, num, width):
+            pres = np.ascontiguousarray(self.pres[i:i + width])
+            y = self.y[i:i + width].T.flatten()
+            dy = np.zeros_like(y)
+            jac = np.zeros(width * num_species ** 2)
+            lib.dydt(ctypes.c_double(0.), as_pointer(pres), as_pointer(y),
+                     as_pointer(dy))
+            lib.eval_jacob(ctypes.c_double(0.), as_pointer(pres),
+                           as_pointer(y), as_pointer(jac))
+            assert np.allclose(dy.reshape(num_species, width).T,
+                               self.dy[i:i + width], rtol=1e-10, atol=1e-12)
+            assert np.allclose(jac.reshape(num_species ** 2, width).T,
+                               self.jac[i:i + width], rtol=1e-10, atol=1e-12)
+
+    def test_sparse(self):
+        """Ensure the compressed sparse Jacobians hold the entries of the
+        default build.
+        """
+        num, num_species = self.y.shape
+        for jac_format, ptr, ind in [('csr', 'row_ptr', 'col_ind'),
+                                     ('csc', 'col_ptr', 'row_ind')]:
+            lib, build_path = build_mechanism(
+                os.path.join(self.path, jac_format), jac_format=jac_format)
+            header = read_header(os.path.join(build_path, 'jacob.h'))
+            nnz = header['NNZ']
+            assert header[ptr][-1] == nnz and len(header[ind]) == nnz
+
+            # the dense (column-major) index of each stored entry
+            index = np.empty(nnz, dtype=int)
+            for i in range(num_species):
+                for k in range(header[ptr][i], header[ptr][i + 1]):
+                    if jac_format == 'csr':
+                        index[k] = i + num_species * header[ind][k]
+                    else:
+                        index[k] = header[ind][k] + num_species * i
+            assert len(set(index)) == nnz
+
+            jac = np.zeros(nnz)
+            for i in range(num):
+                lib.eval_jacob(ctypes.c_double(0.),
+                               ctypes.c_double(self.pres[i]),
+                               as_pointer(self.y[i]), as_pointer(jac))
+                assert np.allclose(jac, self.jac[i][index], rtol=1e-10,
+                                   atol=1e-12)
+                assert not np.any(np.delete(self.jac[i], index))
+
+    def test_jacob_vec(self):
+        """Ensure the Jacobian-vector product matches the product with the
+        Jacobian of the default build.
+        """
+        num, num_species = self.y.shape
+        rand = np.random.RandomState(2)
+        jv = np.zeros(num_species)
+        for i in range(num):
+            jac = self.jac[i].reshape(num_species, num_species).T
+            v = rand.uniform(-1., 1., num_species)
+            self.lib.eval_jacob_vec(ctypes.c_double(0.),
+                                    ctypes.c_double(self.pres[i]),
+                                    as_pointer(self.y[i]), as_pointer(v),
+                                    as_pointer(jv))
+            assert np.allclose(jv, np.dot(jac, v), rtol=1e-10,
+                               atol=1e-12 * np.max(np.abs(jac)))
+
+    def test_dydt_and_jacob(self):
+        """Ensure the fused evaluation matches `dydt` and `eval_jacob`, and
+        the Jacobian the finite differences of `dydt`.
+        """
+        num, num_species = self.y.shape
+        dy = np.zeros(num_species)
+        jac = np.zeros(num_species * num_species)
+        dy_plus = np.zeros(num_species)
+        dy_minus = np.zeros(num_species)
+        for i in range(num):
+            self.lib.eval_dydt_and_jacob(
+                ctypes.c_double(0.), ctypes.c_double(self.pres[i]),
+                as_pointer(self.y[i]), as_pointer(dy), as_pointer(jac))
+            assert np.allclose(dy, self.dy[i], rtol=1e-10, atol=1e-12)
+            assert np.array_equal(jac, self.jac[i])
+
+            # central differences, column by column
+            matrix = jac.reshape(num_species, num_species).T
+            for j in range(num_species):
+                step = 1e-6 * max(abs(self.y[i, j]), 1e-6)
+                y = self.y[i].copy()
+                y[j] += step
+                self.lib.dydt(ctypes.c_double(0.),
+                              ctypes.c_double(self.pres[i]), as_pointer(y),
+                              as_pointer(dy_plus))
+                y[j] -= 2 * step
+                self.lib.dydt(ctypes.c_double(0.),
+                              ctypes.c_double(self.pres[i]), as_pointer(y),
+                              as_pointer(dy_minus))
+                column = (dy_plus - dy_minus) / (2 * step)
+                assert np.allclose(matrix[:, j], column, rtol=1e-4,
+                                   atol=1e-6 * np.max(np.abs(column)))
+
+    def test_kc(self):
+        """Ensure the reverse rates use the equilibrium constants of the
+        species thermodynamic properties, shared between reactions.
+        """
+        elems, specs, reacs = mech_interpret.read_mech(MECH, None)
+        index = dict((sp.name, i) for i, sp in enumerate(specs))
+        with open(os.path.join(self.build_path, 'rxn_rates.c'), 'r') as file:
+            code = file.read()
+        net = set(tuple(sorted(
+            (isp, utils.get_nu(isp, rxn)) for isp in set(rxn.reac + rxn.prod)
+            if utils.get_nu(isp, rxn))) for rxn in reacs
+            if rxn.rev and not rxn.rev_par)
+        # one evaluation per distinct net stoichiometry
+        assert code.count('exp(Kc)') == len(net) < sum(
+            rxn.rev and not rxn.rev_par for rxn in reacs)
+
+        def __kc(rxn, T):
+            # from the standard state entropy and enthalpy
+            log_kc = 0.
+            for isp in set(rxn.reac + rxn.prod):
+                sp = specs[index[isp]]
+                c = sp.lo if T <= sp.Trange[1] else sp.hi
+                h = (c[0] + T * (c[1] / 2. + T * (c[2] / 3. + T * (
+                     c[3] / 4. + T * c[4] / 5.))) + c[5] / T)
+                s = (c[0] * np.log(T) + T * (c[1] + T * (c[2] / 2. + T * (
+                     c[3] / 3. + T * c[4] / 4.))) + c[6])
+                log_kc += utils.get_nu(isp, rxn) * (s - h - np.log(
+                    chem_utilities.RU * T / chem_utilities.PA))
+            return np.exp(log_kc)
+
+        rand = np.random.RandomState(3)
+        num_rev = sum(rxn.rev for rxn in reacs)
+        fwd = np.zeros(len(reacs))
+        rev = np.zeros(num_rev)
+        for T in [500., 999., 1001., 2000.]:
+            conc = rand.uniform(1e-3, 1e-2, len(specs))
+            self.lib.eval_rxn_rates(ctypes.c_double(T),
+                                    ctypes.c_double(101325.),
+                                    as_pointer(conc), as_pointer(fwd),
+                                    as_pointer(rev))
+            i_rev = 0
+            for i, rxn in enumerate(reacs):
+                if not rxn.rev:
+                    continue
+                if not rxn.rev_par:
+                    # the ratio of the rate constants
+                    ratio = fwd[i] / rev[i_rev] * np.prod(
+                        [conc[index[isp]] ** nu for isp, nu in
+                         zip(rxn.prod, rxn.prod_nu)] + [
+                        conc[index[isp]] ** -nu for isp, nu in
+                        zip(rxn.reac, rxn.reac_nu)])
+                    assert np.isclose(ratio, __kc(rxn, T), rtol=1e-10)
+                i_rev += 1
+
+    def compare_build(self, name, **options):
+        """Ensures a build with the given options evaluates the derivatives,
+        Jacobian and reaction rates of the default build."""
+        lib, build_path = build_mechanism(os.path.join(self.path, name),
+                                          **options)
+        dy, jac = evaluate(lib, self.pres, self.y)
+        assert np.allclose(dy, self.dy, rtol=1e-10, atol=1e-12)
+        assert np.allclose(jac, self.jac, rtol=1e-10, atol=1e-12)
+
+        rand = np.random.RandomState(4)
+        num_species = self.y.shape[1]
+        header = read_header(os.path.join(build_path, 'mechanism.h'))
+        rates = [np.zeros(header[name]) for name in
+                 ['FWD_RATES', 'REV_RATES'] * 2]
+        for T in [500., 999., 1000., 1001., 2000.]:
+            conc = rand.uniform(1e-3, 1e-2, num_species)
+            self.lib.eval_rxn_rates(ctypes.c_double(T),
+                                    ctypes.c_double(101325.),
+                                    as_pointer(conc), as_pointer(rates[0]),
+                                    as_pointer(rates[1]))
+            lib.eval_rxn_rates(ctypes.c_double(T), ctypes.c_double(101325.),
+                               as_pointer(conc), as_pointer(rates[2]),
+                               as_pointer(rates[3]))
+            for new, default in zip(rates[2:], rates[:2]):
+                assert np.allclose(new, default, rtol=1e-10, atol=0.)
+
+    def test_kc_gibbs(self):
+        """Ensure the Gibbs-based equilibrium constants match the default
+        build.
+        """
+        self.compare_build('gibbs', kc_mode='gibbs')
+
+    def test_hoist_trange(self):
+        """Ensure grouping by temperature breakpoint matches the default
+        build.
+        """
+        self.compare_build('hoist_trange', hoist_trange=True)
+
+    def test_cache_without_bitarray(self, monkeypatch):
+        """Ensure the cache optimizers run without `bitarray` installed.
+        """
+        methods = []
+        optimize_cache = cache_optimizer.optimize_cache
+        def record(*args, **kwargs):
+            methods.append(kwargs['method'])
+            return optimize_cache(*args, **kwargs)
+
+        monkeypatch.setattr(cache_optimizer, 'have_bitarray', False)
+        monkeypatch.setattr(cache_optimizer, 'optimize_cache', record)
+        build_path = os.path.join(self.path, 'rcm')
+        create_jacobian.create_jacobian('c', MECH, build_path=build_path,
+                                        optimize_cache='rcm',
+                                        tuned_params=False)
+        assert methods == ['rcm']
+
+    def test_newton(self):
+        """Ensure the generated sparse LU factors solve the Newton system,
+        with the fill of a dense LU in the same elimination order.
+        """
+        num, num_species = self.y.shape
+        nnz_lu = read_header(os.path.join(self.build_path, 'newton.h')
+                             )['NNZ_LU']
+        with open(os.path.join(self.build_path, 'newton.c'), 'r') as file:
+            order = re.search(r'// elimination order: ([\d, ]+)\n',
+                              file.read()).group(1)
+        order = [int(x) for x in order.split(',')]
+        assert sorted(order) == list(range(num_species))
+
+        lu = np.zeros(nnz_lu)
+        rand = np.random.RandomState(1)
+        for i in range(num):
+            jac = self.jac[i].reshape(num_species, num_species).T
+            h_gamma = 10. / np.max(np.abs(jac))
+            matrix = np.identity(num_species) - h_gamma * jac
+            assert nnz_lu == dense_lu_fill(matrix[order][:, order])
+
+            assert self.lib.factor_newton_matrix(
+                ctypes.c_double(h_gamma), as_pointer(self.jac[i]),
+                as_pointer(lu)) == 0
+            rhs = rand.uniform(-1., 1., num_species)
+            x = rhs.copy()
+            self.lib.solve_newton(as_pointer(lu), as_pointer(x))
+            assert (np.linalg.norm(np.dot(matrix, x) - rhs) <=
+                    1e-12 * np.linalg.norm(matrix) * np.linalg.norm(x))
+
+class TestManifest(object):
+    """
+    """
+    def test_imported(self):
+        """Ensure manifest module imported.
+        """
+        assert 'pyjac.core.manifest' in sys.modules
+
+    def test_update_build_dir(self):
+        """Ensure only changed, edited or missing files are rewritten.
+        """
+        path = tempfile.mkdtemp()
+        try:
+            build_path = os.path.join(path, 'out')
+
+            def generate(mech_name):
+                create_jacobian.create_jacobian('c', mech_name,
+                                                build_path=build_path,
+                                                tuned_params=False)
+                assert not os.path.exists(os.path.join(build_path,
+                                                       manifest.STAGING))
+                files = read_files(build_path)
+                del files[manifest.MANIFEST]
+                return files
+
+            def written():
+                # the files written since they were marked
+                return set(rel for rel in files if os.path.getmtime(
+                           os.path.join(build_path, rel)) != 0)
+
+            def mark():
+                for rel in files:
+                    os.utime(os.path.join(build_path, rel), (0, 0))
+
+            files = generate(MECH)
+            mark()
+            assert generate(MECH) == files
+            assert not written()
+
+            # edited files are restored
+            with open(os.path.join(build_path, 'dydt.c'), 'w') as file:
+                file.write('truncated')
+            mark()
+            assert generate(MECH) == files
+            assert written() == set(['dydt.c'])
+
+            # a changed rate constant only affects the reaction rates and
+            # the Jacobian
+            mech_name = os.path.join(path, 'h2o2.inp')
+            with open(MECH, 'r') as file:
+                mech = file.read()
+            with open(mech_name, 'w') as file:
+                file.write(mech.replace('3.870E+04', '3.880E+04'))
+            mark()
+            changed = generate(mech_name)
+            assert written() == set(rel for rel in files
+                                    if changed[rel] != files[rel])
+            assert 'rxn_rates.c' in written()
+            assert 'header.h' not in written()
+            assert 'chem_utils.c' not in written()
+
+            # the staging directory is removed after a failed generation
+            try:
+                create_jacobian.create_jacobian(
+                    'c', MECH, build_path=build_path,
+                    initial_state='800,1,XX=1', tuned_params=False)
+            except SystemExit:
+                pass
+            assert not os.path.exists(os.path.join(build_path,
+                                                   manifest.STAGING))
+        finally:
+            shutil.rmtree(path)
+
 class TestMechAuxiliary(object):
     """
     """
@@ -43,6 +866,85 @@ def test_imported(self):
         """
         assert 'pyjac.core.mech_auxiliary' in sys.modules
 
+class TestMechInterpret(object):
+    """
+    """
+    def test_imported(self):
+        """Ensure mech_interpret module imported.
+        """
+        assert 'pyjac.core.mech_interpret' in sys.modules
+
+    def test_read_mech_stream(self):
+        """Ensure the streaming interpreter matches `read_mech`.
+        """
+        from ..performance_tester.parse_benchmark import (
+            write_synthetic_mechanism, same_mechanism)
+
+        assert same_mechanism(mech_interpret.read_mech(MECH, None),
+                              mech_interpret.read_mech_stream(MECH, None))
+
+        path = tempfile.mkdtemp()
+        try:
+            for inline_thermo in [False, True]:
+                mech, therm = write_synthetic_mechanism(
+                    path, 40, 200, inline_thermo=inline_thermo)
+                assert same_mechanism(
+                    mech_interpret.read_mech(mech, therm),
+                    mech_interpret.read_mech_stream(mech, therm))
+        finally:
+            shutil.rmtree(path)
+
+    def test_read_mech_cached(self, monkeypatch):
+        """Ensure parsed mechanisms are stored, loaded and invalidated by
+        changes of the mechanism file.
+        """
+        from ..performance_tester.parse_benchmark import same_mechanism
+
+        path = tempfile.mkdtemp()
+        try:
+            cache_dir = os.path.join(path, 'cache')
+            mech = os.path.join(path, 'h2o2.inp')
+            shutil.copy(MECH, mech)
+            parsed = mech_interpret.read_mech_stream(mech, None)
+
+            # miss: parsed and stored
+            assert same_mechanism(
+                mech_interpret.read_mech_cached(mech, None, cache_dir), parsed)
+            cache_file = os.path.join(cache_dir, mech_interpret.get_mech_hash(
+                mech, None) + '.pickle')
+            assert os.listdir(cache_dir) == [os.path.basename(cache_file)]
+
+            # hit: loaded without parsing
+            def __fail(*args):
+                raise AssertionError('mechanism parsed')
+            with monkeypatch.context() as patch:
+                patch.setattr(mech_interpret, 'read_mech_stream', __fail)
+                assert same_mechanism(
+                    mech_interpret.read_mech_cached(mech, None, cache_dir),
+                    parsed)
+
+            # an unreadable cache file is replaced
+            with open(cache_file, 'wb') as file:
+                file.write(b'corrupt')
+            assert same_mechanism(
+                mech_interpret.read_mech_cached(mech, None, cache_dir), parsed)
+            with open(cache_file, 'rb') as file:
+                assert pickle.load(file)[:3]
+
+            # a changed mechanism is parsed again
+            with open(mech, 'r') as file:
+                contents = file.read()
+            assert '3.870E+04' in contents
+            with open(mech, 'w') as file:
+                file.write(contents.replace('3.870E+04', '3.880E+04'))
+            changed = mech_interpret.read_mech_cached(mech, None, cache_dir)
+            assert not same_mechanism(changed, parsed)
+            assert same_mechanism(
+                changed, mech_interpret.read_mech_stream(mech, None))
+            assert len(os.listdir(cache_dir)) == 2
+        finally:
+            shutil.rmtree(path)
+
 class TestRateSubs(object):
     """
     """
@@ -58,3 +960,31 @@ def test_imported(self):
         """Ensure shared_memory module imported.
         """
         assert 'pyjac.core.shared_memory' in sys.modules
+
+class TestSparseLU(object):
+    """
+    """
+    def test_imported(self):
+        """Ensure sparse_lu module imported.
+        """
+        assert 'pyjac.core.sparse_lu' in sys.modules
+
+    def test_symbolic_lu(self):
+        """Ensure the symbolic factors have the fill of a dense LU of a
+        matrix with the same non-zero pattern.
+        """
+        rand = np.random.RandomState(0)
+        nvars = 30
+        for density in [0.05, 0.1, 0.2]:
+            pattern = set((i, i) for i in range(nvars))
+            pattern.update((i, j) for i in range(nvars) for j in range(nvars)
+                           if rand.uniform() < density)
+            matrix = np.zeros((nvars, nvars))
+            for i, j in pattern:
+                matrix[i, j] = rand.uniform(0.5, 1.) * (1 + nvars * (i == j))
+
+            order = sparse_lu.get_fill_reducing_order(pattern, nvars)
+            assert sorted(order) == list(range(nvars))
+            lu_rows = sparse_lu.get_symbolic_lu(pattern, nvars, order)
+            assert (sum(len(row) for row in lu_rows) ==
+                    dense_lu_fill(matrix[order][:, order]))
@@ -2,9 +2,22 @@
 from __future__ import print_function
 from __future__ import division
 
+import os
 import sys
+import shutil
+import tempfile
+import subprocess
+
+import numpy as np
+import pytest
 
 from ..libgen import libgen
+from ..libgen import object_cache
+from ..libgen import scheduler
+from ..libgen import profile_guided
+from ..core.create_jacobian import create_jacobian
+
+MECH = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'h2o2.inp')
 
 class TestLibgen(object):
     """
@@ -13,3 +26,103 @@ def test_imported(self):
         """Ensure libgen module imported.
         """
         assert 'pyjac.libgen.libgen' in sys.modules
+
+    def test_object_cache(self):
+        """Ensure the object cache follows the includes and evicts the LRU.
+        """
+        path = tempfile.mkdtemp()
+        try:
+            cache_dir = os.path.join(path, 'cache')
+            with open(os.path.join(path, 'header.h'), 'w') as file:
+                file.write('#define N 1\n')
+            source = os.path.join(path, 'source.c')
+            with open(source, 'w') as file:
+                file.write('#include "header.h"\n#include <math.h>\n')
+
+            key = object_cache.cache_key('cc', ['-O3'], source, [])
+            assert key == object_cache.cache_key('cc', ['-O3'], source, [])
+            assert key != object_cache.cache_key('cc', ['-O2'], source, [])
+            with open(os.path.join(path, 'header.h'), 'w') as file:
+                file.write('#define N 2\n')
+            assert key != object_cache.cache_key('cc', ['-O3'], source, [])
+
+            obj = os.path.join(path, 'source.o')
+            assert not object_cache.fetch(cache_dir, key, obj)
+            for i, name in enumerate(['a' * 64, 'b' * 64, key]):
+                with open(obj, 'wb') as file:
+                    file.write(b'\0' * 100)
+                object_cache.store(cache_dir, name, obj)
+                entry = os.path.join(cache_dir, name[:2], name + '.o')
+                os.utime(entry, (i, i))
+            assert object_cache.fetch(cache_dir, 'a' * 64, obj)
+            assert object_cache.evict(cache_dir, 250) == 1
+            assert not object_cache.fetch(cache_dir, 'b' * 64, obj)
+            assert object_cache.fetch(cache_dir, key, obj)
+        finally:
+            shutil.rmtree(path)
+
+    def test_scheduler(self):
+        """Ensure the compile costs follow the history and all jobs run.
+        """
+        history = {'rxn_rates': {'lines': 1000, 'time': 2., 'memory': 1e8}}
+        time, memory = scheduler.estimate('rxn_rates', 2000, history)
+        assert time == 4. and memory == 2e8
+        time, memory = scheduler.estimate('mass_mole', 10, history)
+        assert time == 0.02
+
+        costs = [(1., 2.), (3., 2.), (2., 2.)]
+        results = scheduler.schedule(abs, [-1, -2, -3], costs, processes=2,
+                                     memory_budget=3.)
+        assert [r[0] for r in results] == [1, 2, 3]
+
+        # a job that cannot be sent to a worker is reported, not waited for
+        with pytest.raises(Exception):
+            scheduler.schedule(lambda x: x, [1], [(1., 1.)], processes=1)
+
+    def test_training_states(self):
+        """Ensure the PaSR states are used for a mechanism with their species.
+        """
+        states = profile_guided.training_states(10)
+        assert states.shape == (1020, 13)
+        states = profile_guided.training_states(9, num_states=50)
+        assert states.shape == (50, 12)
+        assert np.allclose(np.sum(states[:, 3:], axis=1), 1.)
+
+    def test_openmp(self):
+        """Ensure the batched drivers are compiled and linked with OpenMP.
+        """
+        path = tempfile.mkdtemp()
+        try:
+            build_path = os.path.join(path, 'out')
+            obj_dir = os.path.join(path, 'obj')
+            create_jacobian('c', MECH, build_path=build_path,
+                            tuned_params=False)
+            lib = libgen.generate_library('c', build_path, obj_dir, path,
+                                          shared=True, cache_dir=False)
+            symbols = subprocess.check_output(
+                ['nm', '-u', os.path.join(obj_dir, 'batch.o')])
+            assert b'GOMP_parallel' in symbols
+            dynamic = subprocess.check_output(['readelf', '-d', lib])
+            assert b'libgomp' in dynamic
+        finally:
+            shutil.rmtree(path)
+
+    def test_pgo(self):
+        """Ensure the training driver runs for each memory layout.
+        """
+        path = tempfile.mkdtemp()
+        try:
+            for layout in ['aos', 'soa']:
+                build_path = os.path.join(path, layout)
+                obj_dir = os.path.join(path, layout + '_obj')
+                create_jacobian('c', MECH, build_path=build_path,
+                                layout=layout, vector_width=4,
+                                tuned_params=False)
+                lib = libgen.generate_library('c', build_path, obj_dir, path,
+                                              shared=True, cache_dir=False,
+                                              pgo=True)
+                assert os.path.isfile(lib)
+                # the batched drivers were trained
+                assert os.path.isfile(os.path.join(obj_dir, 'batch.gcda'))
+        finally:
+            shutil.rmtree(path)
@@ -2,11 +2,20 @@
 from __future__ import print_function
 from __future__ import division
 
+import os
 import sys
+import shutil
+import tempfile
 
+import numpy as np
+import pytest
+
+from ..core.create_jacobian import create_jacobian
 from ..pywrap import pywrap_gen
 from ..pywrap import parallel_compiler
 
+MECH = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'h2o2.inp')
+
 class TestPywrap_gen(object):
     """
     """
@@ -15,6 +24,81 @@ def test_imported(self):
         """
         assert 'pyjac.pywrap.pywrap_gen' in sys.modules
 
+    def test_batch(self):
+        """Ensure the batched functions match the single-state functions.
+        """
+        pytest.importorskip('Cython')
+        # the wrapper is built from files in the package directory
+        home_dir = os.path.dirname(pywrap_gen.__file__)
+        generated = [os.path.join(home_dir, name) for name in
+                     ['pyjacob_setup.py', 'pyjacob_wrapper.c']]
+        previous = {}
+        for filename in generated:
+            if os.path.isfile(filename):
+                with open(filename, 'rb') as file:
+                    previous[filename] = file.read()
+
+        path = tempfile.mkdtemp()
+        cwd = os.getcwd()
+        cache = os.environ.get('PYJAC_OBJECT_CACHE')
+        os.environ['PYJAC_OBJECT_CACHE'] = os.path.join(path, 'cache')
+        try:
+            build_path = os.path.join(path, 'out')
+            create_jacobian('c', MECH, build_path=build_path,
+                            tuned_params=False)
+            os.chdir(path)
+            pywrap_gen.generate_wrapper('c', build_path, path)
+            sys.path.insert(0, path)
+            try:
+                import pyjacob
+            finally:
+                sys.path.remove(path)
+
+            num, num_species = 10, 9
+            rand = np.random.RandomState(0)
+            pres = 101325. * rand.uniform(0.5, 20., num)
+            fractions = rand.uniform(0., 1., (num, num_species))
+            fractions /= np.sum(fractions, axis=1)[:, np.newaxis]
+            # the states including the last species
+            y = np.hstack((rand.uniform(800., 2500., (num, 1)), fractions))
+
+            dy = np.zeros((num, num_species + 1))
+            jac = np.zeros((num, num_species * num_species))
+            for i in range(num):
+                pyjacob.py_dydt(0, pres[i], y[i], dy[i])
+                pyjacob.py_eval_jacobian(0, pres[i], y[i], jac[i])
+                dy[i, -1] = -sum(dy[i, 1:-1])
+
+            for width in [num_species, num_species + 1]:
+                y_width = np.ascontiguousarray(y[:, :width])
+                assert np.array_equal(
+                    pyjacob.py_dydt_batch(0, pres, y_width),
+                    dy[:, :width])
+                out = np.full((num, width), np.nan)
+                assert pyjacob.py_dydt_batch(0, pres, y_width, out=out,
+                                             num_threads=2) is out
+                assert np.array_equal(out, dy[:, :width])
+
+                assert np.array_equal(
+                    pyjacob.py_eval_jacobian_batch(0, pres, y_width), jac)
+                out = np.full_like(jac, np.nan)
+                pyjacob.py_eval_jacobian_batch(0, pres, y_width, out=out,
+                                               num_threads=2)
+                assert np.array_equal(out, jac)
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(path)
+            if cache is None:
+                del os.environ['PYJAC_OBJECT_CACHE']
+            else:
+                os.environ['PYJAC_OBJECT_CACHE'] = cache
+            for filename in generated:
+                if filename in previous:
+                    with open(filename, 'wb') as file:
+                        file.write(previous[filename])
+                elif os.path.isfile(filename):
+                    os.remove(filename)
+
 class TestParallelCompiler(object):
     """
     """
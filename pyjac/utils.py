@@ -12,7 +12,9 @@
            'header_ext', 'line_end', 'exp_10_fun', 'array_chars',
            'get_species_mappings', 'get_nu', 'read_str_num', 'split_str',
            'create_dir', 'get_array', 'get_index', 'reassign_species_lists',
-           'is_integer', 'get_parser'
+           'is_integer', 'get_parser', 'layouts', 'get_soa_array',
+           'soa_loop_start', 'soa_loop_end', 'jac_formats', 'kc_modes',
+           'cache_optimizers'
            ]
 
 line_start = '  '
@@ -49,6 +51,29 @@
                    )
 """dict: the characters to format an index into an array per language"""
 
+layouts = ['aos', 'soa']
+"""list(`str`): memory layouts of the generated C code, i.e., one state per
+call (array-of-structures) or a block of ``VECWIDTH`` states per call stored
+as a structure-of-arrays"""
+
+soa_loop_end = '  } // end loop over states\n'
+"""str: closes the loop opened by :func:`soa_loop_start`"""
+
+jac_formats = ['dense', 'csr', 'csc']
+"""list(`str`): storage formats of the generated Jacobian, i.e., the full
+``NSP * NSP`` (column-major) array, or the structural non-zeros only, in
+compressed sparse row / column order"""
+
+kc_modes = ['reaction', 'gibbs']
+"""list(`str`): evaluation of the equilibrium constants in the generated
+reaction rates, i.e., a thermodynamic polynomial per reaction, or from the
+species' (S - H) / RT evaluated once per call"""
+
+cache_optimizers = ['greedy', 'rcm', 'spectral']
+"""list(`str`): methods of ordering the species and reactions to improve
+cache hit rates, i.e., the greedy random-restart search, or reverse
+Cuthill-McKee / Fiedler-vector ordering of the species-reaction graph"""
+
 # if false, zero values will be assumed to have been set previously (by memset etc.)
 # and can be skipped, to increase efficiency
 
@@ -222,6 +247,67 @@ def get_array(lang, name, index, twod=None):
     return name + array_chars[lang].format(index)
 
 
+def get_soa_array(lang, name, index, twod=None):
+    """
+    A substitute for `get_array` for the structure-of-arrays C layout.
+
+    Entry ``index`` of the state currently being evaluated (``lane``)
+    is stored at ``name[lane + index * VECWIDTH]``.
+
+    Parameters
+    ----------
+    lang : str
+        One of the accepted languages
+    name : str
+        The name of the array
+    index : int
+        The index to format
+    twod : int, optional
+        Not used in this function.
+
+    Returns
+    -------
+    name : str
+        String with indexed array.
+
+    """
+    if index is None:
+        return name
+    return name + '[INDEX({})]'.format(index)
+
+
+def soa_loop_start(inputs=None, outputs=None):
+    """
+    Returns the opening of the vectorized loop over the states of a
+    structure-of-arrays block.
+
+    Per-state scalars are passed between the structure-of-arrays
+    subroutines as arrays of length ``VECWIDTH``, named ``<scalar>_vec``;
+    these are bound to their usual (scalar) names inside the loop.
+
+    Parameters
+    ----------
+    inputs : list of str, optional
+        Names of per-state values to be read into a local scalar
+    outputs : list of str, optional
+        Names of per-state values to be written through a local pointer
+
+    Returns
+    -------
+    line : str
+        The loop opening and scalar bindings
+
+    """
+    line = ('  #pragma omp simd\n'
+            '  for (int lane = 0; lane < VECWIDTH; ++lane) {\n'
+            )
+    for name in inputs or []:
+        line += '  const double {0} = {0}_vec[lane];\n'.format(name)
+    for name in outputs or []:
+        line += '  double * {0} = &{0}_vec[lane];\n'.format(name)
+    return line
+
+
 def get_index(lang, index):
     """
     Given an integer index this function will return the proper string
@@ -356,10 +442,35 @@ def get_parser():
     # cuda specific
     parser.add_argument('-co', '--cache-optimizer',
                         dest='cache_optimizer',
+                        nargs='?',
+                        const='greedy',
+                        choices=cache_optimizers,
+                        default=None,
+                        help='Attempt to optimize cache store/loading '
+                             'via reordering of the species and reactions, '
+                             'by a greedy selection algorithm (the default, '
+                             'slow), or by reverse Cuthill-McKee ("rcm") or '
+                             'spectral ordering of the species-reaction '
+                             'graph (fast). (Experimental)'
+                        )
+    parser.add_argument('-cr', '--cache-refine',
+                        dest='cache_refine',
                         action='store_true',
                         default=False,
-                        help='Attempt to optimize cache store/loading '
-                             'via use of a greedy selection algorithm. (Experimental)'
+                        help='Refine the "rcm" / "spectral" cache '
+                             'optimization with the greedy selection '
+                             'algorithm.'
+                        )
+    parser.add_argument('-cp', '--cache-patience',
+                        type=int,
+                        dest='cache_patience',
+                        default=1000,
+                        required=False,
+                        help='Stop the greedy cache optimization once this '
+                             'many runs in a row did not improve the order '
+                             '(zero runs all of them). Its progress is '
+                             'checkpointed in the build directory, and '
+                             'resumed by the next run.'
                         )
     parser.add_argument('-nosmem', '--no-shared-memory',
                         dest='no_shared',
@@ -430,6 +541,102 @@ def get_parser():
                         action='store_true',
                         help='If specified, this option turns off Jacobian generation '
                              '(only rate subs are generated)')
+    parser.add_argument('-lo', '--layout',
+                        type=str,
+                        choices=layouts,
+                        default='aos',
+                        required=False,
+                        help='Memory layout of the generated C code. The '
+                             '"soa" layout evaluates a block of VECWIDTH '
+                             'states per call with the state data stored as '
+                             'a structure-of-arrays, for vectorization '
+                             '(#pragma omp simd) across states.'
+                        )
+    parser.add_argument('-vw', '--vector-width',
+                        type=int,
+                        dest='vector_width',
+                        default=8,
+                        required=False,
+                        help='The number of states per call (VECWIDTH) for '
+                             'the "soa" layout.'
+                        )
+    parser.add_argument('-jf', '--jac-format',
+                        type=str,
+                        dest='jac_format',
+                        choices=jac_formats,
+                        default='dense',
+                        required=False,
+                        help='Storage of the generated Jacobian. The "csr" '
+                             'and "csc" formats write only the structural '
+                             'non-zeros, with the matching row_ptr / col_ind '
+                             '(col_ptr / row_ind) arrays exported in jacob.h. '
+                             'C only.'
+                        )
+    parser.add_argument('-kc', '--kc-mode',
+                        type=str,
+                        dest='kc_mode',
+                        choices=kc_modes,
+                        default='reaction',
+                        required=False,
+                        help='Evaluation of the equilibrium constants of the '
+                             'reversible reactions. "gibbs" evaluates the '
+                             'species (S - H) / RT once per call, and each '
+                             'equilibrium constant from the stoichiometry. '
+                             'C only.'
+                        )
+    parser.add_argument('-ht', '--hoist-trange',
+                        dest='hoist_trange',
+                        action='store_true',
+                        default=False,
+                        help='Group the species thermodynamic properties '
+                             'and the equilibrium constants by temperature '
+                             'breakpoint, evaluating each under a single '
+                             'conditional. C only.'
+                        )
+    parser.add_argument('-gj', '--gen-jobs',
+                        type=int,
+                        dest='gen_jobs',
+                        default=1,
+                        required=False,
+                        help='The number of processes used to write the '
+                             'independent subroutine files.'
+                        )
+    parser.add_argument('-mc', '--mech-cache',
+                        type=str,
+                        dest='mech_cache',
+                        default=None,
+                        required=False,
+                        help='Directory of the parsed-mechanism cache. '
+                             'Parsed mechanisms are stored keyed by the '
+                             'contents of the mechanism and thermo files, '
+                             'and reloaded instead of parsed again.'
+                        )
+    parser.add_argument('-tp', '--tuned-params',
+                        type=str,
+                        dest='tuned_params',
+                        default=None,
+                        required=False,
+                        help='File of the code-splitting parameters tuned '
+                             'per mechanism by "pyjac tune", by default '
+                             '$PYJAC_TUNE_FILE or '
+                             '~/.cache/pyjac/tuned_params.json.'
+                        )
+    parser.add_argument('-ntp', '--no-tuned-params',
+                        dest='tuned_params',
+                        action='store_const',
+                        const=False,
+                        help='Ignore the tuned code-splitting parameters.'
+                        )
+    parser.add_argument('-bc', '--batch-chunk',
+                        type=int,
+                        dest='batch_chunk',
+                        default=0,
+                        required=False,
+                        help='The number of states handed to each OpenMP '
+                             'thread at once by the batched C drivers '
+                             '(dydt_batch / eval_jacob_batch). If zero, the '
+                             'states are split evenly amongst the threads.'
+                        )
 
     args = parser.parse_args()
     return args
@@ -78,7 +78,8 @@
     ],
     keywords='chemical_kinetics analytical_Jacobian',
 
-    packages=['pyjac', 'pyjac.core', 'pyjac.functional_tester', 'pyjac.libgen',
+    packages=['pyjac', 'pyjac.analysis', 'pyjac.core',
+              'pyjac.functional_tester', 'pyjac.libgen',
               'pyjac.performance_tester', 'pyjac.pywrap', 'pyjac.tests',
               ],
     package_dir={'pyjac': 'pyjac'},